@@ -0,0 +1,9 @@
+from .data_loader import *
+from .series_cache import *
+from .frost_query import *
+from .joined_data import *
+from .raw_frost_store import *
+from .calendar_features import *
+from .climatology import *
+from .analysis_results import *
+from .quality_flags import *
@@ -0,0 +1,198 @@
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from .data_loader import CACHE_SIZE
+
+# Parquet krever pyarrow (med i requirements-filene); mangler den, lagres tabellene som CSV
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Lagre en CSV-kopi i tillegg til Parquet-filen (alltid CSV hvis pyarrow mangler)
+EXPORT_CSV = False
+
+# Kolonner som leses som datoer når en tabell leses fra CSV
+DATE_COLUMNS = ('date', 'referenceTime', 'dateTime', 'start', 'end')
+
+def analysis_table_path(output_dir, name):
+    """
+    Gir filstien en analysetabell lagres til, avhengig av om pyarrow er installert.
+
+    Args:
+        output_dir (str): Katalogen med analyseresultater.
+        name (str): Navnet på tabellen uten filendelse, f.eks. 'frost_aggregated_stats_year'.
+
+    Returns:
+        str: Filsti til .parquet-filen, eller .csv-filen uten pyarrow.
+    """
+    return os.path.join(output_dir, f"{name}.{'parquet' if HAS_PYARROW else 'csv'}")
+
+def _categorize(df):
+    """
+    Gjør tekstkolonner om til kategorier i rekkefølgen verdiene først dukker opp.
+    """
+    for column in df.columns:
+        if df[column].dtype == object:
+            values = df[column]
+            df[column] = pd.Categorical(values, categories=pd.unique(values.dropna()))
+    return df
+
+def tidy_table(table, variable_name='variable'):
+    """
+    Gjør om en analysetabell til langt format med vanlige kolonner.
+
+    Kolonner på formen (variabel, statistikk) stables slik at hver rad er én
+    variabel, med statistikkene som kolonner. Navngitte indeksnivåer, som
+    år og årstid, blir vanlige kolonner.
+
+    Args:
+        table (pd.DataFrame): Tabellen som skal gjøres om.
+        variable_name (str): Navnet på kolonnen med variabelnavnene.
+
+    Returns:
+        pd.DataFrame: Tabellen i langt format, med tekstkolonner som kategorier.
+    """
+    if isinstance(table.columns, pd.MultiIndex):
+        table = table.stack(level=0, future_stack=True)
+        table.index = table.index.set_names(variable_name, level=-1)
+        table.columns.name = None
+    named_index = any(name is not None for name in table.index.names)
+    return _categorize(table.reset_index(drop=not named_index))
+
+def tidy_matrix(matrix, value_name='correlation'):
+    """
+    Gjør om en kvadratisk matrise (f.eks. korrelasjoner) til én rad per par (x, y).
+
+    Args:
+        matrix (pd.DataFrame): Matrisen, med variabelnavn som indeks og kolonner.
+        value_name (str): Navnet på verdikolonnen.
+
+    Returns:
+        pd.DataFrame: Kolonnene 'x', 'y' og verdikolonnen.
+    """
+    long = matrix.rename_axis(index='x', columns='y').stack(future_stack=True)
+    return _categorize(long.reset_index(name=value_name))
+
+def save_analysis_table(table, output_dir, name, export_csv=None):
+    """
+    Lagrer en analysetabell i langt format som Parquet, og eventuelt som CSV.
+
+    Filene skrives først til en midlertidig fil og flyttes på plass, slik at
+    lesere aldri ser en halvskrevet tabell.
+
+    Args:
+        table (pd.DataFrame): Tabellen; gjøres om med tidy_table.
+        output_dir (str): Katalogen med analyseresultater.
+        name (str): Navnet på tabellen uten filendelse.
+        export_csv (bool, optional): Lagre også CSV. Standard er EXPORT_CSV.
+
+    Returns:
+        str: Filstien til hovedfilen (se analysis_table_path).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tidy = tidy_table(table)
+    path = analysis_table_path(output_dir, name)
+    if HAS_PYARROW:
+        tmp_path = path + '.tmp'
+        tidy.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    if not HAS_PYARROW or (EXPORT_CSV if export_csv is None else export_csv):
+        csv_path = os.path.join(output_dir, f'{name}.csv')
+        tidy.to_csv(csv_path + '.tmp', index=False)
+        os.replace(csv_path + '.tmp', csv_path)
+    return path
+
+def _resolve_path(path):
+    """
+    Finner filen for en analysetabell; Parquet foretrekkes fremfor CSV med samme navn.
+    """
+    base, extension = os.path.splitext(path)
+    if extension not in ('.parquet', '.csv'):
+        base = path
+    candidates = ([base + '.parquet'] if HAS_PYARROW else []) + [base + '.csv']
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return os.path.abspath(candidate)
+    raise FileNotFoundError(f"Fant ingen analysetabell for '{path}'")
+
+def _filter(df, filters):
+    """
+    Velger ut radene der hver kolonne har en av de oppgitte verdiene.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, values in filters:
+        mask &= df[column].isin(values)
+    return df[mask].reset_index(drop=True)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _read_cached(path, mtime_ns, columns, filters):
+    """
+    Leser en analysetabell. Resultatet caches per (sti, mtime, kolonner, filter).
+    """
+    if path.endswith('.parquet'):
+        # Filteret og kolonneutvalget utføres av pyarrow, slik at bare de aktuelle dataene leses
+        return pd.read_parquet(path, columns=list(columns) if columns else None,
+                               filters=[(column, 'in', list(values)) for column, values in filters] or None)
+
+    df = pd.read_csv(path)
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    df = _filter(df, filters)
+    return df[list(columns)] if columns else df
+
+def read_analysis_table(path, columns=None, **filters):
+    """
+    Leser en analysetabell lagret med save_analysis_table, med valgfritt kolonne- og radutvalg.
+
+    Stien kan oppgis med eller uten filendelse; en Parquet-fil med samme navn
+    brukes fremfor CSV. Resultatet caches i minnet til filen endres, så gjentatte
+    kall (f.eks. fra et dashbord) ikke leser filen på nytt.
+
+    Eksempel:
+        read_analysis_table('data/analyses_results/nilu_aggregated_stats_year_season',
+                            columns=['year', 'season', 'variable', 'mean'], year=[2020, 2021], season='Winter')
+
+    Args:
+        path (str): Filsti til tabellen.
+        columns (list, optional): Kolonnene som skal leses. Standard er alle.
+        **filters: Kolonne = verdi eller liste med verdier som radene skal ha.
+
+    Returns:
+        pd.DataFrame: De valgte radene og kolonnene.
+
+    Raises:
+        FileNotFoundError: Hvis tabellen ikke finnes.
+    """
+    resolved = _resolve_path(path)
+    columns = tuple(columns) if columns is not None else None
+    filters = tuple(sorted(
+        (column, tuple(values) if isinstance(values, (list, tuple, set)) else (values,))
+        for column, values in filters.items()
+    ))
+    return _read_cached(resolved, os.stat(resolved).st_mtime_ns, columns, filters).copy()
+
+def read_correlation_matrix(path):
+    """
+    Leser en korrelasjonsmatrise lagret med tidy_matrix tilbake til kvadratisk form.
+
+    Args:
+        path (str): Filsti til tabellen.
+
+    Returns:
+        pd.DataFrame: Matrisen med variabelnavn som indeks og kolonner.
+    """
+    long = read_analysis_table(path).astype({'x': str, 'y': str})
+    names = list(dict.fromkeys(long['x']))
+    matrix = long.pivot(index='x', columns='y', values='correlation')
+    return matrix.reindex(index=names, columns=names).rename_axis(index=None, columns=None)
+
+def clear_results_cache():
+    """
+    Tømmer minnecachen for analysetabeller.
+    """
+    _read_cached.cache_clear()
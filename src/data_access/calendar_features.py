@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+# Årstidene i naturlig rekkefølge; kodene under viser til posisjonen i listen
+SEASON_LABELS = ['Winter', 'Spring', 'Summer', 'Fall']
+
+# Årstidskode for hver måned. Indeks 0 er ubrukt (-1 = ukjent), slik at
+# månedsnummeret kan brukes direkte som indeks.
+SEASON_CODE_BY_MONTH = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+# Årstid for hver måned (engelske navn, samme som i analysemodulene)
+MONTH_TO_SEASON = {month: SEASON_LABELS[SEASON_CODE_BY_MONTH[month]] for month in range(1, 13)}
+
+# Det hydrologiske året i Norge går fra 1. september til 31. august og
+# navngis etter året det starter i. Tabellen gir forskyvningen fra kalenderåret.
+HYDROLOGICAL_YEAR_START_MONTH = 9
+HYDROLOGICAL_YEAR_OFFSET_BY_MONTH = np.array(
+    [0] + [-1 if month < HYDROLOGICAL_YEAR_START_MONTH else 0 for month in range(1, 13)], dtype=np.int64
+)
+
+# Lengden på året som brukes i de harmoniske leddene (samme som i prediksjonsmodellen)
+ANNUAL_PERIOD = 365
+
+# Kalenderfunksjonene add_calendar_features kan lage
+CALENDAR_FEATURES = ['year', 'month', 'season', 'day_of_year', 'hydrological_year']
+
+def get_season(month) -> str:
+    """
+    Returnerer navnet på årstiden basert på månedsnummer.
+    Returnerer 'Unknown' hvis måneden er ugyldig.
+
+    Args:
+        month (int): Månedsnummer (1-12).
+
+    Returns:
+        str: Navn på årstid eller 'Unknown'.
+    """
+    try:
+        month = int(month)
+    except (TypeError, ValueError):
+        return 'Unknown'
+    if not 1 <= month <= 12:
+        return 'Unknown'
+    return SEASON_LABELS[SEASON_CODE_BY_MONTH[month]]
+
+def calendar_arrays(dates):
+    """
+    Deler datoer opp i år, måned og dag i året med ren NumPy-aritmetikk.
+
+    Datoene gjøres om til datetime64 med dags-, måneds- og årsoppløsning, og
+    differansene mellom dem gir feltene uten å gå via pandas' .dt-accessor.
+    Manglende datoer gir NaN i alle feltene (og flyttall, som i pandas).
+
+    Args:
+        dates (array-like): Datoer som pd.Series, DatetimeIndex eller datetime64-array.
+
+    Returns:
+        dict: NumPy-arrays med nøklene 'year', 'month' og 'day_of_year'.
+    """
+    days = pd.DatetimeIndex(pd.to_datetime(dates))
+    if days.tz is not None:
+        # Lokal veggklokketid bestemmer datoen
+        days = days.tz_localize(None)
+    missing = np.asarray(days.isna())
+    days = days.values.astype('datetime64[D]')
+    years = days.astype('datetime64[Y]')
+    months = days.astype('datetime64[M]')
+
+    year = years.astype(np.int64) + 1970
+    month = (months - years).astype(np.int64) + 1
+    day_of_year = (days - years).astype(np.int64) + 1
+    parts = {'year': year, 'month': month, 'day_of_year': day_of_year}
+    if missing.any():
+        parts = {key: np.where(missing, np.nan, values) for key, values in parts.items()}
+    return parts
+
+def season_codes(month) -> np.ndarray:
+    """
+    Slår opp årstidskoden for hver måned (0 = vinter, ..., 3 = høst, -1 = ukjent).
+
+    Args:
+        month (array-like): Månedsnummer (1-12).
+
+    Returns:
+        np.ndarray: Årstidskoder som int8.
+    """
+    month = np.asarray(month, dtype=float)
+    valid = (month >= 1) & (month <= 12)
+    lookup = np.where(valid, month, 0).astype(np.intp)
+    return np.where(valid, SEASON_CODE_BY_MONTH[lookup], -1).astype(np.int8)
+
+def season_labels(month, categorical: bool = True):
+    """
+    Gir årstiden for hver måned, enten som kategorisk kolonne eller som tekst.
+
+    Args:
+        month (array-like): Månedsnummer (1-12).
+        categorical (bool): Returner pd.Categorical med kategoriene i SEASON_LABELS.
+            Hvis False returneres en objekt-array med tekst og None for ugyldige måneder.
+
+    Returns:
+        pd.Categorical | np.ndarray: Årstid per rad.
+    """
+    codes = season_codes(month)
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=SEASON_LABELS)
+    # Siste element i tabellen er None, slik at kode -1 gir manglende verdi
+    return np.array(SEASON_LABELS + [None], dtype=object)[codes]
+
+def hydrological_year(year, month) -> np.ndarray:
+    """
+    Finner det hydrologiske året (1. september - 31. august) for hver rad.
+
+    Args:
+        year (array-like): Kalenderår.
+        month (array-like): Månedsnummer (1-12).
+
+    Returns:
+        np.ndarray: Startåret til det hydrologiske året.
+    """
+    month = np.nan_to_num(np.asarray(month, dtype=float)).clip(0, 12).astype(np.intp)
+    return np.asarray(year) + HYDROLOGICAL_YEAR_OFFSET_BY_MONTH[month]
+
+def fourier_terms(day_of_year, harmonics: int = 1, period: float = ANNUAL_PERIOD) -> dict:
+    """
+    Lager sinus- og cosinusledd for årssyklusen.
+
+    Args:
+        day_of_year (array-like): Dag i året (1-366).
+        harmonics (int): Antall harmoniske; ledd k har frekvens k per år.
+        period (float): Lengden på året i dager.
+
+    Returns:
+        dict: Arrays med nøklene 'sin_1', 'cos_1', ..., 'sin_k', 'cos_k'.
+    """
+    angle = 2 * np.pi * np.asarray(day_of_year, dtype=float) / period
+    terms = {}
+    for k in range(1, harmonics + 1):
+        terms[f'sin_{k}'] = np.sin(k * angle)
+        terms[f'cos_{k}'] = np.cos(k * angle)
+    return terms
+
+def add_calendar_features(df: pd.DataFrame, date_column: str, features=('year', 'month', 'season'),
+                          harmonics: int = 0, categorical: bool = True) -> pd.DataFrame:
+    """
+    Legger til kalenderkolonner for datokolonnen i én vektorisert gjennomgang.
+
+    Årstid og hydrologisk år slås opp i tabeller indeksert med måned, slik at
+    hver kolonne er ett enkelt array-oppslag uansett antall rader.
+
+    Args:
+        df (pd.DataFrame): DataFrame med datokolonne. Endres på stedet.
+        date_column (str): Navnet på datokolonnen.
+        features (tuple): Kolonner fra CALENDAR_FEATURES som skal legges til.
+        harmonics (int): Antall sinus/cosinus-par for årssyklusen ('sin_1', 'cos_1', ...).
+        categorical (bool): Lag 'season' som kategorisk kolonne i stedet for tekst.
+
+    Returns:
+        pd.DataFrame: Samme DataFrame med de nye kolonnene.
+
+    Raises:
+        ValueError: Hvis en ukjent kalenderfunksjon er oppgitt.
+    """
+    unknown = set(features) - set(CALENDAR_FEATURES)
+    if unknown:
+        raise ValueError(f"Ukjente kalenderfunksjoner: {sorted(unknown)}")
+
+    parts = calendar_arrays(df[date_column])
+    for feature in features:
+        if feature == 'season':
+            df['season'] = season_labels(parts['month'], categorical=categorical)
+        elif feature == 'hydrological_year':
+            df['hydrological_year'] = hydrological_year(parts['year'], parts['month'])
+        else:
+            df[feature] = parts[feature]
+    for name, values in fourier_terms(parts['day_of_year'], harmonics).items():
+        df[name] = values
+    return df
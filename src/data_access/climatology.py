@@ -0,0 +1,384 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import get_cleaned_data_path
+from .series_cache import to_day_ordinals
+from .calendar_features import calendar_arrays, fourier_terms, ANNUAL_PERIOD
+
+# Mappen i 'data/clean' der klimatologiene lagres
+CLIMATOLOGY_DIRNAME = 'climatology'
+
+# Øk denne hvis formatet endres, slik at gamle klimatologier beregnes på nytt
+CLIMATOLOGY_VERSION = 1
+
+# Kvantilene som beregnes for hver dag i året
+CLIMATOLOGY_QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+# Bredden i dager på det sentrerte vinduet som kvantilene beregnes over.
+# Med få år per dag i året gir ett enkelt døgn for få verdier.
+QUANTILE_WINDOW = 15
+
+# Antall harmoniske i den glattede årssyklusen for gjennomsnitt og standardavvik
+CLIMATOLOGY_HARMONICS = 3
+
+# Antall mulige dager i året (dag 366 finnes bare i skuddår)
+DAYS_IN_YEAR = 366
+
+def _design_matrix(day_of_year, harmonics):
+    """
+    Lager designmatrisen [1, sin_1, cos_1, ..., sin_k, cos_k] for den harmoniske tilpasningen.
+    """
+    terms = fourier_terms(day_of_year, harmonics, ANNUAL_PERIOD)
+    return np.column_stack([np.ones(len(day_of_year))] + list(terms.values()))
+
+def _windowed_quantiles(day_index, values, levels, window):
+    """
+    Beregner kvantiler per dag i året over et sentrert vindu, for alle dager samtidig.
+
+    Hver måling kopieres til alle dagene i vinduet rundt sin egen dag (med
+    omløp over årsskiftet). Deretter sorteres alt én gang på (dag, verdi),
+    og kvantilene hentes med lineær interpolasjon innenfor hver dag.
+    """
+    half = window // 2
+    offsets = np.arange(-half, half + 1)
+    bins = ((day_index[:, None] + offsets[None, :]) % DAYS_IN_YEAR).ravel()
+    pooled = np.repeat(values, len(offsets))
+
+    order = np.lexsort((pooled, bins))
+    pooled = pooled[order]
+    counts = np.bincount(bins, minlength=DAYS_IN_YEAR)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    result = np.full((len(levels), DAYS_IN_YEAR), np.nan)
+    has_values = counts > 0
+    for i, level in enumerate(levels):
+        position = level * (counts[has_values] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, counts[has_values] - 1)
+        fraction = position - lower
+        low_values = pooled[starts[has_values] + lower]
+        high_values = pooled[starts[has_values] + upper]
+        result[i, has_values] = low_values + fraction * (high_values - low_values)
+    return result
+
+def _fingerprint(ordinals, values):
+    """
+    Lager et fingeravtrykk av de målte verdiene i en kolonne, uavhengig av radrekkefølgen.
+
+    -0.0 gjøres om til 0.0, siden SQLite lagrer begge som 0.
+    """
+    order = np.argsort(ordinals, kind='stable')
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(ordinals[order], dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(values[order] + 0.0, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+class Climatology:
+    """
+    Klimatologisk referanse per dag i året for én eller flere variabler.
+
+    For hver variabel lagres gjennomsnitt og antall målinger per dag i året,
+    kvantiler over et sentrert vindu og en glattet årssyklus (harmonisk
+    tilpasning) for gjennomsnitt og standardavvik. Alle arrays har én
+    kolonne per dag i året, der posisjon 0 er 1. januar.
+    """
+    def __init__(self, columns, quantiles, arrays, fingerprints, params):
+        """
+        Oppretter en klimatologi fra ferdige arrays. Bruk compute_climatology eller load.
+
+        Args:
+            columns (list): Variablene i klimatologien.
+            quantiles (tuple): Kvantilnivåene, i samme rekkefølge som i 'quantile_values'.
+            arrays (dict): 'doy_mean', 'count', 'harmonic_mean' og 'harmonic_std' med form
+                (variabler, 366), og 'quantile_values' med form (variabler, kvantiler, 366).
+            fingerprints (dict): Fingeravtrykk av kildedataene per variabel.
+            params (dict): Parametrene klimatologien ble beregnet med.
+        """
+        self.columns = list(columns)
+        self.quantiles = tuple(float(level) for level in quantiles)
+        self.arrays = arrays
+        self.fingerprints = dict(fingerprints)
+        self.params = dict(params)
+
+    def _row(self, column):
+        """
+        Finner raden til en variabel.
+        """
+        if column not in self.columns:
+            raise KeyError(f"Kolonnen '{column}' finnes ikke i klimatologien")
+        return self.columns.index(column)
+
+    def lookup(self, column, day_of_year, kind='harmonic_mean'):
+        """
+        Slår opp referanseverdien for hver dag i året.
+
+        Args:
+            column (str): Variabelen.
+            day_of_year (array-like): Dag i året (1-366).
+            kind (str): 'doy_mean', 'count', 'harmonic_mean' eller 'harmonic_std'.
+
+        Returns:
+            np.ndarray: Referanseverdiene, NaN for ugyldige dager.
+        """
+        day = np.asarray(day_of_year, dtype=float)
+        valid = ~np.isnan(day)
+        index = np.where(valid, day, 1).astype(np.intp) - 1
+        return np.where(valid, self.arrays[kind][self._row(column)][index], np.nan)
+
+    def quantile(self, column, level, day_of_year):
+        """
+        Slår opp en kvantil for hver dag i året.
+
+        Args:
+            column (str): Variabelen.
+            level (float): Kvantilnivået; må være et av nivåene i 'quantiles'.
+            day_of_year (array-like): Dag i året (1-366).
+
+        Returns:
+            np.ndarray: Kvantilverdiene.
+
+        Raises:
+            KeyError: Hvis kvantilen ikke er beregnet.
+        """
+        matches = [i for i, computed in enumerate(self.quantiles) if np.isclose(computed, level)]
+        if not matches:
+            raise KeyError(f"Kvantilen {level} er ikke beregnet; tilgjengelige er {list(self.quantiles)}")
+        day = np.asarray(day_of_year, dtype=float)
+        valid = ~np.isnan(day)
+        index = np.where(valid, day, 1).astype(np.intp) - 1
+        return np.where(valid, self.arrays['quantile_values'][self._row(column), matches[0]][index], np.nan)
+
+    def to_frame(self, column):
+        """
+        Bygger en tabell med én rad per dag i året for en variabel.
+
+        Args:
+            column (str): Variabelen.
+
+        Returns:
+            pd.DataFrame: Kolonnene doy_mean, count, harmonic_mean, harmonic_std og q<nivå>.
+        """
+        row = self._row(column)
+        data = {kind: self.arrays[kind][row] for kind in ('doy_mean', 'count', 'harmonic_mean', 'harmonic_std')}
+        for i, level in enumerate(self.quantiles):
+            data[f'q{level:g}'] = self.arrays['quantile_values'][row, i]
+        return pd.DataFrame(data, index=pd.RangeIndex(1, DAYS_IN_YEAR + 1, name='day_of_year'))
+
+    def matches(self, fingerprints, params):
+        """
+        Sjekker om klimatologien er beregnet fra de samme dataene og med de samme parametrene.
+
+        Args:
+            fingerprints (dict): Fingeravtrykk per variabel for dataene det sammenlignes med.
+            params (dict): Parametrene det sammenlignes med.
+
+        Returns:
+            bool: True hvis alle variablene finnes med samme fingeravtrykk.
+        """
+        return (self.params == params and
+                all(self.fingerprints.get(column) == value for column, value in fingerprints.items()))
+
+    def save(self, path):
+        """
+        Lagrer klimatologien atomisk til en .npz-fil, med metadata i samme fil.
+
+        Args:
+            path (str): Filsti som skal skrives.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        meta = {
+            'version': CLIMATOLOGY_VERSION,
+            'columns': self.columns,
+            'quantiles': list(self.quantiles),
+            'fingerprints': self.fingerprints,
+            'params': self.params
+        }
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), **self.arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Leser en klimatologi fra en .npz-fil.
+
+        Args:
+            path (str): Filsti til klimatologien.
+
+        Returns:
+            Climatology: Den innleste klimatologien.
+
+        Raises:
+            FileNotFoundError: Hvis filen ikke finnes.
+            ValueError: Hvis filen har en annen versjon enn forventet.
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != CLIMATOLOGY_VERSION:
+                raise ValueError(f"Ukjent klimatologi-versjon i '{path}': {meta.get('version')}")
+            arrays = {key: data[key] for key in data.files if key != 'meta'}
+        return cls(meta['columns'], meta['quantiles'], arrays, meta['fingerprints'], meta['params'])
+
+def climatology_params(quantiles=CLIMATOLOGY_QUANTILES, window=QUANTILE_WINDOW, harmonics=CLIMATOLOGY_HARMONICS):
+    """
+    Samler parametrene for en klimatologi i en ordbok som kan lagres og sammenlignes.
+
+    Returns:
+        dict: Kvantilnivåer, vindusbredde og antall harmoniske.
+    """
+    return {'quantiles': [float(level) for level in quantiles], 'window': int(window), 'harmonics': int(harmonics)}
+
+def _observed(df, date_column, columns, exclude_generated):
+    """
+    Henter dag-ordinaler og målte verdier, med imputerte verdier satt til NaN.
+    """
+    ordinals = to_day_ordinals(df[date_column])
+    values = df[columns].to_numpy(dtype=float)
+    if exclude_generated:
+        for j, column in enumerate(columns):
+            flag = f'generated_{column}'
+            if flag in df.columns:
+                values[np.asarray(df[flag], dtype=float) > 0, j] = np.nan
+    return ordinals, values
+
+def climatology_fingerprints(df, date_column, columns, exclude_generated=True):
+    """
+    Lager fingeravtrykk av de målte verdiene per variabel.
+
+    Args:
+        df (pd.DataFrame): Dagdata.
+        date_column (str): Navnet på datokolonnen.
+        columns (list): Variablene.
+        exclude_generated (bool): Utelat verdier med 'generated_<kolonne>' = True.
+
+    Returns:
+        dict: Fingeravtrykk per variabel.
+    """
+    ordinals, values = _observed(df, date_column, list(columns), exclude_generated)
+    fingerprints = {}
+    for j, column in enumerate(columns):
+        keep = ~np.isnan(values[:, j])
+        fingerprints[column] = _fingerprint(ordinals[keep], values[keep, j])
+    return fingerprints
+
+def compute_climatology(df, date_column, columns, exclude_generated=True, quantiles=CLIMATOLOGY_QUANTILES,
+                        window=QUANTILE_WINDOW, harmonics=CLIMATOLOGY_HARMONICS):
+    """
+    Beregner klimatologien for alle variablene i én gjennomgang per variabel.
+
+    Gjennomsnitt og antall per dag i året beregnes med np.bincount. Den
+    glattede årssyklusen er en minste kvadraters tilpasning av harmoniske
+    ledd til alle målingene, og standardavviket tilpasses på samme måte til
+    de kvadrerte avvikene fra den. Imputerte verdier utelates som standard,
+    slik at referansen bare bygger på målinger.
+
+    Args:
+        df (pd.DataFrame): Dagdata.
+        date_column (str): Navnet på datokolonnen.
+        columns (list): Variablene.
+        exclude_generated (bool): Utelat verdier med 'generated_<kolonne>' = True.
+        quantiles (tuple): Kvantilnivåene.
+        window (int): Bredden i dager på vinduet for kvantilene.
+        harmonics (int): Antall harmoniske i den glattede årssyklusen.
+
+    Returns:
+        Climatology: Klimatologien.
+    """
+    columns = list(columns)
+    ordinals, values = _observed(df, date_column, columns, exclude_generated)
+    day_index = calendar_arrays(ordinals.astype('datetime64[D]'))['day_of_year'] - 1
+    grid = _design_matrix(np.arange(1, DAYS_IN_YEAR + 1), harmonics)
+
+    arrays = {
+        'doy_mean': np.full((len(columns), DAYS_IN_YEAR), np.nan),
+        'count': np.zeros((len(columns), DAYS_IN_YEAR)),
+        'harmonic_mean': np.full((len(columns), DAYS_IN_YEAR), np.nan),
+        'harmonic_std': np.full((len(columns), DAYS_IN_YEAR), np.nan),
+        'quantile_values': np.full((len(columns), len(quantiles), DAYS_IN_YEAR), np.nan)
+    }
+    fingerprints = {}
+    for j, column in enumerate(columns):
+        keep = ~np.isnan(values[:, j])
+        days, observed = day_index[keep], values[keep, j]
+        fingerprints[column] = _fingerprint(ordinals[keep], observed)
+        if len(observed) == 0:
+            continue
+
+        counts = np.bincount(days, minlength=DAYS_IN_YEAR)
+        sums = np.bincount(days, weights=observed, minlength=DAYS_IN_YEAR)
+        arrays['count'][j] = counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            arrays['doy_mean'][j] = np.where(counts > 0, sums / counts, np.nan)
+
+        design = _design_matrix(days + 1, harmonics)
+        if len(observed) >= design.shape[1]:
+            coefficients = np.linalg.lstsq(design, observed, rcond=None)[0]
+            residuals = observed - design @ coefficients
+            variance = np.linalg.lstsq(design, residuals ** 2, rcond=None)[0]
+            arrays['harmonic_mean'][j] = grid @ coefficients
+            # Den tilpassede variansen kan bli negativ for små verdier; den begrenses nedover
+            arrays['harmonic_std'][j] = np.sqrt(np.maximum(grid @ variance, np.finfo(float).eps))
+
+        arrays['quantile_values'][j] = _windowed_quantiles(days, observed, quantiles, window)
+
+    return Climatology(columns, quantiles, arrays, fingerprints, climatology_params(quantiles, window, harmonics))
+
+def get_climatology_path(name, clean_dir=None):
+    """
+    Returnerer filstien til den lagrede klimatologien for et datasett.
+
+    Args:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'.
+        clean_dir (str, optional): Mappen med rensede data. Standard er 'data/clean'.
+
+    Returns:
+        str: Filsti til .npz-filen.
+    """
+    if clean_dir is None:
+        return get_cleaned_data_path(os.path.join(CLIMATOLOGY_DIRNAME, f'{name}.npz'))
+    return os.path.join(clean_dir, CLIMATOLOGY_DIRNAME, f'{name}.npz')
+
+def get_climatology(name, df=None, date_column=None, columns=None, clean_dir=None, exclude_generated=True,
+                    **kwargs):
+    """
+    Henter den lagrede klimatologien, og beregner den på nytt bare hvis dataene er endret.
+
+    Uten 'df' leses den lagrede klimatologien direkte. Med 'df' sammenlignes
+    fingeravtrykket av de målte verdiene med det lagrede; er de ulike (eller
+    filen mangler), beregnes klimatologien fra df og returneres uten å lagres.
+    Filen skrives bare av rensingen.
+
+    Args:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'.
+        df (pd.DataFrame, optional): Dagdata klimatologien skal gjelde for.
+        date_column (str, optional): Navnet på datokolonnen i df.
+        columns (list, optional): Variablene i df.
+        clean_dir (str, optional): Mappen med rensede data. Standard er 'data/clean'.
+        exclude_generated (bool): Utelat verdier med 'generated_<kolonne>' = True.
+        **kwargs: Sendes videre til compute_climatology (quantiles, window, harmonics).
+
+    Returns:
+        Climatology: Klimatologien.
+
+    Raises:
+        FileNotFoundError: Hvis 'df' ikke er oppgitt og klimatologien ikke er lagret.
+    """
+    path = get_climatology_path(name, clean_dir)
+    if df is None:
+        return Climatology.load(path)
+
+    if os.path.exists(path):
+        try:
+            cached = Climatology.load(path)
+            fingerprints = climatology_fingerprints(df, date_column, columns, exclude_generated)
+            if cached.matches(fingerprints, climatology_params(**kwargs)):
+                return cached
+        except (ValueError, KeyError, OSError):
+            # En ødelagt eller utdatert fil beregnes på nytt
+            pass
+
+    return compute_climatology(df, date_column, columns, exclude_generated, **kwargs)
@@ -0,0 +1,209 @@
+import os
+import json
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .calendar_features import MONTH_TO_SEASON, add_calendar_features
+
+# Standard filnavn for de rensede datasettene i 'data/clean'
+FROST_DB_FILENAME = 'cleaned_data_frost.db'
+NILU_JSON_FILENAME = 'cleaned_data_nilu.json'
+
+# Norske navn på årstidene, brukt i de interaktive grafene
+SEASON_NAMES_NO = {
+    'Winter': 'Vinter',
+    'Spring': 'Vår',
+    'Summer': 'Sommer',
+    'Fall': 'Høst'
+}
+
+# Maks antall ulike (fil, kolonner)-kombinasjoner som holdes i minnet
+CACHE_SIZE = 32
+
+def get_cleaned_data_path(filename):
+    """
+    Genererer filstien til en renset datafil i 'data/clean'-mappen.
+
+    Args:
+        filename (str): Navnet på filen.
+
+    Returns:
+        str: Full filsti til den rensede datafilen.
+    """
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'data', 'clean', filename
+    )
+
+def _file_key(path):
+    """
+    Lager cache-nøkkel for en fil basert på absolutt sti og endringstidspunkt.
+
+    Args:
+        path (str): Filsti til datafilen.
+
+    Returns:
+        tuple: (absolutt sti, endringstidspunkt i nanosekunder).
+
+    Raises:
+        FileNotFoundError: Hvis filen ikke finnes.
+    """
+    abs_path = os.path.abspath(path)
+    return abs_path, os.stat(abs_path).st_mtime_ns
+
+def _add_calendar_columns(df, date_column):
+    """
+    Konverterer datokolonnen til datetime og legger til år, måned og årstid.
+
+    Årstiden lagres som tekst, slik at de cachede dataene kan gjøres
+    skrivebeskyttet og grupperes alfabetisk som før.
+
+    Args:
+        df (pd.DataFrame): DataFrame med datokolonne.
+        date_column (str): Navnet på datokolonnen.
+
+    Returns:
+        pd.DataFrame: DataFrame med kolonnene 'year', 'month' og 'season'.
+    """
+    df[date_column] = pd.to_datetime(df[date_column])
+    return add_calendar_features(df, date_column, categorical=False)
+
+def _freeze(df):
+    """
+    Bygger en kopi av DataFrame der alle underliggende NumPy-arrays er skrivebeskyttet.
+
+    Args:
+        df (pd.DataFrame): DataFrame som skal fryses.
+
+    Returns:
+        pd.DataFrame: DataFrame som ikke kan endres på stedet.
+    """
+    arrays = {}
+    for column in df.columns:
+        values = np.array(df[column].to_numpy())
+        values.flags.writeable = False
+        arrays[column] = values
+    return pd.DataFrame(arrays, index=df.index, copy=False)
+
+def _read_only_view(df):
+    """
+    Returnerer en grunn kopi av en cachet DataFrame.
+
+    Kallere kan legge til eller erstatte kolonner i kopien, men skriving
+    direkte i verdiene feiler fordi dataene er skrivebeskyttet.
+
+    Args:
+        df (pd.DataFrame): Cachet DataFrame.
+
+    Returns:
+        pd.DataFrame: Skrivebeskyttet visning av dataene.
+    """
+    return df.copy(deep=False)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load_frost_cached(path, mtime_ns, columns, table_name, start, end):
+    """
+    Leser og forbereder Frost-data. Resultatet caches per (sti, mtime, kolonner, tabell, periode).
+    """
+    if columns is None:
+        query = f'SELECT * FROM "{table_name}"'
+    else:
+        selected = ', '.join(f'"{column}"' for column in ('referenceTime',) + columns)
+        query = f'SELECT {selected} FROM "{table_name}"'
+
+    # Datofilteret kjøres i SQLite slik at kun de aktuelle radene leses
+    conditions, params = [], []
+    if start is not None:
+        conditions.append('referenceTime >= ?')
+        params.append(start)
+    if end is not None:
+        conditions.append('referenceTime <= ?')
+        params.append(end)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+
+    conn = sqlite3.connect(path)
+    try:
+        df = pd.read_sql(query, conn, params=params)
+    finally:
+        conn.close()
+
+    return _freeze(_add_calendar_columns(df, 'referenceTime'))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _read_nilu_json(path, mtime_ns):
+    """
+    Parser NILU-JSON én gang per (sti, mtime).
+    """
+    with open(path, 'r') as file:
+        df = pd.DataFrame(json.load(file))
+    return _freeze(_add_calendar_columns(df, 'dateTime'))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load_nilu_cached(path, mtime_ns, columns):
+    """
+    Velger ut kolonner fra den parsede NILU-dataen. Resultatet caches per (sti, mtime, kolonner).
+    """
+    df = _read_nilu_json(path, mtime_ns)
+    if columns is None:
+        return df
+    return _freeze(df[['dateTime'] + list(columns) + ['year', 'month', 'season']])
+
+def load_frost_data(db_path=None, columns=None, table_name='weather_data', start=None, end=None):
+    """
+    Laster inn rensede Frost-data fra SQLite med datetime, år, måned og årstid.
+
+    Resultatet caches i minnet, og databasen leses kun på nytt hvis filen er endret.
+    Den returnerte DataFrame er skrivebeskyttet; bruk .copy() før verdier endres.
+
+    Args:
+        db_path (str, optional): Filsti til SQLite-databasen. Standard er 'data/clean/cleaned_data_frost.db'.
+        columns (list, optional): Kolonner som skal leses i tillegg til 'referenceTime'. Standard er alle.
+        table_name (str): Navn på tabellen i databasen.
+        start (str, optional): Første dato som skal leses (inklusiv), f.eks. '2015-01-01'.
+        end (str, optional): Siste dato som skal leses (inklusiv).
+
+    Returns:
+        pd.DataFrame: Klargjort DataFrame med kolonnene 'year', 'month' og 'season'.
+
+    Raises:
+        FileNotFoundError: Hvis databasen ikke finnes.
+    """
+    path, mtime_ns = _file_key(db_path or get_cleaned_data_path(FROST_DB_FILENAME))
+    columns = tuple(columns) if columns is not None else None
+    # Datoene lagres som 'YYYY-MM-DD' i databasen
+    start = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+    end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None
+    return _read_only_view(_load_frost_cached(path, mtime_ns, columns, table_name, start, end))
+
+def load_nilu_data(json_path=None, columns=None):
+    """
+    Laster inn rensede NILU-data fra JSON med datetime, år, måned og årstid.
+
+    Resultatet caches i minnet, og filen parses kun på nytt hvis den er endret.
+    Den returnerte DataFrame er skrivebeskyttet; bruk .copy() før verdier endres.
+
+    Args:
+        json_path (str, optional): Filsti til JSON-filen. Standard er 'data/clean/cleaned_data_nilu.json'.
+        columns (list, optional): Kolonner som skal tas med i tillegg til 'dateTime'. Standard er alle.
+
+    Returns:
+        pd.DataFrame: Klargjort DataFrame med kolonnene 'year', 'month' og 'season'.
+
+    Raises:
+        FileNotFoundError: Hvis filen ikke finnes.
+    """
+    path, mtime_ns = _file_key(json_path or get_cleaned_data_path(NILU_JSON_FILENAME))
+    columns = tuple(columns) if columns is not None else None
+    return _read_only_view(_load_nilu_cached(path, mtime_ns, columns))
+
+def clear_data_cache():
+    """
+    Tømmer minnecachen for alle datasett.
+    """
+    _load_frost_cached.cache_clear()
+    _read_nilu_json.cache_clear()
+    _load_nilu_cached.cache_clear()
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from .data_loader import get_cleaned_data_path, FROST_DB_FILENAME
+from .calendar_features import MONTH_TO_SEASON
+
+# Gyldige aggregeringsnivåer og hvilke grupperingskolonner de gir
+AGGREGATIONS = {
+    'monthly': ['year', 'month'],
+    'seasonal': ['year', 'season'],
+    'yearly': ['year']
+}
+
+# SQL-uttrykk for år, måned og årstid basert på 'referenceTime' (format 'YYYY-MM-DD')
+_YEAR_SQL = "CAST(substr(referenceTime, 1, 4) AS INTEGER)"
+_MONTH_SQL = "CAST(substr(referenceTime, 6, 2) AS INTEGER)"
+
+def _season_sql():
+    """
+    Bygger et SQL CASE-uttrykk som gir årstid fra måned.
+
+    Returns:
+        str: SQL-uttrykk med samme årstider som MONTH_TO_SEASON.
+    """
+    seasons = {}
+    for month, season in MONTH_TO_SEASON.items():
+        seasons.setdefault(season, []).append(str(month))
+    cases = ' '.join(f"WHEN {_MONTH_SQL} IN ({', '.join(months)}) THEN '{season}'"
+                     for season, months in seasons.items())
+    return f"CASE {cases} END"
+
+def _to_date_string(value):
+    """
+    Normaliserer en dato til 'YYYY-MM-DD', som er formatet i databasen.
+
+    Args:
+        value (str | datetime): Datoen som skal normaliseres.
+
+    Returns:
+        str: Datoen som tekst.
+    """
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def get_table_columns(conn, table_name='weather_data'):
+    """
+    Henter kolonnenavnene i en tabell.
+
+    Args:
+        conn (sqlite3.Connection): Åpen databasetilkobling.
+        table_name (str): Navn på tabellen.
+
+    Returns:
+        list: Kolonnenavn i tabellen.
+    """
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+
+def ensure_frost_index(conn, table_name='weather_data'):
+    """
+    Oppretter indeks på 'referenceTime' slik at datofiltre slipper å lese hele tabellen.
+
+    Args:
+        conn (sqlite3.Connection): Åpen databasetilkobling.
+        table_name (str): Navn på tabellen.
+    """
+    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_referenceTime" '
+                 f'ON "{table_name}" (referenceTime)')
+
+def build_frost_query(available_columns, columns=None, start=None, end=None,
+                      station=None, agg=None, table_name='weather_data'):
+    """
+    Bygger en parameterisert SQL-spørring med kolonneutvalg, datofilter og aggregering.
+
+    Kolonnenavn kan ikke parameteriseres i SQL, så de sjekkes mot tabellens
+    faktiske kolonner før de settes inn i spørringen.
+
+    Args:
+        available_columns (list): Kolonnene som finnes i tabellen.
+        columns (list, optional): Kolonner som skal hentes. Standard er alle målekolonner.
+        start (str, optional): Første dato (inklusiv).
+        end (str, optional): Siste dato (inklusiv).
+        station (str, optional): Stasjons-ID ('sourceId') det skal filtreres på.
+        agg (str, optional): 'monthly', 'seasonal' eller 'yearly' for gjennomsnitt i SQLite.
+        table_name (str): Navn på tabellen.
+
+    Returns:
+        tuple[str, list]: SQL-spørringen og parameterne.
+
+    Raises:
+        ValueError: Ved ukjente kolonner, ukjent aggregering eller stasjonsfilter uten 'sourceId'.
+    """
+    if columns is None:
+        columns = [column for column in available_columns if column not in ('referenceTime', 'sourceId')]
+    unknown = [column for column in columns if column not in available_columns]
+    if unknown:
+        raise ValueError(f"Ukjente kolonner i '{table_name}': {unknown}")
+    if agg is not None and agg not in AGGREGATIONS:
+        raise ValueError(f"Ukjent aggregering '{agg}'. Gyldige verdier: {list(AGGREGATIONS)}")
+
+    # Datofilter og stasjonsfilter som parametere
+    conditions = ['referenceTime IS NOT NULL']
+    params = []
+    if start is not None:
+        conditions.append('referenceTime >= ?')
+        params.append(_to_date_string(start))
+    if end is not None:
+        conditions.append('referenceTime <= ?')
+        params.append(_to_date_string(end))
+    if station is not None:
+        if 'sourceId' not in available_columns:
+            raise ValueError(f"Tabellen '{table_name}' har ingen 'sourceId'-kolonne å filtrere stasjon på")
+        conditions.append('sourceId = ?')
+        params.append(station)
+    where = ' AND '.join(conditions)
+
+    if agg is None:
+        selected = ', '.join(f'"{column}"' for column in ['referenceTime'] + list(columns))
+        sql = f'SELECT {selected} FROM "{table_name}" WHERE {where} ORDER BY referenceTime'
+        return sql, params
+
+    # Gjennomsnitt per gruppe beregnes i SQLite
+    group_sql = {'year': _YEAR_SQL, 'month': _MONTH_SQL, 'season': _season_sql()}
+    keys = AGGREGATIONS[agg]
+    key_select = ', '.join(f'{group_sql[key]} AS {key}' for key in keys)
+    averages = ', '.join(f'AVG("{column}") AS "{column}"' for column in columns)
+    group_by = ', '.join(keys)
+    sql = (f'SELECT {key_select}, {averages}, COUNT(*) AS n_days FROM "{table_name}" '
+           f'WHERE {where} GROUP BY {group_by} ORDER BY {group_by}')
+    return sql, params
+
+def query_frost(columns=None, start=None, end=None, station=None, agg=None,
+                db_path=None, table_name='weather_data'):
+    """
+    Henter Frost-data med kolonneutvalg, datofilter og aggregering utført i SQLite.
+
+    Kun radene og kolonnene som trengs leses fra databasen. Med agg satt
+    returneres gjennomsnitt per måned, årstid eller år i stedet for daglige rader.
+
+    Args:
+        columns (list, optional): Kolonner som skal hentes. Standard er alle målekolonner.
+        start (str, optional): Første dato (inklusiv), f.eks. '2015-01-01'.
+        end (str, optional): Siste dato (inklusiv).
+        station (str, optional): Stasjons-ID ('sourceId') det skal filtreres på.
+        agg (str, optional): None, 'monthly', 'seasonal' eller 'yearly'.
+        db_path (str, optional): Filsti til SQLite-databasen. Standard er 'data/clean/cleaned_data_frost.db'.
+        table_name (str): Navn på tabellen.
+
+    Returns:
+        pd.DataFrame: Daglige rader med datetime 'referenceTime', eller aggregerte rader
+        med grupperingskolonner, gjennomsnitt og 'n_days'.
+
+    Raises:
+        FileNotFoundError: Hvis databasen ikke finnes.
+    """
+    db_path = db_path or get_cleaned_data_path(FROST_DB_FILENAME)
+    # sqlite3.connect lager en tom database hvis filen mangler, så vi sjekker først
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Databasen '{db_path}' ble ikke funnet.")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            try:
+                ensure_frost_index(conn, table_name)
+            except sqlite3.OperationalError:
+                pass  # Skrivebeskyttet database; spørringen fungerer uten indeks
+        sql, params = build_frost_query(get_table_columns(conn, table_name), columns, start, end,
+                                        station, agg, table_name)
+        df = pd.read_sql(sql, conn, params=params)
+    finally:
+        conn.close()
+
+    if agg is None:
+        df['referenceTime'] = pd.to_datetime(df['referenceTime'])
+    return df
@@ -0,0 +1,216 @@
+import os
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import (get_cleaned_data_path, load_frost_data, load_nilu_data, FROST_DB_FILENAME,
+                          NILU_JSON_FILENAME, CACHE_SIZE, _file_key, _freeze, _read_only_view,
+                          _add_calendar_columns)
+from .series_cache import to_day_ordinals
+
+# Database og tabeller for den sammenslåtte dagstabellen
+JOINED_DB_FILENAME = 'joined_frost_nilu.db'
+JOINED_TABLE = 'frost_nilu_daily'
+SOURCES_TABLE = 'joined_sources'
+
+# Kolonner fra innlasteren som ikke er målinger
+_CALENDAR_COLUMNS = ['year', 'month', 'season']
+
+def _default_joined_path(frost_db_path):
+    """
+    Velger filsti for den sammenslåtte databasen: ved siden av Frost-databasen.
+
+    Args:
+        frost_db_path (str | None): Filsti til rensede Frost-data.
+
+    Returns:
+        str: Filsti til den sammenslåtte databasen.
+    """
+    if frost_db_path is None:
+        return get_cleaned_data_path(JOINED_DB_FILENAME)
+    return os.path.join(os.path.dirname(os.path.abspath(frost_db_path)), JOINED_DB_FILENAME)
+
+def _side_frame(side, path):
+    """
+    Leser én side av sammenslåingen og indekserer den på dag-ordinal.
+
+    Args:
+        side (str): 'frost' eller 'nilu'.
+        path (str): Filsti til de rensede dataene for siden.
+
+    Returns:
+        pd.DataFrame: Målekolonnene, indeksert på 'day' (dager siden 1970-01-01).
+    """
+    if side == 'frost':
+        df, date_column = load_frost_data(path), 'referenceTime'
+    else:
+        df, date_column = load_nilu_data(path), 'dateTime'
+
+    value_columns = [column for column in df.select_dtypes(include=[np.number, bool]).columns
+                     if column not in _CALENDAR_COLUMNS]
+    side_df = df[value_columns].astype(float)
+    side_df.index = pd.Index(to_day_ordinals(df[date_column]), name='day')
+    # Én rad per dag; første måling vinner slik som ved lagring av rensede data
+    return side_df[~side_df.index.duplicated(keep='first')]
+
+def _ensure_schema(conn, frost_columns, nilu_columns):
+    """
+    Oppretter tabellene, og legger til kolonner som mangler.
+
+    Args:
+        conn (sqlite3.Connection): Åpen tilkobling til den sammenslåtte databasen.
+        frost_columns (list): Målekolonner fra Frost.
+        nilu_columns (list): Målekolonner fra NILU.
+    """
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{JOINED_TABLE}" (day INTEGER PRIMARY KEY, date TEXT NOT NULL)')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{SOURCES_TABLE}" '
+                 '(side TEXT PRIMARY KEY, path TEXT NOT NULL, mtime_ns INTEGER NOT NULL)')
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{JOINED_TABLE}")')}
+    for column in list(frost_columns) + list(nilu_columns):
+        if column not in existing:
+            conn.execute(f'ALTER TABLE "{JOINED_TABLE}" ADD COLUMN "{column}" REAL')
+
+def _changed_days(old, new):
+    """
+    Finner dagene der en side har nye eller endrede verdier.
+
+    Args:
+        old (pd.DataFrame): Lagrede verdier, indeksert på dag.
+        new (pd.DataFrame): Nye verdier, indeksert på dag.
+
+    Returns:
+        np.ndarray: Dag-ordinaler som må skrives på nytt.
+    """
+    old = old.reindex(new.index)
+    old_values = old.to_numpy(dtype=float)
+    new_values = new.to_numpy(dtype=float)
+    same = (old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values))
+    return new.index.to_numpy()[~same.all(axis=1)]
+
+def _sync_side(conn, side, path, mtime_ns):
+    """
+    Oppdaterer én sides kolonner i den sammenslåtte tabellen.
+
+    Kun dager med nye eller endrede verdier skrives. Dager som er fjernet fra
+    kilden får NULL i sidens kolonner, og rader uten data fra noen side slettes.
+
+    Args:
+        conn (sqlite3.Connection): Åpen tilkobling til den sammenslåtte databasen.
+        side (str): 'frost' eller 'nilu'.
+        path (str): Filsti til de rensede dataene for siden.
+        mtime_ns (int): Endringstidspunktet til kildefilen.
+
+    Returns:
+        int: Antall dager som ble skrevet.
+    """
+    new = _side_frame(side, path)
+    columns = list(new.columns)
+    _ensure_schema(conn, columns if side == 'frost' else [], columns if side == 'nilu' else [])
+
+    quoted = ', '.join(f'"{column}"' for column in columns)
+    old = pd.read_sql(f'SELECT day, {quoted} FROM "{JOINED_TABLE}"', conn).set_index('day')
+
+    # Skriver nye og endrede dager med upsert på dag-nøkkelen
+    days = _changed_days(old, new)
+    rows = new.loc[days]
+    dates = days.astype('datetime64[D]').astype(str)
+    records = [(int(day), date, *[None if np.isnan(value) else float(value) for value in values])
+               for day, date, values in zip(days, dates, rows.to_numpy(dtype=float))]
+    placeholders = ', '.join(['?'] * (len(columns) + 2))
+    updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns)
+    conn.executemany(f'INSERT INTO "{JOINED_TABLE}" (day, date, {quoted}) VALUES ({placeholders}) '
+                     f'ON CONFLICT(day) DO UPDATE SET {updates}', records)
+
+    # Nullstiller dager som ikke lenger finnes i kilden
+    removed = old.index.difference(new.index)
+    if len(removed) > 0:
+        clear = ', '.join(f'"{column}" = NULL' for column in columns)
+        conn.executemany(f'UPDATE "{JOINED_TABLE}" SET {clear} WHERE day = ?',
+                         [(int(day),) for day in removed])
+
+    all_columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{JOINED_TABLE}")')
+                   if row[1] not in ('day', 'date')]
+    empty = ' AND '.join(f'"{column}" IS NULL' for column in all_columns)
+    conn.execute(f'DELETE FROM "{JOINED_TABLE}" WHERE {empty}')
+
+    conn.execute(f'INSERT OR REPLACE INTO "{SOURCES_TABLE}" (side, path, mtime_ns) VALUES (?, ?, ?)',
+                 (side, path, mtime_ns))
+    return len(days)
+
+def refresh_joined_daily(frost_db_path=None, nilu_json_path=None, joined_db_path=None):
+    """
+    Oppdaterer den materialiserte dagstabellen med Frost- og NILU-data.
+
+    Tabellen er en full sammenslåing på heltallsnøkkelen 'day' (dager siden
+    1970-01-01). En side leses kun på nytt når kildefilen er endret, og da
+    skrives bare dagene som faktisk har endret seg.
+
+    Args:
+        frost_db_path (str, optional): Filsti til rensede Frost-data. Standard er 'data/clean/cleaned_data_frost.db'.
+        nilu_json_path (str, optional): Filsti til rensede NILU-data. Standard er 'data/clean/cleaned_data_nilu.json'.
+        joined_db_path (str, optional): Filsti til den sammenslåtte databasen. Standard er
+            'joined_frost_nilu.db' i samme mappe som Frost-databasen.
+
+    Returns:
+        dict: Antall dager skrevet per side (0 hvis siden var uendret).
+    """
+    sources = {
+        'frost': _file_key(frost_db_path or get_cleaned_data_path(FROST_DB_FILENAME)),
+        'nilu': _file_key(nilu_json_path or get_cleaned_data_path(NILU_JSON_FILENAME))
+    }
+    joined_db_path = joined_db_path or _default_joined_path(frost_db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(joined_db_path)), exist_ok=True)
+
+    summary = {}
+    conn = sqlite3.connect(joined_db_path)
+    try:
+        with conn:
+            _ensure_schema(conn, [], [])
+            recorded = {side: (path, mtime_ns) for side, path, mtime_ns
+                        in conn.execute(f'SELECT side, path, mtime_ns FROM "{SOURCES_TABLE}"')}
+            for side, key in sources.items():
+                if recorded.get(side) == key:
+                    summary[side] = 0
+                else:
+                    summary[side] = _sync_side(conn, side, *key)
+    finally:
+        conn.close()
+    return summary
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load_joined_cached(path, mtime_ns, columns):
+    """
+    Leser den sammenslåtte tabellen. Resultatet caches per (sti, mtime, kolonner).
+    """
+    selected = '*' if columns is None else ', '.join(['day', 'date'] + [f'"{column}"' for column in columns])
+    conn = sqlite3.connect(path)
+    try:
+        df = pd.read_sql(f'SELECT {selected} FROM "{JOINED_TABLE}" ORDER BY day', conn)
+    finally:
+        conn.close()
+    return _freeze(_add_calendar_columns(df, 'date'))
+
+def load_joined_daily(columns=None, frost_db_path=None, nilu_json_path=None, joined_db_path=None):
+    """
+    Laster inn den sammenslåtte dagstabellen for Frost og NILU.
+
+    Tabellen oppdateres først hvis en av kildene er endret. Resultatet caches
+    i minnet og er skrivebeskyttet, på samme måte som load_frost_data.
+
+    Args:
+        columns (list, optional): Målekolonner som skal leses. Standard er alle.
+        frost_db_path (str, optional): Filsti til rensede Frost-data.
+        nilu_json_path (str, optional): Filsti til rensede NILU-data.
+        joined_db_path (str, optional): Filsti til den sammenslåtte databasen.
+
+    Returns:
+        pd.DataFrame: Én rad per dag med 'day', datetime 'date', målinger og kolonnene 'year', 'month' og 'season'.
+        Dager som bare finnes i én kilde har NaN i den andre kildens kolonner.
+    """
+    joined_db_path = joined_db_path or _default_joined_path(frost_db_path)
+    refresh_joined_daily(frost_db_path, nilu_json_path, joined_db_path)
+    path, mtime_ns = _file_key(joined_db_path)
+    columns = tuple(columns) if columns is not None else None
+    return _read_only_view(_load_joined_cached(path, mtime_ns, columns))
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# Bits i kvalitetsfeltet 'quality_<kolonne>' (uint8), satt av valideringen av rådataene
+QUALITY_MISSING = 1   # Verdien manglet i rådataene
+QUALITY_OUTLIER = 2   # Verdien var utenfor gyldig område og ble fjernet
+QUALITY_GAP = 4       # Hele dagen manglet og ble lagt til av datokontinuiteten
+QUALITY_IMPUTED = 8   # Verdien er generert av imputasjonen
+
+# Navn på hver bit, i rekkefølge, til rapporter og forklaringer
+QUALITY_BITS = {
+    QUALITY_MISSING: 'manglende',
+    QUALITY_OUTLIER: 'uteligger',
+    QUALITY_GAP: 'datohull',
+    QUALITY_IMPUTED: 'imputert'
+}
+
+def quality_column(column):
+    """
+    Navnet på kvalitetskolonnen for en variabel.
+
+    Args:
+        column (str): Navnet på variabelen.
+
+    Returns:
+        str: 'quality_<kolonne>'.
+    """
+    return f'quality_{column}'
+
+def quality_flags(df, column):
+    """
+    Henter kvalitetsfeltet for en variabel som uint8-array.
+
+    Data som er renset før kvalitetsfeltet fantes, har bare 'generated_<kolonne>';
+    da settes QUALITY_IMPUTED for de genererte verdiene.
+
+    Args:
+        df (pd.DataFrame): Rensede data.
+        column (str): Navnet på variabelen.
+
+    Returns:
+        np.ndarray: Kvalitetsfeltet med én verdi per rad.
+
+    Raises:
+        KeyError: Hvis verken kvalitetskolonnen eller 'generated_'-kolonnen finnes.
+    """
+    name = quality_column(column)
+    if name in df.columns:
+        return df[name].fillna(0).to_numpy(dtype=np.uint8)
+    generated = df[f'generated_{column}']
+    return np.where(np.asarray(generated.fillna(False), dtype=bool), QUALITY_IMPUTED, 0).astype(np.uint8)
+
+def quality_mask(df, column, bits=QUALITY_IMPUTED):
+    """
+    Lager en maske over radene der minst én av bitene er satt.
+
+    Args:
+        df (pd.DataFrame): Rensede data.
+        column (str): Navnet på variabelen.
+        bits (int): Bitene som skal sjekkes, f.eks. QUALITY_OUTLIER | QUALITY_GAP.
+
+    Returns:
+        pd.Series: Bool-maske med samme indeks som df.
+    """
+    return pd.Series((quality_flags(df, column) & bits) != 0, index=df.index)
@@ -0,0 +1,260 @@
+import os
+import json
+import sqlite3
+
+import numpy as np
+
+from .series_cache import to_day_ordinals
+
+# Tabeller i rådatalageret
+OBSERVATIONS_TABLE = 'frost_observations'
+STORE_META_TABLE = 'store_meta'
+DELETED_PERIODS_TABLE = 'deleted_periods'
+
+def get_raw_store_path(json_path):
+    """
+    Returnerer filstien til det indekserte rådatalageret for en Frost-JSON-fil.
+
+    Args:
+        json_path (str): Filsti til 'api_frost_weather.json'.
+
+    Returns:
+        str: Filsti til SQLite-lageret, f.eks. 'api_frost_weather_store.db'.
+    """
+    return os.path.splitext(json_path)[0] + '_store.db'
+
+def _reference_days(entries):
+    """
+    Finner dag-ordinal (dager siden 1970-01-01) for hver oppføring, vektorisert.
+
+    Args:
+        entries (list): Oppføringer fra Frost API med 'referenceTime'.
+
+    Returns:
+        np.ndarray: Dag-ordinaler som int64.
+    """
+    # 'referenceTime' er ISO-format, f.eks. "2010-01-01T00:00:00.000Z"; datodelen er de ti første tegnene
+    dates = np.array([entry.get('referenceTime', '')[:10] for entry in entries], dtype='datetime64[D]')
+    return dates.astype(np.int64)
+
+def _to_day(date):
+    """
+    Konverterer en dato til dag-ordinal.
+
+    Args:
+        date (str | datetime): Datoen som skal konverteres.
+
+    Returns:
+        int: Dager siden 1970-01-01.
+    """
+    return int(to_day_ordinals([date])[0])
+
+def _init_store(conn):
+    """
+    Oppretter tabeller og indeks i rådatalageret.
+    """
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{OBSERVATIONS_TABLE}" '
+                 '(day INTEGER NOT NULL, referenceTime TEXT, sourceId TEXT, entry TEXT NOT NULL)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{OBSERVATIONS_TABLE}_day" ON "{OBSERVATIONS_TABLE}" (day)')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{STORE_META_TABLE}" (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{DELETED_PERIODS_TABLE}" '
+                 '(start_day INTEGER NOT NULL, end_day INTEGER NOT NULL)')
+
+def _apply_deleted_periods(conn):
+    """
+    Sletter oppføringer i alle lagrede slettede perioder.
+
+    Returns:
+        int: Antall slettede oppføringer.
+    """
+    return conn.execute(f'DELETE FROM "{OBSERVATIONS_TABLE}" WHERE EXISTS '
+                        f'(SELECT 1 FROM "{DELETED_PERIODS_TABLE}" AS periods '
+                        f'WHERE "{OBSERVATIONS_TABLE}".day BETWEEN periods.start_day AND periods.end_day)').rowcount
+
+def sync_raw_frost_store(json_path, store_path=None):
+    """
+    Importerer Frost-JSON til det indekserte rådatalageret hvis JSON-filen er ny eller endret.
+
+    JSON-filen leses kun når den har et annet endringstidspunkt enn ved forrige
+    import. Periodene som er slettet med delete_frost_entries er lagret i
+    lageret og slettes på nytt etter hver import, slik at nye rådata ikke
+    gjenoppretter dem.
+
+    Args:
+        json_path (str): Filsti til 'api_frost_weather.json'.
+        store_path (str, optional): Filsti til lageret. Standard er ved siden av JSON-filen.
+
+    Returns:
+        str: Filsti til lageret.
+
+    Raises:
+        FileNotFoundError: Hvis verken JSON-filen eller lageret finnes.
+        json.JSONDecodeError: Hvis JSON-filen har feil format.
+    """
+    store_path = store_path or get_raw_store_path(json_path)
+    if not os.path.exists(json_path):
+        if os.path.exists(store_path):
+            return store_path
+        raise FileNotFoundError(f"Frost-værdatafil ikke funnet: {json_path}")
+
+    json_mtime = str(os.stat(json_path).st_mtime_ns)
+    conn = sqlite3.connect(store_path)
+    try:
+        with conn:
+            _init_store(conn)
+            row = conn.execute(f'SELECT value FROM "{STORE_META_TABLE}" WHERE key = ?', ('json_mtime_ns',)).fetchone()
+            if row is not None and row[0] == json_mtime:
+                return store_path
+
+            with open(json_path, 'r', encoding='utf-8') as file:
+                entries = json.load(file)
+
+            # Oppføringene lagres sortert på dag, med indeks for rask områdesøk
+            days = _reference_days(entries)
+            order = np.argsort(days, kind='stable')
+            conn.execute(f'DELETE FROM "{OBSERVATIONS_TABLE}"')
+            conn.executemany(
+                f'INSERT INTO "{OBSERVATIONS_TABLE}" (day, referenceTime, sourceId, entry) VALUES (?, ?, ?, ?)',
+                ((int(days[i]), entries[i].get('referenceTime'), entries[i].get('sourceId'),
+                  json.dumps(entries[i], separators=(',', ':'), ensure_ascii=False)) for i in order)
+            )
+            _apply_deleted_periods(conn)
+            conn.execute(f'INSERT OR REPLACE INTO "{STORE_META_TABLE}" (key, value) VALUES (?, ?)',
+                         ('json_mtime_ns', json_mtime))
+    finally:
+        conn.close()
+    return store_path
+
+def load_raw_frost_entries(json_path, store_path=None):
+    """
+    Leser alle Frost-oppføringer fra rådatalageret, sortert på dato.
+
+    Args:
+        json_path (str): Filsti til 'api_frost_weather.json'.
+        store_path (str, optional): Filsti til lageret. Standard er ved siden av JSON-filen.
+
+    Returns:
+        list: Oppføringene i samme format som i JSON-filen.
+    """
+    store_path = sync_raw_frost_store(json_path, store_path)
+    conn = sqlite3.connect(store_path)
+    try:
+        rows = conn.execute(f'SELECT entry FROM "{OBSERVATIONS_TABLE}" ORDER BY day, rowid').fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+def count_frost_entries(store_path, start_date=None, end_date=None):
+    """
+    Teller oppføringer i en periode ved hjelp av dag-indeksen.
+
+    Args:
+        store_path (str): Filsti til lageret.
+        start_date (str, optional): Startdato i YYYY-MM-DD format (inklusiv). Standard er ingen nedre grense.
+        end_date (str, optional): Sluttdato i YYYY-MM-DD format (inklusiv). Standard er ingen øvre grense.
+
+    Returns:
+        int: Antall oppføringer i perioden.
+    """
+    conditions = ['1 = 1']
+    params = []
+    if start_date is not None:
+        conditions.append('day >= ?')
+        params.append(_to_day(start_date))
+    if end_date is not None:
+        conditions.append('day <= ?')
+        params.append(_to_day(end_date))
+    conn = sqlite3.connect(store_path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM "{OBSERVATIONS_TABLE}" WHERE {" AND ".join(conditions)}',
+                            params).fetchone()[0]
+    finally:
+        conn.close()
+
+def delete_frost_entries(store_path, start_date, end_date):
+    """
+    Sletter oppføringer i en periode med DELETE på den indekserte dag-kolonnen.
+
+    Perioden lagres også, slik at den slettes igjen når JSON-filen importeres
+    på nytt (se sync_raw_frost_store).
+
+    Args:
+        store_path (str): Filsti til lageret.
+        start_date (str): Startdato i YYYY-MM-DD format (inklusiv).
+        end_date (str): Sluttdato i YYYY-MM-DD format (inklusiv).
+
+    Returns:
+        tuple[int, int]: Antall slettede og antall gjenværende oppføringer.
+    """
+    conn = sqlite3.connect(store_path)
+    try:
+        with conn:
+            _init_store(conn)
+            period = (_to_day(start_date), _to_day(end_date))
+            conn.execute(f'INSERT INTO "{DELETED_PERIODS_TABLE}" (start_day, end_day) SELECT ?, ? '
+                         f'WHERE NOT EXISTS (SELECT 1 FROM "{DELETED_PERIODS_TABLE}" '
+                         'WHERE start_day = ? AND end_day = ?)', period + period)
+            deleted = _apply_deleted_periods(conn)
+            remaining = conn.execute(f'SELECT COUNT(*) FROM "{OBSERVATIONS_TABLE}"').fetchone()[0]
+    finally:
+        conn.close()
+    return deleted, remaining
+
+def deleted_frost_periods(store_path):
+    """
+    Henter periodene som er slettet fra rådatalageret.
+
+    Args:
+        store_path (str): Filsti til lageret.
+
+    Returns:
+        list: (startdato, sluttdato) i YYYY-MM-DD format, i rekkefølgen de ble slettet.
+    """
+    if not os.path.exists(store_path):
+        return []
+    conn = sqlite3.connect(store_path)
+    try:
+        with conn:
+            _init_store(conn)
+        rows = conn.execute(f'SELECT start_day, end_day FROM "{DELETED_PERIODS_TABLE}" ORDER BY rowid').fetchall()
+    finally:
+        conn.close()
+    return [tuple(str(np.datetime64(day, 'D')) for day in row) for row in rows]
+
+def clear_deleted_periods(store_path, start_date=None, end_date=None):
+    """
+    Fjerner lagrede slettede perioder, slik at de gjenopprettes ved neste import.
+
+    Uten datoer fjernes alle periodene, ellers bare de som ligger helt innenfor
+    [start_date, end_date]. Importmerket fjernes også, så neste kall til
+    sync_raw_frost_store leser JSON-filen på nytt og henter tilbake oppføringene.
+
+    Args:
+        store_path (str): Filsti til lageret.
+        start_date (str, optional): Startdato i YYYY-MM-DD format (inklusiv). Standard er ingen nedre grense.
+        end_date (str, optional): Sluttdato i YYYY-MM-DD format (inklusiv). Standard er ingen øvre grense.
+
+    Returns:
+        int: Antall perioder som ble fjernet.
+    """
+    if not os.path.exists(store_path):
+        return 0
+    conditions = ['1 = 1']
+    params = []
+    if start_date is not None:
+        conditions.append('start_day >= ?')
+        params.append(_to_day(start_date))
+    if end_date is not None:
+        conditions.append('end_day <= ?')
+        params.append(_to_day(end_date))
+    conn = sqlite3.connect(store_path)
+    try:
+        with conn:
+            _init_store(conn)
+            cleared = conn.execute(f'DELETE FROM "{DELETED_PERIODS_TABLE}" WHERE {" AND ".join(conditions)}',
+                                   params).rowcount
+            if cleared > 0:
+                conn.execute(f'DELETE FROM "{STORE_META_TABLE}" WHERE key = ?', ('json_mtime_ns',))
+    finally:
+        conn.close()
+    return cleared
@@ -0,0 +1,314 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import get_cleaned_data_path
+
+# Mappen i 'data/clean' der de binære cachene lagres
+SERIES_CACHE_DIRNAME = 'series_cache'
+
+# Filnavn for metadata og genererte-verdier-flagg i hver cache
+META_FILENAME = 'meta.json'
+FLAGS_FILENAME = 'generated_flags.npy'
+QUALITY_FILENAME = 'quality_flags.npy'
+
+# Øk denne hvis formatet endres, slik at gamle cacher ikke leses feil
+CACHE_VERSION = 1
+
+def get_series_cache_dir(name, clean_dir=None):
+    """
+    Returnerer mappen for den binære cachen til et datasett.
+
+    Args:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'.
+        clean_dir (str, optional): Mappen med rensede data. Standard er 'data/clean'.
+
+    Returns:
+        str: Filsti til cache-mappen.
+    """
+    if clean_dir is None:
+        return get_cleaned_data_path(os.path.join(SERIES_CACHE_DIRNAME, name))
+    return os.path.join(clean_dir, SERIES_CACHE_DIRNAME, name)
+
+def to_day_ordinals(dates):
+    """
+    Konverterer datoer til heltall som teller dager siden 1970-01-01.
+
+    Datoer med tidssone (f.eks. NILU sine '+01:00') gir den lokale datoen,
+    ikke datoen i UTC.
+
+    Args:
+        dates (array-like): Datoer som strenger, datetime eller datetime64.
+
+    Returns:
+        np.ndarray: Dag-ordinaler som int64.
+    """
+    dates = pd.to_datetime(pd.Series(dates))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+def _save_array(path, values):
+    """
+    Lagrer en array atomisk ved å skrive til en midlertidig fil først.
+    """
+    tmp_path = path + '.tmp.npy'
+    np.save(tmp_path, np.ascontiguousarray(values))
+    os.replace(tmp_path, path)
+
+def _source_key(path):
+    """
+    Returnerer størrelse og endringstidspunkt for filen cachen er laget fra, eller None.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def write_series_cache(df, cache_dir, date_column, source_path=None):
+    """
+    Skriver rensede data til en binær cache med én .npy-fil per variabel.
+
+    Alle variabler legges på en felles, sammenhengende dag-akse fra første til
+    siste dato. Dager uten måling blir NaN. 'generated_*'-kolonnene lagres som
+    bit-arrays i én felles fil, og kvalitetsfeltene ('quality_*') som uint8 i
+    en annen. Metadata skrives sist, slik at en halvferdig
+    cache aldri blir lest.
+
+    Args:
+        df (pd.DataFrame): Rensede data med én rad per dag.
+        cache_dir (str): Mappen cachen skal skrives til.
+        date_column (str): Navnet på datokolonnen.
+        source_path (str, optional): Den lagrede filen med de samme dataene. Størrelse og
+            endringstidspunkt lagres, slik at open_cleaned_series ser om cachen er utdatert.
+
+    Returns:
+        dict: Metadata for cachen.
+    """
+    if df.empty:
+        raise ValueError("Kan ikke lage cache av en tom DataFrame")
+
+    ordinals = to_day_ordinals(df[date_column])
+    start = int(ordinals.min())
+    length = int(ordinals.max()) - start + 1
+
+    # Beholder første rad per dag og finner posisjonen på dag-aksen
+    positions = ordinals - start
+    first = ~pd.Series(positions).duplicated().to_numpy()
+    positions = positions[first]
+
+    flag_columns = [column for column in df.columns if column.startswith('generated_')]
+    quality_columns = [column for column in df.columns if column.startswith('quality_')]
+    value_columns = [column for column in df.select_dtypes(include=[np.number]).columns
+                     if column not in flag_columns and column not in quality_columns]
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Én sammenhengende float64-array per variabel
+    for column in value_columns:
+        values = np.full(length, np.nan)
+        values[positions] = df[column].to_numpy(dtype=float)[first]
+        _save_array(os.path.join(cache_dir, f'{column}.npy'), values)
+
+    # Flagg pakkes til bits, én rad per 'generated_*'-kolonne
+    flags = np.zeros((len(flag_columns), length), dtype=bool)
+    for i, column in enumerate(flag_columns):
+        flags[i, positions] = df[column].fillna(False).to_numpy(dtype=bool)[first]
+    _save_array(os.path.join(cache_dir, FLAGS_FILENAME), np.packbits(flags, axis=1))
+
+    # Kvalitetsfeltene som én uint8-array med én rad per 'quality_*'-kolonne
+    quality = np.zeros((len(quality_columns), length), dtype=np.uint8)
+    for i, column in enumerate(quality_columns):
+        quality[i, positions] = df[column].fillna(0).to_numpy(dtype=np.uint8)[first]
+    _save_array(os.path.join(cache_dir, QUALITY_FILENAME), quality)
+
+    meta = {
+        'version': CACHE_VERSION,
+        'start_date': str(np.datetime64(start, 'D')),
+        'start_ordinal': start,
+        'frequency': 'D',
+        'length': length,
+        'columns': value_columns,
+        'flag_columns': flag_columns,
+        'quality_columns': quality_columns,
+        'source': _source_key(source_path)
+    }
+    tmp_meta = os.path.join(cache_dir, META_FILENAME + '.tmp')
+    with open(tmp_meta, 'w') as file:
+        json.dump(meta, file, indent=4)
+    os.replace(tmp_meta, os.path.join(cache_dir, META_FILENAME))
+    return meta
+
+class SeriesCache:
+    """
+    Leser en binær cache med minnemappede arrays.
+
+    Åpning leser kun den lille metadatafilen. Variablene mappes inn med
+    np.load(mmap_mode='r') først når de brukes, slik at flere prosesser kan
+    dele de samme sidene gjennom operativsystemets filcache.
+    """
+    def __init__(self, cache_dir):
+        """
+        Åpner cachen i en mappe.
+
+        Args:
+            cache_dir (str): Mappen cachen ligger i.
+
+        Raises:
+            FileNotFoundError: Hvis cachen ikke finnes.
+            ValueError: Hvis cachen har en annen versjon enn forventet.
+        """
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, META_FILENAME), 'r') as file:
+            self.meta = json.load(file)
+        if self.meta.get('version') != CACHE_VERSION:
+            raise ValueError(f"Ukjent cache-versjon i '{cache_dir}': {self.meta.get('version')}")
+
+        self.start_ordinal = self.meta['start_ordinal']
+        self.length = self.meta['length']
+        self.columns = self.meta['columns']
+        self.flag_columns = self.meta['flag_columns']
+        self.quality_columns = self.meta.get('quality_columns', [])
+        self.source = self.meta.get('source')
+        self._arrays = {}
+        self._flags = None
+        self._quality = None
+
+    @property
+    def ordinals(self):
+        """
+        np.ndarray: Dag-ordinaler for hele dag-aksen.
+        """
+        return np.arange(self.start_ordinal, self.start_ordinal + self.length, dtype=np.int64)
+
+    @property
+    def dates(self):
+        """
+        np.ndarray: Datoene for hele dag-aksen som datetime64[D].
+        """
+        return self.ordinals.astype('datetime64[D]')
+
+    def column(self, name):
+        """
+        Returnerer en variabel som en skrivebeskyttet minnemappet array.
+
+        Args:
+            name (str): Navnet på variabelen.
+
+        Returns:
+            np.memmap: Verdiene for hele dag-aksen.
+        """
+        if name not in self._arrays:
+            if name not in self.columns:
+                raise KeyError(f"Kolonnen '{name}' finnes ikke i cachen")
+            self._arrays[name] = np.load(os.path.join(self.cache_dir, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def generated(self, name):
+        """
+        Returnerer flaggene for genererte (imputerte) verdier for en variabel.
+
+        Args:
+            name (str): Navnet på variabelen, med eller uten 'generated_'-prefiks.
+
+        Returns:
+            np.ndarray: Bool-array for hele dag-aksen.
+        """
+        flag_name = name if name.startswith('generated_') else f'generated_{name}'
+        if flag_name not in self.flag_columns:
+            raise KeyError(f"Flagget '{flag_name}' finnes ikke i cachen")
+        if self._flags is None:
+            self._flags = np.load(os.path.join(self.cache_dir, FLAGS_FILENAME), mmap_mode='r')
+        row = self._flags[self.flag_columns.index(flag_name)]
+        return np.unpackbits(row, count=self.length).astype(bool)
+
+    def quality(self, name):
+        """
+        Returnerer kvalitetsfeltet for en variabel (se data_access.quality_flags).
+
+        Args:
+            name (str): Navnet på variabelen, med eller uten 'quality_'-prefiks.
+
+        Returns:
+            np.ndarray: uint8-array for hele dag-aksen.
+        """
+        quality_name = name if name.startswith('quality_') else f'quality_{name}'
+        if quality_name not in self.quality_columns:
+            raise KeyError(f"Kvalitetsfeltet '{quality_name}' finnes ikke i cachen")
+        if self._quality is None:
+            self._quality = np.load(os.path.join(self.cache_dir, QUALITY_FILENAME), mmap_mode='r')
+        return self._quality[self.quality_columns.index(quality_name)]
+
+    def index_of(self, date):
+        """
+        Finner posisjonen til en dato på dag-aksen.
+
+        Args:
+            date (str | datetime): Datoen som skal slås opp.
+
+        Returns:
+            int: Posisjon på dag-aksen (kan ligge utenfor cachen).
+        """
+        return int(to_day_ordinals([date])[0]) - self.start_ordinal
+
+    def to_frame(self, columns=None, date_column='date'):
+        """
+        Bygger en DataFrame av cachen, med flagg for genererte verdier og kvalitetsfelt.
+
+        Args:
+            columns (list, optional): Variabler som skal tas med. Standard er alle.
+            date_column (str): Navnet på datokolonnen i resultatet.
+
+        Returns:
+            pd.DataFrame: Én rad per dag.
+        """
+        columns = self.columns if columns is None else list(columns)
+        data = {date_column: self.dates.astype('datetime64[ns]')}
+        for column in columns:
+            data[column] = self.column(column)
+        for column in columns:
+            if f'generated_{column}' in self.flag_columns:
+                data[f'generated_{column}'] = self.generated(column)
+        for column in columns:
+            if f'quality_{column}' in self.quality_columns:
+                data[f'quality_{column}'] = self.quality(column)
+        return pd.DataFrame(data)
+
+def load_series_cache(name_or_dir):
+    """
+    Åpner en binær cache, enten via datasettnavn eller mappe.
+
+    Args:
+        name_or_dir (str): 'frost', 'nilu' eller en filsti til en cache-mappe.
+
+    Returns:
+        SeriesCache: Den åpnede cachen.
+    """
+    cache_dir = name_or_dir if os.path.isdir(name_or_dir) else get_series_cache_dir(name_or_dir)
+    return SeriesCache(cache_dir)
+
+def open_cleaned_series(name, source_path):
+    """
+    Åpner den binære cachen til en renset datafil hvis den er laget fra filen slik den er nå.
+
+    Rensingen skriver cachen rett etter filen. Hvis filen er endret senere, eller
+    cachen mangler eller har feil versjon, returneres None, og kallere leser
+    filen med load_frost_data eller load_nilu_data i stedet.
+
+    Args:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'.
+        source_path (str): Filsti til den rensede datafilen, f.eks. 'cleaned_data_frost.db'.
+
+    Returns:
+        SeriesCache | None: Den åpnede cachen, eller None hvis den ikke kan brukes.
+    """
+    try:
+        cache = SeriesCache(get_series_cache_dir(name, os.path.dirname(source_path)))
+    except (FileNotFoundError, ValueError, KeyError, json.JSONDecodeError):
+        return None
+    key = _source_key(source_path)
+    if key is None or cache.source != key:
+        return None
+    return cache
@@ -0,0 +1,110 @@
+import pandas as pd
+import numpy as np
+from data_access import calendar_arrays, season_labels, Climatology, save_analysis_table
+
+# En dag er avvikende hvis den ligger mer enn så mange standardavvik fra den glattede årssyklusen
+ANOMALY_Z = 3.0
+
+# ... eller utenfor disse kvantilene for dagen i året (må finnes i klimatologien)
+ANOMALY_QUANTILES = (0.01, 0.99)
+
+# Kolonnene i tabellen over avvikende dager, i rekkefølge
+ANOMALY_COLUMNS = ['station', 'date', 'year', 'season', 'variable', 'value', 'expected', 'z',
+                   'lower', 'upper', 'direction', 'method']
+
+def detect_anomalies(df: pd.DataFrame, date_column: str, columns: list, climatology: Climatology,
+                     z_threshold: float = ANOMALY_Z, quantile_bounds: tuple = ANOMALY_QUANTILES,
+                     exclude_generated: bool = True, station: str = 'station') -> pd.DataFrame:
+    """
+    Finner dager som avviker fra klimatologien, for alle variabler i én vektorisert gjennomgang.
+
+    En dag flagges hvis z-verdien mot den glattede årssyklusen er større enn
+    'z_threshold' i absoluttverdi, eller hvis verdien ligger utenfor
+    kvantilene i 'quantile_bounds' for dagen i året. Sett en av dem til None
+    for å bare bruke den andre.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata
+        date_column (str): Navnet på datokolonnen
+        columns (list): Variablene som skal sjekkes; må finnes i klimatologien
+        climatology (Climatology): Den felles klimatologien (se data_access.get_climatology)
+        z_threshold (float): Grensen for |z|, eller None
+        quantile_bounds (tuple): (nedre, øvre) kvantilnivå, eller None
+        exclude_generated (bool): Hopp over imputerte verdier
+        station (str): Stasjonsnavnet i resultatet
+    Returnerer:
+        pd.DataFrame: Én rad per avvikende dag og variabel, med kolonnene i ANOMALY_COLUMNS
+    Kaster:
+        ValueError: Hvis verken z-grense eller kvantiler er oppgitt
+    """
+    if z_threshold is None and quantile_bounds is None:
+        raise ValueError("Oppgi z_threshold, quantile_bounds eller begge")
+
+    dates = pd.to_datetime(df[date_column])
+    parts = calendar_arrays(dates)
+    day = parts['day_of_year']
+    values = df[columns].to_numpy(dtype=float).T
+    if exclude_generated:
+        for j, column in enumerate(columns):
+            flag = f'generated_{column}'
+            if flag in df.columns:
+                values[j, np.asarray(df[flag], dtype=float) > 0] = np.nan
+
+    # Referanseverdier for alle variabler og dager, med form (variabler, dager)
+    expected = np.vstack([climatology.lookup(column, day, 'harmonic_mean') for column in columns])
+    spread = np.vstack([climatology.lookup(column, day, 'harmonic_std') for column in columns])
+    z = (values - expected) / spread
+
+    nan_bounds = np.full(values.shape, np.nan)
+    if quantile_bounds is not None:
+        lower = np.vstack([climatology.quantile(column, quantile_bounds[0], day) for column in columns])
+        upper = np.vstack([climatology.quantile(column, quantile_bounds[1], day) for column in columns])
+    else:
+        lower, upper = nan_bounds, nan_bounds
+
+    with np.errstate(invalid='ignore'):
+        by_z = np.abs(z) > z_threshold if z_threshold is not None else np.zeros(values.shape, dtype=bool)
+        by_quantile = (values < lower) | (values > upper)
+
+    flagged = by_z | by_quantile
+    variable_index, day_index = np.nonzero(flagged)
+    method = np.where(by_z[flagged] & by_quantile[flagged], 'both',
+                      np.where(by_z[flagged], 'z', 'quantile'))
+    deviation = values[flagged] - expected[flagged]
+    return pd.DataFrame({
+        'station': station,
+        'date': dates.to_numpy()[day_index],
+        'year': parts['year'][day_index],
+        'season': season_labels(parts['month'][day_index], categorical=False),
+        'variable': np.asarray(columns, dtype=object)[variable_index],
+        'value': values[flagged],
+        'expected': expected[flagged],
+        'z': z[flagged],
+        'lower': lower[flagged],
+        'upper': upper[flagged],
+        'direction': np.where(deviation > 0, 'high', 'low'),
+        'method': method
+    }, columns=ANOMALY_COLUMNS).sort_values(['date', 'variable'], kind='stable').reset_index(drop=True)
+
+def count_anomalies(anomalies: pd.DataFrame) -> pd.DataFrame:
+    """
+    Teller avvikende dager per variabel, år og retning.
+
+    Parametre:
+        anomalies (pd.DataFrame): Resultatet fra detect_anomalies
+    Returnerer:
+        pd.DataFrame: Antall høye og lave avvik per (station, variable, year)
+    """
+    counts = anomalies.groupby(['station', 'variable', 'year', 'direction']).size()
+    return counts.unstack('direction', fill_value=0).reindex(columns=['high', 'low'], fill_value=0)
+
+def save_anomalies(anomalies: pd.DataFrame, output_dir: str, prefix: str):
+    """
+    Lagrer de avvikende dagene ved siden av de andre analyseresultatene (se save_analysis_table).
+
+    Parametre:
+        anomalies (pd.DataFrame): Resultatet fra detect_anomalies
+        output_dir (str): Katalog for lagring av resultater
+        prefix (str): Prefiks for filnavnet, f.eks. 'nilu' eller 'frost'
+    """
+    save_analysis_table(anomalies, output_dir, f'{prefix}_anomalies')
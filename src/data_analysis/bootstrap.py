@@ -0,0 +1,195 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+from data_analysis.statistics_engine import group_codes, _group_starts, _sorted_medians
+
+# Antall bootstrap-replikater og blokklengde i dager (en uke fanger mye av autokorrelasjonen)
+N_BOOT = 1000
+BLOCK_LENGTH = 7
+
+# Konfidensnivå for intervallene
+CONFIDENCE = 0.95
+
+# Startverdi for tilfeldighetsstrømmene, slik at intervallene er like fra kjøring til kjøring
+BOOTSTRAP_SEED = 0
+
+# Antall replikater per batch; hver batch får sin egen tilfeldighetsstrøm
+BATCH_SIZE = 250
+
+# Statistikkene det kan lages konfidensintervaller for
+BOOTSTRAP_STATISTICS = ['mean', 'median']
+
+def block_bootstrap_indices(group_sizes: np.ndarray, n_boot: int, block_length: int,
+                            rng: np.random.Generator) -> np.ndarray:
+    """
+    Trekker radindekser for sirkulær blokk-bootstrap innenfor hver gruppe, for alle grupper på én gang.
+
+    Radene antas sortert på gruppe og deretter tid. Hver gruppe deles i
+    blokker på 'block_length' rader; for hver blokk trekkes en tilfeldig
+    startrad i gruppen, og blokken kopieres fra den (med omløp til starten
+    av gruppen). Blokklengde 1 gir vanlig bootstrap.
+
+    Parametre:
+        group_sizes (np.ndarray): Antall rader i hver gruppe, i rekkefølge
+        n_boot (int): Antall replikater
+        block_length (int): Antall sammenhengende rader per blokk
+        rng (np.random.Generator): Tilfeldighetsgenerator
+    Returnerer:
+        np.ndarray: Indeksmatrise med form (n_boot, antall rader)
+    """
+    group_sizes = np.asarray(group_sizes, dtype=np.int64)
+    block_length = max(int(block_length), 1)
+    offsets = np.r_[0, np.cumsum(group_sizes)[:-1]]
+    group_of_row = np.repeat(np.arange(len(group_sizes)), group_sizes)
+    position = np.arange(group_sizes.sum()) - offsets[group_of_row]
+
+    # Blokknummeret til hver rad, nummerert fortløpende over alle grupper
+    blocks_per_group = -(-group_sizes // block_length)
+    block_offsets = np.r_[0, np.cumsum(blocks_per_group)[:-1]]
+    block_of_row = block_offsets[group_of_row] + position // block_length
+    group_of_block = np.repeat(np.arange(len(group_sizes)), blocks_per_group)
+
+    starts = np.floor(rng.random((n_boot, len(group_of_block))) * group_sizes[group_of_block]).astype(np.int64)
+    size = group_sizes[group_of_row]
+    return offsets[group_of_row] + (starts[:, block_of_row] + position % block_length) % size
+
+def _bootstrap_batch(values: np.ndarray, group_sizes: np.ndarray, n_boot: int, block_length: int,
+                     seed_sequence: np.random.SeedSequence, statistics: tuple) -> dict:
+    """
+    Beregner statistikkene for én batch av replikater. Kjøres i en egen prosess ved parallell kjøring.
+
+    Returnerer:
+        dict: Én array med form (grupper, replikater, kolonner) per statistikk
+    """
+    rng = np.random.default_rng(seed_sequence)
+    indices = block_bootstrap_indices(group_sizes, n_boot, block_length, rng)
+    starts = np.r_[0, np.cumsum(group_sizes)[:-1]]
+    sorted_gid = np.repeat(np.arange(len(group_sizes)), group_sizes)
+
+    results = {stat: np.full((len(group_sizes), n_boot, values.shape[1]), np.nan) for stat in statistics}
+    for j in range(values.shape[1]):
+        # Replikatene ligger som kolonner: rad i tilhører fortsatt samme gruppe
+        resampled = values[indices, j].T
+        present = ~np.isnan(resampled)
+        counts = np.add.reduceat(present, starts, axis=0)
+        if 'mean' in statistics:
+            totals = np.add.reduceat(np.where(present, resampled, 0.0), starts, axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                results['mean'][:, :, j] = np.where(counts > 0, totals / counts, np.nan)
+        if 'median' in statistics:
+            results['median'][:, :, j] = _sorted_medians(resampled, sorted_gid, starts, counts)
+    return results
+
+def bootstrap_group_statistics(df: pd.DataFrame, columns: list, keys: list = ('year', 'season'),
+                               statistics: tuple = ('mean', 'median'), n_boot: int = N_BOOT,
+                               block_length: int = BLOCK_LENGTH, seed: int = BOOTSTRAP_SEED,
+                               batch_size: int = BATCH_SIZE, max_workers: int = 1) -> tuple:
+    """
+    Lager bootstrap-replikater av statistikk per gruppe, for alle grupper og kolonner samtidig.
+
+    Replikatene deles i batcher med uavhengige tilfeldighetsstrømmer fra
+    np.random.SeedSequence. Resultatet avhenger derfor bare av 'seed' og
+    batch-størrelsen, ikke av hvor mange prosesser som brukes.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame, sortert på dato
+        columns (list): Kolonner som skal analyseres
+        keys (list): Grupperingskolonner
+        statistics (tuple): Statistikker fra BOOTSTRAP_STATISTICS
+        n_boot (int): Antall replikater
+        block_length (int): Blokklengde i rader (dager); 1 gir vanlig bootstrap
+        seed (int): Startverdi for tilfeldighetsstrømmene
+        batch_size (int): Antall replikater per batch
+        max_workers (int): Antall prosesser; 1 kjører alt i denne prosessen, None bruker alle CPU-er
+    Returnerer:
+        tuple: (indeks med én rad per gruppe, dict med replikater med form (grupper, n_boot, kolonner))
+    """
+    unknown = set(statistics) - set(BOOTSTRAP_STATISTICS)
+    if unknown:
+        raise ValueError(f"Ukjente statistikker: {sorted(unknown)}")
+
+    index, gid, valid = group_codes(df, list(keys))
+    # Stabil sortering beholder tidsrekkefølgen innenfor hver gruppe
+    order = np.argsort(gid, kind='stable')
+    values = df[columns].to_numpy(dtype=float)[valid][order]
+    group_sizes = np.diff(np.r_[_group_starts(gid[order]), len(order)])
+
+    batches = [min(batch_size, n_boot - start) for start in range(0, n_boot, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    args = [(values, group_sizes, size, block_length, seed_sequence, tuple(statistics))
+            for size, seed_sequence in zip(batches, seeds)]
+
+    if max_workers == 1 or len(batches) == 1:
+        parts = [_bootstrap_batch(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(executor.map(_bootstrap_batch, *zip(*args)))
+
+    replicates = {stat: np.concatenate([part[stat] for part in parts], axis=1) for stat in statistics}
+    return index, replicates
+
+def bootstrap_confidence_intervals(df: pd.DataFrame, columns: list, keys: list = ('year', 'season'),
+                                   statistics: tuple = ('mean', 'median'), confidence: float = CONFIDENCE,
+                                   **kwargs) -> pd.DataFrame:
+    """
+    Beregner persentil-konfidensintervaller for gjennomsnitt og median per gruppe.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame, sortert på dato
+        columns (list): Kolonner som skal analyseres
+        keys (list): Grupperingskolonner
+        statistics (tuple): Statistikker fra BOOTSTRAP_STATISTICS
+        confidence (float): Konfidensnivå, f.eks. 0.95
+        **kwargs: Sendes videre til bootstrap_group_statistics (n_boot, block_length, seed, max_workers, ...)
+    Returnerer:
+        pd.DataFrame: Kolonnene (kolonne, '<statistikk>_ci_low') og (kolonne, '<statistikk>_ci_high') per gruppe
+    """
+    index, replicates = bootstrap_group_statistics(df, columns, keys, statistics, **kwargs)
+    alpha = (1 - confidence) / 2
+
+    data = {}
+    for stat in statistics:
+        with warnings.catch_warnings():
+            # Grupper uten verdier gir NaN, som er ønsket
+            warnings.simplefilter('ignore', RuntimeWarning)
+            low, high = np.nanquantile(replicates[stat], [alpha, 1 - alpha], axis=1)
+        for j, column in enumerate(columns):
+            data[(column, f'{stat}_ci_low')] = low[:, j]
+            data[(column, f'{stat}_ci_high')] = high[:, j]
+    ordered = {key: data[key] for key in sorted(data, key=lambda key: columns.index(key[0]))}
+    return pd.DataFrame(ordered, index=index)
+
+def bootstrap_regression_band(x: np.ndarray, y: np.ndarray, x_grid: np.ndarray, n_boot: int = N_BOOT,
+                              block_length: int = 1, confidence: float = CONFIDENCE, seed: int = 0) -> tuple:
+    """
+    Beregner et bootstrap-konfidensbånd for en lineær regresjonslinje, med alle replikater i én beregning.
+
+    Parametre:
+        x (np.ndarray): Forklaringsvariabel
+        y (np.ndarray): Responsvariabel
+        x_grid (np.ndarray): Punktene båndet skal beregnes i
+        n_boot (int): Antall replikater
+        block_length (int): Blokklengde for autokorrelerte data; 1 gir vanlig bootstrap
+        confidence (float): Konfidensnivå
+        seed (int): Startverdi for tilfeldighetsgeneratoren
+    Returnerer:
+        tuple: (nedre grense, øvre grense) i hvert punkt i x_grid
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    indices = block_bootstrap_indices(np.array([len(x)]), n_boot, block_length, np.random.default_rng(seed))
+
+    # Minste kvadraters metode for alle replikater samtidig
+    xs, ys = x[indices], y[indices]
+    x_mean, y_mean = xs.mean(axis=1, keepdims=True), ys.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = ((xs - x_mean) * (ys - y_mean)).sum(axis=1) / ((xs - x_mean) ** 2).sum(axis=1)
+    intercept = y_mean[:, 0] - slope * x_mean[:, 0]
+    predictions = intercept[:, None] + slope[:, None] * np.asarray(x_grid, dtype=float)[None, :]
+
+    alpha = (1 - confidence) / 2
+    low, high = np.nanquantile(predictions, [alpha, 1 - alpha], axis=0)
+    return low, high
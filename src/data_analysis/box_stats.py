@@ -0,0 +1,209 @@
+import os
+import calendar
+import pandas as pd
+import numpy as np
+from data_access import (calendar_arrays, load_frost_data, load_nilu_data, analysis_table_path,
+                         read_analysis_table, save_analysis_table)
+
+# Lengden på whiskers i antall kvartilavstander, som i matplotlib og seaborn
+WHISKER = 1.5
+
+# Maks antall uteliggere som lagres per (stasjon, variabel, måned)
+MAX_OUTLIERS = 50
+
+# Kolonnene i tabellen med boksstatistikk
+BOX_COLUMNS = ['count', 'mean', 'whislo', 'q1', 'median', 'q3', 'whishi', 'n_outliers']
+
+# Korte månedsnavn (Jan, Feb, ...) som etiketter i boksplottene
+MONTH_LABELS = {month: calendar.month_abbr[month] for month in range(1, 13)}
+
+# Innlasting og datokolonne for kildene som boksplottene lages fra
+BOX_SOURCES = {
+    'frost': (load_frost_data, 'referenceTime'),
+    'nilu': (load_nilu_data, 'dateTime')
+}
+
+def _sorted_groups(codes: np.ndarray, values: np.ndarray, n_groups: int) -> tuple:
+    """
+    Sorterer verdiene etter gruppe og verdi, og finner start og antall for hver gruppe.
+    """
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    order = np.lexsort((values, codes))
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return codes[order], values[order], starts, counts
+
+def _group_quantile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    Lineært interpolert kvantil for hver gruppe i de sorterte verdiene (som np.percentile).
+    """
+    position = starts + q * np.maximum(counts - 1, 0)
+    low = np.floor(position).astype(np.intp)
+    high = np.minimum(low + 1, starts + np.maximum(counts - 1, 0))
+    low, high = np.minimum(low, len(sorted_values) - 1), np.minimum(high, len(sorted_values) - 1)
+    fraction = position - low
+    result = sorted_values[low] + fraction * (sorted_values[high] - sorted_values[low])
+    return np.where(counts > 0, result, np.nan)
+
+def _sample_outliers(group_codes: np.ndarray, max_outliers: int) -> np.ndarray:
+    """
+    Velger ut høyst max_outliers jevnt fordelte uteliggere per gruppe, med de mest ekstreme i hver ende.
+
+    Returnerer:
+        np.ndarray: Boolsk maske over uteliggerne (sortert etter gruppe og verdi)
+    """
+    keep = np.ones(len(group_codes), dtype=bool)
+    _, starts, counts = np.unique(group_codes, return_index=True, return_counts=True)
+    for start, count in zip(starts[counts > max_outliers], counts[counts > max_outliers]):
+        keep[start:start + count] = False
+        keep[start + np.round(np.linspace(0, count - 1, max_outliers)).astype(np.intp)] = True
+    return keep
+
+def box_statistics(df: pd.DataFrame, date_column: str, columns: list, station_column: str = None,
+                   station: str = 'station', whis: float = WHISKER, max_outliers: int = MAX_OUTLIERS) -> tuple:
+    """
+    Beregner boksplottstatistikk per (stasjon, variabel, måned) for alle grupper samtidig.
+
+    Verdiene sorteres én gang etter gruppe og verdi. Kvartilene hentes med
+    indeksering i de sorterte verdiene, og whiskers (lengste verdi innenfor
+    1,5 kvartilavstander fra boksen, som i matplotlib) med maksimum og minimum
+    per gruppe. Verdier utenfor whiskers er uteliggere, og et jevnt utvalg av
+    dem lagres slik at grafen kan tegnes uten rådataene.
+
+    Parametre:
+        df (pd.DataFrame): Data med datokolonne, én rad per måling (dag eller time)
+        date_column (str): Navnet på datokolonnen
+        columns (list): Variablene det skal lages boksplott for
+        station_column (str): Kolonnen med stasjonsnavn (valgfri; ellers én stasjon)
+        station (str): Navnet på stasjonen når station_column ikke er oppgitt
+        whis (float): Lengden på whiskers i antall kvartilavstander
+        max_outliers (int): Maks antall lagrede uteliggere per gruppe
+    Returnerer:
+        tuple: (statistikk med indeks (station, variable, month) og kolonnene i BOX_COLUMNS,
+                uteliggere med kolonnene station, variable, month og value)
+    """
+    if station_column is None:
+        station_codes, stations = np.zeros(len(df), dtype=np.intp), [station]
+    else:
+        station_codes, stations = pd.factorize(df[station_column], sort=True)
+        stations = list(stations)
+    month = calendar_arrays(df[date_column])['month']
+    observed = ~np.isnan(month)
+    n_groups = len(stations) * 12
+    codes = station_codes[observed] * 12 + month[observed].astype(np.intp) - 1
+
+    frames, outlier_frames = [], []
+    for column in columns:
+        values = df[column].to_numpy(dtype=float)[observed]
+        group_codes, sorted_values, starts, counts = _sorted_groups(codes, values, n_groups)
+        if not len(sorted_values):
+            continue
+        q1 = _group_quantile(sorted_values, starts, counts, 0.25)
+        median = _group_quantile(sorted_values, starts, counts, 0.5)
+        q3 = _group_quantile(sorted_values, starts, counts, 0.75)
+        iqr = q3 - q1
+
+        # Whiskers: ytterste verdi innenfor grensene, eller kanten av boksen hvis ingen finnes
+        upper, lower = (q3 + whis * iqr)[group_codes], (q1 - whis * iqr)[group_codes]
+        present = counts > 0
+        whishi, whislo = np.full(n_groups, -np.inf), np.full(n_groups, np.inf)
+        whishi[present] = np.maximum.reduceat(np.where(sorted_values <= upper, sorted_values, -np.inf),
+                                              starts[present])
+        whislo[present] = np.minimum.reduceat(np.where(sorted_values >= lower, sorted_values, np.inf),
+                                              starts[present])
+        whishi = np.where(np.isfinite(whishi), np.maximum(whishi, q3), q3)
+        whislo = np.where(np.isfinite(whislo), np.minimum(whislo, q1), q1)
+
+        is_outlier = (sorted_values > whishi[group_codes]) | (sorted_values < whislo[group_codes])
+        sums = np.bincount(group_codes, weights=sorted_values, minlength=n_groups)
+        stats = pd.DataFrame({
+            'count': counts,
+            'mean': np.divide(sums, counts, out=np.full(n_groups, np.nan), where=counts > 0),
+            'whislo': whislo, 'q1': q1, 'median': median, 'q3': q3, 'whishi': whishi,
+            'n_outliers': np.bincount(group_codes[is_outlier], minlength=n_groups)
+        })
+        stats.index = pd.MultiIndex.from_arrays(
+            [np.asarray(stations, dtype=object)[np.arange(n_groups) // 12], np.full(n_groups, column),
+             np.arange(n_groups) % 12 + 1], names=['station', 'variable', 'month'])
+        frames.append(stats[present])
+
+        outlier_codes = group_codes[is_outlier]
+        keep = _sample_outliers(outlier_codes, max_outliers)
+        outlier_frames.append(pd.DataFrame({
+            'station': np.asarray(stations, dtype=object)[outlier_codes[keep] // 12],
+            'variable': column,
+            'month': outlier_codes[keep] % 12 + 1,
+            'value': sorted_values[is_outlier][keep]
+        }))
+
+    if not frames:
+        empty = pd.MultiIndex.from_arrays([[], [], []], names=['station', 'variable', 'month'])
+        return (pd.DataFrame(columns=BOX_COLUMNS, index=empty),
+                pd.DataFrame(columns=['station', 'variable', 'month', 'value']))
+    return pd.concat(frames), pd.concat(outlier_frames, ignore_index=True)
+
+def save_box_statistics(results: tuple, output_dir: str, prefix: str):
+    """
+    Lagrer boksstatistikken og uteliggerne ved siden av de andre analyseresultatene (se save_analysis_table).
+
+    Parametre:
+        results (tuple): Resultatet fra box_statistics
+        output_dir (str): Katalog for lagring av resultater
+        prefix (str): Prefiks for filnavnene, f.eks. 'nilu' eller 'frost'
+    """
+    stats, outliers = results
+    save_analysis_table(stats, output_dir, f'{prefix}_box_stats')
+    save_analysis_table(outliers, output_dir, f'{prefix}_box_outliers')
+
+def load_box_statistics(prefix: str, data_path: str, column: str, results_dir: str = None) -> tuple:
+    """
+    Henter boksstatistikken for én variabel, helst fra tabellene lagret av analysen.
+
+    Tabellene brukes hvis de finnes og er nyere enn datafilen. Ellers beregnes
+    statistikken fra de rensede dataene, slik at grafen alltid viser dataene i filen.
+
+    Parametre:
+        prefix (str): Kilden, 'frost' eller 'nilu' (se BOX_SOURCES)
+        data_path (str): Filsti til de rensede dataene
+        column (str): Variabelen
+        results_dir (str): Katalogen med analyseresultater (standard: 'analyses_results' ved siden av 'clean')
+    Returnerer:
+        tuple: (statistikk per måned, uteliggere), som fra box_statistics
+    """
+    if results_dir is None:
+        results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(data_path))), 'analyses_results')
+    stats_path = analysis_table_path(results_dir, f'{prefix}_box_stats')
+    outliers_path = analysis_table_path(results_dir, f'{prefix}_box_outliers')
+    data_mtime = os.stat(data_path).st_mtime_ns
+    if all(os.path.exists(path) and os.stat(path).st_mtime_ns >= data_mtime for path in (stats_path, outliers_path)):
+        stats = read_analysis_table(stats_path, station=prefix, variable=column)
+        if len(stats):
+            stats = stats.astype({'station': str, 'variable': str}).set_index(['station', 'variable', 'month'])
+            outliers = read_analysis_table(outliers_path, station=prefix, variable=column)
+            return stats, outliers.astype({'station': str, 'variable': str})
+
+    loader, date_column = BOX_SOURCES[prefix]
+    return box_statistics(loader(data_path, columns=[column]), date_column, [column], station=prefix)
+
+def to_bxp_stats(stats: pd.DataFrame, outliers: pd.DataFrame, labels: dict = None) -> list:
+    """
+    Gjør om boksstatistikk til listen av ordbøker som matplotlib sin Axes.bxp tegner direkte.
+
+    Parametre:
+        stats (pd.DataFrame): Statistikk for én stasjon og variabel, fra box_statistics
+        outliers (pd.DataFrame): Uteliggerne fra box_statistics
+        labels (dict): Etikett per måned (valgfri; standard er månedsnummeret)
+    Returnerer:
+        list: Én ordbok per måned med nøklene label, med, q1, q3, whislo, whishi, mean og fliers
+    """
+    fliers = outliers.groupby('month')['value'].apply(np.asarray)
+    boxes = []
+    for (_, _, month), row in stats.sort_index(level='month').iterrows():
+        boxes.append({
+            'label': labels.get(month, month) if labels else month,
+            'med': row['median'], 'q1': row['q1'], 'q3': row['q3'],
+            'whislo': row['whislo'], 'whishi': row['whishi'], 'mean': row['mean'],
+            'fliers': fliers.get(month, np.array([]))
+        })
+    return boxes
@@ -0,0 +1,191 @@
+import pandas as pd
+import numpy as np
+from data_access import calendar_arrays, season_codes, SEASON_LABELS
+from data_analysis.rolling_stats import to_regular_axis
+
+# Største forskyvning i dager for de forskjøvede korrelasjonene
+MAX_LAG = 30
+
+# Minste antall dagpar som må inngå for at en korrelasjon skal regnes ut
+MIN_PERIODS = 10
+
+# Navnet på stratumet som inneholder alle dager
+ALL_SEASONS = 'All'
+
+def correlation_from_sums(n, sx, sy, sxx, syy, sxy, min_periods: int) -> np.ndarray:
+    """
+    Beregner Pearson-korrelasjon fra antall, summer og kvadratsummer over de felles radene.
+
+    Summene kan legges sammen på tvers av partisjoner før korrelasjonen
+    beregnes (se streaming_stats). Fungerer elementvis på NumPy-arrays.
+
+    Parametre:
+        n: Antall felles rader
+        sx, sy: Summene av x og y over de felles radene
+        sxx, syy: Kvadratsummene av x og y over de felles radene
+        sxy: Summen av kryssproduktene
+        min_periods (int): Minste antall felles rader; færre gir NaN
+    Returnerer:
+        np.ndarray: Korrelasjonene, NaN der de ikke kan beregnes
+    """
+    with np.errstate(all='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    # Avrundingsfeil kan gi verdier litt utenfor [-1, 1] og små negative varianser
+    valid = (n >= max(min_periods, 2)) & (var_x > 1e-12 * np.maximum(sxx, 1.0)) & (var_y > 1e-12 * np.maximum(syy, 1.0))
+    return np.where(valid, np.clip(r, -1.0, 1.0), np.nan)
+
+def _centered(values: np.ndarray) -> tuple:
+    """
+    Sentrerer kolonnene rundt gjennomsnittet og setter manglende verdier til 0.
+
+    Returnerer:
+        tuple: (sentrerte verdier, maske for tilstedeværende verdier som float)
+    """
+    present = ~np.isnan(values)
+    with np.errstate(all='ignore'):
+        mean = np.nan_to_num(np.nanmean(values, axis=0)) if values.size else 0.0
+    return np.where(present, values - mean, 0.0), present.astype(float)
+
+def pairwise_correlation(values: np.ndarray, min_periods: int = 2) -> tuple:
+    """
+    Beregner korrelasjonsmatrisen med parvis komplette rader.
+
+    Hvert par av kolonner bruker radene der begge har verdi, slik at en
+    manglende verdi ikke gjør hele matrisen til NaN (som np.corrcoef).
+    Alle par beregnes med fem matriseprodukter.
+
+    Parametre:
+        values (np.ndarray): Verdier med én rad per observasjon og én kolonne per variabel
+        min_periods (int): Minste antall felles rader; færre gir NaN
+    Returnerer:
+        tuple: (korrelasjonsmatrise, antall felles rader per par)
+    """
+    x, mask = _centered(np.asarray(values, dtype=float))
+    n = mask.T @ mask
+    sx = x.T @ mask
+    sxx = (x * x).T @ mask
+    corr = correlation_from_sums(n, sx, sx.T, sxx, sxx.T, x.T @ x, min_periods)
+    return corr, n.astype(np.int64)
+
+def _cross_sums(a: np.ndarray, b: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Beregner sum over t av a[t] * b[t + lag] for alle lag i [-max_lag, max_lag] med FFT.
+
+    Parametre:
+        a (np.ndarray): Array med form (..., n, p)
+        b (np.ndarray): Array med form (n, q)
+        max_lag (int): Største forskyvning
+    Returnerer:
+        np.ndarray: Summer med form (..., 2 * max_lag + 1, p, q)
+    """
+    n = b.shape[0]
+    # Nullutfylling til minst n + max_lag hindrer at summene går rundt (sirkulær korrelasjon)
+    nfft = 1 << int(np.ceil(np.log2(max(n + max_lag, 2))))
+    spectrum_a = np.fft.rfft(a, n=nfft, axis=-2)
+    spectrum_b = np.fft.rfft(b, n=nfft, axis=-2)
+    product = np.conj(spectrum_a)[..., :, None] * spectrum_b[:, None, :]
+    full = np.fft.irfft(product, n=nfft, axis=-3)
+    lags = np.arange(-max_lag, max_lag + 1)
+    return full[..., lags % nfft, :, :]
+
+def lagged_cross_correlation(x: np.ndarray, y: np.ndarray, max_lag: int = MAX_LAG,
+                             strata: np.ndarray = None, min_periods: int = MIN_PERIODS) -> tuple:
+    """
+    Beregner forskjøvede krysskorrelasjoner mellom alle kolonner i x og y, for alle lag og strata.
+
+    Korrelasjonen ved lag L er mellom x[t] og y[t + L], med parvis komplette
+    dagpar. Positiv L betyr at y måles L dager etter x. Alle summene som
+    trengs (antall, summer, kvadratsummer og kryssprodukter) beregnes for alle
+    lag, par og strata i én FFT-basert kryss-sum, i O(n log n).
+
+    Parametre:
+        x (np.ndarray): Verdier på en sammenhengende dagakse, form (n, p)
+        y (np.ndarray): Verdier på samme dagakse, form (n, q)
+        max_lag (int): Største forskyvning i dager
+        strata (np.ndarray): Bool-maske med form (s, n) som velger dagene t for hvert stratum (valgfri)
+        min_periods (int): Minste antall dagpar; færre gir NaN
+    Returnerer:
+        tuple: (korrelasjoner med form (s, 2 * max_lag + 1, p, q), antall dagpar med samme form)
+    """
+    x, x_mask = _centered(np.asarray(x, dtype=float))
+    y, y_mask = _centered(np.asarray(y, dtype=float))
+    p, q = x.shape[1], y.shape[1]
+    if strata is None:
+        strata = np.ones((1, len(x)), dtype=bool)
+    max_lag = min(max_lag, max(len(x) - 1, 0))
+
+    # x-siden begrenses til dagene i hvert stratum; y-siden er felles
+    selected = strata[:, :, None]
+    a = np.concatenate([x_mask * selected, x * selected, x * x * selected], axis=-1)
+    b = np.concatenate([y_mask, y, y * y], axis=-1)
+    sums = _cross_sums(a, b, max_lag)
+
+    def block(i, j):
+        return sums[..., i * p:(i + 1) * p, j * q:(j + 1) * q]
+
+    # Summene er heltall for antall; avrunding fjerner FFT-støy
+    n = np.rint(block(0, 0))
+    corr = correlation_from_sums(n, block(1, 0), block(0, 1), block(2, 0), block(0, 2), block(1, 1),
+                                  min_periods)
+    return corr, n.astype(np.int64)
+
+def season_strata(dates) -> tuple:
+    """
+    Lager strata for alle dager og for hver årstid.
+
+    Parametre:
+        dates (array-like): Datoene på dagaksen
+    Returnerer:
+        tuple: (navn på strata, bool-maske med én rad per stratum)
+    """
+    codes = season_codes(calendar_arrays(dates)['month'])
+    masks = np.vstack([np.ones(len(codes), dtype=bool)] +
+                      [codes == code for code in range(len(SEASON_LABELS))])
+    return [ALL_SEASONS] + SEASON_LABELS, masks
+
+def cross_correlation_table(df: pd.DataFrame, x_columns: list, y_columns: list, date_column: str = 'date',
+                            max_lag: int = MAX_LAG, by_season: bool = True,
+                            min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+    """
+    Beregner forskjøvede korrelasjoner mellom to grupper av kolonner, f.eks. vær og luftkvalitet.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata med begge gruppene, f.eks. fra load_joined_daily
+        x_columns (list): Kolonner på x-siden (f.eks. værvariabler)
+        y_columns (list): Kolonner på y-siden (f.eks. forurensningskomponenter)
+        date_column (str): Navnet på datokolonnen
+        max_lag (int): Største forskyvning i dager
+        by_season (bool): Beregn også korrelasjonene for hver årstid
+        min_periods (int): Minste antall dagpar; færre gir NaN
+    Returnerer:
+        pd.DataFrame: Én rad per (stratum, lag, x, y) med kolonnene 'correlation' og 'n'
+    """
+    axis, values = to_regular_axis(df, date_column, list(x_columns) + list(y_columns))
+    x, y = values[:, :len(x_columns)], values[:, len(x_columns):]
+    if by_season:
+        names, strata = season_strata(axis)
+    else:
+        names, strata = [ALL_SEASONS], np.ones((1, len(axis)), dtype=bool)
+
+    corr, n = lagged_cross_correlation(x, y, max_lag, strata, min_periods)
+    lags = np.arange(-(corr.shape[1] // 2), corr.shape[1] // 2 + 1)
+    index = pd.MultiIndex.from_product([names, lags, x_columns, y_columns],
+                                       names=['season', 'lag', 'x', 'y'])
+    return pd.DataFrame({'correlation': corr.ravel(), 'n': n.ravel()}, index=index)
+
+def strongest_lags(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Finner laget med sterkest korrelasjon (størst absoluttverdi) for hvert stratum og par.
+
+    Parametre:
+        table (pd.DataFrame): Resultat fra cross_correlation_table
+    Returnerer:
+        pd.DataFrame: Én rad per (stratum, x, y) med 'lag', 'correlation' og 'n'
+    """
+    flat = table.reset_index().dropna(subset=['correlation'])
+    order = flat['correlation'].abs().sort_values(ascending=False, kind='stable').index
+    best = flat.loc[order].drop_duplicates(['season', 'x', 'y'])
+    return best.set_index(['season', 'x', 'y']).sort_index()[['lag', 'correlation', 'n']]
@@ -1,57 +1,47 @@
-import pandas as pd
-import numpy as np
-import sqlite3
+import sys
 import os
 
-def get_season(month: int) -> str:
-    """
-    Returnerer navnet på årstiden basert på månedsnummer.
-    Returnerer 'Unknown' hvis måneden er ugyldig.
-
-    Parametre:
-        month (int): Månedsnummer (1-12)
-    Returnerer:
-        str: Navn på årstid eller 'Unknown'
-    """
-    try:
-        # Definerer hvilke måneder som tilhører hver årstid
-        seasons = {
-            (12, 1, 2): 'Winter',
-            (3, 4, 5): 'Spring',
-            (6, 7, 8): 'Summer',
-            (9, 10, 11): 'Fall'
-        }
-        # Finner riktig årstid for gitt måned
-        return next(value for key, value in seasons.items() if month in key)
-    except Exception as e:
-        print(f"Feil ved bestemmelse av årstid for måned {month}: {e}")
-        return 'Unknown'
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
 
-def load_and_prepare_data(db_path: str) -> pd.DataFrame:
+import pandas as pd
+import numpy as np
+import sqlite3
+from data_access import load_frost_data, get_climatology, save_analysis_table, tidy_matrix
+from data_analysis.streaming_stats import StreamingAggregator, refresh_streaming_statistics
+from data_analysis.rolling_stats import rolling_statistics
+from data_analysis.bootstrap import bootstrap_confidence_intervals
+from data_analysis.exceedances import analyse_exceedances, save_exceedances, WEATHER_THRESHOLDS
+from data_analysis.trend_tests import trend_test_table, save_trend_tests
+from data_analysis.anomalies import detect_anomalies, save_anomalies
+from data_analysis.box_stats import box_statistics, save_box_statistics
+from data_analysis.decomposition import get_decomposition
+
+def load_and_prepare_data(db_path: str, columns: list = None,
+                          start: str = None, end: str = None) -> pd.DataFrame:
     """
     Leser inn og forbereder værdata fra en SQLite-database.
+    Kolonneutvalg og datofilter utføres i SQLite.
 
     Parametre:
         db_path (str): Filsti til SQLite-databasen
+        columns (list): Kolonner som skal leses (standard: alle)
+        start (str): Første dato som skal leses (inklusiv, valgfri)
+        end (str): Siste dato som skal leses (inklusiv, valgfri)
     Returnerer:
         pd.DataFrame: Klargjort DataFrame med ekstra kolonner for årstid og år
     """
     try:
-        # Leser data fra SQLite-databasen
-        with sqlite3.connect(db_path) as conn:
-            df = pd.read_sql('SELECT * FROM weather_data', conn)
+        # Leser data fra SQLite-databasen (cachet, med kolonner for årstid og år)
+        df = load_frost_data(db_path, columns=columns, start=start, end=end)
     except FileNotFoundError:
         print(f"Feil: Databasen '{db_path}' ble ikke funnet.")
         return pd.DataFrame()
     except sqlite3.Error as e:
         print(f"Feil ved tilkobling til SQLite-databasen: {e}")
         return pd.DataFrame()
-
-    try:
-        # Konverterer og legger til kolonner for årstid og år
-        df['referenceTime'] = pd.to_datetime(df['referenceTime'])
-        df['season'] = df['referenceTime'].dt.month.apply(get_season)
-        df['year'] = df['referenceTime'].dt.year
     except KeyError as e:
         print(f"Feil: Mangler forventet kolonne i dataene: {e}")
         return pd.DataFrame()
@@ -63,35 +53,23 @@ def load_and_prepare_data(db_path: str) -> pd.DataFrame:
 
 def calculate_statistics(df: pd.DataFrame, columns: list) -> tuple:
     """
-    Beregner statistikk ved bruk av NumPy-operasjoner.
+    Beregner statistikk per år og årstid, per år og korrelasjonsmatrisen.
+
+    Tabellene bygges med den samme aggregatoren som de lagrede tabellene
+    (se streaming_stats), men uten tilstandsfil. Medianene kommer fra
+    kvantilskissen og er eksakte opp til SKETCH_RESOLUTION, altså eksakte for
+    de rensede verdiene med én desimal; korrelasjonen bruker parvis komplette rader.
 
     Parametre:
-        df (pd.DataFrame): Inndata-DataFrame
+        df (pd.DataFrame): Inndata-DataFrame med 'referenceTime', 'year' og 'season'
         columns (list): Kolonner som skal analyseres
     Returnerer:
         tuple: (statistikk per år og årstid, statistikk per år, korrelasjonsmatrise)
     """
     try:
-        # Beregner korrelasjonsmatrise
-        data = df[columns].to_numpy()
-        correlations = np.corrcoef(data.T)
-        correlation_df = pd.DataFrame(correlations, columns=columns, index=columns)
-
-        # Beregner statistikk per år og årstid
-        year_season_stats = df.groupby(['year', 'season'])[columns].agg([
-            ('mean', np.mean),
-            ('median', np.median),
-            ('std', np.std)
-        ])
-
-        # Beregner statistikk per år
-        year_stats = df.groupby('year')[columns].agg([
-            ('mean', np.mean),
-            ('median', np.median),
-            ('std', np.std)
-        ])
-
-        return year_season_stats, year_stats, correlation_df
+        aggregator = StreamingAggregator(columns)
+        aggregator.update(df, 'referenceTime', station='frost')
+        return aggregator.to_frames()
     except KeyError as e:
         print(f"Feil: En eller flere kolonner mangler i DataFrame: {e}")
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
@@ -100,25 +78,34 @@ def calculate_statistics(df: pd.DataFrame, columns: list) -> tuple:
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
 def save_results(stats_ys: pd.DataFrame, stats_y: pd.DataFrame, 
-                corr: pd.DataFrame, output_dir: str):
+                corr: pd.DataFrame, output_dir: str, rolling: pd.DataFrame = None,
+                confidence_intervals: tuple = None):
     """
-    Lagrer analyseresultater til CSV-filer.
+    Lagrer analyseresultater som tabeller i langt format (Parquet, eventuelt CSV).
 
     Parametre:
         stats_ys (pd.DataFrame): Statistikk per år og årstid
         stats_y (pd.DataFrame): Statistikk per år
         corr (pd.DataFrame): Korrelasjonsmatrise
         output_dir (str): Katalog for lagring av resultater
+        rolling (pd.DataFrame): Glidende statistikk per dag (valgfri)
+        confidence_intervals (tuple): Bootstrap-intervaller per år og årstid, og per år (valgfri)
     """
     try:
         # Oppretter katalog hvis den ikke finnes
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Lagrer resultater til CSV-filer
-        stats_ys.to_csv(os.path.join(output_dir, 'frost_aggregated_stats_year_season.csv'))
-        stats_y.to_csv(os.path.join(output_dir, 'frost_aggregated_stats_year.csv'))
-        corr.to_csv(os.path.join(output_dir, 'frost_correlation_matrix.csv'))
+        # Lagrer resultater med én rad per (år, årstid, variabel) og statistikkene som kolonner
+        save_analysis_table(stats_ys, output_dir, 'frost_aggregated_stats_year_season')
+        save_analysis_table(stats_y, output_dir, 'frost_aggregated_stats_year')
+        save_analysis_table(tidy_matrix(corr), output_dir, 'frost_correlation_matrix')
+        if rolling is not None:
+            save_analysis_table(rolling, output_dir, 'frost_rolling_stats')
+        if confidence_intervals is not None:
+            ci_ys, ci_y = confidence_intervals
+            save_analysis_table(ci_ys, output_dir, 'frost_bootstrap_ci_year_season')
+            save_analysis_table(ci_y, output_dir, 'frost_bootstrap_ci_year')
     except Exception as e:
         print(f"Feil ved lagring av resultater: {e}")
 
@@ -126,11 +113,12 @@ def main():
     """
     Hovedfunksjon som kjører analyse-pipelinen:
     - Leser inn data
-    - Utfører statistiske analyser
+    - Oppdaterer statistikken med dagene siden forrige kjøring
     - Skriver ut og lagrer resultater
     """
     DB_FILE = 'data/clean/cleaned_data_frost.db'  # Filsti til frost-database
     OUTPUT_DIR = 'data/analyses_results'  # Katalog for lagring av resultater
+    STATE_FILE = os.path.join(OUTPUT_DIR, 'frost_streaming_state.json')  # Tilstand for løpende statistikk
     COLUMNS_TO_ANALYZE = [
         'mean_air_temperature',
         'total_precipitation',
@@ -139,14 +127,25 @@ def main():
 
     try:
         # Leser og forbereder data
-        df = load_and_prepare_data(DB_FILE)
+        # Flaggene for imputerte verdier leses også, slik at de kan utelates i glidende statistikk
+        flag_columns = [f'generated_{column}' for column in COLUMNS_TO_ANALYZE]
+        df = load_and_prepare_data(DB_FILE, columns=COLUMNS_TO_ANALYZE + flag_columns)
         if df.empty:
             print("Ingen data å analysere. Avslutter.")
             return
 
-        # Utfører statistiske analyser
-        year_season_stats, year_stats, correlations = calculate_statistics(
-            df, COLUMNS_TO_ANALYZE
+        # Oppdaterer løpende statistikk med nye dager (O(nye rader)) og bygger tabellene
+        aggregator = refresh_streaming_statistics(df, COLUMNS_TO_ANALYZE, 'referenceTime',
+                                                  STATE_FILE, station='frost')
+        year_season_stats, year_stats, correlations = aggregator.to_frames()
+
+        # Glidende 7/30/90/365-dagers statistikk
+        rolling = rolling_statistics(df, 'referenceTime', COLUMNS_TO_ANALYZE)
+
+        # 95 % blokk-bootstrap-intervaller for gjennomsnitt og median
+        confidence_intervals = (
+            bootstrap_confidence_intervals(df, COLUMNS_TO_ANALYZE, ['year', 'season']),
+            bootstrap_confidence_intervals(df, COLUMNS_TO_ANALYZE, ['year'])
         )
 
         # Skriver ut statistikk per år
@@ -154,7 +153,30 @@ def main():
         print(year_stats)
 
         # Lagrer analyseresultater
-        save_results(year_season_stats, year_stats, correlations, OUTPUT_DIR)
+        save_results(year_season_stats, year_stats, correlations, OUTPUT_DIR, rolling, confidence_intervals)
+
+        # Kuldeperioder og perioder med kraftig nedbør
+        exceedances = analyse_exceedances(df, 'referenceTime', WEATHER_THRESHOLDS, station='frost')
+        save_exceedances(exceedances, OUTPUT_DIR, 'frost')
+
+        # Mann-Kendall-test og Sen-stigning per variabel og årstid
+        trends = trend_test_table(df, 'referenceTime', COLUMNS_TO_ANALYZE, station='frost')
+        save_trend_tests(trends, OUTPUT_DIR, 'frost')
+
+        # Dager som avviker fra klimatologien (lagret ved rensingen, beregnes på nytt bare hvis dataene er endret)
+        climatology = get_climatology('frost', df, 'referenceTime', COLUMNS_TO_ANALYZE,
+                                      clean_dir=os.path.dirname(DB_FILE))
+        anomalies = detect_anomalies(df, 'referenceTime', COLUMNS_TO_ANALYZE, climatology, station='frost')
+        save_anomalies(anomalies, OUTPUT_DIR, 'frost')
+
+        # Kvartiler, whiskers og et utvalg uteliggere per måned, som boksplottene tegnes fra
+        save_box_statistics(box_statistics(df, 'referenceTime', COLUMNS_TO_ANALYZE, station='frost'),
+                            OUTPUT_DIR, 'frost')
+
+        # Trend, sesong og rest for hver variabel (lagret, beregnes på nytt bare hvis dataene er endret)
+        decomposition = get_decomposition('frost', df, 'referenceTime', COLUMNS_TO_ANALYZE,
+                                          results_dir=OUTPUT_DIR, station='frost')
+        save_analysis_table(decomposition.to_frame(), OUTPUT_DIR, 'frost_decomposition')
         print("Analyseresultater lagret.")
     except Exception as e:
         print(f"En uventet feil oppstod i hovedfunksjonen: {e}")
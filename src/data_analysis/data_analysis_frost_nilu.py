@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+import pandas as pd
+from data_access import load_joined_daily, save_analysis_table, tidy_matrix
+from data_analysis.correlation_engine import pairwise_correlation, cross_correlation_table, strongest_lags, MAX_LAG
+
+# Værvariabler fra Frost og forurensningskomponenter fra NILU som sammenlignes
+WEATHER_COLUMNS = ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed']
+POLLUTANT_COLUMNS = ['NO2', 'PM10', 'PM2.5']
+
+def calculate_correlations(df: pd.DataFrame, max_lag: int = MAX_LAG) -> tuple:
+    """
+    Beregner samme-dags korrelasjoner for alle variabler og forskjøvede korrelasjoner mellom vær og luftkvalitet.
+
+    Parametre:
+        df (pd.DataFrame): Sammenslåtte dagdata med kolonnen 'date'
+        max_lag (int): Største forskyvning i dager
+    Returnerer:
+        tuple: (korrelasjonsmatrise, forskjøvede korrelasjoner per årstid, sterkeste lag per par)
+    """
+    columns = WEATHER_COLUMNS + POLLUTANT_COLUMNS
+    correlations, _ = pairwise_correlation(df[columns].to_numpy(dtype=float))
+    correlation_df = pd.DataFrame(correlations, columns=columns, index=columns)
+    lagged = cross_correlation_table(df, WEATHER_COLUMNS, POLLUTANT_COLUMNS, 'date', max_lag)
+    return correlation_df, lagged, strongest_lags(lagged)
+
+def save_results(corr: pd.DataFrame, lagged: pd.DataFrame, output_dir: str):
+    """
+    Lagrer korrelasjonene som tabeller i langt format (Parquet, eventuelt CSV).
+
+    Parametre:
+        corr (pd.DataFrame): Korrelasjonsmatrise for alle variabler
+        lagged (pd.DataFrame): Forskjøvede korrelasjoner
+        output_dir (str): Katalog for lagring av resultater
+    """
+    try:
+        save_analysis_table(tidy_matrix(corr), output_dir, 'frost_nilu_correlation_matrix')
+        save_analysis_table(lagged, output_dir, 'frost_nilu_lagged_correlation')
+    except Exception as e:
+        print(f"Feil ved lagring av resultater: {e}")
+
+def main():
+    """
+    Hovedfunksjon som sammenligner vær og luftkvalitet:
+    - Leser den sammenslåtte dagstabellen
+    - Beregner samme-dags og forskjøvede korrelasjoner (-30 til +30 dager), også per årstid
+    - Skriver ut og lagrer resultater
+    """
+    FROST_DB_FILE = 'data/clean/cleaned_data_frost.db'  # Filsti til Frost-database
+    NILU_FILE = 'data/clean/cleaned_data_nilu.json'  # Filsti til NILU-data
+    OUTPUT_DIR = 'data/analyses_results'  # Katalog for lagring av resultater
+
+    try:
+        df = load_joined_daily(WEATHER_COLUMNS + POLLUTANT_COLUMNS, FROST_DB_FILE, NILU_FILE)
+    except FileNotFoundError as e:
+        print(f"Feil: Fant ikke rensede data: {e}")
+        return
+    if df.empty:
+        print("Ingen data å analysere. Avslutter.")
+        return
+
+    correlations, lagged, strongest = calculate_correlations(df)
+    print("\nSterkeste forskjøvede korrelasjon per par (alle dager):")
+    print(strongest.loc['All'])
+    save_results(correlations, lagged, OUTPUT_DIR)
+    print("Analyseresultater lagret.")
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,22 @@
-import pandas as pd
-import numpy as np
+import sys
 import os
 
-def get_season(month) -> str:
-    """
-    Returnerer navnet på årstiden basert på månedsnummer.
-    Returnerer 'Unknown' hvis måneden er ugyldig.
-    
-    Parametre:
-        month (int): Månedsnummer (1-12)
-    Returnerer:
-        str: Navn på årstid eller 'Unknown'
-    """
-    # Prøver å konvertere til int og sjekker at måneden er gyldig
-    try:
-        month = int(month)
-        if not 1 <= month <= 12:
-            return 'Unknown'
-        # Definerer hvilke måneder som tilhører hver årstid
-        seasons = {
-            (12, 1, 2): 'Winter',
-            (3, 4, 5): 'Spring',
-            (6, 7, 8): 'Summer',
-            (9, 10, 11): 'Fall'
-        }
-        # Finner riktig årstid for gitt måned
-        return next((value for key, value in seasons.items() if month in key), 'Unknown')
-    except (ValueError, TypeError):
-        # Returnerer 'Unknown' hvis konvertering feiler
-        return 'Unknown'
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+import pandas as pd
+import numpy as np
+from data_access import load_nilu_data, get_climatology, save_analysis_table, tidy_matrix
+from data_analysis.streaming_stats import StreamingAggregator, refresh_streaming_statistics
+from data_analysis.rolling_stats import rolling_statistics, running_means
+from data_analysis.bootstrap import bootstrap_confidence_intervals
+from data_analysis.exceedances import analyse_exceedances, save_exceedances, POLLUTANT_THRESHOLDS
+from data_analysis.trend_tests import trend_test_table, save_trend_tests
+from data_analysis.anomalies import detect_anomalies, count_anomalies, save_anomalies
+from data_analysis.box_stats import box_statistics, save_box_statistics
+from data_analysis.decomposition import get_decomposition, seasonal_summary
 
 def load_and_prepare_data(file_path: str) -> pd.DataFrame:
     """
@@ -42,12 +30,8 @@ def load_and_prepare_data(file_path: str) -> pd.DataFrame:
         ValueError: Hvis ingen gyldige data gjenstår etter prosessering
     """
     try:
-        df = pd.read_json(file_path)  # Leser inn data fra JSON
-        df['dateTime'] = pd.to_datetime(df['dateTime'])  # Konverterer til datetime
-        df['month'] = df['dateTime'].dt.month  # Trekker ut måned
-        df['season'] = df['month'].apply(get_season)  # Finner årstid
-        df['year'] = df['dateTime'].dt.year  # Trekker ut år
-        df = df[df['season'] != 'Unknown']  # Fjerner rader med ukjent årstid
+        df = load_nilu_data(file_path)  # Leser inn data fra JSON (cachet, med måned, årstid og år)
+        df = df.dropna(subset=['season'])  # Fjerner rader med ukjent årstid
         if df.empty:
             # Stopper hvis ingen gyldige data gjenstår
             raise ValueError("Ingen gyldige data igjen etter prosessering")
@@ -59,71 +43,101 @@ def load_and_prepare_data(file_path: str) -> pd.DataFrame:
 
 def calculate_statistics(df: pd.DataFrame, columns: list) -> tuple:
     """
-    Beregner statistikk ved bruk av NumPy-operasjoner.
+    Beregner statistikk per år og årstid, per år og korrelasjonsmatrisen.
+
+    Tabellene bygges med den samme aggregatoren som de lagrede tabellene
+    (se streaming_stats), men uten tilstandsfil. Medianene kommer fra
+    kvantilskissen og er eksakte opp til SKETCH_RESOLUTION, altså eksakte for
+    de rensede verdiene med én desimal; korrelasjonen bruker parvis komplette rader.
     
     Parametre:
-        df (pd.DataFrame): Inndata-DataFrame
+        df (pd.DataFrame): Inndata-DataFrame med 'dateTime', 'year' og 'season'
         columns (list): Kolonner som skal analyseres
     Returnerer:
         tuple: (statistikk per år og årstid, statistikk per år, korrelasjonsmatrise)
     """
-    # Konverterer utvalgte kolonner til numpy-array for effektiv beregning
-    data = df[columns].to_numpy()
-    # Beregner korrelasjonsmatrise mellom variablene
-    correlations = np.corrcoef(data.T)
-    correlation_df = pd.DataFrame(correlations, columns=columns, index=columns)
-    # Beregner statistikk (gjennomsnitt, median, std) per år og årstid
-    year_season_stats = df.groupby(['year', 'season'])[columns].agg([
-        ('mean', np.mean),
-        ('median', np.median),
-        ('std', np.std)
-    ])
-    # Beregner statistikk per år
-    year_stats = df.groupby('year')[columns].agg([
-        ('mean', np.mean),
-        ('median', np.median),
-        ('std', np.std)
-    ])
-    return year_season_stats, year_stats, correlation_df
+    # Legger alle radene inn i en ny aggregator og bygger tabellene fra den
+    aggregator = StreamingAggregator(columns)
+    aggregator.update(df, 'dateTime', station='nilu')
+    return aggregator.to_frames()
 
 def save_results(stats_ys: pd.DataFrame, stats_y: pd.DataFrame, 
-                corr: pd.DataFrame, output_dir: str):
+                corr: pd.DataFrame, output_dir: str, rolling: pd.DataFrame = None,
+                confidence_intervals: tuple = None):
     """
-    Lagrer analyseresultater til CSV-filer.
+    Lagrer analyseresultater som tabeller i langt format (Parquet, eventuelt CSV).
     
     Parametre:
         stats_ys (pd.DataFrame): Statistikk per år og årstid
         stats_y (pd.DataFrame): Statistikk per år
         corr (pd.DataFrame): Korrelasjonsmatrise
         output_dir (str): Katalog for lagring av resultater
+        rolling (pd.DataFrame): Glidende statistikk per dag (valgfri)
+        confidence_intervals (tuple): Bootstrap-intervaller per år og årstid, og per år (valgfri)
     """
-    # Oppretter katalogen hvis den ikke finnes
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    # Lagrer statistikk per år og årstid
-    stats_ys.to_csv(os.path.join(output_dir, 'nilu_aggregated_stats_year_season.csv'))
+    # Lagrer statistikk per år og årstid, med én rad per variabel og statistikkene som kolonner
+    save_analysis_table(stats_ys, output_dir, 'nilu_aggregated_stats_year_season')
     # Lagrer statistikk per år
-    stats_y.to_csv(os.path.join(output_dir, 'nilu_aggregated_stats_year.csv'))
-    # Lagrer korrelasjonsmatrise
-    corr.to_csv(os.path.join(output_dir, 'nilu_correlation_matrix.csv'))
+    save_analysis_table(stats_y, output_dir, 'nilu_aggregated_stats_year')
+    # Lagrer korrelasjonsmatrisen med én rad per par
+    save_analysis_table(tidy_matrix(corr), output_dir, 'nilu_correlation_matrix')
+    # Lagrer glidende statistikk og løpende middelverdier
+    if rolling is not None:
+        save_analysis_table(rolling, output_dir, 'nilu_rolling_stats')
+    # Lagrer konfidensintervaller for gjennomsnitt og median
+    if confidence_intervals is not None:
+        ci_ys, ci_y = confidence_intervals
+        save_analysis_table(ci_ys, output_dir, 'nilu_bootstrap_ci_year_season')
+        save_analysis_table(ci_y, output_dir, 'nilu_bootstrap_ci_year')
 
 def main():
     """
     Hovedfunksjon som kjører analyse-pipelinen:
     - Leser inn data
-    - Utfører statistiske analyser
+    - Oppdaterer statistikken med dagene siden forrige kjøring
     - Skriver ut og lagrer resultater
     """
     DATA_FILE = 'data/clean/cleaned_data_nilu.json'  # Filsti til NILU-data
     OUTPUT_DIR = 'data/analyses_results'  # Katalog for lagring av resultater
+    STATE_FILE = os.path.join(OUTPUT_DIR, 'nilu_streaming_state.json')  # Tilstand for løpende statistikk
     COLUMNS_TO_ANALYZE = ['NO2', 'PM10', 'PM2.5']  # Kolonner som skal analyseres
     df = load_and_prepare_data(DATA_FILE)  # Leser og forbereder data
-    year_season_stats, year_stats, correlations = calculate_statistics(
-        df, COLUMNS_TO_ANALYZE
-    )  # Beregner statistikk og korrelasjon
+    aggregator = refresh_streaming_statistics(
+        df, COLUMNS_TO_ANALYZE, 'dateTime', STATE_FILE, station='nilu'
+    )  # Oppdaterer løpende statistikk med nye dager
+    year_season_stats, year_stats, correlations = aggregator.to_frames()  # Statistikk og korrelasjon
+    rolling = rolling_statistics(df, 'dateTime', COLUMNS_TO_ANALYZE).join(
+        running_means(df, 'dateTime', COLUMNS_TO_ANALYZE)
+    )  # Glidende 7/30/90/365-dagers statistikk og løpende 24-timers/årlige middelverdier
+    confidence_intervals = (
+        bootstrap_confidence_intervals(df, COLUMNS_TO_ANALYZE, ['year', 'season']),
+        bootstrap_confidence_intervals(df, COLUMNS_TO_ANALYZE, ['year'])
+    )  # 95 % blokk-bootstrap-intervaller for gjennomsnitt og median
     print("\nStatistikk per år:")
     print(year_stats)  # Skriver ut statistikk per år
-    save_results(year_season_stats, year_stats, correlations, OUTPUT_DIR)  # Lagrer resultater
+    save_results(year_season_stats, year_stats, correlations, OUTPUT_DIR, rolling,
+                 confidence_intervals)  # Lagrer resultater
+    exceedances = analyse_exceedances(df, 'dateTime', POLLUTANT_THRESHOLDS, station='nilu')  # Overskridelser
+    print("\nDager over terskelverdiene per år:")
+    print(exceedances[1]['exceedance_days'].unstack('rule'))  # Skriver ut antall overskridelsesdager
+    save_exceedances(exceedances, OUTPUT_DIR, 'nilu')  # Lagrer overskridelser og episoder
+    trends = trend_test_table(df, 'dateTime', COLUMNS_TO_ANALYZE, station='nilu')  # Mann-Kendall og Sen-stigning
+    print("\nTrender per komponent og årstid:")
+    print(trends[['sen_slope', 'p_value', 'trend']])  # Skriver ut stigning per år og signifikans
+    save_trend_tests(trends, OUTPUT_DIR, 'nilu')  # Lagrer trendtabellen
+    climatology = get_climatology('nilu', df, 'dateTime', COLUMNS_TO_ANALYZE,
+                                  clean_dir=os.path.dirname(DATA_FILE))  # Felles klimatologi fra rensingen
+    anomalies = detect_anomalies(df, 'dateTime', COLUMNS_TO_ANALYZE, climatology, station='nilu')  # Avvikende dager
+    print("\nAvvik fra klimatologien per år:")
+    print(count_anomalies(anomalies))  # Skriver ut antall høye og lave avvik
+    save_anomalies(anomalies, OUTPUT_DIR, 'nilu')  # Lagrer de avvikende dagene
+    box_stats = box_statistics(df, 'dateTime', COLUMNS_TO_ANALYZE, station='nilu')  # Boksstatistikk per måned
+    save_box_statistics(box_stats, OUTPUT_DIR, 'nilu')  # Lagrer statistikken boksplottene tegnes fra
+    decomposition = get_decomposition('nilu', df, 'dateTime', COLUMNS_TO_ANALYZE, results_dir=OUTPUT_DIR,
+                                      station='nilu')  # Trend, sesong og rest (beregnes på nytt bare ved endrede data)
+    print("\nDekomposisjon i trend og sesong:")
+    print(seasonal_summary(decomposition))  # Skriver ut sesongamplitude og endring i trend
+    save_analysis_table(decomposition.to_frame(), OUTPUT_DIR, 'nilu_decomposition')  # Lagrer komponentene per dag
 
 if __name__ == "__main__":
     main()
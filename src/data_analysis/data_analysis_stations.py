@@ -0,0 +1,216 @@
+import sys
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+import pandas as pd
+import numpy as np
+from data_access import load_frost_data, load_nilu_data, save_analysis_table
+from data_analysis.statistics_engine import multi_level_statistics
+from data_analysis.correlation_engine import pairwise_correlation
+from data_analysis.spatial_interpolation import interpolate_stations, save_grid
+
+# Datakildene en stasjon kan komme fra: innlastingsfunksjon, datokolonne og standardkolonner
+SOURCES = {
+    'frost': {'loader': load_frost_data, 'date_column': 'referenceTime',
+              'columns': ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed']},
+    'nilu': {'loader': load_nilu_data, 'date_column': 'dateTime',
+             'columns': ['NO2', 'PM10', 'PM2.5']}
+}
+
+# Konfigurasjonsfil med stasjonene som skal analyseres (valgfri)
+STATIONS_FILE = 'data/stations.json'
+
+# Stasjonene som analyseres når konfigurasjonsfilen ikke finnes
+DEFAULT_PARTITIONS = [
+    {'station': 'frost', 'source': 'frost', 'path': 'data/clean/cleaned_data_frost.db'},
+    {'station': 'nilu', 'source': 'nilu', 'path': 'data/clean/cleaned_data_nilu.json'}
+]
+
+def read_partitions(config_file: str = STATIONS_FILE) -> list:
+    """
+    Leser listen over stasjoner fra en JSON-fil, eller bruker standardlisten hvis filen ikke finnes.
+
+    Hver stasjon er en ordbok med 'station' (navn), 'source' ('frost' eller
+    'nilu'), 'path' (filsti til de rensede dataene) og eventuelt 'columns'.
+    Stasjoner med 'latitude' og 'longitude' tas med i interpolasjonen til rutenett.
+
+    Parametre:
+        config_file (str): Filsti til konfigurasjonsfilen
+    Returnerer:
+        list: Stasjonene som skal analyseres
+    Kaster:
+        ValueError: Hvis en stasjon mangler felter, har ukjent kilde, halve koordinater eller navnet er brukt før
+    """
+    if not os.path.exists(config_file):
+        return [dict(partition) for partition in DEFAULT_PARTITIONS]
+    with open(config_file, 'r') as file:
+        partitions = json.load(file)
+
+    names = set()
+    for partition in partitions:
+        missing = {'station', 'source', 'path'} - set(partition)
+        if missing:
+            raise ValueError(f"Stasjonen {partition} mangler feltene {sorted(missing)}")
+        if partition['source'] not in SOURCES:
+            raise ValueError(f"Ukjent kilde '{partition['source']}', bruk en av {list(SOURCES)}")
+        if partition['station'] in names:
+            raise ValueError(f"Stasjonen '{partition['station']}' er oppgitt flere ganger")
+        if ('latitude' in partition) != ('longitude' in partition):
+            raise ValueError(f"Stasjonen '{partition['station']}' må ha både 'latitude' og 'longitude'")
+        names.add(partition['station'])
+    return partitions
+
+def load_partition(partition: dict) -> pd.DataFrame:
+    """
+    Leser de rensede dataene for én stasjon og legger til stasjonsnavnet.
+
+    Parametre:
+        partition (dict): Stasjonen, se read_partitions
+    Returnerer:
+        pd.DataFrame: Kolonnene station, date, year, season og variablene
+    """
+    source = SOURCES[partition['source']]
+    columns = list(partition.get('columns', source['columns']))
+    df = source['loader'](partition['path'], columns=columns)
+    df = df[[source['date_column'], 'year', 'season'] + columns].rename(columns={source['date_column']: 'date'})
+    df.insert(0, 'station', partition['station'])
+    return df
+
+def load_partitions(partitions: list, max_workers: int = 1) -> pd.DataFrame:
+    """
+    Leser alle stasjonene og slår dem sammen til én DataFrame i langt format.
+
+    Stasjoner med ulike variabler får NaN for variablene de ikke har.
+
+    Parametre:
+        partitions (list): Stasjonene, se read_partitions
+        max_workers (int): Antall prosesser; 1 leser alt i denne prosessen, None bruker alle CPU-er
+    Returnerer:
+        pd.DataFrame: Én rad per stasjon og dag
+    """
+    if max_workers == 1 or len(partitions) == 1:
+        frames = [load_partition(partition) for partition in partitions]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(load_partition, partitions))
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+def _to_long(stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gjør om statistikk med kolonnene (variabel, statistikk) til én rad per variabel, uten tomme grupper.
+    """
+    long = stats.stack(level=0, future_stack=True)
+    long.index = long.index.set_names('variable', level=-1)
+    return long[long['count'] > 0]
+
+def station_statistics(df: pd.DataFrame, columns: list) -> tuple:
+    """
+    Beregner statistikk per stasjon, år og årstid for alle stasjoner i én vektorisert gjennomgang.
+
+    Statistikken per stasjon og år avledes fra delresultatene (se statistics_engine).
+
+    Parametre:
+        df (pd.DataFrame): Data for alle stasjoner fra load_partitions
+        columns (list): Variablene som skal analyseres
+    Returnerer:
+        tuple: (statistikk per stasjon, år, årstid og variabel, statistikk per stasjon, år og variabel)
+    """
+    year_season, year = multi_level_statistics(df, columns, ['station', 'year', 'season'], ['station', 'year'])
+    return _to_long(year_season), _to_long(year)
+
+def station_correlations(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Beregner korrelasjonsmatrisen for hver stasjon, med variablene stasjonen har målinger for.
+
+    Parametre:
+        df (pd.DataFrame): Data for alle stasjoner fra load_partitions
+        columns (list): Variablene som skal analyseres
+    Returnerer:
+        pd.DataFrame: Én rad per (station, x, y) med korrelasjon og antall felles målinger
+    """
+    frames = []
+    for station, rows in df.groupby('station', sort=False).indices.items():
+        values = df[columns].to_numpy(dtype=float)[rows]
+        present = [j for j in range(len(columns)) if not np.isnan(values[:, j]).all()]
+        corr, counts = pairwise_correlation(values[:, present])
+        names = [columns[j] for j in present]
+        index = pd.MultiIndex.from_product([[station], names, names], names=['station', 'x', 'y'])
+        frames.append(pd.DataFrame({'correlation': corr.ravel(), 'n': counts.ravel()}, index=index))
+    return pd.concat(frames)
+
+def station_coordinates(partitions: list) -> dict:
+    """
+    Henter koordinatene til stasjonene som har dem.
+
+    Parametre:
+        partitions (list): Stasjonene, se read_partitions
+    Returnerer:
+        dict: Stasjonsnavn -> (breddegrad, lengdegrad)
+    """
+    return {partition['station']: (float(partition['latitude']), float(partition['longitude']))
+            for partition in partitions if 'latitude' in partition}
+
+def save_grids(grids: dict, output_dir: str):
+    """
+    Lagrer de interpolerte feltene som én .npz-fil per variabel i undermappen 'grids'.
+
+    Parametre:
+        grids (dict): Resultatet fra interpolate_stations
+        output_dir (str): Katalog for lagring av resultater
+    """
+    for column, (dates, grid_lats, grid_lons, fields, stations) in grids.items():
+        save_grid(os.path.join(output_dir, 'grids', f'{column}.npz'), dates, grid_lats, grid_lons, fields, stations)
+
+def save_results(stats_ys: pd.DataFrame, stats_y: pd.DataFrame, corr: pd.DataFrame, output_dir: str):
+    """
+    Lagrer de samlede resultatene for alle stasjoner (se save_analysis_table).
+
+    Parametre:
+        stats_ys (pd.DataFrame): Statistikk per stasjon, år, årstid og variabel
+        stats_y (pd.DataFrame): Statistikk per stasjon, år og variabel
+        corr (pd.DataFrame): Korrelasjoner per stasjon
+        output_dir (str): Katalog for lagring av resultater
+    """
+    save_analysis_table(stats_ys, output_dir, 'stations_aggregated_stats_year_season')
+    save_analysis_table(stats_y, output_dir, 'stations_aggregated_stats_year')
+    save_analysis_table(corr, output_dir, 'stations_correlation')
+
+def main(config_file: str = STATIONS_FILE, max_workers: int = 1):
+    """
+    Hovedfunksjon som analyserer alle stasjonene i én kjøring:
+    - Leser stasjonslisten og dataene for alle stasjonene
+    - Beregner statistikk og korrelasjoner med stasjon som nøkkel
+    - Skriver ut og lagrer de samlede tabellene
+    - Interpolerer variabler med minst to stasjoner med koordinater til et rutenett
+    """
+    OUTPUT_DIR = 'data/analyses_results'  # Katalog for lagring av resultater
+    try:
+        partitions = read_partitions(config_file)
+        df = load_partitions(partitions, max_workers)
+    except Exception as e:
+        print(f"Feil ved lasting av stasjonene: {e}")
+        return
+
+    columns = list(dict.fromkeys(column for column in df.columns
+                                 if column not in ('station', 'date', 'year', 'season')))
+    year_season_stats, year_stats = station_statistics(df, columns)
+    correlations = station_correlations(df, columns)
+    print(f"\nGjennomsnitt per stasjon og år ({len(partitions)} stasjoner):")
+    print(year_stats['mean'].unstack('variable'))
+    save_results(year_season_stats, year_stats, correlations, OUTPUT_DIR)
+
+    grids = interpolate_stations(df, station_coordinates(partitions), columns)
+    if grids:
+        save_grids(grids, OUTPUT_DIR)
+        print(f"\nInterpolerte {len(grids)} variabler til rutenett: {', '.join(grids)}")
+    else:
+        print("\nIngen variabler har minst to stasjoner med koordinater, hopper over interpolasjon til rutenett")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
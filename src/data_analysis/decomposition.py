@@ -0,0 +1,362 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from statsmodels.tsa.seasonal import STL
+from data_access import calendar_arrays
+from data_analysis.exceedances import station_axes
+
+# Perioden i dager for årssyklusen
+PERIOD = 365
+
+# Bredden i år på glattingen av hver dag-i-året-delserie (seasonal i STL, oddetall)
+SEASONAL_YEARS = 7
+
+# Bredden i dager på glattingen av sesongkomponenten mellom nabodager i året
+SEASONAL_DAYS = 31
+
+# Antall runder der hull og imputerte dager fylles med tilpasningen og STL kjøres på nytt
+FILL_ITERATIONS = 2
+
+# Robuste vekter gjør at enkeltstående ekstremverdier påvirker mindre
+ROBUST = True
+
+# Komponentene som lagres for hver serie
+COMPONENTS = ('observed', 'trend', 'seasonal', 'residual')
+
+# Øk denne hvis formatet endres, slik at gamle dekomposisjoner beregnes på nytt
+DECOMPOSITION_VERSION = 3
+
+def _fill_gaps(series: np.ndarray, mask: np.ndarray, day_of_year: np.ndarray) -> np.ndarray:
+    """
+    Fyller dagene som ikke brukes i tilpasningen med gjennomsnittet for dagen i året.
+
+    Avviket fra gjennomsnittet interpoleres lineært mellom nabodagene, slik at
+    nivået følger målingene rundt hullet uten å bli en rett linje gjennom sesongen.
+    """
+    counts = np.bincount(day_of_year[mask], minlength=367)
+    sums = np.bincount(day_of_year[mask], weights=series[mask], minlength=367)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        baseline = np.where(counts > 0, sums / counts, np.nan)[day_of_year]
+    baseline = np.where(np.isnan(baseline), np.mean(series[mask]), baseline)
+    days = np.arange(len(series))
+    anomaly = np.interp(days, days[mask], series[mask] - baseline[mask])
+    return np.where(mask, series, baseline + anomaly)
+
+def _smooth_days(seasonal: np.ndarray, width: int) -> np.ndarray:
+    """
+    Glidende gjennomsnitt over 'width' nabodager, med speiling ved kantene.
+    """
+    half = width // 2
+    padded = np.pad(seasonal, (half, half), mode='reflect')
+    return np.convolve(padded, np.ones(2 * half + 1) / (2 * half + 1), mode='valid')
+
+def _decompose_block(values: np.ndarray, dates: np.ndarray, fit_mask: np.ndarray, period: int,
+                     seasonal_years: int, seasonal_days: int, trend_window: int, robust: bool,
+                     fill_iterations: int) -> tuple:
+    """
+    Dekomponerer hver serie med STL fra statsmodels.
+
+    STL krever en sammenhengende serie uten hull. Dagene som ikke brukes i
+    tilpasningen (manglende og imputerte) fylles først med gjennomsnittet for
+    dagen i året, og deretter med tilpasningen selv (trend + sesong) i
+    'fill_iterations' runder, slik at de til slutt har rest 0 og ikke trekker
+    komponentene mot fyllverdiene. STL glatter sesongen bare over år, så den
+    glattes til slutt også over nabodager. Som i R sin stl beregnes hver
+    glatting bare for hvert tiende punkt av vindusbredden.
+
+    Parametre:
+        values (np.ndarray): Verdier med form (serier, dager), NaN der målinger mangler
+        dates (np.ndarray): Datoene som datetime64[D]
+        fit_mask (np.ndarray): True for verdiene som brukes i tilpasningen
+    Returnerer:
+        tuple: (trend, sesong) med samme form som values
+    """
+    trend = np.full(values.shape, np.nan)
+    seasonal = np.full(values.shape, np.nan)
+    day_of_year = calendar_arrays(dates)['day_of_year']
+    settings = {'period': period, 'seasonal': seasonal_years, 'trend': trend_window, 'robust': robust}
+    windows = STL(np.zeros(2 * period), **settings).config
+    jumps = {f'{name}_jump': int(np.ceil(windows[name] / 10)) for name in ('seasonal', 'trend', 'low_pass')}
+    for index, (series, mask) in enumerate(zip(values, fit_mask)):
+        if not mask.any():
+            continue
+        filled = _fill_gaps(series, mask, day_of_year)
+        for _ in range(fill_iterations + 1):
+            result = STL(filled, **settings, **jumps).fit()
+            filled = np.where(mask, series, result.trend + result.seasonal)
+        trend[index] = result.trend
+        seasonal[index] = _smooth_days(result.seasonal, seasonal_days) if seasonal_days > 1 else result.seasonal
+    return trend, seasonal
+
+def _decompose_chunk(args: tuple) -> tuple:
+    """
+    Kjører _decompose_block for en del av seriene (brukes av prosessene).
+    """
+    values, dates, fit_mask, kwargs = args
+    return _decompose_block(values, dates, fit_mask, **kwargs)
+
+class Decomposition:
+    """
+    Trend, sesong og rest for alle (stasjon, variabel)-serier på en felles dagakse.
+
+    Komponentene lagres som arrays med form (stasjoner, dager, variabler), slik
+    at mange serier kan slås opp og lagres samlet.
+    """
+
+    def __init__(self, stations, columns, dates, components, fingerprint, params):
+        """
+        Args:
+            stations (list): Stasjonsnavnene.
+            columns (list): Variablene.
+            dates (np.ndarray): Datoene som datetime64[D].
+            components (dict): Arrays for observed, trend, seasonal og residual.
+            fingerprint (str): Fingeravtrykk av dataene dekomposisjonen er beregnet fra.
+            params (dict): Parametrene fra decomposition_params.
+        """
+        self.stations = list(stations)
+        self.columns = list(columns)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.components = components
+        self.fingerprint = fingerprint
+        self.params = params
+
+    def component(self, name: str, column: str, station: str = None) -> pd.Series:
+        """
+        Henter én komponent for én serie.
+
+        Parametre:
+            name (str): 'observed', 'trend', 'seasonal' eller 'residual'
+            column (str): Variabelen
+            station (str): Stasjonen (valgfri når det bare er én)
+        Returnerer:
+            pd.Series: Komponenten med datoene som indeks
+        """
+        station_index = 0 if station is None else self.stations.index(station)
+        values = self.components[name][station_index, :, self.columns.index(column)]
+        return pd.Series(values, index=pd.DatetimeIndex(self.dates), name=name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Gjør om komponentene til én rad per (stasjon, variabel, dag) med dager som har målinger.
+
+        Returnerer:
+            pd.DataFrame: Kolonnene station, variable, date og komponentene
+        """
+        n_stations, n_days, n_columns = self.components['observed'].shape
+        frame = pd.DataFrame({
+            'station': np.repeat(np.asarray(self.stations, dtype=object), n_days * n_columns),
+            'variable': np.tile(np.repeat(np.asarray(self.columns, dtype=object), n_days), n_stations),
+            'date': np.tile(np.tile(self.dates, n_columns), n_stations).astype('datetime64[ns]'),
+            **{name: self.components[name].transpose(0, 2, 1).ravel() for name in COMPONENTS}
+        })
+        return frame[frame['observed'].notna()].reset_index(drop=True)
+
+    def save(self, path: str):
+        """
+        Lagrer dekomposisjonen atomisk til en .npz-fil, med metadata i samme fil.
+
+        Parametre:
+            path (str): Filsti som skal skrives
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        meta = {'version': DECOMPOSITION_VERSION, 'stations': self.stations, 'columns': self.columns,
+                'fingerprint': self.fingerprint, 'params': self.params}
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), dates=self.dates.astype(np.int64), **self.components)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Leser en dekomposisjon fra en .npz-fil.
+
+        Parametre:
+            path (str): Filsti til dekomposisjonen
+        Returnerer:
+            Decomposition: Den innleste dekomposisjonen
+        Kaster:
+            FileNotFoundError: Hvis filen ikke finnes
+            ValueError: Hvis filen har en annen versjon enn forventet
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != DECOMPOSITION_VERSION:
+                raise ValueError(f"Ukjent dekomposisjons-versjon i '{path}': {meta.get('version')}")
+            components = {name: data[name] for name in COMPONENTS}
+            dates = data['dates'].astype('datetime64[D]')
+        return cls(meta['stations'], meta['columns'], dates, components, meta['fingerprint'], meta['params'])
+
+def decomposition_params(period: int = PERIOD, seasonal_years: int = SEASONAL_YEARS,
+                         seasonal_days: int = SEASONAL_DAYS, trend_window: int = None, robust: bool = ROBUST,
+                         fill_iterations: int = FILL_ITERATIONS) -> dict:
+    """
+    Samler parametrene for en dekomposisjon i en ordbok som kan lagres og sammenlignes.
+
+    Parametre:
+        period (int): Perioden i dager
+        seasonal_years (int): Bredden på glattingen av dag-i-året-delseriene (oddetall)
+        seasonal_days (int): Bredden i dager på glattingen av sesongen mellom nabodager (1 slår den av)
+        trend_window (int): Bredden på trendglattingen i dager (None gir standardbredden i STL)
+        robust (bool): Bruk robuste vekter
+        fill_iterations (int): Antall runder der hullene fylles med tilpasningen
+    Returnerer:
+        dict: Perioden, bredder på glattingene, om vektene er robuste og antall fyllrunder
+    """
+    return {'period': int(period), 'seasonal_years': int(seasonal_years), 'seasonal_days': int(seasonal_days),
+            'trend_window': None if trend_window is None else int(trend_window), 'robust': bool(robust),
+            'fill_iterations': int(fill_iterations)}
+
+def _prepare(df: pd.DataFrame, date_column: str, columns: list, station_column: str, station: str,
+             exclude_generated: bool) -> tuple:
+    """
+    Legger seriene på en felles dagakse og finner verdiene som brukes i tilpasningen, med fingeravtrykk.
+    """
+    flags = [f'generated_{column}' for column in columns]
+    use_flags = exclude_generated and all(flag in df.columns for flag in flags)
+    stations, dates, values = station_axes(df, date_column, columns + (flags if use_flags else []),
+                                           station_column, station)
+    if use_flags:
+        values, generated = values[..., :len(columns)], values[..., len(columns):] == 1
+    else:
+        generated = np.zeros(values.shape, dtype=bool)
+    fit_mask = ~np.isnan(values) & ~generated
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps([list(map(str, stations)), columns]).encode())
+    digest.update(dates.astype(np.int64).tobytes())
+    # -0.0 gjøres om til 0.0, siden SQLite lagrer begge som 0
+    digest.update(np.ascontiguousarray(values + 0.0).tobytes())
+    digest.update(np.ascontiguousarray(fit_mask).tobytes())
+    return stations, dates, values, fit_mask, digest.hexdigest()
+
+def decompose(df: pd.DataFrame, date_column: str, columns: list, station_column: str = None,
+              station: str = 'station', exclude_generated: bool = True, max_workers: int = 1,
+              **kwargs) -> Decomposition:
+    """
+    Deler hver daglige serie (stasjon, variabel) i trend, sesong og rest med STL fra statsmodels.
+
+    Alle serier legges på en felles dagakse. Manglende og imputerte verdier
+    brukes ikke i tilpasningen og får ingen rest, men trend og sesong
+    beregnes for alle dager.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata i langt format, én rad per stasjon og dag
+        date_column (str): Navnet på datokolonnen
+        columns (list): Variablene som skal dekomponeres
+        station_column (str): Kolonnen med stasjonsnavn (valgfri; ellers én stasjon)
+        station (str): Navnet på stasjonen når station_column ikke er oppgitt
+        exclude_generated (bool): Gi verdier med 'generated_<kolonne>' = True vekt 0
+        max_workers (int): Antall prosesser seriene fordeles på; 1 kjører alt i denne prosessen
+        **kwargs: Sendes til decomposition_params (period, seasonal_years, seasonal_days, ...)
+    Returnerer:
+        Decomposition: Komponentene for alle serier
+    """
+    columns = list(columns)
+    params = decomposition_params(**kwargs)
+    stations, dates, values, fit_mask, fingerprint = _prepare(df, date_column, columns, station_column,
+                                                              station, exclude_generated)
+    n_stations, n_days, n_columns = values.shape
+    series = values.transpose(0, 2, 1).reshape(-1, n_days)
+    series_mask = fit_mask.transpose(0, 2, 1).reshape(-1, n_days)
+
+    if max_workers == 1 or len(series) == 1:
+        trend, seasonal = _decompose_block(series, dates, series_mask, **params)
+    else:
+        chunks = np.array_split(np.arange(len(series)), min(len(series), max_workers or os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_decompose_chunk, [(series[chunk], dates, series_mask[chunk], params)
+                                                           for chunk in chunks]))
+        trend = np.concatenate([result[0] for result in results])
+        seasonal = np.concatenate([result[1] for result in results])
+
+    def reshape(array):
+        return array.reshape(n_stations, n_columns, n_days).transpose(0, 2, 1)
+
+    components = {'observed': values, 'trend': reshape(trend), 'seasonal': reshape(seasonal)}
+    # Hull og imputerte dager er ikke målinger, og har ingen rest
+    components['residual'] = np.where(fit_mask, values - components['trend'] - components['seasonal'], np.nan)
+    return Decomposition(stations, columns, dates, components, fingerprint, params)
+
+def get_decomposition_path(name: str, results_dir: str = 'data/analyses_results') -> str:
+    """
+    Returnerer filstien til den lagrede dekomposisjonen for et datasett.
+
+    Parametre:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'
+        results_dir (str): Katalogen med analyseresultater
+    Returnerer:
+        str: Filsti til .npz-filen
+    """
+    return os.path.join(results_dir, 'decomposition', f'{name}.npz')
+
+def get_decomposition(name: str, df: pd.DataFrame = None, date_column: str = None, columns: list = None,
+                      results_dir: str = 'data/analyses_results', exclude_generated: bool = True,
+                      **kwargs) -> Decomposition:
+    """
+    Henter den lagrede dekomposisjonen, og beregner den på nytt bare hvis dataene eller parametrene er endret.
+
+    Parametre:
+        name (str): Navn på datasettet, f.eks. 'frost' eller 'nilu'
+        df (pd.DataFrame): Dagdata (valgfri; uten df leses den lagrede dekomposisjonen direkte)
+        date_column (str): Navnet på datokolonnen i df
+        columns (list): Variablene i df
+        results_dir (str): Katalogen med analyseresultater
+        exclude_generated (bool): Gi imputerte verdier vekt 0
+        **kwargs: Sendes videre til decompose (station_column, station, max_workers, period, ...)
+    Returnerer:
+        Decomposition: Dekomposisjonen
+    Kaster:
+        FileNotFoundError: Hvis df ikke er oppgitt og dekomposisjonen ikke er lagret
+    """
+    path = get_decomposition_path(name, results_dir)
+    if df is None:
+        return Decomposition.load(path)
+
+    param_names = ('period', 'seasonal_years', 'seasonal_days', 'trend_window', 'robust', 'fill_iterations')
+    params = decomposition_params(**{key: value for key, value in kwargs.items() if key in param_names})
+    if os.path.exists(path):
+        try:
+            cached = Decomposition.load(path)
+            *_, fingerprint = _prepare(df, date_column, list(columns), kwargs.get('station_column'),
+                                       kwargs.get('station', 'station'), exclude_generated)
+            if cached.fingerprint == fingerprint and cached.params == params:
+                return cached
+        except (ValueError, KeyError, OSError):
+            # En ødelagt eller utdatert fil beregnes på nytt
+            pass
+
+    decomposition = decompose(df, date_column, columns, exclude_generated=exclude_generated, **kwargs)
+    decomposition.save(path)
+    return decomposition
+
+def seasonal_summary(decomposition: Decomposition) -> pd.DataFrame:
+    """
+    Oppsummerer hver serie: sesongamplitude, endring i trend og andelen varians forklart av trend og sesong.
+
+    Parametre:
+        decomposition (Decomposition): Resultatet fra decompose
+    Returnerer:
+        pd.DataFrame: Indeks (station, variable) og kolonnene seasonal_amplitude, trend_change,
+                      trend_strength og seasonal_strength
+    """
+    observed = decomposition.components['observed']
+    trend, seasonal = decomposition.components['trend'], decomposition.components['seasonal']
+    residual = decomposition.components['residual']
+    valid = ~np.isnan(observed)
+
+    def variance(array):
+        return np.nanvar(np.where(valid, array, np.nan), axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trend_strength = np.maximum(0, 1 - variance(residual) / variance(residual + trend))
+        seasonal_strength = np.maximum(0, 1 - variance(residual) / variance(residual + seasonal))
+    index = pd.MultiIndex.from_product([decomposition.stations, decomposition.columns], names=['station', 'variable'])
+    return pd.DataFrame({
+        'seasonal_amplitude': (np.nanmax(seasonal, axis=1) - np.nanmin(seasonal, axis=1)).ravel(),
+        'trend_change': (trend[:, -1] - trend[:, 0]).ravel(),
+        'trend_strength': trend_strength.ravel(),
+        'seasonal_strength': seasonal_strength.ravel()
+    }, index=index)
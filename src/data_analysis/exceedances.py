@@ -0,0 +1,265 @@
+import pandas as pd
+import numpy as np
+from data_access import calendar_arrays, season_codes, SEASON_LABELS, save_analysis_table
+from data_analysis.rolling_stats import rolling_window_statistics, MIN_COVERAGE
+
+# Midlingsperioder i timer. Døgndata gir vinduer på hele døgn (24h = selve døgnverdien).
+AVERAGING_PERIODS = {'24h': 24, '3d': 3 * 24, '7d': 7 * 24, 'annual': 365 * 24}
+
+# Terskler for luftkvalitet, per komponent og midlingsperiode (µg/m³).
+# PM10 bruker grenseverdien for døgnmiddel; NO2 og PM2.5 bruker WHOs
+# retningslinjer for døgnmiddel (2021). Årsmiddel følger de norske grenseverdiene.
+POLLUTANT_THRESHOLDS = [
+    {'name': 'NO2_24h', 'column': 'NO2', 'averaging': '24h', 'threshold': 25.0, 'direction': 'above', 'min_duration': 1},
+    {'name': 'PM10_24h', 'column': 'PM10', 'averaging': '24h', 'threshold': 50.0, 'direction': 'above', 'min_duration': 1},
+    {'name': 'PM2.5_24h', 'column': 'PM2.5', 'averaging': '24h', 'threshold': 15.0, 'direction': 'above', 'min_duration': 1},
+    {'name': 'NO2_annual', 'column': 'NO2', 'averaging': 'annual', 'threshold': 40.0, 'direction': 'above', 'min_duration': 1},
+    {'name': 'PM10_annual', 'column': 'PM10', 'averaging': 'annual', 'threshold': 20.0, 'direction': 'above', 'min_duration': 1},
+    {'name': 'PM2.5_annual', 'column': 'PM2.5', 'averaging': 'annual', 'threshold': 10.0, 'direction': 'above', 'min_duration': 1}
+]
+
+# Værepisoder: kuldeperioder (døgnmiddel under -10 °C i minst tre dager) og
+# perioder med kraftig nedbør (minst 10 mm per døgn, som ETCCDI-indeksen R10mm)
+WEATHER_THRESHOLDS = [
+    {'name': 'cold_snap', 'column': 'mean_air_temperature', 'averaging': '24h', 'threshold': -10.0,
+     'direction': 'below', 'min_duration': 3},
+    {'name': 'heavy_precipitation', 'column': 'total_precipitation', 'averaging': '24h', 'threshold': 10.0,
+     'direction': 'at_least', 'min_duration': 1}
+]
+
+# Sammenligningen som gir overskridelse for hver retning
+_COMPARISONS = {
+    'above': np.greater,
+    'at_least': np.greater_equal,
+    'below': np.less,
+    'at_most': np.less_equal
+}
+
+def station_axes(df: pd.DataFrame, date_column: str, columns: list, station_column: str = None,
+                 station: str = 'station') -> tuple:
+    """
+    Legger alle stasjoner på en felles, sammenhengende dagakse i én operasjon.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata i langt format, én rad per stasjon og dag
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonner som skal tas med
+        station_column (str): Kolonnen med stasjonsnavn (valgfri; ellers én stasjon)
+        station (str): Navnet på stasjonen når station_column ikke er oppgitt
+    Returnerer:
+        tuple: (stasjonsnavn, datoer som datetime64[D], verdier med form (stasjoner, dager, kolonner))
+    Kaster:
+        ValueError: Hvis DataFrame er tom
+    """
+    if df.empty:
+        raise ValueError("Kan ikke finne overskridelser i en tom DataFrame")
+    if station_column is None:
+        station_codes, stations = np.zeros(len(df), dtype=np.intp), [station]
+    else:
+        station_codes, stations = pd.factorize(df[station_column], sort=True)
+        stations = list(stations)
+
+    days = pd.to_datetime(df[date_column]).to_numpy().astype('datetime64[D]').astype(np.int64)
+    start = int(days.min())
+    dates = np.arange(start, int(days.max()) + 1).astype('datetime64[D]')
+    values = np.full((len(stations), len(dates), len(columns)), np.nan)
+    values[station_codes, days - start] = df[columns].to_numpy(dtype=float)
+    return stations, dates, values
+
+def averaged_values(values: np.ndarray, rules: list, columns: list, min_coverage: float = MIN_COVERAGE) -> np.ndarray:
+    """
+    Beregner løpende middel for hver regel, for alle stasjoner samtidig.
+
+    Parametre:
+        values (np.ndarray): Døgnverdier med form (stasjoner, dager, kolonner)
+        rules (list): Terskelreglene
+        columns (list): Kolonnenavnene i values
+        min_coverage (float): Andelen av perioden som må ha målinger
+    Returnerer:
+        np.ndarray: Midlede verdier med form (stasjoner, dager, regler)
+    """
+    n_stations, n_days, n_columns = values.shape
+    # Tidsaksen først, stasjoner og kolonner side om side
+    flat = values.transpose(1, 0, 2).reshape(n_days, n_stations * n_columns)
+    means = {}
+    for period in {rule['averaging'] for rule in rules}:
+        if period not in AVERAGING_PERIODS:
+            raise ValueError(f"Ukjent midlingsperiode '{period}', bruk en av {list(AVERAGING_PERIODS)}")
+        window = max(AVERAGING_PERIODS[period] // 24, 1)
+        if window == 1:
+            # Døgnverdien brukes direkte, slik at verdier lik terskelen ikke påvirkes av avrunding
+            mean = flat
+        else:
+            mean = rolling_window_statistics(flat, window, int(np.ceil(min_coverage * window)))['mean']
+        means[period] = mean.reshape(n_days, n_stations, n_columns).transpose(1, 0, 2)
+
+    averaged = np.empty((n_stations, n_days, len(rules)))
+    for r, rule in enumerate(rules):
+        averaged[:, :, r] = means[rule['averaging']][:, :, columns.index(rule['column'])]
+    return averaged
+
+def exceedance_flags(averaged: np.ndarray, rules: list) -> np.ndarray:
+    """
+    Markerer dagene der den midlede verdien overskrider terskelen. Manglende verdier gir False.
+
+    Parametre:
+        averaged (np.ndarray): Midlede verdier med form (stasjoner, dager, regler)
+        rules (list): Terskelreglene
+    Returnerer:
+        np.ndarray: Bool-array med samme form
+    """
+    flags = np.zeros(averaged.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for r, rule in enumerate(rules):
+            if rule['direction'] not in _COMPARISONS:
+                raise ValueError(f"Ukjent retning '{rule['direction']}', bruk en av {list(_COMPARISONS)}")
+            flags[:, :, r] = _COMPARISONS[rule['direction']](averaged[:, :, r], rule['threshold'])
+    return flags
+
+def find_episodes(flags: np.ndarray, averaged: np.ndarray, dates: np.ndarray, stations: list,
+                  rules: list) -> pd.DataFrame:
+    """
+    Finner sammenhengende episoder med overskridelse med vektorisert run-length-koding.
+
+    Alle serier (stasjon, regel) legges etter hverandre med en False-dag
+    mellom hver, slik at ett differanse-kall gir start og slutt på alle
+    episoder uten at de kan gå over fra én serie til den neste.
+
+    Parametre:
+        flags (np.ndarray): Overskridelser med form (stasjoner, dager, regler)
+        averaged (np.ndarray): Midlede verdier med samme form
+        dates (np.ndarray): Datoene på dagaksen
+        stations (list): Stasjonsnavn
+        rules (list): Terskelreglene
+    Returnerer:
+        pd.DataFrame: Én rad per episode med stasjon, regel, start, slutt, varighet, ekstremverdi og middel
+    """
+    n_stations, n_days, n_rules = flags.shape
+    series = flags.transpose(0, 2, 1).reshape(-1, n_days)
+    padded = np.zeros((len(series), n_days + 2), dtype=np.int8)
+    padded[:, 1:-1] = series
+    edges = np.diff(padded.ravel())
+    starts = np.flatnonzero(edges == 1) + 1
+    ends = np.flatnonzero(edges == -1) + 1
+
+    row, first = np.divmod(starts, n_days + 2)
+    duration = ends - starts
+    first = first - 1
+    last = first + duration - 1
+    station_index, rule_index = np.divmod(row, n_rules)
+
+    min_duration = np.array([rule.get('min_duration', 1) for rule in rules])
+    keep = duration >= min_duration[rule_index]
+
+    # Ekstremverdi og middel over hver episode med reduceat på de samme posisjonene
+    padded_values = np.zeros((len(series), n_days + 2))
+    padded_values[:, 1:-1] = np.nan_to_num(averaged.transpose(0, 2, 1).reshape(-1, n_days))
+    flat_values = padded_values.ravel()
+    bounds = np.column_stack([starts, ends]).ravel()
+    if len(bounds):
+        maximum = np.maximum.reduceat(flat_values, bounds)[::2]
+        minimum = np.minimum.reduceat(flat_values, bounds)[::2]
+        total = np.add.reduceat(flat_values, bounds)[::2]
+    else:
+        maximum = minimum = total = np.zeros(0)
+    below = np.array([rule['direction'] in ('below', 'at_most') for rule in rules])
+    peak = np.where(below[rule_index], minimum, maximum)
+
+    rule_names = np.array([rule['name'] for rule in rules], dtype=object)
+    episodes = pd.DataFrame({
+        'station': np.array(stations, dtype=object)[station_index],
+        'rule': rule_names[rule_index],
+        'start': dates[first].astype('datetime64[ns]'),
+        'end': dates[last].astype('datetime64[ns]'),
+        'duration_days': duration,
+        'peak': peak,
+        'mean': total / np.maximum(duration, 1)
+    })
+    return episodes[keep].reset_index(drop=True)
+
+def count_exceedances(flags: np.ndarray, averaged: np.ndarray, dates: np.ndarray, stations: list,
+                      rules: list, episodes: pd.DataFrame, by_season: bool = True) -> pd.DataFrame:
+    """
+    Teller overskridelsesdager, gyldige dager og episoder per stasjon, regel, år og (valgfritt) årstid.
+
+    Parametre:
+        flags (np.ndarray): Overskridelser med form (stasjoner, dager, regler)
+        averaged (np.ndarray): Midlede verdier med samme form
+        dates (np.ndarray): Datoene på dagaksen
+        stations (list): Stasjonsnavn
+        rules (list): Terskelreglene
+        episodes (pd.DataFrame): Episoder fra find_episodes
+        by_season (bool): Tell per år og årstid i stedet for bare per år
+    Returnerer:
+        pd.DataFrame: Kolonnene 'exceedance_days', 'valid_days', 'episodes' og 'longest_episode'
+    """
+    n_stations, n_days, n_rules = flags.shape
+    parts = calendar_arrays(dates)
+    years = np.unique(parts['year'])
+    year_index = np.searchsorted(years, parts['year'])
+    n_seasons = len(SEASON_LABELS) if by_season else 1
+    period_index = year_index * n_seasons + (season_codes(parts['month']) if by_season else 0)
+
+    # Én felles gruppe-ID per (stasjon, regel, år, årstid) og én bincount per størrelse
+    group = ((np.arange(n_stations)[:, None, None] * n_rules + np.arange(n_rules)[None, None, :]) * len(years)
+             * n_seasons + period_index[None, :, None])
+    size = n_stations * n_rules * len(years) * n_seasons
+    exceeded = np.bincount(group.ravel(), weights=flags.ravel(), minlength=size)
+    valid = np.bincount(group.ravel(), weights=(~np.isnan(averaged)).ravel(), minlength=size)
+
+    levels = [stations, [rule['name'] for rule in rules], years]
+    names = ['station', 'rule', 'year']
+    if by_season:
+        levels.append(SEASON_LABELS)
+        names.append('season')
+    index = pd.MultiIndex.from_product(levels, names=names)
+    counts = pd.DataFrame({'exceedance_days': exceeded.astype(np.int64), 'valid_days': valid.astype(np.int64)},
+                          index=index)
+
+    # Episodene telles i perioden der de starter
+    keys = episodes[['station', 'rule']].copy()
+    keys['year'] = episodes['start'].dt.year
+    if by_season:
+        keys['season'] = np.array(SEASON_LABELS, dtype=object)[season_codes(episodes['start'].dt.month)]
+    per_period = episodes['duration_days'].groupby([keys[name] for name in names]).agg(['size', 'max'])
+    counts['episodes'] = per_period['size'].reindex(index, fill_value=0).to_numpy()
+    counts['longest_episode'] = per_period['max'].reindex(index, fill_value=0).to_numpy()
+    return counts[counts['valid_days'] > 0]
+
+def analyse_exceedances(df: pd.DataFrame, date_column: str, rules: list, station_column: str = None,
+                        station: str = 'station', min_coverage: float = MIN_COVERAGE) -> tuple:
+    """
+    Finner overskridelser og episoder for alle stasjoner og regler i én samlet gjennomgang.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata, i langt format hvis flere stasjoner
+        date_column (str): Navnet på datokolonnen
+        rules (list): Terskelregler, f.eks. POLLUTANT_THRESHOLDS eller WEATHER_THRESHOLDS
+        station_column (str): Kolonnen med stasjonsnavn (valgfri)
+        station (str): Navnet på stasjonen når station_column ikke er oppgitt
+        min_coverage (float): Andelen av midlingsperioden som må ha målinger
+    Returnerer:
+        tuple: (antall per år og årstid, antall per år, episoder)
+    """
+    columns = list(dict.fromkeys(rule['column'] for rule in rules))
+    stations, dates, values = station_axes(df, date_column, columns, station_column, station)
+    averaged = averaged_values(values, rules, columns, min_coverage)
+    flags = exceedance_flags(averaged, rules)
+    episodes = find_episodes(flags, averaged, dates, stations, rules)
+    return (count_exceedances(flags, averaged, dates, stations, rules, episodes, by_season=True),
+            count_exceedances(flags, averaged, dates, stations, rules, episodes, by_season=False),
+            episodes)
+
+def save_exceedances(results: tuple, output_dir: str, prefix: str):
+    """
+    Lagrer overskridelser og episoder ved siden av de andre analyseresultatene (se save_analysis_table).
+
+    Parametre:
+        results (tuple): Resultatet fra analyse_exceedances
+        output_dir (str): Katalog for lagring av resultater
+        prefix (str): Prefiks for filnavnene, f.eks. 'nilu' eller 'frost'
+    """
+    year_season, year, episodes = results
+    save_analysis_table(year_season, output_dir, f'{prefix}_exceedances_year_season')
+    save_analysis_table(year, output_dir, f'{prefix}_exceedances_year')
+    save_analysis_table(episodes, output_dir, f'{prefix}_episodes')
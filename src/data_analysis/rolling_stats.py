@@ -0,0 +1,192 @@
+import pandas as pd
+import numpy as np
+
+# Vindusstørrelser i dager for de glidende statistikkene
+ROLLING_WINDOWS = (7, 30, 90, 365)
+
+# Statistikkene som beregnes per kolonne og vindu, i rekkefølgen de får i resultatet
+ROLLING_STATISTICS = ['mean', 'sum', 'std', 'min', 'max', 'count']
+
+# Andelen av vinduet som må ha målinger for at statistikken skal regnes ut
+MIN_COVERAGE = 0.75
+
+# Løpende middelverdier i luftkvalitetsrapportering, med vinduslengde i timer
+AIR_QUALITY_WINDOWS = {'24h': 24, 'annual': 365 * 24}
+
+# Antall timer per tidssteg for de støttede oppløsningene
+STEP_HOURS = {'D': 24, 'h': 1}
+
+def to_regular_axis(df: pd.DataFrame, date_column: str, columns: list, freq: str = 'D',
+                    exclude_generated: bool = False) -> tuple:
+    """
+    Legger kolonnene på en sammenhengende tidsakse, der manglende tidssteg blir NaN.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonner som skal tas med
+        freq (str): Oppløsning på tidsaksen, 'D' (dag) eller 'h' (time)
+        exclude_generated (bool): Sett verdier med 'generated_<kolonne>' = True til NaN
+    Returnerer:
+        tuple: (tidsakse som datetime64-array, verdier med én rad per tidssteg og én kolonne per variabel)
+    Kaster:
+        ValueError: Hvis DataFrame er tom eller oppløsningen er ukjent
+    """
+    if freq not in STEP_HOURS:
+        raise ValueError(f"Ukjent oppløsning '{freq}', bruk en av {list(STEP_HOURS)}")
+    if df.empty:
+        raise ValueError("Kan ikke lage tidsakse av en tom DataFrame")
+
+    steps = pd.to_datetime(df[date_column]).to_numpy().astype(f'datetime64[{freq}]').astype(np.int64)
+    start = int(steps.min())
+    length = int(steps.max()) - start + 1
+
+    data = df[columns].to_numpy(dtype=float)
+    if exclude_generated:
+        for j, column in enumerate(columns):
+            flag = f'generated_{column}'
+            if flag in df.columns:
+                # Imputerte verdier regnes som manglende
+                data[np.asarray(df[flag], dtype=float) > 0, j] = np.nan
+
+    values = np.full((length, len(columns)), np.nan)
+    values[steps - start] = data
+    axis = np.arange(start, start + length).astype(f'datetime64[{freq}]')
+    return axis, values
+
+def _trailing_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Summerer over etterfølgende vinduer med kumulative summer, uavhengig av vindusstørrelsen.
+
+    Vinduet for rad i er radene i-window+1 til og med i; i starten av serien
+    er vinduet kortere.
+    """
+    cumulative = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    return cumulative[upper] - cumulative[lower]
+
+def rolling_extremes(values: np.ndarray, window: int, func=np.fmin) -> np.ndarray:
+    """
+    Beregner glidende minimum eller maksimum i O(n), uavhengig av vindusstørrelsen.
+
+    Serien deles i blokker på 'window' rader (van Herk/Gil-Werman). Innenfor
+    hver blokk beregnes løpende ekstremverdi fra starten og fra slutten, og
+    hvert vindu dekker høyst to blokker, så svaret er ekstremverdien av én
+    verdi fra hver. NaN ignoreres; vinduer uten verdier gir NaN.
+
+    Parametre:
+        values (np.ndarray): Verdier med én rad per tidssteg og én kolonne per variabel
+        window (int): Vinduslengde i antall tidssteg
+        func (np.ufunc): np.fmin for minimum eller np.fmax for maksimum
+    Returnerer:
+        np.ndarray: Ekstremverdien i vinduet som slutter i hver rad
+    """
+    n = len(values)
+    # NaN foran serien gir korte vinduer i starten, og NaN bak fyller siste blokk
+    padded_length = -(-(n + window - 1) // window) * window
+    padded = np.full((padded_length,) + values.shape[1:], np.nan)
+    padded[window - 1:window - 1 + n] = values
+
+    blocks = padded.reshape((-1, window) + values.shape[1:])
+    prefix = func.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = func.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    return func(suffix[:n], prefix[window - 1:window - 1 + n])
+
+def rolling_window_statistics(values: np.ndarray, window: int, min_periods: int = 1) -> dict:
+    """
+    Beregner glidende gjennomsnitt, sum, standardavvik, min, maks og antall for ett vindu.
+
+    Summer og kvadratsummer hentes fra kumulative summer, og verdiene sentreres
+    rundt kolonnens gjennomsnitt først for å unngå kansellering i variansen.
+
+    Parametre:
+        values (np.ndarray): Verdier med én rad per tidssteg og én kolonne per variabel
+        window (int): Vinduslengde i antall tidssteg
+        min_periods (int): Minste antall verdier i vinduet; færre gir NaN
+    Returnerer:
+        dict: Én array per statistikk i ROLLING_STATISTICS
+    """
+    present = ~np.isnan(values)
+    with np.errstate(all='ignore'):
+        reference = np.nan_to_num(np.nanmean(values, axis=0)) if values.size else 0.0
+    centered = np.where(present, values - reference, 0.0)
+
+    count = _trailing_sums(present.astype(float), window)
+    first = _trailing_sums(centered, window)
+    second = _trailing_sums(centered * centered, window)
+
+    enough = count >= max(min_periods, 1)
+    with np.errstate(all='ignore'):
+        mean = first / count
+        variance = np.maximum(second - first * mean, 0.0) / (count - 1)
+    stats = {
+        'mean': mean + reference,
+        'sum': first + count * reference,
+        'std': np.where(count > 1, np.sqrt(variance), np.nan),
+        'min': rolling_extremes(values, window, np.fmin),
+        'max': rolling_extremes(values, window, np.fmax)
+    }
+    stats = {name: np.where(enough, result, np.nan) for name, result in stats.items()}
+    stats['count'] = count.astype(np.int64)
+    return stats
+
+def rolling_statistics(df: pd.DataFrame, date_column: str, columns: list, windows: tuple = ROLLING_WINDOWS,
+                       freq: str = 'D', exclude_generated: bool = False,
+                       min_coverage: float = MIN_COVERAGE) -> pd.DataFrame:
+    """
+    Beregner glidende statistikk for alle kolonner og vinduer, med én rad per tidssteg.
+
+    Kolonnene i resultatet heter '<kolonne>_<vindu>d_<statistikk>', f.eks. 'NO2_30d_mean'.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonner som skal analyseres
+        windows (tuple): Vinduslengder i dager
+        freq (str): Oppløsningen på dataene, 'D' eller 'h'
+        exclude_generated (bool): Utelat imputerte verdier ('generated_<kolonne>')
+        min_coverage (float): Andelen av vinduet som må ha målinger
+    Returnerer:
+        pd.DataFrame: Glidende statistikk indeksert med dato
+    """
+    axis, values = to_regular_axis(df, date_column, columns, freq, exclude_generated)
+    steps_per_day = 24 // STEP_HOURS[freq]
+
+    result = {}
+    for days in windows:
+        window = days * steps_per_day
+        stats = rolling_window_statistics(values, window, int(np.ceil(min_coverage * window)))
+        for j, column in enumerate(columns):
+            for stat in ROLLING_STATISTICS:
+                result[f'{column}_{days}d_{stat}'] = stats[stat][:, j]
+    return pd.DataFrame(result, index=pd.DatetimeIndex(axis, name=date_column))
+
+def running_means(df: pd.DataFrame, date_column: str, columns: list, freq: str = 'D',
+                  exclude_generated: bool = False, min_coverage: float = MIN_COVERAGE) -> pd.DataFrame:
+    """
+    Beregner løpende 24-timers og årlige middelverdier, som brukes i luftkvalitetsrapportering.
+
+    For døgndata er 24-timersmiddelet selve døgnverdien (med dekningskrav),
+    mens timedata gir et glidende middel over de siste 24 timene.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonner som skal analyseres
+        freq (str): Oppløsningen på dataene, 'D' eller 'h'
+        exclude_generated (bool): Utelat imputerte verdier ('generated_<kolonne>')
+        min_coverage (float): Andelen av vinduet som må ha målinger
+    Returnerer:
+        pd.DataFrame: Kolonnene '<kolonne>_24h_mean' og '<kolonne>_annual_mean' indeksert med dato
+    """
+    axis, values = to_regular_axis(df, date_column, columns, freq, exclude_generated)
+
+    result = {}
+    for name, hours in AIR_QUALITY_WINDOWS.items():
+        window = max(hours // STEP_HOURS[freq], 1)
+        stats = rolling_window_statistics(values, window, int(np.ceil(min_coverage * window)))
+        for j, column in enumerate(columns):
+            result[f'{column}_{name}_mean'] = stats['mean'][:, j]
+    return pd.DataFrame(result, index=pd.DatetimeIndex(axis, name=date_column))
@@ -0,0 +1,243 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+from data_analysis.exceedances import station_axes
+
+# Jordens radius i kilometer
+EARTH_RADIUS_KM = 6371.0
+
+# Eksponenten i inverse avstandsvekter (1 / avstand^p)
+IDW_POWER = 2.0
+
+# Avstanden i rutenettet i kilometer, og margen rundt stasjonene
+GRID_RESOLUTION_KM = 1.0
+GRID_MARGIN_KM = 5.0
+
+# Avstand under denne (km) regnes som samme punkt som stasjonen
+MIN_DISTANCE_KM = 1e-3
+
+def haversine_distances(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Beregner storsirkelavstanden mellom alle par av punkter.
+
+    Parametre:
+        lat1, lon1 (np.ndarray): Koordinater i grader for de første punktene, form (n,)
+        lat2, lon2 (np.ndarray): Koordinater i grader for de andre punktene, form (m,)
+    Returnerer:
+        np.ndarray: Avstander i kilometer med form (n, m)
+    """
+    lat1, lon1 = np.radians(np.asarray(lat1, dtype=float))[:, None], np.radians(np.asarray(lon1, dtype=float))[:, None]
+    lat2, lon2 = np.radians(np.asarray(lat2, dtype=float))[None, :], np.radians(np.asarray(lon2, dtype=float))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def regular_grid(latitudes: np.ndarray, longitudes: np.ndarray, resolution_km: float = GRID_RESOLUTION_KM,
+                 margin_km: float = GRID_MARGIN_KM) -> tuple:
+    """
+    Lager et regulært rutenett som dekker stasjonene med en margin.
+
+    Avstanden mellom punktene er tilnærmet lik i kilometer i begge retninger,
+    ved at lengdegradssteget skaleres med cos(breddegrad) midt i området.
+
+    Parametre:
+        latitudes, longitudes (np.ndarray): Stasjonenes koordinater i grader
+        resolution_km (float): Avstanden mellom punktene i kilometer
+        margin_km (float): Margen rundt stasjonene i kilometer
+    Returnerer:
+        tuple: (breddegrader med form (ny,), lengdegrader med form (nx,))
+    """
+    km_per_degree = np.pi * EARTH_RADIUS_KM / 180
+    center = np.radians((np.min(latitudes) + np.max(latitudes)) / 2)
+    lat_step = resolution_km / km_per_degree
+    lon_step = resolution_km / (km_per_degree * np.cos(center))
+    lat_margin, lon_margin = margin_km / km_per_degree, margin_km / (km_per_degree * np.cos(center))
+    grid_lats = np.arange(np.min(latitudes) - lat_margin, np.max(latitudes) + lat_margin + lat_step / 2, lat_step)
+    grid_lons = np.arange(np.min(longitudes) - lon_margin, np.max(longitudes) + lon_margin + lon_step / 2, lon_step)
+    return grid_lats, grid_lons
+
+def idw_weights(station_lats: np.ndarray, station_lons: np.ndarray, point_lats: np.ndarray, point_lons: np.ndarray,
+                power: float = IDW_POWER, max_distance_km: float = None, exact: bool = True) -> np.ndarray:
+    """
+    Beregner inverse avstandsvekter fra hver stasjon til hvert punkt, uten normalisering.
+
+    Med exact får et punkt som ligger på en stasjon bare vekt fra den stasjonen,
+    slik at interpolasjonen går gjennom målingene.
+
+    Parametre:
+        station_lats, station_lons (np.ndarray): Stasjonenes koordinater, form (s,)
+        point_lats, point_lons (np.ndarray): Punktenes koordinater, form (p,)
+        power (float): Eksponenten p i 1 / avstand^p
+        max_distance_km (float): Stasjoner lenger unna enn dette får vekt 0 (valgfri)
+        exact (bool): Om punkter på en stasjon bare skal bruke den stasjonen
+    Returnerer:
+        np.ndarray: Vekter med form (p, s)
+    """
+    distances = haversine_distances(point_lats, point_lons, station_lats, station_lons)
+    weights = 1.0 / np.maximum(distances, MIN_DISTANCE_KM) ** power
+    if exact:
+        # Punkter på en stasjon bruker bare stasjonen(e) de ligger på
+        on_station = distances < MIN_DISTANCE_KM
+        weights = np.where(on_station.any(axis=1, keepdims=True), on_station.astype(float), weights)
+    if max_distance_km is not None:
+        weights = np.where(distances <= max_distance_km, weights, 0.0)
+    return weights
+
+class SpatialInterpolator:
+    """
+    Interpolerer stasjonsverdier til faste punkter (f.eks. et rutenett) med inverse avstandsvekter.
+
+    Vektmatrisen fra stasjoner til punkter beregnes én gang. Alle dager
+    interpoleres deretter med to matrisemultiplikasjoner, der vektene
+    normaliseres på nytt for hver dag ut fra hvilke stasjoner som har målinger.
+    Punkter som ligger på en stasjon uten måling den dagen, bruker de andre
+    stasjonene som vanlig.
+    """
+
+    def __init__(self, station_lats, station_lons, point_lats, point_lons, power: float = IDW_POWER,
+                 max_distance_km: float = None):
+        """
+        Parametre:
+            station_lats, station_lons (array-like): Stasjonenes koordinater i grader
+            point_lats, point_lons (array-like): Punktenes koordinater i grader
+            power (float): Eksponenten i inverse avstandsvekter
+            max_distance_km (float): Største avstand en stasjon påvirker (valgfri)
+        """
+        self.weights = idw_weights(station_lats, station_lons, point_lats, point_lons, power, max_distance_km)
+        distance_weights = idw_weights(station_lats, station_lons, point_lats, point_lons, power, max_distance_km,
+                                       exact=False)
+        # Punktene som ligger på en stasjon, med vanlige avstandsvekter til bruk når stasjonen mangler
+        self.on_station = np.flatnonzero((self.weights != distance_weights).any(axis=1))
+        self.station_fallback = distance_weights[self.on_station]
+
+    @classmethod
+    def for_grid(cls, station_lats, station_lons, grid_lats, grid_lons, **kwargs):
+        """
+        Lager en interpolator for alle punktene i et regulært rutenett (se regular_grid).
+
+        Parametre:
+            station_lats, station_lons (array-like): Stasjonenes koordinater i grader
+            grid_lats (np.ndarray): Rutenettets breddegrader, form (ny,)
+            grid_lons (np.ndarray): Rutenettets lengdegrader, form (nx,)
+            **kwargs: Sendes videre til SpatialInterpolator (power, max_distance_km)
+        Returnerer:
+            SpatialInterpolator: Interpolator med ny * nx punkter i radrekkefølge
+        """
+        lons, lats = np.meshgrid(grid_lons, grid_lats)
+        interpolator = cls(station_lats, station_lons, lats.ravel(), lons.ravel(), **kwargs)
+        interpolator.grid_shape = (len(grid_lats), len(grid_lons))
+        return interpolator
+
+    def interpolate(self, values: np.ndarray) -> np.ndarray:
+        """
+        Interpolerer verdiene for mange dager samtidig.
+
+        Parametre:
+            values (np.ndarray): Stasjonsverdier med form (dager, stasjoner), NaN der stasjonen mangler
+        Returnerer:
+            np.ndarray: Verdier med form (dager, punkter), eller (dager, ny, nx) for et rutenett.
+                        NaN der ingen stasjon med måling har vekt.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        present = ~np.isnan(values)
+        numerator = np.where(present, values, 0.0) @ self.weights.T
+        denominator = present.astype(float) @ self.weights.T
+        if len(self.on_station):
+            missing = denominator[:, self.on_station] <= 0
+            numerator[:, self.on_station] = np.where(
+                missing, np.where(present, values, 0.0) @ self.station_fallback.T, numerator[:, self.on_station])
+            denominator[:, self.on_station] = np.where(
+                missing, present.astype(float) @ self.station_fallback.T, denominator[:, self.on_station])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(denominator > 0, numerator / denominator, np.nan)
+        shape = getattr(self, 'grid_shape', None)
+        return result.reshape((len(values),) + shape) if shape else result
+
+def station_matrix(df: pd.DataFrame, date_column: str, column: str, station_column: str,
+                   stations: list = None) -> tuple:
+    """
+    Legger én variabel for alle stasjoner i en matrise med én rad per dag og én kolonne per stasjon.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata i langt format, én rad per stasjon og dag
+        date_column (str): Navnet på datokolonnen
+        column (str): Variabelen
+        station_column (str): Kolonnen med stasjonsnavn
+        stations (list): Rekkefølgen på stasjonene (valgfri; standard er sortert)
+    Returnerer:
+        tuple: (datoer som datetime64[D], verdier med form (dager, stasjoner))
+    """
+    names, dates, values = station_axes(df, date_column, [column], station_column)
+    matrix = values[..., 0].T
+    if stations is not None:
+        position = {name: i for i, name in enumerate(names)}
+        matrix = np.column_stack([matrix[:, position[name]] if name in position else np.full(len(dates), np.nan)
+                                  for name in stations])
+    return dates, matrix
+
+def save_grid(path: str, dates: np.ndarray, grid_lats: np.ndarray, grid_lons: np.ndarray, fields: np.ndarray,
+              stations: list):
+    """
+    Lagrer daglige felt på et rutenett atomisk til en .npz-fil.
+
+    Parametre:
+        path (str): Filsti som skal skrives
+        dates (np.ndarray): Datoene som datetime64[D]
+        grid_lats, grid_lons (np.ndarray): Rutenettets koordinater
+        fields (np.ndarray): Verdier med form (dager, ny, nx)
+        stations (list): Stasjonene feltene er interpolert fra
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, dates=np.asarray(dates, dtype='datetime64[D]').astype(np.int64), latitudes=grid_lats,
+             longitudes=grid_lons, fields=fields.astype(np.float32), stations=np.array(json.dumps(stations)))
+    os.replace(tmp_path, path)
+
+def load_grid(path: str) -> tuple:
+    """
+    Leser daglige felt lagret med save_grid.
+
+    Parametre:
+        path (str): Filsti til .npz-filen
+    Returnerer:
+        tuple: (datoer, breddegrader, lengdegrader, felt med form (dager, ny, nx), stasjoner)
+    """
+    with np.load(path) as data:
+        return (data['dates'].astype('datetime64[D]'), data['latitudes'], data['longitudes'], data['fields'],
+                json.loads(str(data['stations'])))
+
+def interpolate_stations(df: pd.DataFrame, coordinates: dict, columns: list, date_column: str = 'date',
+                         station_column: str = 'station', resolution_km: float = GRID_RESOLUTION_KM,
+                         margin_km: float = GRID_MARGIN_KM, **kwargs) -> dict:
+    """
+    Interpolerer hver variabel fra stasjonene som måler den til et felles rutenett.
+
+    Variabler som færre enn to stasjoner med koordinater måler, hoppes over.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata i langt format for alle stasjoner
+        coordinates (dict): Stasjonsnavn -> (breddegrad, lengdegrad)
+        columns (list): Variablene som skal interpoleres
+        date_column (str): Navnet på datokolonnen
+        station_column (str): Kolonnen med stasjonsnavn
+        resolution_km (float): Avstanden mellom punktene i rutenettet i kilometer
+        margin_km (float): Margen rundt stasjonene i kilometer
+        **kwargs: Sendes videre til SpatialInterpolator (power, max_distance_km)
+    Returnerer:
+        dict: Variabel -> (datoer, breddegrader, lengdegrader, felt med form (dager, ny, nx), stasjoner)
+    """
+    located = df[df[station_column].isin(list(coordinates))]
+    grids = {}
+    for column in columns:
+        measured = located.loc[located[column].notna(), station_column].unique()
+        stations = sorted(measured)
+        if len(stations) < 2:
+            continue
+        lats = np.array([coordinates[name][0] for name in stations], dtype=float)
+        lons = np.array([coordinates[name][1] for name in stations], dtype=float)
+        grid_lats, grid_lons = regular_grid(lats, lons, resolution_km, margin_km)
+        interpolator = SpatialInterpolator.for_grid(lats, lons, grid_lats, grid_lons, **kwargs)
+        rows = located[located[station_column].isin(stations)]
+        dates, values = station_matrix(rows, date_column, column, station_column, stations)
+        grids[column] = (dates, grid_lats, grid_lons, interpolator.interpolate(values), stations)
+    return grids
@@ -0,0 +1,232 @@
+import pandas as pd
+import numpy as np
+
+# Statistikkene som beregnes per kolonne, i rekkefølgen de får i resultatet
+STATISTICS = ['mean', 'median', 'std', 'min', 'max', 'count']
+
+def group_codes(df: pd.DataFrame, keys: list) -> tuple:
+    """
+    Gir hver rad et heltall for gruppen den tilhører, basert på sorterte nøkkelkoder.
+
+    Nøklene (f.eks. år og årstid) faktoriseres til heltall hver for seg og
+    kombineres til én gruppe-ID. Rader med manglende nøkkel utelates, slik
+    som i pandas groupby.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        keys (list): Grupperingskolonner, f.eks. ['year', 'season']
+    Returnerer:
+        tuple: (indeks med én rad per gruppe, gruppe-ID per gyldig rad, maske for gyldige rader)
+    """
+    codes, levels = [], []
+    valid = np.ones(len(df), dtype=bool)
+    for key in keys:
+        key_codes, uniques = pd.factorize(df[key], sort=True)  # Manglende verdier får koden -1
+        codes.append(key_codes)
+        levels.append(pd.Index(uniques, name=key))
+        valid &= key_codes >= 0
+
+    sizes = [max(len(level), 1) for level in levels]
+    flat = np.ravel_multi_index([key_codes[valid] for key_codes in codes], sizes)
+    observed, gid = np.unique(flat, return_inverse=True)
+    observed_codes = np.unravel_index(observed, sizes)
+
+    if len(keys) == 1:
+        index = levels[0].take(observed_codes[0])
+    else:
+        index = pd.MultiIndex(levels=levels, codes=observed_codes, names=keys)
+    return index, gid, valid
+
+def _group_starts(sorted_gid: np.ndarray) -> np.ndarray:
+    """
+    Finner startposisjonen til hver gruppe i en sortert gruppe-ID-array.
+    """
+    if len(sorted_gid) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, sorted_gid[1:] != sorted_gid[:-1]])
+
+def _sorted_medians(values: np.ndarray, sorted_gid: np.ndarray, starts: np.ndarray,
+                    counts: np.ndarray) -> np.ndarray:
+    """
+    Beregner median per gruppe og kolonne for rader som allerede er sortert på gruppe.
+
+    Alle kolonner sorteres innenfor gruppene i én argsort: hver verdi flyttes
+    med gruppe-ID ganger kolonnens verdiområde, slik at gruppene ikke
+    overlapper. NaN legges sist i sin gruppe, så medianen ligger midt i de
+    gyldige verdiene. Selve verdiene hentes fra de opprinnelige dataene.
+    """
+    medians = np.full(counts.shape, np.nan)
+    if values.size == 0:
+        return medians
+    with np.errstate(all='ignore'):
+        low = np.nanmin(values, axis=0)
+        span = np.nanmax(values, axis=0) - low + 1.0
+    low, span = np.nan_to_num(low), np.nan_to_num(span, nan=1.0)
+    shifted = np.where(np.isnan(values), span, values - low) + sorted_gid[:, None] * (span + 1.0)
+    if np.isfinite(shifted).all():
+        ordered_values = np.take_along_axis(values, np.argsort(shifted, axis=0), axis=0)
+    else:
+        # Ekstremt store verdier: sorter hver kolonne for seg med lexsort
+        ordered_values = np.column_stack([values[np.lexsort((values[:, j], sorted_gid)), j]
+                                          for j in range(values.shape[1])])
+
+    for j in range(values.shape[1]):
+        ordered = ordered_values[:, j]
+        n = counts[:, j]
+        lower = starts + np.maximum(n - 1, 0) // 2
+        upper = starts + n // 2
+        has_values = n > 0
+        medians[has_values, j] = 0.5 * (ordered[lower[has_values]] + ordered[upper[has_values]])
+    return medians
+
+class GroupMoments:
+    """
+    Antall, gjennomsnitt, kvadratsum av avvik (M2), minimum og maksimum per gruppe og kolonne.
+
+    Størrelsene kan slås sammen eksakt (Chan et al.), slik at statistikk for
+    grovere grupper, f.eks. per år fra per år og årstid, ikke trenger rådataene.
+    """
+    def __init__(self, index, columns, count, mean, m2, minimum, maximum, medians=None):
+        self.index = index
+        self.columns = list(columns)
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+        self.medians = medians
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, keys: list, columns: list, with_medians: bool = False):
+        """
+        Beregner størrelsene for alle grupper og kolonner i én sortering.
+
+        Parametre:
+            df (pd.DataFrame): Inndata-DataFrame
+            keys (list): Grupperingskolonner
+            columns (list): Kolonner som skal analyseres
+            with_medians (bool): Beregn også median per gruppe (lagres i 'medians')
+        Returnerer:
+            GroupMoments: Størrelsene per gruppe
+        """
+        index, gid, valid = group_codes(df, keys)
+        order = np.argsort(gid, kind='stable')
+        sorted_gid = gid[order]
+        values = df[columns].to_numpy(dtype=float)[valid][order]
+        starts = _group_starts(sorted_gid)
+        sizes = np.diff(np.r_[starts, len(sorted_gid)])
+
+        present = ~np.isnan(values)
+        count = np.add.reduceat(present, starts, axis=0).astype(np.int64) if len(starts) else np.zeros((0, len(columns)), np.int64)
+        if len(starts):
+            total = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count > 0, total / count, np.nan)
+            # Tolags-beregning av M2 rundt gruppens gjennomsnitt for numerisk stabilitet
+            deviations = np.where(present, values - np.repeat(mean, sizes, axis=0), 0.0)
+            m2 = np.add.reduceat(deviations * deviations, starts, axis=0)
+            minimum = np.fmin.reduceat(values, starts, axis=0)
+            maximum = np.fmax.reduceat(values, starts, axis=0)
+        else:
+            mean = m2 = minimum = maximum = np.zeros((0, len(columns)))
+
+        medians = _sorted_medians(values, sorted_gid, starts, count) if with_medians else None
+        return cls(index, columns, count, mean, m2, minimum, maximum, medians)
+
+    def combine(self, keys: list):
+        """
+        Slår sammen gruppene til færre nøkler, f.eks. fra (år, årstid) til år.
+
+        Parametre:
+            keys (list): Nøklene som skal beholdes (et utvalg av de nåværende)
+        Returnerer:
+            GroupMoments: Størrelsene for de sammenslåtte gruppene (uten median)
+        """
+        frame = self.index.to_frame(index=False)
+        index, gid, _ = group_codes(frame, keys)
+        order = np.argsort(gid, kind='stable')
+        starts = _group_starts(gid[order])
+        sizes = np.diff(np.r_[starts, len(gid)])
+
+        count = self.count[order]
+        mean = np.nan_to_num(self.mean[order])
+        new_count = np.add.reduceat(count, starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            new_mean = np.where(new_count > 0, np.add.reduceat(count * mean, starts, axis=0) / new_count, np.nan)
+        # M2 for sammenslåtte grupper: summen av delenes M2 pluss spredningen mellom delenes gjennomsnitt
+        spread = count * (mean - np.nan_to_num(np.repeat(new_mean, sizes, axis=0))) ** 2
+        new_m2 = np.add.reduceat(self.m2[order] + spread, starts, axis=0)
+        new_min = np.fmin.reduceat(self.minimum[order], starts, axis=0)
+        new_max = np.fmax.reduceat(self.maximum[order], starts, axis=0)
+        return GroupMoments(index, self.columns, new_count, new_mean, new_m2, new_min, new_max)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """
+        Standardavvik per gruppe og kolonne. Grupper med for få verdier gir NaN.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, np.sqrt(self.m2 / (self.count - ddof)), np.nan)
+
+    def to_frame(self, medians: np.ndarray = None, ddof: int = 1) -> pd.DataFrame:
+        """
+        Bygger en tabell med kolonnene (kolonne, statistikk), som groupby(...).agg gir.
+
+        Parametre:
+            medians (np.ndarray): Median per gruppe og kolonne (valgfri; ellers NaN)
+            ddof (int): Frihetsgrader for standardavviket (1 gir utvalgsstandardavvik som pandas)
+        Returnerer:
+            pd.DataFrame: Statistikk per gruppe
+        """
+        if medians is None:
+            medians = self.medians
+        if medians is None:
+            medians = np.full(self.count.shape, np.nan)
+        stats = {'mean': self.mean, 'median': medians, 'std': self.std(ddof),
+                 'min': self.minimum, 'max': self.maximum, 'count': self.count}
+        data = {(column, stat): stats[stat][:, j] for j, column in enumerate(self.columns) for stat in STATISTICS}
+        return pd.DataFrame(data, index=self.index)
+
+def group_medians(df: pd.DataFrame, keys: list, columns: list) -> np.ndarray:
+    """
+    Beregner median per gruppe med én sortering, i samme gruppe-rekkefølge som GroupMoments.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        keys (list): Grupperingskolonner
+        columns (list): Kolonner som skal analyseres
+    Returnerer:
+        np.ndarray: Medianer med én rad per gruppe og én kolonne per variabel
+    """
+    _, gid, valid = group_codes(df, keys)
+    order = np.argsort(gid, kind='stable')
+    sorted_gid = gid[order]
+    values = df[columns].to_numpy(dtype=float)[valid][order]
+    starts = _group_starts(sorted_gid)
+    counts = np.add.reduceat(~np.isnan(values), starts, axis=0) if len(starts) else np.zeros((0, len(columns)), int)
+    return _sorted_medians(values, sorted_gid, starts, counts)
+
+def multi_level_statistics(df: pd.DataFrame, columns: list, keys: list = ('year', 'season'),
+                           rollup_keys: list = ('year',)) -> tuple:
+    """
+    Beregner statistikk for to grupperingsnivåer, f.eks. per (år, årstid) og per år.
+
+    Det fine nivået beregnes i én vektorisert gjennomgang. Gjennomsnitt,
+    standardavvik, min, maks og antall for det grove nivået avledes eksakt fra
+    det fine nivået; bare medianen krever en ny sortering av rådataene.
+
+    Parametre:
+        df (pd.DataFrame): Inndata-DataFrame
+        columns (list): Kolonner som skal analyseres
+        keys (list): Grupperingskolonner for det fine nivået
+        rollup_keys (list): Grupperingskolonner for det grove nivået (et utvalg av keys)
+    Returnerer:
+        tuple: (statistikk per fine gruppe, statistikk per grove gruppe)
+    """
+    keys, rollup_keys = list(keys), list(rollup_keys)
+    if df[keys].isna().any().any():
+        # Begge nivåene skal bygge på de samme radene
+        df = df.dropna(subset=keys)
+    fine = GroupMoments.from_frame(df, keys, columns, with_medians=True)
+    coarse = fine.combine(rollup_keys)
+    coarse_medians = group_medians(df, rollup_keys, columns)
+    return fine.to_frame(), coarse.to_frame(coarse_medians)
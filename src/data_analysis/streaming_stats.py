@@ -0,0 +1,371 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+import numpy as np
+
+from data_access import to_day_ordinals
+from data_analysis.statistics_engine import GroupMoments, group_codes
+from data_analysis.correlation_engine import correlation_from_sums
+
+# Øk denne hvis formatet på tilstandsfilen endres
+STATE_VERSION = 3
+
+# Summene per par av kolonner som korrelasjonsmatrisen beregnes fra
+PAIR_SUMS = ('n', 'sx', 'sxx', 'sxy')
+
+# Oppløsningen til kvantilskissen; medianer er eksakte opp til denne verdien
+SKETCH_RESOLUTION = 0.001
+
+def merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b) -> tuple:
+    """
+    Slår sammen antall, gjennomsnitt og M2 for to delmengder (Chan et al.).
+
+    Med n_b = 1 og m2_b = 0 er dette nøyaktig Welfords oppdatering for én ny
+    verdi. Fungerer elementvis på NumPy-arrays.
+
+    Parametre:
+        n_a, mean_a, m2_a: Antall, gjennomsnitt og M2 for første delmengde
+        n_b, mean_b, m2_b: Antall, gjennomsnitt og M2 for andre delmengde
+    Returnerer:
+        tuple: (antall, gjennomsnitt, M2) for den samlede mengden
+    """
+    n = n_a + n_b
+    mean_a, mean_b = np.nan_to_num(mean_a), np.nan_to_num(mean_b)
+    delta = mean_b - mean_a
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, mean_a + delta * np.divide(n_b, n, where=n > 0, out=np.zeros_like(delta)), np.nan)
+        m2 = m2_a + m2_b + delta * delta * np.divide(n_a * n_b, n, where=n > 0, out=np.zeros_like(delta))
+    return n, mean, m2
+
+class QuantileSketch:
+    """
+    Mergebar kvantilskisse: et sparsomt histogram over verdier avrundet til en fast oppløsning.
+
+    To skisser slås sammen ved å legge sammen tellingene, så resultatet er det
+    samme uansett hvordan dataene er delt mellom partisjoner eller prosesser.
+    Kvantiler er eksakte opp til oppløsningen.
+    """
+    def __init__(self, resolution: float = SKETCH_RESOLUTION, counts: dict = None):
+        self.resolution = resolution
+        self.counts = dict(counts or {})
+
+    def add(self, values: np.ndarray):
+        """
+        Legger til verdier. NaN ignoreres.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        buckets, counts = np.unique(np.round(values / self.resolution).astype(np.int64), return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Returnerer en ny skisse med tellingene fra begge skissene.
+        """
+        merged = QuantileSketch(self.resolution, self.counts)
+        for bucket, count in other.counts.items():
+            merged.counts[bucket] = merged.counts.get(bucket, 0) + count
+        return merged
+
+    def quantile(self, q: float) -> float:
+        """
+        Beregner en kvantil på samme måte som np.median for q = 0.5 (snitt av de to midterste verdiene).
+
+        Parametre:
+            q (float): Kvantil mellom 0 og 1
+        Returnerer:
+            float: Kvantilen, eller NaN hvis skissen er tom
+        """
+        if not self.counts:
+            return np.nan
+        buckets = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[bucket] for bucket in buckets])
+        position = q * (cumulative[-1] - 1)
+        lower = buckets[np.searchsorted(cumulative, np.floor(position) + 1)]
+        upper = buckets[np.searchsorted(cumulative, np.ceil(position) + 1)]
+        weight = position - np.floor(position)
+        return float(((1 - weight) * lower + weight * upper) * self.resolution)
+
+class StreamingAggregator:
+    """
+    Vedvarende statistikk per (stasjon, år, årstid) som oppdateres med nye dager.
+
+    For hver gruppe og kolonne holdes antall, gjennomsnitt og M2 (Welford),
+    minimum, maksimum og en kvantilskisse for medianen. I tillegg holdes
+    summene for korrelasjonsmatrisen per par av kolonner, over radene der
+    begge har verdi (som pairwise_correlation). Nye rader legges til i O(nye rader),
+    og to aggregatorer kan slås sammen, f.eks. fra ulike partisjoner eller prosesser.
+    """
+    def __init__(self, columns: list, resolution: float = SKETCH_RESOLUTION):
+        self.columns = list(columns)
+        self.resolution = resolution
+        self.groups = {}
+        self.watermark = None
+        self.rows = 0
+        # Fingeravtrykk av radene til og med watermark (se history_fingerprint), satt av refresh_streaming_statistics
+        self.history = None
+        # Summer per par (i, j) over radene der begge kolonnene har verdi: antall, sum og
+        # kvadratsum av kolonne i, og kryssprodukt. Summene kan legges sammen direkte.
+        k = len(self.columns)
+        self.pair_sums = {name: np.zeros((k, k)) for name in PAIR_SUMS}
+
+    def _empty_group(self) -> dict:
+        k = len(self.columns)
+        return {'count': np.zeros(k, dtype=np.int64), 'mean': np.full(k, np.nan), 'm2': np.zeros(k),
+                'min': np.full(k, np.nan), 'max': np.full(k, np.nan),
+                'sketches': [QuantileSketch(self.resolution) for _ in range(k)]}
+
+    def _merge_group(self, key: tuple, count, mean, m2, minimum, maximum, sketches):
+        group = self.groups.setdefault(key, self._empty_group())
+        group['count'], group['mean'], group['m2'] = merge_moments(
+            group['count'], group['mean'], group['m2'], count, mean, m2)
+        group['min'] = np.fmin(group['min'], minimum)
+        group['max'] = np.fmax(group['max'], maximum)
+        group['sketches'] = [a.merge(b) for a, b in zip(group['sketches'], sketches)]
+
+    def _merge_pair_sums(self, sums: dict):
+        self.pair_sums = {name: self.pair_sums[name] + sums[name] for name in PAIR_SUMS}
+
+    def update(self, df: pd.DataFrame, date_column: str, station: str = 'station'):
+        """
+        Legger til nye rader. Radene grupperes én gang, og hver gruppe slås inn i tilstanden.
+
+        Parametre:
+            df (pd.DataFrame): Nye rader med datokolonne, 'year', 'season' og kolonnene som analyseres
+            date_column (str): Navnet på datokolonnen
+            station (str): Stasjonsnavn som brukes hvis df ikke har kolonnen 'station'
+        """
+        if df.empty:
+            return
+        if 'station' not in df.columns:
+            df = df.assign(station=station)
+        keys = ['station', 'year', 'season']
+        moments = GroupMoments.from_frame(df, keys, self.columns)
+        _, gid, valid = group_codes(df, keys)
+        values = df[self.columns].to_numpy(dtype=float)[valid]
+
+        for i, key in enumerate(moments.index):
+            group_values = values[gid == i]
+            sketches = []
+            for j in range(len(self.columns)):
+                sketch = QuantileSketch(self.resolution)
+                sketch.add(group_values[:, j])
+                sketches.append(sketch)
+            key = (str(key[0]), int(key[1]), str(key[2]))
+            self._merge_group(key, moments.count[i], moments.mean[i], moments.m2[i],
+                              moments.minimum[i], moments.maximum[i], sketches)
+
+        all_values = df[self.columns].to_numpy(dtype=float)
+        mask = (~np.isnan(all_values)).astype(float)
+        x = np.nan_to_num(all_values, nan=0.0)
+        self._merge_pair_sums({'n': mask.T @ mask, 'sx': x.T @ mask, 'sxx': (x * x).T @ mask, 'sxy': x.T @ x})
+
+        last = pd.to_datetime(df[date_column]).max().strftime('%Y-%m-%d')
+        self.watermark = last if self.watermark is None else max(self.watermark, last)
+        self.rows += len(df)
+        self.history = None
+
+    def merge(self, other: 'StreamingAggregator') -> 'StreamingAggregator':
+        """
+        Slår sammen to aggregatorer med samme kolonner, f.eks. fra to partisjoner.
+
+        Returnerer:
+            StreamingAggregator: Ny aggregator med tilstanden fra begge
+        """
+        if other.columns != self.columns:
+            raise ValueError("Aggregatorene må ha de samme kolonnene")
+        merged = StreamingAggregator.from_dict(self.to_dict())
+        for key, group in other.groups.items():
+            merged._merge_group(key, group['count'], group['mean'], group['m2'],
+                                group['min'], group['max'], group['sketches'])
+        merged._merge_pair_sums(other.pair_sums)
+        watermarks = [w for w in (self.watermark, other.watermark) if w is not None]
+        merged.watermark = max(watermarks) if watermarks else None
+        merged.rows = self.rows + other.rows
+        return merged
+
+    def _moments(self, keys: list) -> tuple:
+        """
+        Bygger GroupMoments og medianer for et utvalg av nøklene.
+        """
+        group_keys = sorted(self.groups)
+        frame = pd.DataFrame(group_keys, columns=['station', 'year', 'season'])
+        stacked = {name: np.array([self.groups[key][name] for key in group_keys]).reshape(len(group_keys), -1)
+                   for name in ('count', 'mean', 'm2', 'min', 'max')}
+        fine = GroupMoments(pd.MultiIndex.from_frame(frame), self.columns, stacked['count'], stacked['mean'],
+                            stacked['m2'], stacked['min'], stacked['max'])
+        moments = fine.combine(keys)
+
+        # Medianer fra sammenslåtte skisser
+        index, gid, _ = group_codes(frame, keys)
+        medians = np.full((len(index), len(self.columns)), np.nan)
+        for i in range(len(index)):
+            members = [group_keys[g] for g in np.flatnonzero(gid == i)]
+            for j in range(len(self.columns)):
+                sketch = QuantileSketch(self.resolution)
+                for member in members:
+                    sketch = sketch.merge(self.groups[member]['sketches'][j])
+                medians[i, j] = sketch.quantile(0.5)
+        return moments, medians
+
+    def to_frames(self) -> tuple:
+        """
+        Bygger tabellene som skrives til de aggregerte CSV-filene.
+
+        Stasjon tas med i indeksen bare når det finnes mer enn én stasjon,
+        slik at formatet er likt multi_level_statistics for én stasjon.
+
+        Returnerer:
+            tuple: (statistikk per år og årstid, statistikk per år, korrelasjonsmatrise)
+        """
+        stations = {key[0] for key in self.groups}
+        prefix = ['station'] if len(stations) > 1 else []
+        year_season, ys_medians = self._moments(prefix + ['year', 'season'])
+        year, y_medians = self._moments(prefix + ['year'])
+
+        sums = self.pair_sums
+        correlations = correlation_from_sums(sums['n'], sums['sx'], sums['sx'].T, sums['sxx'], sums['sxx'].T,
+                                             sums['sxy'], min_periods=2)
+        correlation_df = pd.DataFrame(correlations, columns=self.columns, index=self.columns)
+        return year_season.to_frame(ys_medians), year.to_frame(y_medians), correlation_df
+
+    def to_dict(self) -> dict:
+        """
+        Gjør tilstanden om til en JSON-vennlig dict.
+        """
+        def clean(values):
+            return [None if np.isnan(v) else float(v) for v in np.asarray(values, dtype=float)]
+
+        return {
+            'version': STATE_VERSION,
+            'columns': self.columns,
+            'resolution': self.resolution,
+            'watermark': self.watermark,
+            'rows': self.rows,
+            'history': self.history,
+            'pair_sums': {name: values.tolist() for name, values in self.pair_sums.items()},
+            'groups': [{
+                'key': list(key),
+                'count': [int(c) for c in group['count']],
+                'mean': clean(group['mean']),
+                'm2': clean(group['m2']),
+                'min': clean(group['min']),
+                'max': clean(group['max']),
+                'sketches': [{str(b): c for b, c in sketch.counts.items()} for sketch in group['sketches']]
+            } for key, group in self.groups.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'StreamingAggregator':
+        """
+        Gjenoppretter en aggregator fra to_dict.
+        """
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Ukjent versjon av tilstandsfilen: {data.get('version')}")
+
+        def restore(values):
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+        agg = cls(data['columns'], data['resolution'])
+        agg.watermark = data['watermark']
+        agg.rows = data['rows']
+        agg.history = data['history']
+        agg.pair_sums = {name: np.array(data['pair_sums'][name], dtype=float).reshape(len(agg.columns), -1)
+                         for name in PAIR_SUMS}
+        for group in data['groups']:
+            key = (group['key'][0], int(group['key'][1]), group['key'][2])
+            agg.groups[key] = {
+                'count': np.array(group['count'], dtype=np.int64),
+                'mean': restore(group['mean']),
+                'm2': restore(group['m2']),
+                'min': restore(group['min']),
+                'max': restore(group['max']),
+                'sketches': [QuantileSketch(agg.resolution, {int(b): c for b, c in counts.items()})
+                             for counts in group['sketches']]
+            }
+        return agg
+
+    def save(self, path: str):
+        """
+        Lagrer tilstanden atomisk som JSON.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.to_dict(), file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'StreamingAggregator':
+        """
+        Leser tilstanden fra en JSON-fil.
+        """
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+def history_fingerprint(df: pd.DataFrame, date_column: str, columns: list) -> str:
+    """
+    Lager et fingeravtrykk av datoene og verdiene i radene, sortert på dato.
+
+    Parametre:
+        df (pd.DataFrame): Rader med datokolonne og kolonnene
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonnene som analyseres
+    Returnerer:
+        str: SHA-1 som heksadesimal tekst
+    """
+    days = to_day_ordinals(df[date_column])
+    order = np.argsort(days, kind='stable')
+    values = df[columns].to_numpy(dtype=float)[order]
+    digest = hashlib.sha1()
+    digest.update(days[order].astype('<i8').tobytes())
+    # NaN kan ha ulike bitmønstre, så manglende verdier hashes som en maske
+    digest.update(np.isnan(values).tobytes())
+    digest.update(np.nan_to_num(values, nan=0.0).astype('<f8').tobytes())
+    return digest.hexdigest()
+
+def refresh_streaming_statistics(df: pd.DataFrame, columns: list, date_column: str,
+                                 state_path: str, station: str = 'station') -> StreamingAggregator:
+    """
+    Oppdaterer den lagrede tilstanden med dagene etter forrige kjøring.
+
+    Kun rader nyere enn tilstandens siste dato legges til. Tilstanden lagrer
+    et fingeravtrykk av radene til og med siste dato; hvis antallet eller
+    innholdet i disse radene er endret (f.eks. etter sletting, ny rensing
+    med andre grenser eller nye imputerte verdier), bygges den opp på nytt.
+
+    Parametre:
+        df (pd.DataFrame): Rensede data med datokolonne, 'year', 'season' og kolonnene
+        columns (list): Kolonner som skal analyseres
+        date_column (str): Navnet på datokolonnen
+        state_path (str): Filsti til tilstandsfilen
+        station (str): Stasjonsnavn hvis df ikke har kolonnen 'station'
+    Returnerer:
+        StreamingAggregator: Den oppdaterte aggregatoren (også lagret til state_path)
+    """
+    agg = None
+    if os.path.exists(state_path):
+        try:
+            agg = StreamingAggregator.load(state_path)
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"Kunne ikke lese tilstandsfilen '{state_path}', bygger på nytt: {e}")
+
+    dates = pd.to_datetime(df[date_column])
+    if agg is not None and (agg.columns != list(columns) or agg.watermark is None
+                            or int((dates <= agg.watermark).sum()) != agg.rows
+                            or agg.history != history_fingerprint(df[dates <= agg.watermark], date_column, columns)):
+        agg = None
+
+    if agg is None:
+        agg = StreamingAggregator(columns)
+        new_rows = df
+    else:
+        new_rows = df[dates > agg.watermark]
+
+    agg.update(new_rows, date_column, station)
+    agg.history = history_fingerprint(df, date_column, columns)
+    agg.save(state_path)
+    return agg
@@ -0,0 +1,320 @@
+import math
+import pandas as pd
+import numpy as np
+from scipy.stats import norm
+from data_access import save_analysis_table, calendar_arrays, fourier_terms, ANNUAL_PERIOD, CLIMATOLOGY_HARMONICS
+from data_analysis.correlation_engine import season_strata, ALL_SEASONS
+from data_analysis.exceedances import station_axes
+
+# Signifikansnivå for trendtestene og konfidensintervallet til Sen-stigningen
+ALPHA = 0.05
+
+# Minste antall målinger i en serie for at trenden skal testes
+MIN_COUNT = 10
+
+# Antall verdier per blokk når S telles; styrer minnebruken til blokkmatrisene
+CHUNK_SIZE = 1024
+
+# Største antall par for Sen-stigningen. Lengre serier bruker et tilfeldig, men fast utvalg av par.
+MAX_PAIRS = 2_000_000
+
+# Antall dager per år, slik at stigningen oppgis per år
+DAYS_PER_YEAR = 365.25
+
+# Kolonnene i trendtabellen, i rekkefølge
+TREND_COLUMNS = ['n', 'S', 'tau', 'var_s', 'variance_factor', 'z', 'p_value', 'trend',
+                 'sen_slope', 'slope_ci_low', 'slope_ci_high']
+
+def mann_kendall_s(values: np.ndarray, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Beregner Mann-Kendall-statistikken S = sum av sign(x_j - x_i) over alle par i < j.
+
+    Serien gås gjennom i blokker. Par innenfor en blokk telles med en
+    fortegnsmatrise, og par mot alle tidligere verdier telles med
+    binærsøk i de tidligere verdiene, som holdes sortert. Det gir
+    O(n * blokk + n² / blokk * log n) arbeid uten Python-løkker over par.
+
+    Parametre:
+        values (np.ndarray): Verdiene i tidsrekkefølge, uten NaN
+        chunk_size (int): Antall verdier per blokk
+    Returnerer:
+        int: Mann-Kendall-statistikken S
+    """
+    values = np.asarray(values, dtype=float)
+    previous = np.empty(0)
+    s = 0
+    for start in range(0, len(values), chunk_size):
+        block = values[start:start + chunk_size]
+        if len(previous):
+            # Antall tidligere verdier som er mindre, minus antall som er større
+            smaller = np.searchsorted(previous, block, side='left')
+            larger = len(previous) - np.searchsorted(previous, block, side='right')
+            s += int((smaller - larger).sum())
+        s += int(np.triu(np.sign(block[None, :] - block[:, None]), 1).sum())
+        previous = np.sort(np.concatenate([previous, block]))
+    return s
+
+def tie_corrected_variance(values: np.ndarray) -> float:
+    """
+    Beregner variansen til S under nullhypotesen, korrigert for like verdier.
+
+    Parametre:
+        values (np.ndarray): Verdiene, uten NaN
+    Returnerer:
+        float: Var(S) = [n(n-1)(2n+5) - sum t(t-1)(2t+5)] / 18, der t er størrelsen på hver gruppe like verdier
+    """
+    n = len(values)
+    _, ties = np.unique(values, return_counts=True)
+    ties = ties[ties > 1].astype(float)
+    return (n * (n - 1) * (2 * n + 5) - np.sum(ties * (ties - 1) * (2 * ties + 5))) / 18
+
+def pairwise_slopes(times: np.ndarray, values: np.ndarray, max_pairs: int = MAX_PAIRS, seed: int = 0) -> np.ndarray:
+    """
+    Beregner stigningen mellom alle par av målinger i én vektorisert operasjon.
+
+    Har serien flere enn 'max_pairs' par, brukes et tilfeldig utvalg med
+    fast 'seed', slik at resultatet er det samme fra kjøring til kjøring.
+
+    Parametre:
+        times (np.ndarray): Tidspunktene, stigende
+        values (np.ndarray): Verdiene, uten NaN
+        max_pairs (int): Største antall par som brukes
+        seed (int): Startverdi for utvalget av par
+    Returnerer:
+        np.ndarray: Stigningene (x_j - x_i) / (t_j - t_i) for par i < j
+    """
+    n = len(values)
+    if n * (n - 1) // 2 <= max_pairs:
+        first, second = np.triu_indices(n, k=1)
+    else:
+        rng = np.random.default_rng(seed)
+        first, second = rng.integers(0, n, size=(2, max_pairs))
+        first, second = np.minimum(first, second), np.maximum(first, second)
+        keep = first < second
+        first, second = first[keep], second[keep]
+
+    return (values[second] - values[first]) / (times[second] - times[first])
+
+def slope_interval(slopes: np.ndarray, n: int, var_s: float, alpha: float = ALPHA) -> tuple:
+    """
+    Finner konfidensintervallet til Sen-stigningen fra rangene blant de parvise stigningene (Gilbert, 1987).
+
+    Parametre:
+        slopes (np.ndarray): Parvise stigninger fra pairwise_slopes
+        n (int): Antall målinger i serien
+        var_s (float): Variansen til S, eventuelt korrigert for autokorrelasjon
+        alpha (float): Signifikansnivå
+    Returnerer:
+        tuple: (nedre grense, øvre grense); NaN hvis serien er for kort
+    """
+    total_pairs = n * (n - 1) // 2
+    if len(slopes) == 0 or var_s <= 0:
+        return np.nan, np.nan
+    # Rangene skaleres til utvalget når ikke alle par er brukt
+    spread = norm.isf(alpha / 2) * math.sqrt(var_s)
+    scale = len(slopes) / total_pairs
+    lower = int(round((total_pairs - spread) / 2 * scale)) - 1
+    upper = int(round((total_pairs + spread) / 2 * scale))
+    if lower < 0 or upper >= len(slopes):
+        return np.nan, np.nan
+    bounds = np.partition(slopes, [lower, upper])
+    return float(bounds[lower]), float(bounds[upper])
+
+def sen_slope(times: np.ndarray, values: np.ndarray, max_pairs: int = MAX_PAIRS) -> float:
+    """
+    Beregner Theil-Sen-stigningen, medianen av de parvise stigningene.
+
+    Parametre:
+        times (np.ndarray): Tidspunktene, stigende
+        values (np.ndarray): Verdiene, uten NaN
+        max_pairs (int): Største antall par som brukes
+    Returnerer:
+        float: Stigningen i verdienheter per tidsenhet, NaN for færre enn to målinger
+    """
+    slopes = pairwise_slopes(times, values, max_pairs)
+    return float(np.median(slopes)) if len(slopes) else np.nan
+
+def autocorrelation_factor(times: np.ndarray, values: np.ndarray, slope: float, alpha: float = ALPHA) -> float:
+    """
+    Beregner Hamed og Raos (1998) korreksjonsfaktor for Var(S) ved autokorrelasjon.
+
+    Serien avtrendes med Sen-stigningen, og autokorrelasjonen til rangene
+    beregnes for alle lag med FFT. Bare lag med signifikant korrelasjon
+    tas med. Lag regnes i antall målinger, så hull i serien (f.eks. mellom
+    vintrene i en årstidsserie) behandles som sammenhengende.
+
+    Parametre:
+        times (np.ndarray): Tidspunktene, stigende
+        values (np.ndarray): Verdiene, uten NaN
+        slope (float): Sen-stigningen som brukes til avtrendingen
+        alpha (float): Signifikansnivå for autokorrelasjonen
+    Returnerer:
+        float: Faktoren n/n* som Var(S) multipliseres med (1 betyr ingen korreksjon)
+    """
+    n = len(values)
+    if n < 3 or np.isnan(slope):
+        return 1.0
+    residuals = values - slope * times
+    ranks = np.argsort(np.argsort(residuals, kind='stable'), kind='stable').astype(float)
+    ranks -= ranks.mean()
+
+    # Autokorrelasjon for alle lag i O(n log n)
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(ranks, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+    if acf[0] <= 0:
+        return 1.0
+    acf = acf[1:] / acf[0]
+
+    lags = np.arange(1, n)
+    significant = np.abs(acf) > norm.isf(alpha / 2) / math.sqrt(n)
+    weights = (n - lags) * (n - lags - 1.0) * (n - lags - 2.0)
+    factor = 1 + 2 / (n * (n - 1.0) * (n - 2.0)) * np.sum(weights[significant] * acf[significant])
+    return float(factor) if factor > 0 else 1.0
+
+def trend_test(times: np.ndarray, values: np.ndarray, alpha: float = ALPHA, autocorrelation: bool = True,
+               max_pairs: int = MAX_PAIRS) -> dict:
+    """
+    Kjører Mann-Kendall-testen og beregner Sen-stigningen for én serie.
+
+    Parametre:
+        times (np.ndarray): Tidspunktene, f.eks. i år
+        values (np.ndarray): Verdiene; NaN utelates
+        alpha (float): Signifikansnivå
+        autocorrelation (bool): Korriger variansen for autokorrelasjon (Hamed og Rao)
+        max_pairs (int): Største antall par for Sen-stigningen
+    Returnerer:
+        dict: n, S, tau, var_s, variance_factor, z, p_value, trend, sen_slope, slope_ci_low og slope_ci_high
+    """
+    times, values = np.asarray(times, dtype=float), np.asarray(values, dtype=float)
+    keep = ~np.isnan(values)
+    times, values = times[keep], values[keep]
+    order = np.argsort(times, kind='stable')
+    times, values = times[order], values[order]
+
+    n = len(values)
+    s = mann_kendall_s(values)
+    var_s = float(tie_corrected_variance(values))
+    slopes = pairwise_slopes(times, values, max_pairs)
+    slope = float(np.median(slopes)) if len(slopes) else np.nan
+    factor = autocorrelation_factor(times, values, slope, alpha) if autocorrelation else 1.0
+
+    # Både z og intervallet for stigningen bruker den korrigerte variansen
+    corrected = var_s * factor
+    low, high = slope_interval(slopes, n, corrected, alpha)
+    z = float(s - np.sign(s)) / math.sqrt(corrected) if corrected > 0 else 0.0
+    p_value = float(2 * norm.sf(abs(z)))
+    if p_value >= alpha:
+        trend = 'no trend'
+    else:
+        trend = 'increasing' if z > 0 else 'decreasing'
+    return {
+        'n': n,
+        'S': s,
+        'tau': s / (n * (n - 1) / 2) if n > 1 else np.nan,
+        'var_s': var_s,
+        'variance_factor': factor,
+        'z': z,
+        'p_value': p_value,
+        'trend': trend,
+        'sen_slope': slope,
+        'slope_ci_low': low,
+        'slope_ci_high': high
+    }
+
+def seasonal_anomalies(dates: np.ndarray, values: np.ndarray, harmonics: int = CLIMATOLOGY_HARMONICS) -> np.ndarray:
+    """
+    Trekker årssyklusen fra hver serie, slik at sesonggangen innenfor en årstid ikke leses som en trend.
+
+    Årssyklusen er de harmoniske leddene i klimatologien (se data_access.climatology),
+    tilpasset med minste kvadrater sammen med et konstantledd og en lineær trend.
+    Bare de harmoniske leddene trekkes fra. Uten trendleddet ville en del av
+    trenden (stigningen gjennom hvert år) blitt tatt opp av årssyklusen.
+
+    Parametre:
+        dates (np.ndarray): Datoene på dagaksen
+        values (np.ndarray): Verdier med form (stasjoner, dager, kolonner)
+        harmonics (int): Antall harmoniske i årssyklusen
+    Returnerer:
+        np.ndarray: Avvikene fra årssyklusen, med samme form som values
+    """
+    terms = fourier_terms(calendar_arrays(dates)['day_of_year'], harmonics, ANNUAL_PERIOD)
+    seasonal = np.column_stack(list(terms.values()))
+    times = dates.astype(np.int64) / DAYS_PER_YEAR
+    design = np.column_stack([seasonal, np.ones(len(dates)), times - times.mean()])
+
+    anomalies = values.copy()
+    for s in range(values.shape[0]):
+        for j in range(values.shape[2]):
+            keep = ~np.isnan(values[s, :, j])
+            if np.count_nonzero(keep) <= design.shape[1]:
+                continue
+            coefficients = np.linalg.lstsq(design[keep], values[s, keep, j], rcond=None)[0]
+            anomalies[s, :, j] -= seasonal @ coefficients[:seasonal.shape[1]]
+    return anomalies
+
+def trend_test_table(df: pd.DataFrame, date_column: str, columns: list, station_column: str = None,
+                     station: str = 'station', by_season: bool = True, exclude_generated: bool = True,
+                     alpha: float = ALPHA, autocorrelation: bool = True, min_count: int = MIN_COUNT,
+                     deseasonalize: bool = True) -> pd.DataFrame:
+    """
+    Tester trend for hver kombinasjon av stasjon, variabel og årstid, og samler resultatet i én tabell.
+
+    Testene kjøres på avvikene fra årssyklusen (se seasonal_anomalies), slik at sesonggangen innenfor hver årstid ikke gir
+    falske trender. Stigningen oppgis i verdienheter per år. Serier med færre
+    enn 'min_count' målinger tas med i tabellen, men uten testresultater.
+
+    Parametre:
+        df (pd.DataFrame): Dagdata, i langt format hvis flere stasjoner
+        date_column (str): Navnet på datokolonnen
+        columns (list): Kolonner som skal testes
+        station_column (str): Kolonnen med stasjonsnavn (valgfri; ellers én stasjon)
+        station (str): Navnet på stasjonen når station_column ikke er oppgitt
+        by_season (bool): Test hver årstid i tillegg til hele serien
+        exclude_generated (bool): Utelat verdier med 'generated_<kolonne>' = True
+        alpha (float): Signifikansnivå
+        autocorrelation (bool): Korriger for autokorrelasjon
+        min_count (int): Minste antall målinger per serie
+        deseasonalize (bool): Trekk fra årssyklusen før testene
+    Returnerer:
+        pd.DataFrame: Én rad per (station, variable, season)
+    """
+    if exclude_generated:
+        # Imputerte verdier regnes som manglende, slik at de ikke påvirker trenden
+        df = df.assign(**{
+            column: df[column].where(~(np.asarray(df[f'generated_{column}'], dtype=float) > 0))
+            for column in columns if f'generated_{column}' in df.columns
+        })
+    stations, dates, values = station_axes(df, date_column, columns, station_column, station)
+    if deseasonalize:
+        values = seasonal_anomalies(dates, values)
+    times = dates.astype(np.int64) / DAYS_PER_YEAR
+    if by_season:
+        names, strata = season_strata(dates)
+    else:
+        names, strata = [ALL_SEASONS], np.ones((1, len(dates)), dtype=bool)
+
+    rows, index = [], []
+    for s, station_name in enumerate(stations):
+        for j, column in enumerate(columns):
+            for name, mask in zip(names, strata):
+                series = values[s, mask, j]
+                if np.count_nonzero(~np.isnan(series)) >= min_count:
+                    rows.append(trend_test(times[mask], series, alpha, autocorrelation))
+                else:
+                    rows.append({'n': int(np.count_nonzero(~np.isnan(series)))})
+                index.append((station_name, column, name))
+
+    table = pd.DataFrame(rows, index=pd.MultiIndex.from_tuples(index, names=['station', 'variable', 'season']))
+    return table.reindex(columns=TREND_COLUMNS)
+
+def save_trend_tests(table: pd.DataFrame, output_dir: str, prefix: str):
+    """
+    Lagrer trendtabellen ved siden av de andre analyseresultatene (se save_analysis_table).
+
+    Parametre:
+        table (pd.DataFrame): Resultatet fra trend_test_table
+        output_dir (str): Katalog for lagring av resultater
+        prefix (str): Prefiks for filnavnet, f.eks. 'nilu' eller 'frost'
+    """
+    save_analysis_table(table, output_dir, f'{prefix}_trend_tests')
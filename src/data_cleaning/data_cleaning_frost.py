@@ -5,6 +5,17 @@ import os
 import numpy as np
 import sqlite3
 
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from data_access.series_cache import write_series_cache, SERIES_CACHE_DIRNAME
+from data_access.frost_query import ensure_frost_index
+from data_access.raw_frost_store import load_raw_frost_entries
+from data_access.climatology import compute_climatology, get_climatology_path
+from data_access.data_loader import load_frost_data
+
 if __name__ == "__main__":
     # Når skriptet kjøres direkte
     from data_validators import *
@@ -12,6 +23,16 @@ else:
     # Når skriptet importeres som modul
     from .data_validators import *
 
+# Gyldige verdier for værdata basert på klima i Trondheim
+FROST_VALID_RANGES = {
+    'mean_air_temperature': (-30, 40),  # Temperatur i Celsius
+    'total_precipitation': (0, 250),   # Nedbør i mm
+    'mean_wind_speed': (0, 60)         # Vindhastighet i m/s
+}
+
+# Antall naboer som brukes ved KNN-imputasjon
+FROST_N_NEIGHBORS = 5
+
 def print_dataset_info(df_cleaned, missing_results, outlier_results, gap_results, imputation_results):
     """
     Skriver ut informasjon om datasettet i ønsket format.
@@ -54,6 +75,10 @@ def print_dataset_info(df_cleaned, missing_results, outlier_results, gap_results
     imputation_validator = ImputationValidator()
     imputation_validator.report(imputation_results)
 
+    # 5. Kvalitetsfelt
+    quality_validator = QualityFlagValidator()
+    quality_validator.report(quality_validator.count(df_cleaned))
+
     print("\nData renset og lagret i SQLite-database.")
 
     return {
@@ -73,9 +98,8 @@ def clean_frost_data(json_file, db_file):
         db_file (str): Filsti til SQLite-databasen der rensede data skal lagres.
     """
     try:
-        # Last inn JSON-data
-        with open(json_file, 'r') as file:
-            raw_data = json.load(file)
+        # Last inn rådata via det indekserte lageret (importeres fra JSON ved endringer)
+        raw_data = load_raw_frost_entries(json_file)
     except FileNotFoundError:
         print(f"Feil: JSON-filen '{json_file}' ble ikke funnet.")
         return
@@ -115,19 +139,13 @@ def clean_frost_data(json_file, db_file):
         print(f"Feil under behandling av data: {e}")
         return
 
-    # Definer gyldige verdier for værdata basert på klima i Trondheim
-    frost_valid_ranges = {
-        'mean_air_temperature': (-30, 40),  # Temperatur i Celsius
-        'total_precipitation': (0, 250),   # Nedbør i mm
-        'mean_wind_speed': (0, 60)         # Vindhastighet i m/s
-    }
-
     try:
         # Initialiser validatorer
         missing_validator = MissingValueValidator()  # Validator for manglende verdier
-        outlier_validator = OutlierValidator(frost_valid_ranges)  # Validator for uteliggere
+        outlier_validator = OutlierValidator(FROST_VALID_RANGES)  # Validator for uteliggere
         continuity_validator = DateContinuityValidator()  # Validator for datokontinuitet
-        imputation_validator = ImputationValidator(n_neighbors=5)  # Validator for imputasjon
+        imputation_validator = ImputationValidator(n_neighbors=FROST_N_NEIGHBORS)  # Validator for imputasjon
+        quality_validator = QualityFlagValidator()  # Samler resultatene i kvalitetsfelt
 
         # 1. Sjekk for manglende verdier
         missing_results, df_cleaned = missing_validator.validate(df_pivot)
@@ -140,6 +158,9 @@ def clean_frost_data(json_file, db_file):
 
         # 4. Imputer manglende verdier
         imputation_results, df_cleaned = imputation_validator.validate(df_cleaned)
+
+        # 5. Lag kvalitetsfelt per variabel og dag
+        _, df_cleaned = quality_validator.validate(df_cleaned, missing_results, outlier_results, gap_results)
     except Exception as e:
         print(f"Feil under validering av data: {e}")
         return    # Skriv ut dataset-informasjon
@@ -155,6 +176,8 @@ def clean_frost_data(json_file, db_file):
         conn = sqlite3.connect(db_file)
         df_cleaned['referenceTime'] = pd.to_datetime(df_cleaned['referenceTime']).dt.strftime('%Y-%m-%d')  # Konverter datoformat
         df_cleaned.to_sql('weather_data', conn, if_exists='replace', index=False)
+        ensure_frost_index(conn, 'weather_data')  # Indeks for raske datofiltre
+        conn.commit()
         conn.close()
     except sqlite3.Error as e:
         print(f"Feil under lagring i SQLite-databasen: {e}")
@@ -162,6 +185,22 @@ def clean_frost_data(json_file, db_file):
 
     print(f"\nRensede data lagret i '{db_file}' i tabellen 'weather_data'.")
 
+    try:
+        # Lagre en binær cache (.npy per variabel) for rask, minnemappet innlasting
+        cache_dir = os.path.join(os.path.dirname(db_file), SERIES_CACHE_DIRNAME, 'frost')
+        write_series_cache(df_cleaned, cache_dir, 'referenceTime', source_path=db_file)
+        print(f"Binær cache lagret i '{cache_dir}'.")
+    except Exception as e:
+        print(f"Feil under lagring av binær cache: {e}")
+
+    try:
+        # Lagre klimatologien av de lagrede verdiene, slik at analyser og grafer kan gjenbruke den
+        climatology_path = get_climatology_path('frost', os.path.dirname(db_file))
+        compute_climatology(load_frost_data(db_file), 'referenceTime', list(imputation_results)).save(climatology_path)
+        print(f"Klimatologi lagret i '{climatology_path}'.")
+    except Exception as e:
+        print(f"Feil under lagring av klimatologi: {e}")
+
 def default_clean_frost_data(project_root):
     """
     Standardfunksjon for å rense FROST-data med forhåndsdefinerte filstier.
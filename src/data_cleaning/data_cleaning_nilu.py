@@ -5,6 +5,13 @@ import json
 import numpy as np
 from sklearn.impute import KNNImputer
 
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+from data_access.series_cache import write_series_cache, SERIES_CACHE_DIRNAME
+from data_access.climatology import compute_climatology, get_climatology_path
+from data_access.data_loader import load_nilu_data
+
 if __name__ == "__main__":
     # When running directly
     from data_validators import *
@@ -20,6 +27,12 @@ cleaned_json_file = os.path.join(project_root, 'data', 'clean', 'cleaned_data_ni
 # Kolonnen som skal fjernes
 column_to_remove = 'Benzo(a)pyrene in PM10 (aerosol)'
 
+# Antall standardavvik fra gjennomsnittet før en verdi regnes som outlier
+NILU_NUM_STD = 4
+
+# Antall naboer som brukes ved KNN-imputasjon
+NILU_N_NEIGHBORS = 100
+
 def load_json(file_path):
     """
     Laster inn en JSON-fil og returnerer dataen.
@@ -91,6 +104,7 @@ def clean_data(df_all, column_to_remove, num_std, n_neighbors):
     outlier_validator = OutlierValidator({})  # Midlertidig, oppdateres under
     continuity_validator = DateContinuityValidator()  # Validator for datokontinuitet
     imputation_validator = ImputationValidator(n_neighbors=n_neighbors)  # Validator for imputasjon
+    quality_validator = QualityFlagValidator()  # Samler resultatene i kvalitetsfelt
 
     # 1. Sjekk for manglende verdier
     missing_results, df_pivot = missing_validator.validate(df_pivot)
@@ -107,6 +121,9 @@ def clean_data(df_all, column_to_remove, num_std, n_neighbors):
     # 4. Fyller inn manglende verdier ved hjelp av ImputationValidator
     imputation_results, df_pivot = imputation_validator.validate(df_pivot)
 
+    # 5. Lager kvalitetsfelt per variabel og dag
+    _, df_pivot = quality_validator.validate(df_pivot, missing_results, outlier_results, gap_results)
+
     return df_pivot, missing_results, outlier_results, gap_results, imputation_results
 
 def print_dataset_info(df_cleaned, missing_results, outlier_results, gap_results, imputation_results):
@@ -152,6 +169,10 @@ def print_dataset_info(df_cleaned, missing_results, outlier_results, gap_results
     imputation_validator = ImputationValidator()
     imputation_validator.report(imputation_results)
 
+    # 5. Kvalitetsfelt
+    quality_validator = QualityFlagValidator()
+    quality_validator.report(quality_validator.count(df_cleaned))
+
     return {
         "Antall rader": total_rows,
         "Manglende verdier": missing_results,
@@ -221,13 +242,19 @@ def save_cleaned_data(df_pivot, file_path):
         print("DataFrame kolonner:", df_to_save.columns.tolist())
         print("DataFrame første rad:", df_to_save.iloc[0].to_dict() if not df_to_save.empty else "Tom DataFrame")
 
-def main_dc_nilu():
+def main_dc_nilu(raw_file=None, cleaned_file=None):
     """
     Hovedfunksjonen som kjører alle funksjonene for datarensing.
+
+    Args:
+        raw_file (str, optional): Filsti til rådata. Standard er 'data/raw/api_nilu_air_quality.json'.
+        cleaned_file (str, optional): Filsti for rensede data. Standard er 'data/clean/cleaned_data_nilu.json'.
     """
+    raw_file = raw_file or raw_json_file
+    cleaned_file = cleaned_file or cleaned_json_file
     try:
         # Laster inn rådata fra JSON-fil
-        data = load_json(raw_json_file)
+        data = load_json(raw_file)
     except Exception as e:
         print(f"Feil ved innlasting av JSON-fil: {e}")
         return
@@ -241,7 +268,7 @@ def main_dc_nilu():
 
     try:
         # Renser dataen
-        df_pivot, missing_results, outlier_results, gap_results, imputation_results = clean_data(df_all, column_to_remove, 4, 100)
+        df_pivot, missing_results, outlier_results, gap_results, imputation_results = clean_data(df_all, column_to_remove, NILU_NUM_STD, NILU_N_NEIGHBORS)
     except Exception as e:
         print(f"Feil under datarensing: {e}")
         return
@@ -255,11 +282,27 @@ def main_dc_nilu():
 
     try:
         # Lagrer den rensede dataen
-        save_cleaned_data(df_pivot, cleaned_json_file)
+        save_cleaned_data(df_pivot, cleaned_file)
     except Exception as e:
         print(f"Feil ved lagring av renset data: {e}")
         return
 
+    try:
+        # Lagrer en binær cache (.npy per variabel) for rask, minnemappet innlasting
+        cache_dir = os.path.join(os.path.dirname(cleaned_file), SERIES_CACHE_DIRNAME, 'nilu')
+        write_series_cache(df_pivot, cache_dir, 'dateTime', source_path=cleaned_file)
+        print(f"Binær cache lagret i '{cache_dir}'")
+    except Exception as e:
+        print(f"Feil ved lagring av binær cache: {e}")
+
+    try:
+        # Lagrer klimatologien av de lagrede verdiene, slik at analyser og grafer kan gjenbruke den
+        climatology_path = get_climatology_path('nilu', os.path.dirname(cleaned_file))
+        compute_climatology(load_nilu_data(cleaned_file), 'dateTime', list(imputation_results)).save(climatology_path)
+        print(f"Klimatologi lagret i '{climatology_path}'")
+    except Exception as e:
+        print(f"Feil ved lagring av klimatologi: {e}")
+
     print("\nData rensing fullført")
 
 # Kjører hovedfunksjonen
@@ -1,8 +1,20 @@
+import sys
+import os
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 from sklearn.impute import KNNImputer
 
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from data_access.climatology import compute_climatology
+from data_access.series_cache import to_day_ordinals
+from data_access.quality_flags import (QUALITY_MISSING, QUALITY_OUTLIER, QUALITY_GAP, QUALITY_IMPUTED,
+                                       QUALITY_BITS, quality_column)
+
 # Juster Pandas' utskriftsinnstillinger
 pd.set_option('display.max_columns', None)  # Vis alle kolonner
 pd.set_option('display.width', 1000)       # Øk bredden på utskriften
@@ -240,14 +252,18 @@ class ImputationValidator:
     """
     Klasse for å implantere manglende verdier i en DataFrame.
     """
-    def __init__(self, n_neighbors=5):
+    def __init__(self, n_neighbors=5, climatology=None):
         """
         Initialiserer validatoren med antall naboer for KNN-imputasjon.
 
         Args:
             n_neighbors (int): Antall naboer for KNN-imputasjon.
+            climatology (Climatology, optional): Ferdig klimatologi som gir gjennomsnittet per dag i året.
+                Standard er å beregne den fra dataene som valideres.
         """
         self.n_neighbors = n_neighbors
+        self.baseline = climatology
+        self.climatology = None  # Klimatologien som ble brukt i siste validering
     
     def validate(self, df: pd.DataFrame) -> tuple[dict, pd.DataFrame]:
         """
@@ -270,9 +286,18 @@ class ImputationValidator:
         
         dates = pd.to_datetime(df_cleaned['referenceTime'])
         df_cleaned['day_of_year'] = dates.dt.dayofyear
-        
+
+        # Gjennomsnittet per dag i året hentes fra klimatologien. Den beregnes fra de
+        # uavrundede målte verdiene; bare det endelige resultatet avrundes.
+        self.climatology = self.baseline
+        if self.climatology is None or not set(numeric_columns) <= set(self.climatology.columns):
+            observed = df[numeric_columns].assign(referenceTime=dates)
+            self.climatology = compute_climatology(observed, 'referenceTime', numeric_columns,
+                                                   exclude_generated=False)
+
         for column in numeric_columns:
-            seasonal_avg = df_cleaned.groupby('day_of_year')[column].transform('mean')
+            seasonal_avg = pd.Series(self.climatology.lookup(column, df_cleaned['day_of_year'], 'doy_mean'),
+                                     index=df_cleaned.index)
             mask = df_cleaned[column].isna()
             df_cleaned.loc[mask, column] = seasonal_avg[mask]
             
@@ -304,3 +329,81 @@ class ImputationValidator:
         for column, count in results.items():
             if count > 0:
                 print(f"- {column}: {count}")
+
+class QualityFlagValidator:
+    """
+    Klasse for å samle resultatene fra de andre validatorene i ett kvalitetsfelt per variabel og dag.
+    """
+    def validate(self, df: pd.DataFrame, missing_results: dict = None, outlier_results: dict = None,
+                 gap_results: list = None, date_column='referenceTime') -> tuple[dict, pd.DataFrame]:
+        """
+        Legger til kolonnen 'quality_<kolonne>' (uint8) for hver variabel med 'generated_<kolonne>'.
+
+        Bitene (se data_access.quality_flags) settes fra resultatene til
+        MissingValueValidator, OutlierValidator og DateContinuityValidator, og fra
+        flaggene til ImputationValidator. Validatoren kjøres derfor sist.
+
+        Args:
+            df (pd.DataFrame): DataFrame etter imputasjon.
+            missing_results (dict, optional): Resultatet fra MissingValueValidator.
+            outlier_results (dict, optional): Resultatet fra OutlierValidator.
+            gap_results (list, optional): Resultatet fra DateContinuityValidator.
+            date_column (str): Kolonnenavn for datoer.
+
+        Returns:
+            tuple[dict, pd.DataFrame]: Ordbok med antall dager per bit for hver kolonne, og en kopi av DataFrame.
+        """
+        df_cleaned = df.copy()
+        days = to_day_ordinals(df_cleaned[date_column])
+        gap_days = to_day_ordinals(gap_results) if gap_results else np.empty(0, dtype=np.int64)
+        columns = [column[len('generated_'):] for column in df.columns
+                   if column.startswith('generated_') and column[len('generated_'):] in df.columns]
+
+        for column in columns:
+            flags = np.zeros(len(df_cleaned), dtype=np.uint8)
+            missing = (missing_results or {}).get(column)
+            if missing is not None and date_column in missing.columns:
+                flags[np.isin(days, to_day_ordinals(missing[date_column]))] |= QUALITY_MISSING
+            outliers = (outlier_results or {}).get(column)
+            if outliers is not None and len(outliers):
+                flags[np.isin(days, to_day_ordinals(outliers.index))] |= QUALITY_OUTLIER
+            flags[np.isin(days, gap_days)] |= QUALITY_GAP
+            flags[df_cleaned[f'generated_{column}'].fillna(False).to_numpy(dtype=bool)] |= QUALITY_IMPUTED
+
+            df_cleaned[quality_column(column)] = flags
+
+        return self.count(df_cleaned), df_cleaned
+
+    def count(self, df: pd.DataFrame) -> dict:
+        """
+        Teller antall dager med hver bit i kvalitetskolonnene.
+
+        Args:
+            df (pd.DataFrame): DataFrame med kolonnene 'quality_<kolonne>'.
+
+        Returns:
+            dict: Ordbok med antall dager per bit for hver kolonne.
+        """
+        counts = {}
+        for column in df.columns:
+            if column.startswith('quality_'):
+                flags = df[column].to_numpy(dtype=np.uint8)
+                counts[column[len('quality_'):]] = {name: int(np.count_nonzero(flags & bit))
+                                                    for bit, name in QUALITY_BITS.items()}
+        return counts
+
+    def report(self, results: dict):
+        """
+        Genererer en rapport over antall dager med hver kvalitetsbit.
+
+        Args:
+            results (dict): Ordbok med antall dager per bit for hver kolonne.
+        """
+        if not results:
+            print("\nIngen kvalitetsfelt laget")
+            return
+
+        print("\nKvalitetsfelt (antall dager per bit):")
+        report_df = pd.DataFrame(results).T
+        report_df = report_df.apply(lambda column: column.map(lambda x: "ok" if int(x) == 0 else int(x)))
+        print(report_df)
@@ -1,8 +1,16 @@
 import requests
 import os
+import sys
 import json
 from dotenv import load_dotenv
 
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from data_collection.station_catalogue import FROST_ELEMENTS, load_catalogue
+
 class WeatherDataFetcher:
     """
     En klasse for å hente værdata fra Frost API basert på geografiske koordinater og tidsperiode.
@@ -27,10 +35,22 @@ class WeatherDataFetcher:
     def fetch_sources(self):
         """
         Henter den nærmeste værstasjonen basert på geografiske koordinater.
+
+        Stasjonen slås først opp i den lokale stasjonskatalogen, blant stasjonene som
+        var i drift i tidsperioden. Frost API brukes bare hvis katalogen ikke finnes.
         """
+        catalogue = load_catalogue(client_id=self.client_id)
+        if catalogue is not None:
+            station = catalogue.subset(source='frost', valid_from=self.from_date,
+                                       valid_to=self.to_date).nearest_station(self.latitude, self.longitude)
+            if station is not None:
+                self.source_id = station['id']
+                print(f"Funnet kilde: {self.source_id} ({station['distance_km']:.1f} km unna, fra stasjonskatalogen)")
+                return
+
         sources_parameters = {
             'geometry': f'nearest(POINT({self.longitude} {self.latitude}))',  # Finner nærmeste punkt
-            'elements': 'mean(air_temperature P1D),sum(precipitation_amount P1D),mean(wind_speed P1D)',  # Ønskede elementer
+            'elements': ','.join(FROST_ELEMENTS),  # Ønskede elementer
         }
         # Gjør en GET-forespørsel til Frost API for å hente værstasjoner
         sources_response = requests.get(self.sources_endpoint, params=sources_parameters, auth=(self.client_id, ''))
@@ -52,7 +72,7 @@ class WeatherDataFetcher:
         """
         observations_parameters = {
             'sources': self.source_id,  # ID for værstasjonen
-            'elements': 'mean(air_temperature P1D),sum(precipitation_amount P1D),mean(wind_speed P1D)',  # Ønskede elementer
+            'elements': ','.join(FROST_ELEMENTS),  # Ønskede elementer
             'referencetime': f'{self.from_date}/{self.to_date}',  # Tidsperiode
             'timeoffsets': 'default'  # Standard tidsforskyvning
         }
@@ -1,5 +1,14 @@
 import requests  # For å sende HTTP-forespørsler
 import json  # For å håndtere JSON-data
+import os
+import sys
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from data_collection.station_catalogue import load_catalogue
 
 class AirQualityDataFetcher:
     def __init__(self, latitude, longitude, fromtime, totime, radius=20):
@@ -41,6 +50,25 @@ class AirQualityDataFetcher:
             print(f"Feil ved henting av data: {response.status_code}")
             return None
 
+    def nearby_stations(self, catalogue=None):
+        """
+        Finner NILU-stasjonene innenfor radiusen i den lokale stasjonskatalogen, uten å spørre API-et.
+
+        Args:
+            catalogue (StationCatalogue, optional): Katalogen som skal brukes. Standard er den lagrede katalogen.
+
+        Returns:
+            list: Stasjonene sortert etter avstand, med avstanden i km under 'distance_km'.
+            None: Hvis katalogen ikke finnes og ikke kan hentes.
+        """
+        if catalogue is None:
+            catalogue = load_catalogue()
+        if catalogue is None:
+            return None
+        nilu = catalogue.subset(source='nilu', valid_from=self.fromtime, valid_to=self.totime)
+        distances, indices = nilu.within_radius(self.latitude, self.longitude, self.radius)
+        return [dict(nilu.stations[i], distance_km=float(d)) for d, i in zip(distances[0], indices[0])]
+
     def save_data(self, data, filename):
         """
         Lagrer data som en JSON-fil.
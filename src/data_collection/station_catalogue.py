@@ -0,0 +1,271 @@
+import os
+import json
+from datetime import datetime, timezone, timedelta
+import requests
+import numpy as np
+from sklearn.neighbors import BallTree
+
+# Lokal kopi av stasjonskatalogen, og hvor ofte den skal hentes på nytt
+CATALOGUE_FILE = 'data/raw/station_catalogue.json'
+REFRESH_DAYS = 7
+
+FROST_SOURCES_ENDPOINT = 'https://frost.met.no/sources/v0.jsonld'
+NILU_STATIONS_ENDPOINT = 'https://api.nilu.no/lookup/stations'
+
+# Elementene Frost-stasjonene i katalogen må måle (samme som i data_collection_frost_weather.py)
+FROST_ELEMENTS = ['mean(air_temperature P1D)', 'sum(precipitation_amount P1D)', 'mean(wind_speed P1D)']
+
+EARTH_RADIUS_KM = 6371.0
+
+class StationCatalogue:
+    """
+    Stasjonskatalog med et BallTree-indeks over koordinatene for raske oppslag.
+
+    Hver stasjon er en ordbok med 'id', 'name', 'source' ('frost' eller 'nilu'),
+    'latitude', 'longitude', 'elements', 'valid_from' og 'valid_to' (None for
+    stasjoner som fortsatt er i drift). Indeksen bruker haversine-avstand, slik
+    at nærmeste stasjoner og stasjoner innenfor en radius for tusenvis av
+    koordinater finnes i én spørring uten HTTP-kall.
+
+    Args:
+        stations (list): Stasjonene i katalogen
+        fetched_at (str): Tidspunktet katalogen ble hentet (ISO 8601, UTC)
+    """
+    def __init__(self, stations, fetched_at=None):
+        self.stations = list(stations)
+        self.fetched_at = fetched_at or datetime.now(timezone.utc).isoformat()
+        coordinates = np.radians([[station['latitude'], station['longitude']] for station in self.stations])
+        self.tree = BallTree(coordinates.reshape(-1, 2), metric='haversine') if self.stations else None
+
+    def __len__(self):
+        return len(self.stations)
+
+    def is_stale(self, refresh_days=REFRESH_DAYS):
+        """
+        Sjekker om katalogen er eldre enn oppdateringsintervallet.
+
+        Args:
+            refresh_days (float): Antall dager før katalogen skal hentes på nytt
+        Returns:
+            bool: True hvis katalogen bør hentes på nytt
+        """
+        fetched_at = datetime.fromisoformat(self.fetched_at)
+        return datetime.now(timezone.utc) - fetched_at > timedelta(days=refresh_days)
+
+    def subset(self, source=None, element=None, valid_from=None, valid_to=None):
+        """
+        Lager en ny katalog med stasjonene som passer filtrene.
+
+        Args:
+            source (str): Bare stasjoner fra denne kilden (valgfri)
+            element (str): Bare stasjoner som måler dette elementet (valgfri)
+            valid_from (str): Bare stasjoner i drift på eller etter denne datoen, 'YYYY-MM-DD' (valgfri)
+            valid_to (str): Bare stasjoner i drift på eller før denne datoen, 'YYYY-MM-DD' (valgfri)
+        Returns:
+            StationCatalogue: Katalog med de utvalgte stasjonene
+        """
+        def keep(station):
+            if source is not None and station['source'] != source:
+                return False
+            if element is not None and element not in station.get('elements', []):
+                return False
+            # Datoene er ISO 8601, så de første ti tegnene kan sammenlignes som tekst
+            if valid_from is not None and station.get('valid_to') and station['valid_to'][:10] < valid_from:
+                return False
+            if valid_to is not None and station.get('valid_from') and station['valid_from'][:10] > valid_to:
+                return False
+            return True
+        return StationCatalogue([station for station in self.stations if keep(station)], self.fetched_at)
+
+    def nearest(self, latitudes, longitudes, k=1):
+        """
+        Finner de k nærmeste stasjonene for hver koordinat.
+
+        Args:
+            latitudes (array-like): Breddegrader i grader
+            longitudes (array-like): Lengdegrader i grader
+            k (int): Antall stasjoner per koordinat
+        Returns:
+            tuple: (avstander i km, indekser i self.stations), begge med form (koordinater, k)
+        Raises:
+            ValueError: Hvis katalogen har færre enn k stasjoner
+        """
+        if len(self) < k:
+            raise ValueError(f"Katalogen har bare {len(self)} stasjoner, kan ikke finne {k} nærmeste")
+        distances, indices = self.tree.query(self._points(latitudes, longitudes), k=k)
+        return distances * EARTH_RADIUS_KM, indices
+
+    def within_radius(self, latitudes, longitudes, radius_km):
+        """
+        Finner alle stasjoner innenfor en radius av hver koordinat, sortert etter avstand.
+
+        Args:
+            latitudes (array-like): Breddegrader i grader
+            longitudes (array-like): Lengdegrader i grader
+            radius_km (float): Radius i kilometer
+        Returns:
+            tuple: (avstander i km, indekser i self.stations), som lister med én tabell per koordinat
+        """
+        if not len(self):
+            n = len(np.atleast_1d(latitudes))
+            return [np.empty(0)] * n, [np.empty(0, dtype=np.intp)] * n
+        indices, distances = self.tree.query_radius(self._points(latitudes, longitudes),
+                                                    r=radius_km / EARTH_RADIUS_KM, return_distance=True,
+                                                    sort_results=True)
+        return [distance * EARTH_RADIUS_KM for distance in distances], list(indices)
+
+    def nearest_station(self, latitude, longitude):
+        """
+        Henter den nærmeste stasjonen for én koordinat.
+
+        Args:
+            latitude (float): Breddegrad i grader
+            longitude (float): Lengdegrad i grader
+        Returns:
+            dict: Stasjonen, med avstanden i km under 'distance_km', eller None hvis katalogen er tom
+        """
+        if not len(self):
+            return None
+        distances, indices = self.nearest(latitude, longitude)
+        return dict(self.stations[indices[0, 0]], distance_km=float(distances[0, 0]))
+
+    def save(self, path=CATALOGUE_FILE):
+        """
+        Lagrer katalogen som JSON, atomisk via en midlertidig fil.
+
+        Args:
+            path (str): Filsti for katalogen
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'fetched_at': self.fetched_at, 'stations': self.stations}, file, indent=4)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CATALOGUE_FILE):
+        """
+        Leser en katalog lagret med save.
+
+        Args:
+            path (str): Filsti til katalogen
+        Returns:
+            StationCatalogue: Katalogen
+        """
+        with open(path, 'r') as file:
+            data = json.load(file)
+        return cls(data['stations'], data['fetched_at'])
+
+    @staticmethod
+    def _points(latitudes, longitudes):
+        return np.radians(np.column_stack([np.atleast_1d(latitudes), np.atleast_1d(longitudes)]).astype(float))
+
+def fetch_frost_stations(client_id, elements=FROST_ELEMENTS):
+    """
+    Henter alle Frost-stasjoner som måler elementene, med koordinater og gyldighetsperiode.
+
+    Args:
+        client_id (str): API-nøkkel for Frost
+        elements (list): Elementene stasjonene må måle
+    Returns:
+        list: Stasjonene i katalogformat, eller None ved feil
+    """
+    parameters = {'types': 'SensorSystem', 'elements': ','.join(elements)}
+    response = requests.get(FROST_SOURCES_ENDPOINT, params=parameters, auth=(client_id, ''))
+    if response.status_code != 200:
+        print('Feil ved henting av Frost-stasjoner! Returnert statuskode %s' % response.status_code)
+        return None
+
+    stations = []
+    for source in response.json()['data']:
+        coordinates = source.get('geometry', {}).get('coordinates')
+        if not coordinates:
+            continue
+        stations.append({
+            'id': source['id'], 'name': source.get('name', source['id']), 'source': 'frost',
+            'latitude': coordinates[1], 'longitude': coordinates[0], 'elements': list(elements),
+            'valid_from': source.get('validFrom'), 'valid_to': source.get('validTo')
+        })
+    return stations
+
+def fetch_nilu_stations():
+    """
+    Henter alle NILU-stasjoner med koordinater, komponenter og måleperiode.
+
+    Returns:
+        list: Stasjonene i katalogformat, eller None ved feil
+    """
+    response = requests.get(NILU_STATIONS_ENDPOINT)
+    if response.status_code != 200:
+        print(f"Feil ved henting av NILU-stasjoner: {response.status_code}")
+        return None
+
+    stations = []
+    for station in response.json():
+        if station.get('latitude') is None or station.get('longitude') is None:
+            continue
+        components = station.get('components') or ''
+        stations.append({
+            'id': str(station.get('eoi') or station.get('id') or station['station']),
+            'name': station['station'], 'source': 'nilu',
+            'latitude': station['latitude'], 'longitude': station['longitude'],
+            'elements': [component.strip() for component in components.split(',') if component.strip()],
+            'valid_from': station.get('firstMeasurment'), 'valid_to': station.get('lastMeasurment')
+        })
+    return stations
+
+def fetch_catalogue(client_id=None, previous=None):
+    """
+    Henter stasjonskatalogen fra Frost og NILU.
+
+    Frost hoppes over uten API-nøkkel. For en kilde som ikke kan hentes, beholdes
+    stasjonene fra den forrige katalogen.
+
+    Args:
+        client_id (str): API-nøkkel for Frost (valgfri)
+        previous (StationCatalogue): Den forrige katalogen (valgfri)
+    Returns:
+        StationCatalogue: Den nye katalogen, eller None hvis ingen kilder kunne hentes
+    """
+    fetchers = {'frost': (lambda: fetch_frost_stations(client_id)) if client_id else None,
+                'nilu': fetch_nilu_stations}
+    stations, fetched = [], False
+    for source, fetch in fetchers.items():
+        result = None
+        if fetch is not None:
+            try:
+                result = fetch()
+            except requests.RequestException as e:
+                print(f"Feil ved henting av stasjonskatalogen: {e}")
+        if result is not None:
+            fetched = True
+        elif previous is not None:
+            result = previous.subset(source=source).stations
+        stations.extend(result or [])
+    return StationCatalogue(stations) if fetched else None
+
+def load_catalogue(path=CATALOGUE_FILE, refresh_days=REFRESH_DAYS, client_id=None):
+    """
+    Henter stasjonskatalogen, helst fra den lokale kopien.
+
+    Kopien hentes på nytt hvis den mangler eller er eldre enn refresh_days. Hvis
+    hentingen feiler, brukes den gamle kopien så lenge den finnes.
+
+    Args:
+        path (str): Filsti til den lokale kopien
+        refresh_days (float): Antall dager før katalogen hentes på nytt
+        client_id (str): API-nøkkel for Frost (valgfri)
+    Returns:
+        StationCatalogue: Katalogen, eller None hvis den verken finnes lokalt eller kan hentes
+    """
+    catalogue = StationCatalogue.load(path) if os.path.exists(path) else None
+    if catalogue is not None and not catalogue.is_stale(refresh_days):
+        return catalogue
+
+    fresh = fetch_catalogue(client_id, catalogue)
+    if fresh is not None:
+        fresh.save(path)
+        return fresh
+    if catalogue is not None:
+        print(f"Bruker stasjonskatalogen fra {catalogue.fetched_at}, den kunne ikke oppdateres")
+    return catalogue
@@ -1,22 +1,6 @@
-import os
-import json
 import pandas as pd
 import plotly.graph_objects as go
-
-def get_cleaned_data_path(filename):
-    """
-    Genererer filstien til en renset datafil i 'data/clean'-mappen.
-
-    Args:
-        filename (str): Navnet på filen.
-
-    Returns:
-        str: Full filsti til den rensede datafilen.
-    """
-    return os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        'data', 'clean', filename
-    )
+from data_access.data_loader import get_cleaned_data_path, load_nilu_data  # Sentral innlasting av rensede data
 
 def nilu_plotly(json_file_path):
     """
@@ -28,12 +12,8 @@ def nilu_plotly(json_file_path):
     Returns:
         plotly.graph_objects.Figure: En interaktiv figur med luftkvalitetsdata.
     """
-    # Laster inn data fra JSON-filen
-    with open(json_file_path, 'r') as file:
-        df = pd.DataFrame(json.load(file))
-    
-    # Konverterer 'dateTime' til datetime-format for enklere håndtering
-    df['dateTime'] = pd.to_datetime(df['dateTime'])
+    # Laster inn data fra JSON-filen (cachet, 'dateTime' er allerede datetime)
+    df = load_nilu_data(json_file_path, columns=['NO2', 'PM2.5', 'PM10'])
     
     # Oppretter en Plotly-figur med linjediagrammer for NO2, PM2.5 og PM10
     fig = go.Figure([
@@ -1,16 +1,16 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from data_access import read_correlation_matrix
 
 def show_frost_correlation(csv_filsti):
     """
     Visualiserer korrelasjonsmatrisen for værdata ved hjelp av et heatmap.
 
     Args:
-        csv_filsti (str): Filsti til CSV-filen som inneholder korrelasjonsmatrisen.
+        csv_filsti (str): Filsti til korrelasjonstabellen (Parquet eller CSV).
     """
-    # Leser inn korrelasjonsmatrise fra CSV-fil
-    df = pd.read_csv(csv_filsti, index_col=0)
+    # Leser inn korrelasjonene og gjør dem om til en matrise
+    df = read_correlation_matrix(csv_filsti)
     
     # Lager et heatmap for å vise korrelasjon mellom variabler
     plt.figure(figsize=(8, 6))
@@ -1,9 +1,11 @@
+import os
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import sqlite3
+from data_access import load_frost_data, get_climatology, calendar_arrays
+from data_analysis.rolling_stats import rolling_statistics
 
-def plot_weather_components(db_path="data/clean/cleaned_data_frost.db"):
+def plot_weather_components(db_path="data/clean/cleaned_data_frost.db", rolling_window=30):
     """
     Leser inn værdata fra cleaned_data_frost.db og visualiserer utviklingen i temperatur, nedbør og vindhastighet.
     
@@ -11,16 +13,21 @@ def plot_weather_components(db_path="data/clean/cleaned_data_frost.db"):
     -----------
     db_path : str
         Filsti til SQLite-databasen som inneholder værdataene.
-    """
-    # Last inn data
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql("SELECT * FROM weather_data", conn)
-    conn.close()
-
-    df['referenceTime'] = pd.to_datetime(df['referenceTime'])
+    rolling_window : int
+        Vinduslengde i dager for det glidende gjennomsnittet som tegnes i tillegg.
 
+    Det klimatologiske normalområdet (5-95 %-kvantilene for dagen i året)
+    hentes fra den felles klimatologien i data/clean/climatology.
+    """
     # Velg komponenter og tilhørende titler
     components = ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed']
+
+    # Last inn data (cachet, 'referenceTime' er allerede datetime)
+    # Flaggene for imputerte verdier trengs for å kjenne igjen den lagrede klimatologien
+    df = load_frost_data(db_path, columns=components + [f'generated_{comp}' for comp in components])
+    rolling = rolling_statistics(df, 'referenceTime', components, windows=(rolling_window,))
+    climatology = get_climatology('frost', df, 'referenceTime', components, clean_dir=os.path.dirname(db_path))
+    day_of_year = calendar_arrays(df['referenceTime'])['day_of_year']
     titles = {
         'mean_air_temperature': "Utvikling i temperatur (daglig)",
         'total_precipitation': "Utvikling i nedbør (daglig)",
@@ -43,6 +50,14 @@ def plot_weather_components(db_path="data/clean/cleaned_data_frost.db"):
             line_kws={"color": "crimson"},
             lowess=True
         )
+        normal_x = (df['referenceTime'] - data['referenceTime'].min()).dt.days
+        axes[i].fill_between(normal_x, climatology.quantile(comp, 0.05, day_of_year),
+                             climatology.quantile(comp, 0.95, day_of_year), color='grey', alpha=0.2,
+                             label="Klimatologisk normalområde (5-95 %)")
+        rolling_x = (rolling.index - data['referenceTime'].min()).days
+        axes[i].plot(rolling_x, rolling[f'{comp}_{rolling_window}d_mean'], color='darkorange',
+                     linewidth=1.5, label=f"{rolling_window}-dagers glidende gjennomsnitt")
+        axes[i].legend(loc='upper right')
 
         tick_step = max(1, int(len(data) / 8))
         tick_pos = data['x_temp'][::tick_step]
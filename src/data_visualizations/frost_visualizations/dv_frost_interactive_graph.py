@@ -1,6 +1,6 @@
 import pandas as pd
 import plotly.express as px
-import sqlite3
+from data_access import query_frost, SEASON_NAMES_NO
 
 def plot_seasonal_weather_from_sqlite(db_path: str, table_name: str = "weather_data"):
     """
@@ -10,32 +10,13 @@ def plot_seasonal_weather_from_sqlite(db_path: str, table_name: str = "weather_d
     - db_path (str): Filsti til SQLite-database (f.eks. 'data/clean/cleaned_data_frost.db')
     - table_name (str): Navn på tabellen i databasen (default: 'weather_data')
     """
+    columns_to_analyze = ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed']
 
-    # Hent data
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql(f'SELECT * FROM {table_name}', conn)
-    conn.close()
-
-    # Konverter dato
-    df['referenceTime'] = pd.to_datetime(df['referenceTime'])
-    df['year'] = df['referenceTime'].dt.year
-
-    # Legg til sesong
-    def get_season(month):
-        if month in [12, 1, 2]:
-            return 'Vinter'
-        elif month in [3, 4, 5]:
-            return 'Vår'
-        elif month in [6, 7, 8]:
-            return 'Sommer'
-        else:
-            return 'Høst'
-
-    df['season'] = df['referenceTime'].dt.month.apply(get_season)
+    # Aggreger sesongvis i SQLite (uten å fylle ut manglende)
+    seasonal_avg = query_frost(columns_to_analyze, agg='seasonal', db_path=db_path, table_name=table_name)
 
-    # Aggreger sesongvis (uten å fylle ut manglende)
-    columns_to_analyze = ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed']
-    seasonal_avg = df.groupby(['year', 'season'])[columns_to_analyze].mean(numeric_only=True).reset_index()
+    # Bruk norske sesongnavn
+    seasonal_avg['season'] = seasonal_avg['season'].map(SEASON_NAMES_NO)
 
     # Langformat for plot
     df_long = seasonal_avg.melt(
@@ -1,28 +1,23 @@
-import sqlite3
 import pandas as pd
 import plotly.graph_objects as go
+from data_access import load_frost_data
 
-def plot_weather_data(db_path="data/clean/cleaned_data_frost.db"):
+def plot_weather_data(db_path="data/clean/cleaned_data_frost.db", start=None, end=None):
     """
     Visualiserer værdata fra en SQLite-database ved hjelp av Plotly.
 
     Args:
         db_path (str): Filsti til SQLite-databasen som inneholder værdata.
+        start (str, optional): Første dato som skal vises (inklusiv). Standard er hele perioden.
+        end (str, optional): Siste dato som skal vises (inklusiv).
 
     Returns:
         plotly.graph_objects.Figure: En interaktiv figur med værdata.
     """
-    # Koble til databasen og hent data
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("""
-        SELECT referenceTime, mean_air_temperature, total_precipitation, mean_wind_speed
-        FROM weather_data
-        WHERE referenceTime IS NOT NULL
-    """, conn)
-    conn.close()  # Lukk tilkoblingen til databasen
-
-    # Konverter 'referenceTime' til datetime-format
-    df['referenceTime'] = pd.to_datetime(df['referenceTime'])
+    # Hent kun radene som vises (cachet, 'referenceTime' er allerede datetime)
+    df = load_frost_data(db_path, columns=['mean_air_temperature', 'total_precipitation', 'mean_wind_speed'],
+                         start=start, end=end)
+    df = df.dropna(subset=['referenceTime'])
 
     # Initialiser figuren
     fig = go.Figure()
@@ -1,27 +1,23 @@
-import sqlite3
 import pandas as pd
 import matplotlib.pyplot as plt
 import calendar
 import numpy as np
+from data_access import load_frost_data
 
-def show_percipitation(db_path="data/clean/cleaned_data_frost.db"):
+def show_percipitation(db_path="data/clean/cleaned_data_frost.db", start=None, end=None):
     """
     Visualiserer gjennomsnittlig daglig nedbør per måned med standardavvik som feilmarginer.
 
     Args:
         db_path (str): Filsti til SQLite-databasen som inneholder værdata.
+        start (str, optional): Første dato som tas med (inklusiv). Standard er hele perioden.
+        end (str, optional): Siste dato som tas med (inklusiv).
     """
-    # Koble til databasen og hent data
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("""
-        SELECT referenceTime, total_precipitation
-        FROM weather_data
-        WHERE total_precipitation IS NOT NULL
-    """, conn)
-    conn.close()  # Lukk tilkoblingen til databasen
+    # Hent kun nedbør for perioden (cachet, 'referenceTime' er allerede datetime)
+    df = load_frost_data(db_path, columns=['total_precipitation'], start=start, end=end)
+    df = df.dropna(subset=['total_precipitation'])
 
-    # Konverter 'referenceTime' til datetime-format og grupper data per dag
-    df['referenceTime'] = pd.to_datetime(df['referenceTime'])
+    # Grupper data per dag
     daily_precip = (
         df.groupby(df['referenceTime'].dt.date)['total_precipitation']
         .sum()
@@ -1,7 +1,6 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import sqlite3
+from data_analysis.box_stats import load_box_statistics, to_bxp_stats, MONTH_LABELS
 
 def show_temp(db_path):
     """
@@ -10,25 +9,15 @@ def show_temp(db_path):
     Args:
         db_path (str): Filsti til SQLite-databasen som inneholder værdata.
     """
-    # Koble til databasen og hent data
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql("SELECT referenceTime, mean_air_temperature FROM weather_data", conn)
-    conn.close()  # Lukk tilkoblingen til databasen
+    # Hent kvartiler, whiskers og uteliggere per måned, forhåndsberegnet av analysen
+    stats, outliers = load_box_statistics('frost', db_path, 'mean_air_temperature')
+    boxes = to_bxp_stats(stats, outliers, MONTH_LABELS)
 
-    # Forbered data for visualisering
-    df['referenceTime'] = pd.to_datetime(df['referenceTime'])  # Konverter til datetime-format
-    df['month'] = df['referenceTime'].dt.strftime('%b')  # Ekstraher månednavn
-    df['month_num'] = df['referenceTime'].dt.month  # Ekstraher måned som tall
-    df = df.sort_values('month_num')  # Sorter etter måned for korrekt rekkefølge
-
-    # Lag boxplot for å vise temperaturfordeling per måned
-    plt.figure(figsize=(12, 6)) 
-    sns.boxplot(
-        data=df, 
-        x='month', 
-        y='mean_air_temperature', 
-        palette='coolwarm'  # Fargepalett for bedre visualisering
-    )
+    # Lag boxplot for å vise temperaturfordeling per måned, tegnet direkte fra statistikken
+    fig, ax = plt.subplots(figsize=(12, 6))
+    artists = ax.bxp(boxes, patch_artist=True, medianprops={'color': 'black'})
+    for patch, color in zip(artists['boxes'], sns.color_palette('coolwarm', len(boxes))):  # Fargepalett for bedre visualisering
+        patch.set_facecolor(color)
     plt.title("Boxplot av daglig middeltemperatur per måned", fontsize=14)  # Tittel for plottet
     plt.xlabel("Måned", fontsize=12)  # Etikett for x-aksen
     plt.ylabel("Temperatur (°C)", fontsize=12)  # Etikett for y-aksen
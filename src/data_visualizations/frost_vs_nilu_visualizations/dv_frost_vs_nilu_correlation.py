@@ -1,18 +1,18 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from data_access import read_analysis_table, read_correlation_matrix
 
 def show_correlation_together(frost_csv, nilu_csv):
     """
     Visualiserer korrelasjonsmatriser for FROST- og NILU-data ved hjelp av heatmaps.
 
     Args:
-        frost_csv (str): Filsti til CSV-filen som inneholder korrelasjonsmatrisen for FROST-data.
-        nilu_csv (str): Filsti til CSV-filen som inneholder korrelasjonsmatrisen for NILU-data.
+        frost_csv (str): Filsti til korrelasjonstabellen for FROST-data (Parquet eller CSV).
+        nilu_csv (str): Filsti til korrelasjonstabellen for NILU-data (Parquet eller CSV).
     """
-    # Les inn korrelasjonsmatriser fra CSV-filer
-    frost_df = pd.read_csv(frost_csv, index_col=0)  # FROST-data
-    nilu_df = pd.read_csv(nilu_csv, index_col=0)  # NILU-data
+    # Les inn korrelasjonene og gjør dem om til matriser
+    frost_df = read_correlation_matrix(frost_csv)  # FROST-data
+    nilu_df = read_correlation_matrix(nilu_csv)  # NILU-data
 
     # Opprett en figur med to subplot (side ved side)
     fig, axes = plt.subplots(1, 2, figsize=(16, 6))  # 1 rad, 2 kolonner
@@ -45,4 +45,42 @@ def show_correlation_together(frost_csv, nilu_csv):
     plt.tight_layout()
 
     # Vis figuren
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+def show_lagged_correlation(lagged_csv):
+    """
+    Visualiserer forskjøvede korrelasjoner mellom værvariabler og luftkomponenter, per årstid.
+
+    Hver rute viser korrelasjonen mellom én værvariabel og én komponent som
+    funksjon av lag i dager; positivt lag betyr at luftkvaliteten måles etter været.
+
+    Args:
+        lagged_csv (str): Filsti til tabellen med forskjøvede korrelasjoner (fra data_analysis_frost_nilu).
+    """
+    # Les inn korrelasjonene i langt format (årstid, lag, x, y)
+    lagged = read_analysis_table(lagged_csv).astype({'season': str, 'x': str, 'y': str})
+    weather = list(dict.fromkeys(lagged['x']))
+    pollutants = list(dict.fromkeys(lagged['y']))
+
+    fig, axes = plt.subplots(len(weather), len(pollutants), figsize=(16, 10), sharex=True, sharey=True,
+                             squeeze=False)
+    for i, x in enumerate(weather):
+        for j, y in enumerate(pollutants):
+            pair = lagged[(lagged['x'] == x) & (lagged['y'] == y)]
+            ax = axes[i][j]
+            # Én linje per årstid, med alle dager som tykkere linje
+            for season, group in pair.groupby('season', sort=False):
+                ax.plot(group['lag'], group['correlation'], label=season,
+                        linewidth=2.5 if season == 'All' else 1.0)
+            ax.axhline(0, color='gray', linewidth=0.5)
+            ax.axvline(0, color='gray', linewidth=0.5, linestyle='--')
+            ax.set_title(f"{x} mot {y}", fontsize=10)
+            if i == len(weather) - 1:
+                ax.set_xlabel('Lag (dager)')
+            if j == 0:
+                ax.set_ylabel('Korrelasjon')
+
+    axes[0][-1].legend(loc='upper right', fontsize=8)
+    plt.suptitle('Forskjøvet korrelasjon mellom vær (Frost) og luftkvalitet (NILU)', fontsize=14)
+    plt.tight_layout(rect=[0, 0, 1, 0.96])
+    plt.show()
@@ -1,7 +1,9 @@
 import pandas as pd
 import seaborn as sns
+import numpy as np
 import matplotlib.pyplot as plt
-import sqlite3
+from data_access import load_joined_daily
+from data_analysis.bootstrap import bootstrap_regression_band
 
 def plot_temperature_vs_pm25(nilu_json_path, frost_db_path):
     """
@@ -12,33 +14,9 @@ def plot_temperature_vs_pm25(nilu_json_path, frost_db_path):
         nilu_json_path (str): Filsti til JSON-filen som inneholder NILU-data.
         frost_db_path (str): Filsti til SQLite-databasen som inneholder FROST-data.
     """
-    # Last inn daglig NILU-data
-    nilu = pd.read_json(nilu_json_path)
-    nilu['dateTime'] = pd.to_datetime(nilu['dateTime'])  # Konverter til datetime-format
-
-    # Last inn daglig FROST-data
-    conn = sqlite3.connect(frost_db_path)
-    frost = pd.read_sql("SELECT referenceTime, mean_air_temperature FROM weather_data", conn)
-    conn.close()  # Lukk tilkoblingen til databasen
-    frost['referenceTime'] = pd.to_datetime(frost['referenceTime'])  # Konverter til datetime-format
-
-    # Merge data på dato
-    nilu['date'] = nilu['dateTime'].dt.date  # Ekstraher dato fra NILU-data
-    frost['date'] = frost['referenceTime'].dt.date  # Ekstraher dato fra FROST-data
-    merged = pd.merge(nilu, frost, on='date')  # Slå sammen datasettene basert på dato
-
-    # Legg til sesong basert på måned
-    def get_season(month):
-        if month in [12, 1, 2]:
-            return 'Winter'
-        elif month in [3, 4, 5]:
-            return 'Spring'
-        elif month in [6, 7, 8]:
-            return 'Summer'
-        else:
-            return 'Fall'
-
-    merged['season'] = pd.to_datetime(merged['date']).dt.month.apply(get_season)
+    # Last inn den ferdig sammenslåtte dagstabellen (oppdateres kun hvis en av kildene er endret)
+    merged = load_joined_daily(['mean_air_temperature', 'PM2.5'],
+                               frost_db_path=frost_db_path, nilu_json_path=nilu_json_path)
 
     # Fjern manglende verdier
     merged = merged.dropna(subset=['mean_air_temperature', 'PM2.5'])
@@ -81,8 +59,11 @@ def plot_temperature_vs_pm25(nilu_json_path, frost_db_path):
             scatter_kws={"s": 10, "alpha": 0.3, "color": point_color},  # Stil for datapunkter
             line_kws={"color": "crimson", "lw": 2},  # Stil for regresjonslinjen
             color="crimson",
-            ci=95  # Konfidensintervall
+            ci=None  # Konfidensbåndet beregnes under, med blokk-bootstrap for daglige data
         )
+        x_grid = np.linspace(data['mean_air_temperature'].min(), data['mean_air_temperature'].max(), 100)
+        low, high = bootstrap_regression_band(data['mean_air_temperature'], data['PM2.5'], x_grid, block_length=7)
+        axes[i].fill_between(x_grid, low, high, color="crimson", alpha=0.15)  # 95 % konfidensintervall
 
         # Legg til tittel og akseetiketter
         axes[i].set_title(season, fontsize=14)
@@ -1,7 +1,9 @@
 import pandas as pd
 import seaborn as sns
+import numpy as np
 import matplotlib.pyplot as plt
-import json
+from data_access import load_nilu_data
+from data_analysis.bootstrap import bootstrap_regression_band
 
 def show_pm10_vs_no2(json_path):
     """
@@ -10,24 +12,10 @@ def show_pm10_vs_no2(json_path):
     Args:
         json_path (str): Filsti til JSON-filen som inneholder NILU-data.
     """
-    # Leser inn NILU-data fra JSON-fil
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    # Konverterer data til en DataFrame og legger til dato
-    nilu = pd.DataFrame(data)
-    nilu['dateTime'] = pd.to_datetime(nilu['dateTime'])
+    # Leser inn NILU-data (cachet, med sesong basert på måned) og legger til dato
+    nilu = load_nilu_data(json_path, columns=['PM10', 'NO2'])
     nilu['date'] = nilu['dateTime'].dt.date
 
-    # Legger til sesong basert på måned
-    def get_season(month):
-        if month in [12, 1, 2]: return 'Winter'
-        if month in [3, 4, 5]: return 'Spring'
-        if month in [6, 7, 8]: return 'Summer'
-        return 'Fall'
-
-    nilu['season'] = nilu['dateTime'].dt.month.apply(get_season)
-
     # Filtrer nødvendige kolonner og fjern rader med manglende verdier
     df = nilu[['date', 'PM10', 'NO2', 'season']].dropna()
 
@@ -66,9 +54,12 @@ def show_pm10_vs_no2(json_path):
             ax=axes[i],
             scatter_kws={"s": 12, "alpha": 0.3, "color": season_colors[season]},  # Stil for datapunkter
             line_kws={"color": "crimson", "lw": 2},  # Stil for regresjonslinjen
-            ci=95,  # Konfidensintervall
+            ci=None,  # Konfidensbåndet beregnes under, med blokk-bootstrap for daglige data
             color="crimson"
         )
+        x_grid = np.linspace(data['PM10'].min(), data['PM10'].max(), 100)
+        low, high = bootstrap_regression_band(data['PM10'], data['NO2'], x_grid, block_length=7)
+        axes[i].fill_between(x_grid, low, high, color="crimson", alpha=0.15)  # 95 % konfidensintervall
 
         # Legg til tittel, akseetiketter og forklaring for sesongen
         axes[i].set_title(season, fontsize=14)
@@ -1,16 +1,16 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from data_access import read_correlation_matrix
 
 def vis_korrelasjon_nilu(csv_path):
     """
     Visualiserer korrelasjonsmatrisen for NILU-data ved hjelp av et heatmap.
 
     Args:
-        csv_path (str): Filsti til CSV-filen som inneholder korrelasjonsmatrisen for NILU-data.
+        csv_path (str): Filsti til korrelasjonstabellen for NILU-data (Parquet eller CSV).
     """
-    # Leser inn korrelasjonsmatrise fra CSV-fil
-    corr_df = pd.read_csv(csv_path, index_col=0)  # Bruk første kolonne som indeks
+    # Leser inn korrelasjonene og gjør dem om til en matrise
+    corr_df = read_correlation_matrix(csv_path)
 
     # Opprett en figur og lag et heatmap
     plt.figure(figsize=(8, 6))  # Sett figurstørrelse
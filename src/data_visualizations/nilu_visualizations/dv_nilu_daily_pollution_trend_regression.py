@@ -1,21 +1,30 @@
+import os
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from data_access import load_nilu_data, get_climatology, calendar_arrays
+from data_analysis.rolling_stats import rolling_statistics
 
-def show_regretion(json_path):
+def show_regretion(json_path, rolling_window=30):
     """
     Visualiserer daglig utvikling i luftforurensningsnivåer (NO2, PM10, PM2.5) 
-    ved hjelp av regresjonsplot.
+    ved hjelp av regresjonsplot og et glidende gjennomsnitt, med det klimatologiske
+    normalområdet (5-95 %-kvantilene for dagen i året) fra den felles klimatologien.
 
     Args:
         json_path (str): Filsti til JSON-filen som inneholder NILU-data.
+        rolling_window (int): Vinduslengde i dager for det glidende gjennomsnittet.
     """
-    # Les inn NILU-data og konverter datoer
-    df = pd.read_json(json_path)
-    df['dateTime'] = pd.to_datetime(df['dateTime'])
-
     # Luftkomponenter som skal analyseres
     components = ['NO2', 'PM10', 'PM2.5']
+
+    # Les inn NILU-data (cachet, 'dateTime' er allerede datetime)
+    # Flaggene for imputerte verdier trengs for å kjenne igjen den lagrede klimatologien
+    df = load_nilu_data(json_path, columns=components + [f'generated_{comp}' for comp in components])
+    # Glidende gjennomsnitt for alle komponentene i én beregning
+    rolling = rolling_statistics(df, 'dateTime', components, windows=(rolling_window,))
+    climatology = get_climatology('nilu', df, 'dateTime', components, clean_dir=os.path.dirname(json_path))
+    day_of_year = calendar_arrays(df['dateTime'])['day_of_year']
     titles = {
         'NO2': "Utvikling i NO2-nivåer (daglig)",
         'PM10': "Utvikling i PM10-nivåer (daglig)",
@@ -41,6 +50,14 @@ def show_regretion(json_path):
             scatter_kws={"s": 12, "alpha": 0.6},
             line_kws={"color": "crimson"}
         )
+        normal_x = (df['dateTime'] - data['dateTime'].min()).dt.days
+        axes[i].fill_between(normal_x, climatology.quantile(comp, 0.05, day_of_year),
+                             climatology.quantile(comp, 0.95, day_of_year), color='grey', alpha=0.2,
+                             label="Klimatologisk normalområde (5-95 %)")
+        rolling_x = (rolling.index - data['dateTime'].min()).days
+        axes[i].plot(rolling_x, rolling[f'{comp}_{rolling_window}d_mean'], color='darkorange',
+                     linewidth=1.5, label=f"{rolling_window}-dagers glidende gjennomsnitt")
+        axes[i].legend(loc='upper right')
 
         # Tilpass x-aksen med datoetiketter
         tick_step = max(1, int(len(data) / 8))
@@ -1,6 +1,6 @@
 import pandas as pd
 import plotly.express as px
-import json
+from data_access import load_nilu_data, SEASON_NAMES_NO
 
 def plot_seasonal_air_quality(json_path: str):
     """
@@ -10,32 +10,15 @@ def plot_seasonal_air_quality(json_path: str):
     Parametre:
     - json_path (str): Filsti til renset NILU-JSON (f.eks. 'data/clean/cleaned_data_nilu.json')
     """
-
-    # Last inn JSON manuelt
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    # Lag DataFrame
-    df = pd.DataFrame(data)
-    df['dateTime'] = pd.to_datetime(df['dateTime'])
-    df['year'] = df['dateTime'].dt.year
-
-    # Legg til sesong
-    def get_season(month):
-        if month in [12, 1, 2]:
-            return "Vinter"
-        elif month in [3, 4, 5]:
-            return "Vår"
-        elif month in [6, 7, 8]:
-            return "Sommer"
-        else:
-            return "Høst"
-
-    df['season'] = df['dateTime'].dt.month.apply(get_season)
-
     # Kolonner å analysere (forutsetter at data er ferdigrenset)
     columns_to_analyze = ['NO2', 'PM10', 'PM2.5']
 
+    # Last inn data (cachet, med år og sesong)
+    df = load_nilu_data(json_path, columns=columns_to_analyze)
+
+    # Bruk norske sesongnavn
+    df['season'] = df['season'].map(SEASON_NAMES_NO)
+
     # Aggregering
     seasonal_avg = df.groupby(['year', 'season'])[columns_to_analyze].mean(numeric_only=True).reset_index()
 
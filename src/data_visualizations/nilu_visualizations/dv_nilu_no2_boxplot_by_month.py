@@ -1,7 +1,6 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import json
+from data_analysis.box_stats import load_box_statistics, to_bxp_stats, MONTH_LABELS
 
 def show_no2(json_path):
     """
@@ -10,24 +9,15 @@ def show_no2(json_path):
     Args:
         json_path (str): Filsti til JSON-filen som inneholder NILU-data.
     """
-    # Laster inn renset NILU-data fra JSON-fil
-    with open(json_path, "r") as f:
-        data = json.load(f)
+    # Henter kvartiler, whiskers og uteliggere per måned, forhåndsberegnet av analysen
+    stats, outliers = load_box_statistics('nilu', json_path, 'NO2')
+    boxes = to_bxp_stats(stats, outliers, MONTH_LABELS)
 
-    # Konverterer data til en DataFrame
-    df = pd.DataFrame(data)
-    df['dateTime'] = pd.to_datetime(df['dateTime'])  # Konverterer 'dateTime' til datetime-format
-
-    # Legger til kolonner for månednavn og månednummer
-    df['month'] = df['dateTime'].dt.strftime('%b')  # Månednavn (kort format, f.eks. Jan)
-    df['month_num'] = df['dateTime'].dt.month  # Måned som tall
-
-    # Sorterer DataFrame for riktig månedrekkefølge
-    df = df.sort_values('month_num')
-
-    # Oppretter boxplot for å vise fordelingen av NO2-nivåer per måned
-    plt.figure(figsize=(12, 6))  # Setter figurstørrelse
-    sns.boxplot(data=df, x='month', y='NO2', palette='Blues', fliersize=3)  # Boxplot med fargepalett
+    # Tegner boxplot direkte fra statistikken, uten å sende rådataene til plottebiblioteket
+    fig, ax = plt.subplots(figsize=(12, 6))  # Setter figurstørrelse
+    artists = ax.bxp(boxes, patch_artist=True, flierprops={'markersize': 3}, medianprops={'color': 'black'})
+    for patch, color in zip(artists['boxes'], sns.color_palette('Blues', len(boxes))):  # Fargepalett
+        patch.set_facecolor(color)
     plt.title("Boxplot av månedlige NO2-nivå (μg/m³)", fontsize=14)  # Tittel for plottet
     plt.xlabel("Måned", fontsize=12)  # Etikett for x-aksen
     plt.ylabel("NO2 (μg/m³)", fontsize=12)  # Etikett for y-aksen
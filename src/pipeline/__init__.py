@@ -0,0 +1,3 @@
+from .stage_cache import *
+from .stages import *
+from .pipeline_runner import run_pipeline, critical_path
@@ -0,0 +1,10 @@
+import sys
+import os
+
+# Legg til prosjektets src-mappe i sys.path, slik at 'python src/pipeline' fungerer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+
+from pipeline.pipeline_runner import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from pipeline.stage_cache import StageCache, get_stage_cache_path
+from pipeline.stages import get_stages, prepare_stage, complete_stage, call_in_project_root
+
+def resolve_dependencies(stages):
+    """
+    Fjerner avhengigheter til steg som ikke er valgt, og sjekker at grafen er uten sykler.
+
+    Et steg som avhenger av et steg som ikke er med (f.eks. 'collect_frost' uten
+    --collect) bruker utdataene som allerede ligger på disk.
+
+    Args:
+        stages (list[Stage]): Stegene som skal kjøres.
+
+    Returns:
+        dict: Avhengighetene til hvert steg, begrenset til de valgte stegene.
+
+    Raises:
+        ValueError: Ved dupliserte stegnavn eller sykliske avhengigheter.
+    """
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Stegnavn må være unike: {names}")
+    dependencies = {stage.name: [name for name in stage.depends_on if name in names] for stage in stages}
+
+    # Kahns algoritme: alle steg må kunne ordnes topologisk
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Sykliske avhengigheter mellom stegene: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return dependencies
+
+def critical_path(dependencies, durations):
+    """
+    Finner den lengste kjeden av avhengige steg, målt i kjøretid.
+
+    Args:
+        dependencies (dict): Avhengighetene til hvert steg.
+        durations (dict): Kjøretid i sekunder per steg.
+
+    Returns:
+        tuple[list, float]: Stegene i kjeden og samlet kjøretid.
+    """
+    finish = {}
+    previous = {}
+
+    def longest(name):
+        if name not in finish:
+            best = max(dependencies[name], key=longest, default=None)
+            previous[name] = best
+            finish[name] = durations.get(name, 0.0) + (finish[best] if best is not None else 0.0)
+        return finish[name]
+
+    if not dependencies:
+        return [], 0.0
+    end = max(dependencies, key=longest)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = previous[end]
+    return path[::-1], finish[path[0]]
+
+def _init_worker(paths):
+    """
+    Gjør prosjektets moduler tilgjengelige i arbeiderprosessene og slår av interaktive figurer.
+    """
+    for path in paths:
+        if path not in sys.path:
+            sys.path.append(path)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+def _execute(func, project_root):
+    """
+    Kjører en stegfunksjon i en arbeiderprosess og måler tiden.
+
+    Returns:
+        tuple[float, float]: Start- og sluttidspunkt (time.time()).
+    """
+    start = time.time()
+    call_in_project_root(func, project_root)
+    return start, time.time()
+
+def print_timing_report(results, timings, dependencies, wall_time):
+    """
+    Skriver ut kjøretid per steg og den kritiske stien.
+
+    Args:
+        results (dict): Status per steg.
+        timings (dict): (start, slutt) i sekunder fra pipelinens start, per kjørt steg.
+        dependencies (dict): Avhengighetene til hvert steg.
+        wall_time (float): Total kjøretid for pipelinen.
+    """
+    durations = {name: end - start for name, (start, end) in timings.items()}
+    print("\nKjøretid per steg:")
+    for name, status in results.items():
+        if name in timings:
+            start, end = timings[name]
+            print(f"  {name:<15} {status:<8} {durations[name]:7.2f} s  (start {start:6.2f} s, slutt {end:6.2f} s)")
+        else:
+            print(f"  {name:<15} {status:<8}")
+
+    if not timings:
+        print(f"\nIngen steg ble kjørt; alt var oppdatert ({wall_time:.2f} s).")
+        return
+    path, length = critical_path(dependencies, durations)
+    print(f"\nKritisk sti: {' -> '.join(path)} ({length:.2f} s)")
+    print(f"Sum av alle steg: {sum(durations.values()):.2f} s, total kjøretid: {wall_time:.2f} s")
+
+def run_pipeline(project_root, names=None, collect=False, force=False, max_workers=None, stages=None):
+    """
+    Kjører pipelinen som en avhengighetsgraf, med uavhengige steg i parallell.
+
+    Steg hvis avhengigheter er ferdige sendes til en prosesspool, slik at
+    Frost- og NILU-grenen kjører samtidig. Uendrede steg hoppes over ved hjelp
+    av stegcachen, og steg som avhenger av et feilet steg kjøres ikke.
+
+    Args:
+        project_root (str): Stien til prosjektets rot-mappe.
+        names (list, optional): Navn på stegene som skal kjøres. Standard er alle.
+        collect (bool): Hent nye rådata fra API-ene først.
+        force (bool): Kjør alle valgte steg uansett fingeravtrykk.
+        max_workers (int, optional): Antall prosesser. Standard er antall CPU-er.
+        stages (list, optional): Stegene som skal brukes. Standard er get_stages().
+
+    Returns:
+        dict: Status per steg ('skipped', 'ran', 'failed' eller 'blocked').
+    """
+    stages = stages if stages is not None else get_stages(include_collect=collect)
+    if names is not None:
+        unknown = set(names) - {stage.name for stage in stages}
+        if unknown:
+            raise ValueError(f"Ukjente steg: {sorted(unknown)}")
+        stages = [stage for stage in stages if stage.name in names]
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = resolve_dependencies(stages)
+
+    cache = StageCache(get_stage_cache_path(project_root))
+    results = {}
+    timings = {}
+    running = {}
+    fingerprints = {}
+    pipeline_start = time.time()
+    worker_paths = [p for p in sys.path if p]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(worker_paths,)) as executor:
+        while len(results) < len(stages):
+            # Start alle steg som ikke venter på noe
+            for name, deps in dependencies.items():
+                if name in results or name in running.values():
+                    continue
+                if any(results.get(dep) in ('failed', 'blocked') for dep in deps):
+                    print(f"Hopper over '{name}': et steg det avhenger av feilet.")
+                    results[name] = 'blocked'
+                    continue
+                if not all(results.get(dep) in ('skipped', 'ran') for dep in deps):
+                    continue
+                fingerprint = prepare_stage(by_name[name], project_root, cache, force)
+                if fingerprint is None:
+                    results[name] = 'skipped'
+                    continue
+                print(f"Kjører '{name}'...")
+                fingerprints[name] = fingerprint
+                running[executor.submit(_execute, by_name[name].func, project_root)] = name
+
+            if not running:
+                continue
+
+            # Vent til minst ett steg er ferdig
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    start, end = future.result()
+                    timings[name] = (start - pipeline_start, end - pipeline_start)
+                    results[name] = complete_stage(by_name[name], project_root, cache, fingerprints[name])
+                except BaseException as e:
+                    print(f"Feil i steget '{name}': {e}")
+                    cache.invalidate(name)
+                    results[name] = 'failed'
+                cache.save()
+
+    cache.save()
+    ordered = {stage.name: results[stage.name] for stage in stages}
+    print_timing_report(ordered, timings, dependencies, time.time() - pipeline_start)
+    return ordered
+
+def main(argv=None):
+    """
+    Kommandolinjegrensesnitt for pipelinen.
+
+    Eksempler:
+        python src/pipeline --collect
+        python src/pipeline --stages clean_nilu analyse_nilu --workers 2
+    """
+    parser = argparse.ArgumentParser(prog='pipeline', description="Kjør rensing, analyse og figurer som en avhengighetsgraf.")
+    parser.add_argument('--stages', nargs='+', help="Stegene som skal kjøres (standard: alle)")
+    parser.add_argument('--collect', action='store_true', help="Hent nye rådata fra Frost og NILU først")
+    parser.add_argument('--force', action='store_true', help="Kjør stegene selv om inndata er uendret")
+    parser.add_argument('--workers', type=int, default=None, help="Antall prosesser (standard: antall CPU-er)")
+    parser.add_argument('--list', action='store_true', help="Vis stegene og avhengighetene deres")
+    parser.add_argument('--root', default=project_root, help="Prosjektets rot-mappe")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for stage in get_stages(include_collect=True):
+            print(f"{stage.name:<15} <- {', '.join(stage.depends_on) or '-'}")
+        return {}
+    return run_pipeline(args.root, args.stages, args.collect, args.force, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+
+# Filen i 'data'-mappen der fingeravtrykkene til stegene lagres
+STAGE_CACHE_FILENAME = 'stage_cache.json'
+
+# Filer leses i biter på 1 MB når innholdet hashes
+CHUNK_SIZE = 1 << 20
+
+def get_stage_cache_path(project_root):
+    """
+    Returnerer filstien til stegcachen.
+
+    Args:
+        project_root (str): Stien til prosjektets rot-mappe.
+
+    Returns:
+        str: Filsti til 'data/stage_cache.json'.
+    """
+    return os.path.join(project_root, 'data', STAGE_CACHE_FILENAME)
+
+def _file_stat(path):
+    """
+    Henter størrelse og endringstidspunkt for en fil.
+    """
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class StageCache:
+    """
+    Holder fingeravtrykk for pipeline-stegene og hasher av filene de leser.
+
+    Et fingeravtrykk er en SHA-256 av innholdet i inndatafilene, parameterne
+    og kildekoden til steget. Hasher av filer gjenbrukes så lenge størrelse
+    og endringstidspunkt er uendret, slik at store filer ikke leses hver gang.
+    """
+    def __init__(self, path):
+        """
+        Åpner stegcachen. En manglende eller ødelagt fil gir en tom cache.
+
+        Args:
+            path (str): Filsti til JSON-filen med fingeravtrykk.
+        """
+        self.path = path
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.stages = data.get('stages', {})
+        self.files = data.get('files', {})
+
+    def hash_file(self, path):
+        """
+        Hasher innholdet i en fil, eller gjenbruker hashen hvis filen er uendret.
+
+        Args:
+            path (str): Filsti til filen.
+
+        Returns:
+            str: SHA-256 av innholdet.
+        """
+        path = os.path.abspath(path)
+        stat = _file_stat(path)
+        known = self.files.get(path)
+        if known is not None and known['stat'] == stat:
+            return known['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        self.files[path] = {'stat': stat, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def hash_path(self, path):
+        """
+        Hasher en fil eller alle filer i en mappe. Manglende stier gir en fast verdi.
+
+        Args:
+            path (str): Filsti til en fil eller mappe.
+
+        Returns:
+            str: Hash av innholdet.
+        """
+        if os.path.isfile(path):
+            return self.hash_file(path)
+        if not os.path.isdir(path):
+            return 'missing'
+
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self.hash_file(file_path).encode())
+        return digest.hexdigest()
+
+    def fingerprint(self, inputs, params=None, code_files=()):
+        """
+        Beregner fingeravtrykket til et steg.
+
+        Args:
+            inputs (list): Filer eller mapper steget leser.
+            params (dict, optional): Parametre som påvirker resultatet, f.eks. 'num_std'.
+            code_files (list): Kildefiler med koden til steget.
+
+        Returns:
+            str: SHA-256 av inndata, parametre og kode.
+        """
+        parts = {
+            'inputs': {os.path.abspath(path): self.hash_path(path) for path in inputs},
+            'params': params or {},
+            'code': {os.path.basename(path): self.hash_file(path) for path in code_files}
+        }
+        # default=str gjør at tupler og andre verdier får en stabil tekstform
+        text = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def is_fresh(self, name, fingerprint, outputs):
+        """
+        Sjekker om steget allerede har gyldige utdata for fingeravtrykket.
+
+        Args:
+            name (str): Navnet på steget.
+            fingerprint (str): Fingeravtrykket til stegets inndata.
+            outputs (list): Filer eller mapper steget skriver.
+
+        Returns:
+            bool: True hvis steget kan hoppes over.
+        """
+        record = self.stages.get(name)
+        if record is None or record['fingerprint'] != fingerprint:
+            return False
+        for path in outputs:
+            if not os.path.exists(path):
+                return False
+            # Utdata som er endret eller erstattet etter kjøringen må lages på nytt
+            if os.path.isfile(path) and record['outputs'].get(os.path.abspath(path)) != _file_stat(path):
+                return False
+        return True
+
+    def record(self, name, fingerprint, outputs):
+        """
+        Lagrer fingeravtrykket og utdataene til et steg som er kjørt.
+
+        Args:
+            name (str): Navnet på steget.
+            fingerprint (str): Fingeravtrykket til stegets inndata.
+            outputs (list): Filer eller mapper steget skrev.
+        """
+        self.stages[name] = {
+            'fingerprint': fingerprint,
+            'outputs': {os.path.abspath(path): _file_stat(path) for path in outputs if os.path.isfile(path)},
+            'finished': datetime.now().isoformat(timespec='seconds')
+        }
+
+    def invalidate(self, name=None):
+        """
+        Glemmer fingeravtrykket til ett steg, eller alle steg.
+
+        Args:
+            name (str, optional): Navnet på steget. Standard er alle steg.
+        """
+        if name is None:
+            self.stages.clear()
+        else:
+            self.stages.pop(name, None)
+
+    def save(self):
+        """
+        Skriver cachen til disk atomisk.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'stages': self.stages, 'files': self.files}, file, indent=4)
+        os.replace(tmp_path, self.path)
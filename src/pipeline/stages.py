@@ -0,0 +1,425 @@
+import sys
+import os
+import runpy
+import warnings
+import importlib.util
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from pipeline.stage_cache import StageCache, get_stage_cache_path
+
+# Mappen der pipelinen lagrer figurer, relativt til prosjektets rot-mappe
+FIGURES_DIR = os.path.join('data', 'figures')
+
+class Stage:
+    """
+    Beskriver ett steg i pipelinen: hva det leser, skriver og hvilke parametre det bruker.
+    """
+    def __init__(self, name, func, inputs, outputs, params=None, code_modules=(), depends_on=(), always_run=False):
+        """
+        Args:
+            name (str): Navnet på steget, f.eks. 'clean_frost'.
+            func (callable): Funksjon som kjører steget med prosjektets rot-mappe som argument.
+            inputs (list): Filer eller mapper steget leser, relativt til prosjektets rot-mappe.
+            outputs (list): Filer eller mapper steget skriver, relativt til prosjektets rot-mappe.
+                En fil kan stå i både inputs og outputs hvis steget oppdaterer den selv.
+            params (dict, optional): Parametre som påvirker resultatet.
+            code_modules (list): Moduler med koden til steget; endringer i dem gir ny kjøring.
+            depends_on (list): Navn på stegene som må være ferdige før dette steget.
+            always_run (bool): Kjør steget hver gang det velges, f.eks. for henting fra API.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.code_modules = list(code_modules)
+        self.depends_on = list(depends_on)
+        self.always_run = always_run
+
+    def code_files(self):
+        """
+        Finner kildefilene til stegets moduler uten å kjøre dem.
+
+        Returns:
+            list: Filstier til kildefilene.
+        """
+        return [importlib.util.find_spec(module).origin for module in self.code_modules]
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+def _run_collection_script(project_root, module):
+    # Innhentingsskriptene henter data når de kjøres, og skriver til 'data/raw' relativt til arbeidsmappen
+    os.makedirs(os.path.join(project_root, 'data', 'raw'), exist_ok=True)
+    runpy.run_path(importlib.util.find_spec(module).origin, run_name='__main__')
+
+def _collect_frost(project_root):
+    _run_collection_script(project_root, 'data_collection.data_collection_frost_weather')
+
+def _collect_nilu(project_root):
+    _run_collection_script(project_root, 'data_collection.data_collection_nilu_air_quality')
+
+def _clean_frost(project_root):
+    from data_cleaning.data_cleaning_frost import default_clean_frost_data
+    default_clean_frost_data(project_root)
+
+def _clean_nilu(project_root):
+    from data_cleaning.data_cleaning_nilu import main_dc_nilu
+    main_dc_nilu(os.path.join(project_root, 'data', 'raw', 'api_nilu_air_quality.json'),
+                 os.path.join(project_root, 'data', 'clean', 'cleaned_data_nilu.json'))
+
+def _analyse_frost(project_root):
+    from data_analysis.data_analysis_frost import main
+    main()
+
+def _analyse_nilu(project_root):
+    from data_analysis.data_analysis_nilu import main
+    main()
+
+def _analyse_joined(project_root):
+    from data_analysis.data_analysis_frost_nilu import main
+    main()
+
+def _analyse_stations(project_root):
+    from data_analysis.data_analysis_stations import main
+    main()
+
+def _features(project_root):
+    from predictive_analysis.feature_store import FEATURE_SETS, get_features
+    for name in FEATURE_SETS:
+        get_features(name, columns=[], project_root=project_root)
+
+def _train_frost(project_root):
+    from predictive_analysis.data_prediction_frost import train_and_save_model
+    train_and_save_model(project_root)
+
+def _join(project_root):
+    from data_access.joined_data import refresh_joined_daily
+    clean_dir = os.path.join(project_root, 'data', 'clean')
+    refresh_joined_daily(os.path.join(clean_dir, 'cleaned_data_frost.db'),
+                         os.path.join(clean_dir, 'cleaned_data_nilu.json'))
+
+def _cross_plots(project_root):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from data_visualizations.frost_vs_nilu_visualizations import (show_correlation_together, plot_temperature_vs_pm25,
+                                                                  show_lagged_correlation)
+
+    results_dir = os.path.join(project_root, 'data', 'analyses_results')
+    clean_dir = os.path.join(project_root, 'data', 'clean')
+    figures_dir = os.path.join(project_root, FIGURES_DIR)
+    os.makedirs(figures_dir, exist_ok=True)
+
+    # Plottefunksjonene kaller plt.show(), som ikke gjør noe med Agg; figuren lagres etterpå
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        show_correlation_together(os.path.join(results_dir, 'frost_correlation_matrix'),
+                                  os.path.join(results_dir, 'nilu_correlation_matrix'))
+        plt.savefig(os.path.join(figures_dir, 'frost_vs_nilu_correlation.png'))
+        plt.close('all')
+        plot_temperature_vs_pm25(os.path.join(clean_dir, 'cleaned_data_nilu.json'),
+                                 os.path.join(clean_dir, 'cleaned_data_frost.db'))
+        plt.savefig(os.path.join(figures_dir, 'temperature_vs_pm25.png'))
+        plt.close('all')
+        show_lagged_correlation(os.path.join(results_dir, 'frost_nilu_lagged_correlation'))
+        plt.savefig(os.path.join(figures_dir, 'frost_nilu_lagged_correlation.png'))
+        plt.close('all')
+
+def analysis_params():
+    """
+    Samler konstantene analysestegene bruker, slik at en endring i en av dem gir ny kjøring.
+
+    Returns:
+        dict: Navn -> parametre for 'statistics', 'joined' og 'stations', som brukes av de tilsvarende stegene.
+    """
+    from data_analysis import (statistics_engine, streaming_stats, rolling_stats, correlation_engine, bootstrap,
+                               exceedances, trend_tests, anomalies, box_stats, spatial_interpolation)
+    from data_analysis.decomposition import decomposition_params
+    from data_access.climatology import climatology_params
+
+    statistics = {
+        'statistics': statistics_engine.STATISTICS,
+        'sketch_resolution': streaming_stats.SKETCH_RESOLUTION,
+        'rolling': {'windows': rolling_stats.ROLLING_WINDOWS, 'statistics': rolling_stats.ROLLING_STATISTICS,
+                    'min_coverage': rolling_stats.MIN_COVERAGE,
+                    'air_quality_windows': rolling_stats.AIR_QUALITY_WINDOWS},
+        'bootstrap': {'n_boot': bootstrap.N_BOOT, 'block_length': bootstrap.BLOCK_LENGTH,
+                      'confidence': bootstrap.CONFIDENCE, 'seed': bootstrap.BOOTSTRAP_SEED,
+                      'batch_size': bootstrap.BATCH_SIZE},
+        'exceedances': {'averaging': exceedances.AVERAGING_PERIODS,
+                        'pollutants': exceedances.POLLUTANT_THRESHOLDS, 'weather': exceedances.WEATHER_THRESHOLDS},
+        'trend': {'alpha': trend_tests.ALPHA, 'min_count': trend_tests.MIN_COUNT,
+                  'max_pairs': trend_tests.MAX_PAIRS},
+        'anomalies': {'z': anomalies.ANOMALY_Z, 'quantiles': anomalies.ANOMALY_QUANTILES},
+        'climatology': climatology_params(),
+        'box': {'whisker': box_stats.WHISKER, 'max_outliers': box_stats.MAX_OUTLIERS},
+        'decomposition': decomposition_params()
+    }
+    joined = {'max_lag': correlation_engine.MAX_LAG, 'min_periods': correlation_engine.MIN_PERIODS}
+    stations = {
+        'statistics': statistics_engine.STATISTICS,
+        'interpolation': {'power': spatial_interpolation.IDW_POWER,
+                          'resolution_km': spatial_interpolation.GRID_RESOLUTION_KM,
+                          'margin_km': spatial_interpolation.GRID_MARGIN_KM,
+                          'min_distance_km': spatial_interpolation.MIN_DISTANCE_KM}
+    }
+    return {'statistics': statistics, 'joined': joined, 'stations': stations}
+
+def get_stages(include_collect=False):
+    """
+    Bygger listen over pipeline-stegene i kjørerekkefølge.
+
+    Parametrene hentes fra konstantene i modulene, slik at en endring i
+    f.eks. NILU_NUM_STD gir et nytt fingeravtrykk og ny kjøring av steget.
+
+    Args:
+        include_collect (bool): Ta med stegene som henter rådata fra API-ene.
+
+    Returns:
+        list[Stage]: Stegene i pipelinen.
+    """
+    from data_cleaning.data_cleaning_frost import FROST_VALID_RANGES, FROST_N_NEIGHBORS
+    from data_cleaning.data_cleaning_nilu import NILU_NUM_STD, NILU_N_NEIGHBORS, column_to_remove
+    from predictive_analysis.data_prediction_frost import MODEL_FEATURES, MODEL_FILE
+    from predictive_analysis.feature_store import FEATURES_DIR, FEATURES_FILENAME, LAGS, ROLLING_WINDOWS
+    from data_analysis.data_analysis_stations import STATIONS_FILE, DEFAULT_PARTITIONS
+    from data_access.analysis_results import analysis_table_path
+
+    frost_db = os.path.join('data', 'clean', 'cleaned_data_frost.db')
+    nilu_json = os.path.join('data', 'clean', 'cleaned_data_nilu.json')
+    results_dir = os.path.join('data', 'analyses_results')
+    validators = 'data_cleaning.data_validators'
+    analysis_engines = ['data_analysis.statistics_engine', 'data_analysis.streaming_stats',
+                        'data_analysis.rolling_stats', 'data_analysis.correlation_engine',
+                        'data_analysis.bootstrap', 'data_analysis.exceedances',
+                        'data_analysis.trend_tests', 'data_analysis.anomalies', 'data_access.climatology',
+                        'data_analysis.box_stats', 'data_analysis.decomposition', 'data_access.analysis_results']
+    # Rådatalageret med slettede perioder leses av rensingen, men oppdateres også av den ved ny JSON-fil
+    frost_store = os.path.join('data', 'raw', 'api_frost_weather_store.db')
+    frost_corr = analysis_table_path(results_dir, 'frost_correlation_matrix')
+    nilu_corr = analysis_table_path(results_dir, 'nilu_correlation_matrix')
+    joined_db = os.path.join('data', 'clean', 'joined_frost_nilu.db')
+    lagged_corr = analysis_table_path(results_dir, 'frost_nilu_lagged_correlation')
+    frost_features = os.path.join(FEATURES_DIR, 'frost', FEATURES_FILENAME)
+    tunables = analysis_params()
+    nilu_features = os.path.join(FEATURES_DIR, 'nilu', FEATURES_FILENAME)
+
+    collect = [
+        Stage('collect_frost', _collect_frost, inputs=[],
+              outputs=[os.path.join('data', 'raw', 'api_frost_weather.json')],
+              code_modules=['data_collection.data_collection_frost_weather'], always_run=True),
+        Stage('collect_nilu', _collect_nilu, inputs=[],
+              outputs=[os.path.join('data', 'raw', 'api_nilu_air_quality.json')],
+              code_modules=['data_collection.data_collection_nilu_air_quality'], always_run=True)
+    ]
+
+    return (collect if include_collect else []) + [
+        Stage('clean_frost', _clean_frost,
+              inputs=[os.path.join('data', 'raw', 'api_frost_weather.json'), frost_store],
+              outputs=[frost_db, frost_store, os.path.join('data', 'clean', 'series_cache', 'frost'),
+                       os.path.join('data', 'clean', 'climatology', 'frost.npz')],
+              params={'valid_ranges': FROST_VALID_RANGES, 'n_neighbors': FROST_N_NEIGHBORS},
+              code_modules=['data_cleaning.data_cleaning_frost', validators, 'data_access.climatology'],
+              depends_on=['collect_frost']),
+        Stage('clean_nilu', _clean_nilu,
+              inputs=[os.path.join('data', 'raw', 'api_nilu_air_quality.json')],
+              outputs=[nilu_json, os.path.join('data', 'clean', 'series_cache', 'nilu'),
+                       os.path.join('data', 'clean', 'climatology', 'nilu.npz')],
+              params={'num_std': NILU_NUM_STD, 'n_neighbors': NILU_N_NEIGHBORS,
+                      'column_to_remove': column_to_remove},
+              code_modules=['data_cleaning.data_cleaning_nilu', validators, 'data_access.climatology'],
+              depends_on=['collect_nilu']),
+        Stage('analyse_frost', _analyse_frost,
+              inputs=[frost_db],
+              outputs=[analysis_table_path(results_dir, name) for name in
+                       ('frost_aggregated_stats_year_season', 'frost_aggregated_stats_year',
+                        'frost_rolling_stats', 'frost_bootstrap_ci_year_season',
+                        'frost_bootstrap_ci_year', 'frost_exceedances_year_season',
+                        'frost_exceedances_year', 'frost_episodes',
+                        'frost_trend_tests', 'frost_anomalies', 'frost_box_stats',
+                        'frost_box_outliers', 'frost_decomposition')] +
+                      [frost_corr, os.path.join(results_dir, 'decomposition', 'frost.npz')],
+              params=tunables['statistics'],
+              code_modules=['data_analysis.data_analysis_frost'] + analysis_engines,
+              depends_on=['clean_frost']),
+        Stage('analyse_nilu', _analyse_nilu,
+              inputs=[nilu_json],
+              outputs=[analysis_table_path(results_dir, name) for name in
+                       ('nilu_aggregated_stats_year_season', 'nilu_aggregated_stats_year',
+                        'nilu_rolling_stats', 'nilu_bootstrap_ci_year_season',
+                        'nilu_bootstrap_ci_year', 'nilu_exceedances_year_season',
+                        'nilu_exceedances_year', 'nilu_episodes',
+                        'nilu_trend_tests', 'nilu_anomalies', 'nilu_box_stats',
+                        'nilu_box_outliers', 'nilu_decomposition')] +
+                      [nilu_corr, os.path.join(results_dir, 'decomposition', 'nilu.npz')],
+              params=tunables['statistics'],
+              code_modules=['data_analysis.data_analysis_nilu'] + analysis_engines,
+              depends_on=['clean_nilu']),
+        Stage('analyse_stations', _analyse_stations,
+              inputs=[frost_db, nilu_json, STATIONS_FILE],
+              outputs=[analysis_table_path(results_dir, name) for name in
+                       ('stations_aggregated_stats_year_season', 'stations_aggregated_stats_year',
+                        'stations_correlation')],
+              params={'partitions': DEFAULT_PARTITIONS, **tunables['stations']},
+              code_modules=['data_analysis.data_analysis_stations', 'data_analysis.spatial_interpolation'] + analysis_engines,
+              depends_on=['clean_frost', 'clean_nilu']),
+        Stage('features', _features,
+              inputs=[frost_db, nilu_json],
+              outputs=[frost_features, nilu_features],
+              params={'lags': LAGS, 'windows': ROLLING_WINDOWS},
+              code_modules=['predictive_analysis.feature_store', 'data_analysis.rolling_stats',
+                            'data_access.series_cache'],
+              depends_on=['clean_frost', 'clean_nilu']),
+        Stage('train_frost', _train_frost,
+              inputs=[frost_db, frost_features],
+              outputs=[MODEL_FILE],
+              params={'features': MODEL_FEATURES},
+              code_modules=['predictive_analysis.data_prediction_frost', 'predictive_analysis.feature_store',
+                            'predictive_analysis.model_registry'],
+              depends_on=['features']),
+        Stage('join', _join,
+              inputs=[frost_db, nilu_json],
+              outputs=[joined_db],
+              code_modules=['data_access.joined_data'],
+              depends_on=['clean_frost', 'clean_nilu']),
+        Stage('analyse_joined', _analyse_joined,
+              inputs=[joined_db],
+              outputs=[analysis_table_path(results_dir, 'frost_nilu_correlation_matrix'), lagged_corr],
+              params=tunables['joined'],
+              code_modules=['data_analysis.data_analysis_frost_nilu', 'data_analysis.correlation_engine',
+                            'data_access.analysis_results'],
+              depends_on=['join']),
+        Stage('cross_plots', _cross_plots,
+              inputs=[frost_corr, nilu_corr, joined_db, lagged_corr],
+              outputs=[os.path.join(FIGURES_DIR, 'frost_vs_nilu_correlation.png'),
+                       os.path.join(FIGURES_DIR, 'temperature_vs_pm25.png'),
+                       os.path.join(FIGURES_DIR, 'frost_nilu_lagged_correlation.png')],
+              code_modules=['data_visualizations.frost_vs_nilu_visualizations.dv_frost_vs_nilu_correlation',
+                            'data_visualizations.frost_vs_nilu_visualizations.dv_frost_vs_nilu_temperature_vs_no2'],
+              depends_on=['analyse_frost', 'analyse_nilu', 'join', 'analyse_joined'])
+    ]
+
+def call_in_project_root(func, project_root):
+    """
+    Kjører en stegfunksjon med prosjektets rot-mappe som arbeidsmappe.
+
+    Analyse-skriptene bruker filstier relativt til rot-mappen, så
+    arbeidsmappen settes midlertidig og gjenopprettes etterpå.
+
+    Args:
+        func (callable): Stegfunksjonen.
+        project_root (str): Stien til prosjektets rot-mappe.
+    """
+    previous_dir = os.getcwd()
+    os.chdir(project_root)
+    try:
+        func(project_root)
+    finally:
+        os.chdir(previous_dir)
+
+def prepare_stage(stage, project_root, cache, force=False):
+    """
+    Beregner fingeravtrykket til et steg og sjekker om det kan hoppes over.
+
+    Args:
+        stage (Stage): Steget som skal kjøres.
+        project_root (str): Stien til prosjektets rot-mappe.
+        cache (StageCache): Stegcachen.
+        force (bool): Kjør steget selv om fingeravtrykket er uendret.
+
+    Returns:
+        str | None: Fingeravtrykket, eller None hvis steget kan hoppes over.
+    """
+    inputs = [os.path.join(project_root, path) for path in stage.inputs]
+    outputs = [os.path.join(project_root, path) for path in stage.outputs]
+    fingerprint = cache.fingerprint(inputs, stage.params, stage.code_files())
+
+    if not (force or stage.always_run) and cache.is_fresh(stage.name, fingerprint, outputs):
+        print(f"Hopper over '{stage.name}': inndata og parametre er uendret.")
+        return None
+
+    # Utdatamappene lages på forhånd, slik at steg som kjører samtidig ikke kolliderer
+    for path in outputs:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return fingerprint
+
+def complete_stage(stage, project_root, cache, fingerprint):
+    """
+    Sjekker utdataene etter at et steg er kjørt, og lagrer fingeravtrykket.
+
+    Args:
+        stage (Stage): Steget som ble kjørt.
+        project_root (str): Stien til prosjektets rot-mappe.
+        cache (StageCache): Stegcachen.
+        fingerprint (str): Fingeravtrykket fra prepare_stage.
+
+    Returns:
+        str: 'ran' eller 'failed'.
+    """
+    outputs = [os.path.join(project_root, path) for path in stage.outputs]
+
+    # Stegfunksjonene skriver ut feil i stedet for å kaste unntak, så vi sjekker utdataene
+    missing = [path for path in outputs if not os.path.exists(path)]
+    if missing:
+        print(f"Feil: '{stage.name}' skrev ikke alle utdata: {missing}")
+        cache.invalidate(stage.name)
+        return 'failed'
+
+    # Inndata som steget selv oppdaterer hashes etter kjøringen, ellers ville neste kjøring se dem som endret
+    if set(stage.inputs) & set(stage.outputs):
+        inputs = [os.path.join(project_root, path) for path in stage.inputs]
+        fingerprint = cache.fingerprint(inputs, stage.params, stage.code_files())
+    cache.record(stage.name, fingerprint, outputs)
+    return 'ran'
+
+def run_stage(stage, project_root, cache, force=False):
+    """
+    Kjører ett steg, eller hopper over det hvis utdataene finnes for samme fingeravtrykk.
+
+    Args:
+        stage (Stage): Steget som skal kjøres.
+        project_root (str): Stien til prosjektets rot-mappe.
+        cache (StageCache): Stegcachen.
+        force (bool): Kjør steget selv om fingeravtrykket er uendret.
+
+    Returns:
+        str: 'skipped', 'ran' eller 'failed'.
+    """
+    fingerprint = prepare_stage(stage, project_root, cache, force)
+    if fingerprint is None:
+        return 'skipped'
+
+    print(f"Kjører '{stage.name}'...")
+    call_in_project_root(stage.func, project_root)
+    return complete_stage(stage, project_root, cache, fingerprint)
+
+def run_stages(project_root, names=None, force=False, stages=None):
+    """
+    Kjører pipeline-stegene i rekkefølge og hopper over uendrede steg.
+
+    Args:
+        project_root (str): Stien til prosjektets rot-mappe.
+        names (list, optional): Navn på stegene som skal kjøres. Standard er alle.
+        force (bool): Kjør alle valgte steg uansett fingeravtrykk.
+        stages (list, optional): Stegene som skal brukes. Standard er get_stages().
+
+    Returns:
+        dict: Status per steg ('skipped', 'ran' eller 'failed').
+    """
+    stages = stages if stages is not None else get_stages()
+    cache = StageCache(get_stage_cache_path(project_root))
+    results = {}
+    for stage in stages:
+        if names is not None and stage.name not in names:
+            continue
+        results[stage.name] = run_stage(stage, project_root, cache, force)
+        cache.save()
+    return results
+
+if __name__ == "__main__":
+    run_stages(project_root)
@@ -1,3 +1,5 @@
+from .feature_store import *
+from .model_registry import *
 from .data_prediction_frost import *
 from .data_prediction_nilu import *
 from .data_deletion_frost import *
\ No newline at end of file
@@ -1,66 +1,147 @@
 
 
-import json
+import sys
 import os
-from datetime import datetime
+import shutil
 
-def delete_frost_data_period(project_root, start_date="2012-05-01", end_date="2012-10-31"):
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+from data_access.data_loader import clear_data_cache, FROST_DB_FILENAME
+from data_access.series_cache import SERIES_CACHE_DIRNAME
+from data_access.climatology import CLIMATOLOGY_DIRNAME
+from data_access.joined_data import JOINED_DB_FILENAME
+from data_access.raw_frost_store import (sync_raw_frost_store, count_frost_entries, delete_frost_entries,
+                                         get_raw_store_path, deleted_frost_periods, clear_deleted_periods)
+from predictive_analysis.feature_store import FEATURES_DIR
+
+# Filer og mapper som er avledet fra Frost-rådataene, relativt til prosjektets rot-katalog.
+# Alt som bygger på datoene eller antall rader i de rensede dataene må fjernes når rådataene endres.
+FROST_DERIVED_OUTPUTS = [
+    os.path.join("data", "clean", FROST_DB_FILENAME),
+    os.path.join("data", "clean", SERIES_CACHE_DIRNAME, "frost"),
+    os.path.join("data", "clean", CLIMATOLOGY_DIRNAME, "frost.npz"),
+    os.path.join("data", "clean", JOINED_DB_FILENAME),
+    os.path.join("data", "analyses_results", "frost_streaming_state.json"),
+    os.path.join("data", "analyses_results", "decomposition", "frost.npz"),
+    os.path.join(FEATURES_DIR, "frost"),
+    os.path.join(FEATURES_DIR, "nilu")  # NILU-egenskapene inneholder værdata fra Frost
+]
+
+def invalidate_cleaned_frost_outputs(project_root):
+    """
+    Fjerner rensede Frost-data og alt som er avledet fra dem, slik at de må lages på nytt.
+
+    Args:
+        project_root (str): Stien til prosjektets rot-katalog
+
+    Returns:
+        list: Filstier som ble fjernet
+    """
+    removed = []
+    for relative_path in FROST_DERIVED_OUTPUTS:
+        path = os.path.join(project_root, relative_path)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+            removed.append(path)
+        elif os.path.exists(path):
+            os.remove(path)
+            removed.append(path)
+
+    # Cachede DataFrames i minnet kan også være utdaterte
+    clear_data_cache()
+    return removed
+
+def delete_frost_data_period(project_root, start_date="2012-05-01", end_date="2012-10-31", dry_run=False):
     """
     Sletter værdata fra Frost API for en spesifisert periode.
-    
+
+    Rådataene ligger i et SQLite-lager sortert og indeksert på dag, slik at
+    perioden slettes med én DELETE på indeksen i stedet for å lese og skrive
+    hele JSON-filen. Perioden lagres i lageret og gjelder også når rådataene
+    hentes på nytt. Rensede Frost-data og alt som bygger på dem fjernes etterpå.
+
     Args:
         project_root (str): Stien til prosjektets rot-katalog
         start_date (str): Startdato i YYYY-MM-DD format (inklusiv)
         end_date (str): Sluttdato i YYYY-MM-DD format (inklusiv)
-    
+        dry_run (bool): Hvis True telles oppføringene i perioden uten at noe slettes
+
     Returns:
         dict: Sammendrag av slettingsoperasjonen
     """
-    # Konstruer stien til frost-værdatafilen
+    # Konstruer stien til frost-værdatafilen og lageret ved siden av den
     frost_file_path = os.path.join(project_root, "data", "raw", "api_frost_weather.json")
-    
-    if not os.path.exists(frost_file_path):
+    store_path = get_raw_store_path(frost_file_path)
+
+    if not os.path.exists(frost_file_path) and not os.path.exists(store_path):
         raise FileNotFoundError(f"Frost-værdatafil ikke funnet: {frost_file_path}")
-    
-    # Last inn eksisterende data
-    with open(frost_file_path, 'r', encoding='utf-8') as file:
-        data = json.load(file)
-    
-    original_count = len(data)
-    
-    # Konverter datostrenger til datetime-objekter for sammenligning
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    # Filtrer ut data innenfor den spesifiserte perioden
-    filtered_data = []
-    deleted_count = 0
-    
-    for entry in data:
-        # Parse referenceTime fra oppføringen
-        ref_time_str = entry.get("referenceTime", "")
-        if ref_time_str:
-            # Parse ISO-format: "2010-01-01T00:00:00.000Z"
-            ref_time = datetime.fromisoformat(ref_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
-            
-            # Sjekk om denne oppføringen faller innenfor slettingsperioden
-            if start_dt <= ref_time <= end_dt:
-                deleted_count += 1
-                continue  # Hopp over denne oppføringen (slett den)
-        
-        filtered_data.append(entry)
-    
-    # Lagre de filtrerte dataene tilbake til filen
-    with open(frost_file_path, 'w', encoding='utf-8') as file:
-        json.dump(filtered_data, file, indent=4, ensure_ascii=False)
-    
+
+    # Importer JSON-filen til lageret hvis den er ny eller endret
+    sync_raw_frost_store(frost_file_path, store_path)
+
+    invalidated = []
+    if dry_run:
+        deleted_count = count_frost_entries(store_path, start_date, end_date)
+        remaining_count = count_frost_entries(store_path) - deleted_count
+    else:
+        deleted_count, remaining_count = delete_frost_entries(store_path, start_date, end_date)
+        if deleted_count > 0:
+            invalidated = invalidate_cleaned_frost_outputs(project_root)
+
     # Returner sammendrag
     return {
-        "original_entries": original_count,
+        "original_entries": deleted_count + remaining_count,
         "deleted_entries": deleted_count,
-        "remaining_entries": len(filtered_data),
+        "remaining_entries": remaining_count,
         "deletion_period": f"{start_date} to {end_date}",
-        "file_path": frost_file_path
+        "file_path": store_path,
+        "dry_run": dry_run,
+        "deleted_periods": deleted_frost_periods(store_path),
+        "invalidated_outputs": invalidated
+    }
+
+def restore_frost_data_period(project_root, start_date=None, end_date=None):
+    """
+    Gjenoppretter værdata fra Frost API som er slettet med delete_frost_data_period.
+
+    De lagrede slettede periodene innenfor [start_date, end_date] fjernes, og
+    lageret importeres på nytt fra JSON-filen. Uten datoer gjenopprettes alle
+    periodene. Rensede Frost-data og alt som bygger på dem fjernes etterpå.
+
+    Args:
+        project_root (str): Stien til prosjektets rot-katalog
+        start_date (str, optional): Startdato i YYYY-MM-DD format (inklusiv). Standard er ingen nedre grense
+        end_date (str, optional): Sluttdato i YYYY-MM-DD format (inklusiv). Standard er ingen øvre grense
+
+    Returns:
+        dict: Sammendrag av gjenopprettingen
+    """
+    frost_file_path = os.path.join(project_root, "data", "raw", "api_frost_weather.json")
+    store_path = get_raw_store_path(frost_file_path)
+
+    # Oppføringene hentes tilbake fra JSON-filen, så den må finnes
+    if not os.path.exists(frost_file_path):
+        raise FileNotFoundError(f"Frost-værdatafil ikke funnet: {frost_file_path}")
+
+    before = count_frost_entries(store_path) if os.path.exists(store_path) else 0
+    restored_periods = clear_deleted_periods(store_path, start_date, end_date)
+    sync_raw_frost_store(frost_file_path, store_path)
+    total = count_frost_entries(store_path)
+
+    invalidated = []
+    if total != before:
+        invalidated = invalidate_cleaned_frost_outputs(project_root)
+
+    return {
+        "restored_periods": restored_periods,
+        "restored_entries": total - before,
+        "total_entries": total,
+        "file_path": store_path,
+        "deleted_periods": deleted_frost_periods(store_path),
+        "invalidated_outputs": invalidated
     }
 
 def delete_summer_2012_frost_data(project_root):
@@ -82,6 +163,8 @@ def delete_summer_2012_frost_data(project_root):
     print(f"Gjenværende oppføringer: {result['remaining_entries']}")
     print(f"Periode slettet: {result['deletion_period']}")
     print(f"Fil modifisert: {result['file_path']}")
+    for path in result['invalidated_outputs']:
+        print(f"Utdatert renset data fjernet: {path}")
     
     return result
 
@@ -1,11 +1,47 @@
-import sqlite3
+import sys
+import os
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 from matplotlib.dates import YearLocator, DateFormatter
-import os
+from data_access import load_frost_data, quality_mask, QUALITY_IMPUTED
+from predictive_analysis.feature_store import calendar_features, get_features
+from predictive_analysis.model_registry import MODEL_SPECS, get_model, get_model_path, predict
+
+# Navnet på temperaturmodellen i modellregisteret
+FROST_MODEL = 'frost_temperature'
+
+# Forklaringsvariablene modellen trenes på (kalenderegenskaper fra feature_store)
+MODEL_FEATURES = MODEL_SPECS[FROST_MODEL]['features']
+
+# Andelen av dagene som brukes til trening; resten brukes til validering
+TRAIN_FRACTION = MODEL_SPECS[FROST_MODEL]['train_fraction']
+
+# Filsti til den lagrede modellen, relativt til prosjektets rot-mappe
+MODEL_FILE = get_model_path(FROST_MODEL)
+
+def add_model_features(df):
+    """
+    Legger til forklaringsvariablene i MODEL_FEATURES basert på 'referenceTime'.
+
+    Args:
+        df (pd.DataFrame): DataFrame med datetime-kolonnen 'referenceTime'.
+
+    Returns:
+        pd.DataFrame: DataFrame med dag i året, måned og årssyklusen som sin/cos.
+    """
+    features = calendar_features(df['referenceTime'])
+    for column in MODEL_FEATURES:
+        df[column] = features[column].to_numpy()
+    return df
 
 def load_data(db_path):
     """
@@ -17,10 +53,23 @@ def load_data(db_path):
     Returns:
         pd.DataFrame: DataFrame med værdata.
     """
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("SELECT * FROM weather_data", conn)
-    conn.close()
-    return df
+    return load_frost_data(db_path)
+
+def load_model_data(path):
+    """
+    Henter temperaturen og forklaringsvariablene fra de lagrede egenskapene (se feature_store).
+
+    Egenskapene lages bare på nytt når de rensede dataene er endret.
+
+    Args:
+        path (str): Stien til prosjektets rot-mappe.
+
+    Returns:
+        pd.DataFrame: Sortert etter 'referenceTime', med temperatur, kvalitetsfelt og MODEL_FEATURES.
+    """
+    df = get_features('frost', ['mean_air_temperature'] + MODEL_FEATURES, project_root=path)
+    df = df.rename(columns={'date': 'referenceTime'})
+    return df.dropna(subset=['mean_air_temperature']).reset_index(drop=True)
 
 def preprocess_data(df):
     """
@@ -36,15 +85,10 @@ def preprocess_data(df):
     df['referenceTime'] = pd.to_datetime(df['referenceTime'])
     # Sorter data etter dato
     df = df.sort_values('referenceTime')
-    # Legg til dag i året og måned som funksjoner
-    df['DayOfYear'] = df['referenceTime'].dt.dayofyear
-    df['Month'] = df['referenceTime'].dt.month
-    # Beregn sin og cos for årssykluser
-    df['sin_day'] = np.sin(2 * np.pi * df['DayOfYear'] / 365)
-    df['cos_day'] = np.cos(2 * np.pi * df['DayOfYear'] / 365)
-    return df
+    # Legg til dag i året, måned og sin/cos for årssyklusen som funksjoner
+    return add_model_features(df)
 
-def split_data(df, split_ratio=0.75):
+def split_data(df, split_ratio=TRAIN_FRACTION):
     """
     Deler data i treningssett og valideringssett.
 
@@ -81,11 +125,7 @@ def create_future_features(df_future, end_year=2024):
     )
     # Lag DataFrame med fremtidige datoer og funksjoner
     future_df = pd.DataFrame({'referenceTime': future_dates})
-    future_df['DayOfYear'] = future_df['referenceTime'].dt.dayofyear
-    future_df['Month'] = future_df['referenceTime'].dt.month
-    future_df['sin_day'] = np.sin(2 * np.pi * future_df['DayOfYear'] / 365)
-    future_df['cos_day'] = np.cos(2 * np.pi * future_df['DayOfYear'] / 365)
-    return future_df
+    return add_model_features(future_df)
 
 def train_model(X_train, y_train):
     """
@@ -166,8 +206,12 @@ def plot_predictions(df_train, df_future, future_df, y_pred_extended):
     """
     plt.figure(figsize=(15, 6))
 
+    # Imputerte dager hentes fra kvalitetsfeltet laget under rensingen
+    imputed_train = quality_mask(df_train, 'mean_air_temperature', QUALITY_IMPUTED)
+    imputed_future = quality_mask(df_future, 'mean_air_temperature', QUALITY_IMPUTED)
+
     # Plot treningsdata (reell)
-    mask_train_real = df_train['generated_mean_air_temperature'] == 0
+    mask_train_real = ~imputed_train
     dates_real = df_train.loc[mask_train_real, 'referenceTime']
     temps_real = df_train.loc[mask_train_real, 'mean_air_temperature']
     segments_x, segments_y = split_into_segments(dates_real, temps_real)
@@ -175,7 +219,7 @@ def plot_predictions(df_train, df_future, future_df, y_pred_extended):
         plt.plot(seg_x, seg_y, color='blue', alpha=0.7, label='Trenings data')
 
     # Plot treningsdata (generert)
-    mask_train_gen = df_train['generated_mean_air_temperature'] == 1
+    mask_train_gen = imputed_train
     dates_gen = df_train.loc[mask_train_gen, 'referenceTime']
     temps_gen = df_train.loc[mask_train_gen, 'mean_air_temperature']
     segments_x, segments_y = split_into_segments(dates_gen, temps_gen)
@@ -183,7 +227,7 @@ def plot_predictions(df_train, df_future, future_df, y_pred_extended):
         plt.plot(seg_x, seg_y, color='red', alpha=0.7, label='Imputert data')
 
     # Plot valideringsdata (reell)
-    mask_future_real = df_future['generated_mean_air_temperature'] == 0
+    mask_future_real = ~imputed_future
     dates_future = df_future.loc[mask_future_real, 'referenceTime']
     temps_future = df_future.loc[mask_future_real, 'mean_air_temperature']
     segments_x, segments_y = split_into_segments(dates_future, temps_future)
@@ -191,7 +235,7 @@ def plot_predictions(df_train, df_future, future_df, y_pred_extended):
         plt.plot(seg_x, seg_y, color='seagreen', alpha=0.7, label='Validerings data')
 
     # Plot valideringsdata (generert)
-    mask_future_gen = df_future['generated_mean_air_temperature'] == 1
+    mask_future_gen = imputed_future
     dates_future_gen = df_future.loc[mask_future_gen, 'referenceTime']
     temps_future_gen = df_future.loc[mask_future_gen, 'mean_air_temperature']
     segments_x, segments_y = split_into_segments(dates_future_gen, temps_future_gen)
@@ -220,28 +264,51 @@ def plot_predictions(df_train, df_future, future_df, y_pred_extended):
     plt.tight_layout()
     plt.show()
 
+def train_and_save_model(path):
+    """
+    Trener temperaturmodellen på treningssettet og lagrer den i modellregisteret.
+
+    Modellen trenes bare på nytt når de rensede dataene er endret siden forrige trening.
+
+    Args:
+        path (str): Stien til prosjektets rot-mappe.
+
+    Returns:
+        str: Filstien til den lagrede modellen.
+    """
+    get_model(FROST_MODEL, project_root=path)
+    return get_model_path(FROST_MODEL, project_root=path)
+
+def predict_temperature(date_range, path=''):
+    """
+    Predikerer gjennomsnittlig lufttemperatur for datoene med den lagrede modellen.
+
+    Args:
+        date_range (array-like): Datoene, f.eks. fra pd.date_range.
+        path (str): Stien til prosjektets rot-mappe.
+
+    Returns:
+        pd.Series: Predikert temperatur indeksert på datoene.
+    """
+    return predict(FROST_MODEL, date_range, project_root=path)
+
 def main_frost_prediciton(path, end_year=2024):
     """
     Hovedfunksjon for å kjøre hele funksjonaliteten.
 
     Args:
-        db_path (str): Stien til SQLite-databasen.
+        path (str): Stien til prosjektets rot-mappe.
         end_year (int): Året prediksjonen skal stoppe (inkludert).
     """
-    path_file = os.path.join(path, 'data', 'clean', 'cleaned_data_frost.db')
-    df = load_data(path_file)
-    df = preprocess_data(df)
+    df = load_model_data(path)
     df_train, df_future = split_data(df)
     future_df = create_future_features(df_future, end_year=end_year)
 
-    X_train = df_train[['DayOfYear', 'Month', 'sin_day', 'cos_day']]
-    y_train = df_train['mean_air_temperature']
-    model = train_model(X_train, y_train)
-
-    X_future_extended = future_df[['DayOfYear', 'Month', 'sin_day', 'cos_day']]
-    y_pred_extended = model.predict(X_future_extended)
+    # Den lagrede modellen brukes så lenge dataene ikke er endret
+    model = get_model(FROST_MODEL, project_root=path)['model']
+    y_pred_extended = predict_temperature(future_df['referenceTime'], path).to_numpy()
 
-    mse, r2, _ = evaluate_model(model, df_future[['DayOfYear', 'Month', 'sin_day', 'cos_day']], df_future['mean_air_temperature'])
+    mse, r2, _ = evaluate_model(model, df_future[MODEL_FEATURES], df_future['mean_air_temperature'])
     print(f"Modellens ytelse:\nMean Squared Error: {mse:.2f}\nR² Score: {r2:.2f}")
 
     plot_predictions(df_train, df_future, future_df, y_pred_extended)
@@ -1,10 +1,19 @@
+import sys
+import os
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
 import pandas as pd
 import numpy as np
-import os
-from sklearn.linear_model import LinearRegression
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.dates import DateFormatter, YearLocator
+from data_access import load_nilu_data
+from predictive_analysis.feature_store import get_features
+from predictive_analysis.model_registry import predict
 
 def load_and_prepare_nilu_data(file_path):
     """
@@ -16,11 +25,8 @@ def load_and_prepare_nilu_data(file_path):
     Returns:
         pd.DataFrame: DataFrame med sorterte og rensede NILU-data.
     """
-    # Les inn data fra JSON-filen
-    df = pd.read_json(file_path)
-    
-    # Konverter 'dateTime' til datetime-format
-    df['dateTime'] = pd.to_datetime(df['dateTime'])
+    # Les inn data fra JSON-filen (cachet, 'dateTime' er allerede datetime)
+    df = load_nilu_data(file_path)
     
     # Fjern rader med manglende verdier for de relevante komponentene og dateTime
     df = df.dropna(subset=['dateTime', 'NO2', 'PM10', 'PM2.5'])
@@ -28,6 +34,21 @@ def load_and_prepare_nilu_data(file_path):
     # Returner sorterte data
     return df.sort_values('dateTime')
 
+def load_model_data(path, components):
+    """
+    Henter komponentene og tidsaksen 'days' fra de lagrede egenskapene (se feature_store).
+
+    Args:
+        path (str): Stien til prosjektets rot-mappe.
+        components (list): Komponentene som skal tas med.
+
+    Returns:
+        pd.DataFrame: Sortert etter 'dateTime', uten dager der en av komponentene mangler.
+    """
+    df = get_features('nilu', ['days'] + list(components), project_root=path)
+    df = df.rename(columns={'date': 'dateTime'})
+    return df.dropna(subset=list(components)).reset_index(drop=True)
+
 def extend_dates(df, years=5):
     """
     Genererer fremtidige datoer for prediksjon.
@@ -46,7 +67,7 @@ def extend_dates(df, years=5):
     future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=years * 365, freq='D')
     return future_dates
 
-def plot_nilu_with_regression_and_prediction(df, components, years=5):
+def plot_nilu_with_regression_and_prediction(df, components, years=5, path=''):
     """
     Visualiserer NILU-komponenter med regresjonslinjer og prediksjon.
     
@@ -54,6 +75,7 @@ def plot_nilu_with_regression_and_prediction(df, components, years=5):
         df (pd.DataFrame): DataFrame med NILU-data.
         components (list): Liste over komponenter som skal visualiseres (f.eks. ['NO2', 'PM10', 'PM2.5']).
         years (int): Antall år fremover for prediksjon.
+        path (str): Stien til prosjektets rot-mappe, der modellene lagres.
     """
     # Sett stil for grafene
     sns.set(style="whitegrid")
@@ -66,20 +88,16 @@ def plot_nilu_with_regression_and_prediction(df, components, years=5):
         # Scatter plot for historiske data
         axes[i].scatter(df['dateTime'], df[component], alpha=0.6, label='Historiske data', color='blue', s=10)
 
-        # Tren en lineær regresjonsmodell
-        X = np.arange(len(df)).reshape(-1, 1)
-        y = df[component].values
-        model = LinearRegression()
-        model.fit(X, y)
-        
+        # Lineær regresjon på antall dager fra modellregisteret, som bare trenes på nytt når dataene endres
+        name = f'nilu_{component}'
+
         # Prediksjon for historiske data
-        y_pred = model.predict(X)
+        y_pred = predict(name, df['dateTime'], project_root=path).to_numpy()
         axes[i].plot(df['dateTime'], y_pred, color='red', label='Regresjonslinje', linewidth=2)
 
         # Prediksjon for fremtidige datoer
         future_dates = extend_dates(df, years)
-        future_X = np.arange(len(df), len(df) + len(future_dates)).reshape(-1, 1)
-        future_y_pred = model.predict(future_X)
+        future_y_pred = predict(name, future_dates, project_root=path).to_numpy()
         axes[i].plot(future_dates, future_y_pred, color='green', linestyle='--', label='Prediksjon', linewidth=2)
 
         # Sett tittel, aksetekster og grid
@@ -107,15 +125,14 @@ def main_nilu_prediction(path):
     Args:
         project_root (str): Stien til prosjektets rot-mappe.
     """
-    # Last inn og forbered data
-    file_path = os.path.join(path, 'data', 'clean', 'cleaned_data_nilu.json')
-    df = load_and_prepare_nilu_data(file_path)
-    
     # Komponenter som skal analyseres
     components = ['NO2', 'PM10', 'PM2.5']
+
+    # Last inn data og tidsaksen fra de lagrede egenskapene
+    df = load_model_data(path, components)
     
     # Visualiser data med regresjonslinjer og prediksjon
-    plot_nilu_with_regression_and_prediction(df, components, years=5)
+    plot_nilu_with_regression_and_prediction(df, components, years=5, path=path)
 
 # Hvordan bruke funksjonen i andre filer:
 '''
@@ -0,0 +1,262 @@
+import sys
+import os
+import json
+import hashlib
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+import pandas as pd
+import numpy as np
+from data_access import (load_frost_data, load_nilu_data, calendar_arrays, fourier_terms, to_day_ordinals,
+                         write_series_cache, SeriesCache, open_cleaned_series)
+from data_analysis.rolling_stats import to_regular_axis, rolling_window_statistics
+
+# Mappen der egenskapene lagres, relativt til prosjektets rot-mappe
+FEATURES_DIR = os.path.join('data', 'features')
+
+# Fil med fingeravtrykket til dataene og parametrene egenskapene er laget fra
+FEATURES_FILENAME = 'features.json'
+
+# Øk denne hvis egenskapene beregnes på en ny måte, slik at lagrede egenskaper lages på nytt
+FEATURE_STORE_VERSION = 1
+
+# Forskyvninger (dager) og glidende vinduer (dager) for egenskapene fra tidligere dager
+LAGS = (1, 7)
+ROLLING_WINDOWS = (7, 30)
+
+# Kalenderegenskapene, som også kan lages for fremtidige datoer
+CALENDAR_COLUMNS = ['year', 'month', 'day_of_year', 'sin_day', 'cos_day', 'days']
+
+# Datasettene med egenskaper: rensede data, variabler og eventuelt et datasett med værdata
+FEATURE_SETS = {
+    'frost': {'path': os.path.join('data', 'clean', 'cleaned_data_frost.db'), 'loader': load_frost_data,
+              'date_column': 'referenceTime',
+              'columns': ['mean_air_temperature', 'total_precipitation', 'mean_wind_speed'], 'exogenous': None},
+    'nilu': {'path': os.path.join('data', 'clean', 'cleaned_data_nilu.json'), 'loader': load_nilu_data,
+             'date_column': 'dateTime', 'columns': ['NO2', 'PM10', 'PM2.5'], 'exogenous': 'frost'}
+}
+
+def calendar_features(dates):
+    """
+    Lager kalenderegenskapene for en liste med datoer.
+
+    'days' er antall dager siden 1970-01-01 og brukes som tidsakse i trendmodeller.
+
+    Args:
+        dates (array-like): Datoene.
+
+    Returns:
+        pd.DataFrame: Kolonnene i CALENDAR_COLUMNS, én rad per dato.
+    """
+    parts = calendar_arrays(dates)
+    terms = fourier_terms(parts['day_of_year'], harmonics=1, period=365)
+    return pd.DataFrame({
+        'year': parts['year'], 'month': parts['month'], 'day_of_year': parts['day_of_year'],
+        'sin_day': terms['sin_1'], 'cos_day': terms['cos_1'],
+        'days': to_day_ordinals(dates).astype(float)
+    })
+
+def history_features(values, columns, lags=LAGS, windows=ROLLING_WINDOWS):
+    """
+    Lager egenskaper fra tidligere dager: forskjøvede verdier og glidende gjennomsnitt.
+
+    Gjennomsnittene dekker dagene før hver dag, slik at egenskapene er kjent
+    før dagen som skal predikeres.
+
+    Args:
+        values (np.ndarray): Verdier med én rad per dag på en sammenhengende dagakse.
+        columns (list): Navnene på kolonnene i values.
+        lags (tuple): Forskyvninger i dager.
+        windows (tuple): Vinduslengder i dager.
+
+    Returns:
+        dict: '<kolonne>_lag<n>' og '<kolonne>_mean<n>' -> array med én verdi per dag.
+    """
+    def shift(array, days):
+        shifted = np.full_like(array, np.nan)
+        shifted[days:] = array[:len(array) - days]
+        return shifted
+
+    features = {}
+    for lag in lags:
+        shifted = shift(values, lag)
+        features.update({f'{column}_lag{lag}': shifted[:, j] for j, column in enumerate(columns)})
+    for window in windows:
+        means = shift(rolling_window_statistics(values, window)['mean'], 1)
+        features.update({f'{column}_mean{window}': means[:, j] for j, column in enumerate(columns)})
+    return features
+
+def build_features(df, date_column, columns, exogenous=None, lags=LAGS, windows=ROLLING_WINDOWS):
+    """
+    Lager alle egenskapene for et datasett på en sammenhengende dagakse.
+
+    Args:
+        df (pd.DataFrame): Rensede data.
+        date_column (str): Navnet på datokolonnen.
+        columns (list): Variablene.
+        exogenous (dict, optional): Prefiks -> (DataFrame, datokolonne, variabler) for data fra
+            en annen kilde, f.eks. værdata til luftkvalitetsmodeller. Gir '<prefiks>_<kolonne>'
+            for samme dag og forskjøvet én dag.
+        lags (tuple): Forskyvninger i dager.
+        windows (tuple): Vinduslengder i dager.
+
+    Returns:
+        pd.DataFrame: 'date', variablene med 'generated_'- og 'quality_'-kolonner, og egenskapene.
+    """
+    flags = [prefix + column for column in columns for prefix in ('generated_', 'quality_')
+             if prefix + column in df.columns]
+    axis, values = to_regular_axis(df, date_column, columns + flags)
+    data = {'date': axis.astype('datetime64[ns]')}
+    for j, column in enumerate(columns + flags):
+        if column.startswith('generated_'):
+            data[column] = values[:, j] > 0
+        elif column.startswith('quality_'):
+            data[column] = np.nan_to_num(values[:, j]).astype(np.uint8)
+        else:
+            data[column] = values[:, j]
+
+    variables = values[:, :len(columns)]
+    data.update(calendar_features(axis).to_dict('series'))
+    data.update(history_features(variables, columns, lags, windows))
+
+    for prefix, (other, other_date_column, other_columns) in (exogenous or {}).items():
+        other_axis, other_values = to_regular_axis(other, other_date_column, other_columns)
+        # Verdiene til den andre kilden legges på denne dagaksen
+        positions = (axis - other_axis[0]).astype(np.int64)
+        inside = (positions >= 0) & (positions < len(other_axis))
+        aligned = np.full((len(axis), len(other_columns)), np.nan)
+        aligned[inside] = other_values[positions[inside]]
+        for j, column in enumerate(other_columns):
+            data[f'{prefix}_{column}'] = aligned[:, j]
+        data.update(history_features(aligned, [f'{prefix}_{column}' for column in other_columns],
+                                     lags=(1,), windows=()))
+
+    return pd.DataFrame(data)
+
+def get_features_dir(name, project_root='', features_dir=None):
+    """
+    Returnerer mappen der egenskapene til et datasett lagres.
+
+    Args:
+        name (str): Datasettet, en nøkkel i FEATURE_SETS.
+        project_root (str): Prosjektets rot-mappe.
+        features_dir (str, optional): Mappen med alle egenskapene. Standard er FEATURES_DIR i rot-mappen.
+
+    Returns:
+        str: Filsti til mappen.
+    """
+    return os.path.join(features_dir or os.path.join(project_root, FEATURES_DIR), name)
+
+def _sources(name, project_root):
+    """
+    Finner datasettene egenskapene lages fra: datasettet selv og eventuelt værdataene.
+    """
+    names = [name]
+    exogenous = FEATURE_SETS[name]['exogenous']
+    if exogenous and os.path.exists(os.path.join(project_root, FEATURE_SETS[exogenous]['path'])):
+        names.append(exogenous)
+    return names
+
+def load_cleaned(name, project_root='', columns=None):
+    """
+    Leser de rensede dataene til et datasett, helst fra den binære cachen fra rensingen.
+
+    Cachen brukes bare når den er laget fra den lagrede filen slik den er nå
+    (se open_cleaned_series); ellers leses filen med datasettets loader.
+
+    Args:
+        name (str): Datasettet, en nøkkel i FEATURE_SETS.
+        project_root (str): Prosjektets rot-mappe.
+        columns (list, optional): Variablene som skal leses. Standard er alle.
+
+    Returns:
+        pd.DataFrame: Datokolonnen, variablene og 'generated_'- og 'quality_'-kolonnene.
+            Fra filen følger også kalenderkolonnene med.
+    """
+    spec = FEATURE_SETS[name]
+    path = os.path.join(project_root, spec['path'])
+    cache = open_cleaned_series(name, path)
+    if cache is None:
+        return spec['loader'](path, columns=columns)
+    # Cachen dekker første til siste dato i filen; dager uten måling er NaN som på dagaksen i build_features
+    return cache.to_frame(columns, date_column=spec['date_column'])
+
+def features_fingerprint(name, project_root=''):
+    """
+    Lager et fingeravtrykk av de rensede dataene og parametrene egenskapene lages fra.
+
+    Args:
+        name (str): Datasettet, en nøkkel i FEATURE_SETS.
+        project_root (str): Prosjektets rot-mappe.
+
+    Returns:
+        str: SHA-1 som heksadesimal tekst.
+    """
+    files = []
+    for source in _sources(name, project_root):
+        stat = os.stat(os.path.join(project_root, FEATURE_SETS[source]['path']))
+        files.append([source, stat.st_size, stat.st_mtime_ns])
+    key = {'version': FEATURE_STORE_VERSION, 'lags': LAGS, 'windows': ROLLING_WINDOWS,
+           'columns': FEATURE_SETS[name]['columns'], 'files': files}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+def materialize_features(name, project_root='', features_dir=None):
+    """
+    Lager egenskapene for et datasett og lagrer dem med én .npy-fil per egenskap.
+
+    Egenskapene skrives som en binær cache (se write_series_cache), slik at
+    trening og prediksjon kan minnemappe bare kolonnene de trenger.
+    Fingeravtrykket skrives sist.
+
+    Args:
+        name (str): Datasettet, en nøkkel i FEATURE_SETS.
+        project_root (str): Prosjektets rot-mappe.
+        features_dir (str, optional): Mappen med alle egenskapene.
+
+    Returns:
+        str: Mappen egenskapene ble lagret i.
+    """
+    fingerprint = features_fingerprint(name, project_root)
+    spec = FEATURE_SETS[name]
+    df = load_cleaned(name, project_root)
+    exogenous = {}
+    for source in _sources(name, project_root)[1:]:
+        other = FEATURE_SETS[source]
+        exogenous[source] = (load_cleaned(source, project_root, other['columns']),
+                             other['date_column'], other['columns'])
+    features = build_features(df, spec['date_column'], spec['columns'], exogenous)
+
+    directory = get_features_dir(name, project_root, features_dir)
+    write_series_cache(features, directory, 'date')
+    tmp_path = os.path.join(directory, FEATURES_FILENAME + '.tmp')
+    with open(tmp_path, 'w') as file:
+        json.dump({'fingerprint': fingerprint, 'columns': [column for column in features.columns if column != 'date']},
+                  file, indent=4)
+    os.replace(tmp_path, os.path.join(directory, FEATURES_FILENAME))
+    return directory
+
+def get_features(name, columns=None, project_root='', features_dir=None):
+    """
+    Henter egenskapene for et datasett, og lager dem bare hvis de rensede dataene er endret.
+
+    Args:
+        name (str): Datasettet, en nøkkel i FEATURE_SETS.
+        columns (list, optional): Egenskapene som skal leses. Standard er alle.
+        project_root (str): Prosjektets rot-mappe.
+        features_dir (str, optional): Mappen med alle egenskapene.
+
+    Returns:
+        pd.DataFrame: 'date' og de valgte egenskapene, med 'generated_'- og 'quality_'-kolonner for variablene.
+    """
+    directory = get_features_dir(name, project_root, features_dir)
+    meta_path = os.path.join(directory, FEATURES_FILENAME)
+    stored = None
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as file:
+            stored = json.load(file).get('fingerprint')
+    if stored != features_fingerprint(name, project_root):
+        materialize_features(name, project_root, features_dir)
+    return SeriesCache(directory).to_frame(columns, date_column='date')
@@ -0,0 +1,177 @@
+import sys
+import os
+import json
+import pickle
+import hashlib
+from datetime import datetime, timezone
+
+# Legg til prosjektets src-mappe i sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(os.path.join(project_root, 'src'))
+
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from predictive_analysis.feature_store import CALENDAR_COLUMNS, calendar_features, features_fingerprint, get_features
+
+# Mappen der modellene lagres, relativt til prosjektets rot-mappe
+MODELS_DIR = os.path.join('data', 'models')
+
+# Øk denne hvis formatet på de lagrede modellene endres, slik at gamle modeller trenes på nytt
+REGISTRY_VERSION = 1
+
+# Modellene i registeret: datasett i feature_store, målvariabel, forklaringsvariabler og
+# andelen av dagene (de første) som brukes til trening
+MODEL_SPECS = {
+    'frost_temperature': {'feature_set': 'frost', 'target': 'mean_air_temperature',
+                          'features': ['day_of_year', 'month', 'sin_day', 'cos_day'], 'train_fraction': 0.75},
+    **{f'nilu_{component}': {'feature_set': 'nilu', 'target': component, 'features': ['days'],
+                             'train_fraction': 1.0}
+       for component in ('NO2', 'PM10', 'PM2.5')}
+}
+
+def get_model_path(name, project_root='', models_dir=None):
+    """
+    Returnerer filstien til en lagret modell.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+        models_dir (str, optional): Mappen med modellene. Standard er MODELS_DIR i rot-mappen.
+
+    Returns:
+        str: Filsti til '<navn>_model.pkl'.
+    """
+    return os.path.join(models_dir or os.path.join(project_root, MODELS_DIR), f'{name}_model.pkl')
+
+def training_fingerprint(name, project_root=''):
+    """
+    Lager et fingeravtrykk av treningsdataene og beskrivelsen av modellen.
+
+    Treningsdataene kjennes igjen på fingeravtrykket til egenskapene i
+    feature_store, så sjekken trenger ikke å lese dataene.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+
+    Returns:
+        str: SHA-1 som heksadesimal tekst.
+    """
+    spec = MODEL_SPECS[name]
+    key = {'version': REGISTRY_VERSION, 'spec': spec,
+           'features': features_fingerprint(spec['feature_set'], project_root)}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+def training_data(name, project_root=''):
+    """
+    Henter treningsdataene for en modell fra feature_store.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+
+    Returns:
+        pd.DataFrame: De første train_fraction av dagene med målvariabelen, med 'date' og forklaringsvariablene.
+    """
+    spec = MODEL_SPECS[name]
+    df = get_features(spec['feature_set'], spec['features'] + [spec['target']], project_root=project_root)
+    df = df.dropna(subset=[spec['target']]).reset_index(drop=True)
+    return df[:int(len(df) * spec['train_fraction'])]
+
+def train_registered_model(name, project_root='', models_dir=None):
+    """
+    Trener en modell og lagrer den med forklaringsvariablene og fingeravtrykket til treningsdataene.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+        models_dir (str, optional): Mappen med modellene.
+
+    Returns:
+        dict: Den lagrede modellen med nøklene model, name, features, target, fingerprint, n_train og trained_at.
+    """
+    spec = MODEL_SPECS[name]
+    fingerprint = training_fingerprint(name, project_root)
+    df = training_data(name, project_root)
+    model = LinearRegression()
+    model.fit(df[spec['features']], df[spec['target']])
+
+    record = {
+        'version': REGISTRY_VERSION, 'name': name, 'model': model,
+        'features': list(spec['features']), 'target': spec['target'], 'fingerprint': fingerprint,
+        'n_train': len(df), 'trained_at': datetime.now(timezone.utc).isoformat()
+    }
+    path = get_model_path(name, project_root, models_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(record, file)
+    os.replace(tmp_path, path)
+    return record
+
+def load_registered_model(name, project_root='', models_dir=None):
+    """
+    Leser en lagret modell uten å sjekke om den er oppdatert.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+        models_dir (str, optional): Mappen med modellene.
+
+    Returns:
+        dict: Den lagrede modellen, eller None hvis den mangler eller har et eldre format.
+    """
+    path = get_model_path(name, project_root, models_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        record = pickle.load(file)
+    if not isinstance(record, dict) or record.get('version') != REGISTRY_VERSION:
+        return None
+    return record
+
+def get_model(name, project_root='', models_dir=None):
+    """
+    Henter en modell, og trener den bare hvis treningsdataene eller beskrivelsen er endret.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        project_root (str): Prosjektets rot-mappe.
+        models_dir (str, optional): Mappen med modellene.
+
+    Returns:
+        dict: Den lagrede modellen, se train_registered_model.
+    """
+    record = load_registered_model(name, project_root, models_dir)
+    if record is None or record['fingerprint'] != training_fingerprint(name, project_root):
+        record = train_registered_model(name, project_root, models_dir)
+    return record
+
+def predict(name, date_range, project_root='', models_dir=None):
+    """
+    Predikerer målvariabelen for en liste med datoer med den lagrede modellen.
+
+    Forklaringsvariablene er kalenderegenskaper, som regnes ut direkte fra
+    datoene. En prediksjon koster derfor bare innlasting av modellen og en
+    matrisemultiplikasjon, så lenge dataene ikke er endret.
+
+    Args:
+        name (str): Modellen, en nøkkel i MODEL_SPECS.
+        date_range (array-like): Datoene, f.eks. fra pd.date_range.
+        project_root (str): Prosjektets rot-mappe.
+        models_dir (str, optional): Mappen med modellene.
+
+    Returns:
+        pd.Series: Predikerte verdier indeksert på datoene.
+
+    Raises:
+        ValueError: Hvis modellen bruker egenskaper som ikke kan regnes ut fra datoene alene.
+    """
+    record = get_model(name, project_root, models_dir)
+    unknown = [feature for feature in record['features'] if feature not in CALENDAR_COLUMNS]
+    if unknown:
+        raise ValueError(f"Modellen '{name}' trenger {unknown}, som ikke kan regnes ut fra datoene")
+    dates = pd.DatetimeIndex(date_range)
+    features = calendar_features(dates)[record['features']]
+    return pd.Series(record['model'].predict(features), index=dates, name=record['target'])
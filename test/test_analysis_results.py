@@ -0,0 +1,84 @@
+import unittest
+import tempfile
+from unittest import mock
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_access import analysis_results
+from src.data_access.analysis_results import (
+    save_analysis_table, read_analysis_table, read_correlation_matrix, tidy_matrix
+)
+from src.data_analysis.statistics_engine import multi_level_statistics
+
+class TestAnalysisResults(unittest.TestCase):
+    """
+    Tester for lagring og lesing av analysetabeller i langt format.
+    """
+
+    def setUp(self):
+        """
+        Lager statistikk per år og årstid for to variabler, og en midlertidig resultatmappe.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        df = pd.DataFrame({
+            'year': np.repeat([2019, 2020, 2021], 40),
+            'season': np.tile(np.repeat(['Winter', 'Spring', 'Summer', 'Fall'], 10), 3),
+            'NO2': rng.normal(20, 5, 120),
+            'PM10': rng.normal(10, 2, 120)
+        })
+        self.year_season, _ = multi_level_statistics(df, ['NO2', 'PM10'], ['year', 'season'], ['year'])
+
+    def tearDown(self):
+        """
+        Fjerner den midlertidige mappen.
+        """
+        self.tmp_dir.cleanup()
+
+    @unittest.skipUnless(analysis_results.HAS_PYARROW, "pyarrow er ikke installert")
+    def test_parquet_filter_and_types(self):
+        """
+        Tester at statistikken lagres med én rad per variabel, og at filteret bare gir de valgte radene.
+        """
+        path = save_analysis_table(self.year_season, self.tmp_dir.name, 'stats')
+        self.assertTrue(path.endswith('.parquet'))
+
+        table = read_analysis_table(path, columns=['year', 'season', 'variable', 'mean', 'count'],
+                                    year=[2020, 2021], season='Winter')
+        self.assertEqual(len(table), 2 * 2)
+        self.assertEqual(table['count'].dtype, np.int64)
+        self.assertIsInstance(table['season'].dtype, pd.CategoricalDtype)
+        expected = self.year_season.loc[(2021, 'Winter'), ('PM10', 'mean')]
+        row = table[(table['year'] == 2021) & (table['variable'] == 'PM10')]
+        self.assertAlmostEqual(row['mean'].iloc[0], expected)
+
+    def test_correlation_matrix_round_trip(self):
+        """
+        Tester at en korrelasjonsmatrise kan leses tilbake med samme rekkefølge, også via .csv-navnet.
+        """
+        columns = ['b', 'a', 'c']
+        matrix = pd.DataFrame(np.corrcoef(np.random.default_rng(1).normal(size=(3, 50))), index=columns, columns=columns)
+        save_analysis_table(tidy_matrix(matrix), self.tmp_dir.name, 'corr')
+
+        restored = read_correlation_matrix(os.path.join(self.tmp_dir.name, 'corr.csv'))
+        pd.testing.assert_frame_equal(restored, matrix, check_names=False)
+
+    def test_csv_without_pyarrow(self):
+        """
+        Tester at tabellen lagres og filtreres som CSV når pyarrow mangler.
+        """
+        with mock.patch.object(analysis_results, 'HAS_PYARROW', False):
+            path = save_analysis_table(self.year_season, self.tmp_dir.name, 'stats')
+            table = read_analysis_table(path, year=2019)
+
+        self.assertTrue(path.endswith('.csv'))
+        self.assertEqual(sorted(table['variable'].unique()), ['NO2', 'PM10'])
+        self.assertEqual(len(table), 4 * 2)
+
+if __name__ == '__main__':
+    unittest.main()
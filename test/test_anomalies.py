@@ -0,0 +1,56 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_access.climatology import compute_climatology
+from src.data_analysis.anomalies import detect_anomalies, count_anomalies
+
+class TestAnomalies(unittest.TestCase):
+    """
+    Tester for avviksdeteksjonen mot klimatologien.
+    """
+
+    def setUp(self):
+        """
+        Lager fem år med årssyklus og legger inn to tydelige avvik.
+        """
+        dates = pd.date_range('2015-01-01', '2019-12-31', freq='D')
+        rng = np.random.default_rng(5)
+        doy = dates.dayofyear.to_numpy()
+        values = 10 * np.sin(2 * np.pi * doy / 365) + rng.normal(size=len(dates))
+        values[100] += 15   # Høyt avvik
+        values[1000] -= 15  # Lavt avvik
+        self.df = pd.DataFrame({'date': dates, 'NO2': values})
+        self.climatology = compute_climatology(self.df, 'date', ['NO2'])
+
+    def test_z_bounds(self):
+        """
+        Tester at z-grensen bare finner de innlagte avvikene, med riktig retning.
+        """
+        anomalies = detect_anomalies(self.df, 'date', ['NO2'], self.climatology,
+                                     z_threshold=6.0, quantile_bounds=None, station='test')
+
+        self.assertEqual(list(anomalies['date']), [self.df['date'][100], self.df['date'][1000]])
+        self.assertEqual(list(anomalies['direction']), ['high', 'low'])
+        self.assertTrue((anomalies['method'] == 'z').all())
+        self.assertEqual(count_anomalies(anomalies).loc[('test', 'NO2', 2015), 'high'], 1)
+
+    def test_quantile_bounds(self):
+        """
+        Tester at kvantilgrensene flagger omtrent den forventede andelen dager.
+        """
+        anomalies = detect_anomalies(self.df, 'date', ['NO2'], self.climatology,
+                                     z_threshold=None, quantile_bounds=(0.05, 0.95))
+
+        share = len(anomalies) / len(self.df)
+        self.assertGreater(share, 0.05)
+        self.assertLess(share, 0.15)
+        self.assertTrue(((anomalies['value'] < anomalies['lower']) | (anomalies['value'] > anomalies['upper'])).all())
+
+if __name__ == '__main__':
+    unittest.main()
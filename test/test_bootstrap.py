@@ -0,0 +1,66 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.bootstrap import (
+    block_bootstrap_indices, bootstrap_group_statistics, bootstrap_confidence_intervals
+)
+
+class TestBootstrap(unittest.TestCase):
+    """
+    Tester for bootstrap-konfidensintervallene.
+    """
+
+    def setUp(self):
+        """
+        Lager to år med tilfeldige daglige verdier per år og årstid.
+        """
+        rng = np.random.default_rng(3)
+        dates = pd.date_range('2019-01-01', '2020-12-31', freq='D')
+        self.df = pd.DataFrame({
+            'year': dates.year,
+            'season': np.array(['Winter', 'Spring', 'Summer', 'Fall'])[(dates.month % 12) // 3],
+            'NO2': rng.normal(20, 5, len(dates))
+        })
+
+    def test_blocks_stay_within_groups(self):
+        """
+        Tester at trukne rader hører til samme gruppe og at blokkene er sammenhengende.
+        """
+        sizes = np.array([10, 3, 25])
+        indices = block_bootstrap_indices(sizes, 50, 4, np.random.default_rng(0))
+        group = np.repeat(np.arange(3), sizes)
+
+        self.assertEqual(indices.shape, (50, 38))
+        np.testing.assert_array_equal(group[indices], np.broadcast_to(group, indices.shape))
+        # Første blokk i den siste gruppen (rad 13-16): indeksen øker med én, med omløp i gruppen
+        step = np.diff(indices[:, 13:17] - 13, axis=1) % 25
+        self.assertTrue(np.all(step == 1))
+
+    def test_parallel_matches_serial(self):
+        """
+        Tester at resultatet er det samme uansett antall prosesser.
+        """
+        _, serial = bootstrap_group_statistics(self.df, ['NO2'], n_boot=200, batch_size=50, max_workers=1)
+        _, parallel = bootstrap_group_statistics(self.df, ['NO2'], n_boot=200, batch_size=50, max_workers=2)
+        np.testing.assert_array_equal(serial['median'], parallel['median'])
+
+    def test_intervals_contain_estimate(self):
+        """
+        Tester at intervallet for gjennomsnittet inneholder gruppens gjennomsnitt.
+        """
+        ci = bootstrap_confidence_intervals(self.df, ['NO2'], n_boot=300)
+        means = self.df.groupby(['year', 'season'])['NO2'].mean()
+
+        self.assertEqual(len(ci), 8)
+        self.assertTrue((ci[('NO2', 'mean_ci_low')] < means).all())
+        self.assertTrue((ci[('NO2', 'mean_ci_high')] > means).all())
+        self.assertTrue((ci[('NO2', 'median_ci_low')] < ci[('NO2', 'median_ci_high')]).all())
+
+if __name__ == '__main__':
+    unittest.main()
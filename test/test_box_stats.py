@@ -0,0 +1,83 @@
+import unittest
+import tempfile
+import json
+import pandas as pd
+import numpy as np
+import sys
+import os
+from matplotlib.cbook import boxplot_stats
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.box_stats import box_statistics, save_box_statistics, load_box_statistics, to_bxp_stats
+
+class TestBoxStats(unittest.TestCase):
+    """
+    Tester for den forhåndsberegnede boksplottstatistikken per måned.
+    """
+
+    def setUp(self):
+        """
+        Lager to år med timedata med tunge haler for to stasjoner, med noen manglende verdier.
+        """
+        rng = np.random.default_rng(8)
+        dates = pd.date_range('2019-01-01', '2020-12-31 23:00', freq='h')
+        self.df = pd.DataFrame({
+            'date': dates,
+            'station': rng.choice(['elgeseter', 'torvet'], len(dates)),
+            'NO2': rng.standard_t(3, len(dates)) * 5 + 20
+        })
+        self.df.loc[::11, 'NO2'] = np.nan
+
+    def test_matches_matplotlib(self):
+        """
+        Tester kvartiler, whiskers og antall uteliggere mot matplotlib sin boxplot_stats.
+        """
+        stats, outliers = box_statistics(self.df, 'date', ['NO2'], station_column='station', max_outliers=20)
+
+        for station in ('elgeseter', 'torvet'):
+            for month in (1, 6, 12):
+                rows = (self.df['station'] == station) & (self.df['date'].dt.month == month)
+                expected = boxplot_stats(self.df.loc[rows, 'NO2'].dropna().to_numpy())[0]
+                row = stats.loc[(station, 'NO2', month)]
+                for key, column in (('q1', 'q1'), ('med', 'median'), ('q3', 'q3'), ('whislo', 'whislo'),
+                                    ('whishi', 'whishi'), ('mean', 'mean')):
+                    self.assertAlmostEqual(row[column], expected[key])
+                self.assertEqual(row['n_outliers'], len(expected['fliers']))
+
+                # Utvalget av uteliggere er begrenset, men tar med de mest ekstreme verdiene
+                sample = outliers[(outliers['station'] == station) & (outliers['month'] == month)]['value']
+                self.assertEqual(len(sample), min(20, len(expected['fliers'])))
+                self.assertEqual(sample.min(), expected['fliers'].min())
+                self.assertEqual(sample.max(), expected['fliers'].max())
+
+    def test_load_prefers_saved_tables(self):
+        """
+        Tester at lagrede tabeller brukes når de er nyere enn dataene, og at de beregnes på nytt ellers.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            clean_dir, results_dir = os.path.join(root, 'clean'), os.path.join(root, 'analyses_results')
+            os.makedirs(clean_dir)
+            data_path = os.path.join(clean_dir, 'nilu.json')
+            daily = self.df.set_index('date')['NO2'].resample('D').mean().round(1)
+            with open(data_path, 'w') as file:
+                json.dump([{'dateTime': day.strftime('%Y-%m-%d'), 'NO2': value} for day, value in daily.items()], file)
+
+            computed, _ = load_box_statistics('nilu', data_path, 'NO2')
+            # Lagrede tabeller med en kjent verdi skal brukes uten ny beregning
+            saved = computed.copy()
+            saved['median'] = -1.0
+            save_box_statistics((saved, pd.DataFrame({'station': ['nilu'], 'variable': ['NO2'], 'month': [1],
+                                                      'value': [99.0]})), results_dir, 'nilu')
+            stats, outliers = load_box_statistics('nilu', data_path, 'NO2')
+
+        self.assertTrue((stats['median'] == -1.0).all())
+        boxes = to_bxp_stats(stats, outliers, {1: 'Jan'})
+        self.assertEqual(len(boxes), 12)
+        self.assertEqual(boxes[0]['label'], 'Jan')
+        self.assertEqual(list(boxes[0]['fliers']), [99.0])
+        self.assertAlmostEqual(computed.loc[('nilu', 'NO2', 3), 'median'], daily[daily.index.month == 3].median())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_access.calendar_features import (
+    SEASON_LABELS, MONTH_TO_SEASON, get_season, calendar_arrays, add_calendar_features
+)
+
+class TestCalendarFeatures(unittest.TestCase):
+    """
+    Tester for de vektoriserte kalenderfunksjonene.
+    """
+
+    def setUp(self):
+        """
+        Lager timesdata over et skuddår og litt av året etter.
+        """
+        self.dates = pd.Series(pd.date_range('2019-12-30', '2021-01-02 23:00', freq='h'))
+
+    def test_calendar_arrays_match_pandas(self):
+        """
+        Tester at år, måned og dag i året er de samme som pandas' .dt-accessor gir.
+        """
+        parts = calendar_arrays(self.dates)
+        np.testing.assert_array_equal(parts['year'], self.dates.dt.year)
+        np.testing.assert_array_equal(parts['month'], self.dates.dt.month)
+        np.testing.assert_array_equal(parts['day_of_year'], self.dates.dt.dayofyear)
+
+    def test_season_matches_get_season(self):
+        """
+        Tester at årstidskolonnen er kategorisk og stemmer med get_season per rad.
+        """
+        df = add_calendar_features(pd.DataFrame({'date': self.dates}), 'date',
+                                   features=('month', 'season', 'hydrological_year'), harmonics=2)
+
+        self.assertEqual(list(df['season'].cat.categories), SEASON_LABELS)
+        expected = df['month'].map(get_season)
+        self.assertTrue((df['season'].astype(str) == expected).all())
+        self.assertEqual(df.loc[df['date'] == '2020-08-31', 'hydrological_year'].iloc[0], 2019)
+        self.assertEqual(df.loc[df['date'] == '2020-09-01', 'hydrological_year'].iloc[0], 2020)
+        self.assertIn('cos_2', df.columns)
+
+    def test_invalid_months_and_missing_dates(self):
+        """
+        Tester at ugyldige måneder gir 'Unknown' og manglende datoer gir manglende årstid.
+        """
+        self.assertEqual(get_season(0), 'Unknown')
+        self.assertEqual(get_season('abc'), 'Unknown')
+        self.assertEqual(MONTH_TO_SEASON[12], 'Winter')
+
+        df = pd.DataFrame({'date': pd.to_datetime(['2020-01-15', None, '2020-07-01'])})
+        add_calendar_features(df, 'date', categorical=False)
+        self.assertEqual(df['season'].tolist(), ['Winter', None, 'Summer'])
+        self.assertTrue(np.isnan(df['year'].iloc[1]))
+
+if __name__ == '__main__':
+    unittest.main()
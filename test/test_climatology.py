@@ -0,0 +1,111 @@
+import unittest
+import tempfile
+import json
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_access.climatology import compute_climatology, get_climatology, get_climatology_path
+from src.data_access.climatology import Climatology, climatology_fingerprints, climatology_params
+from src.data_cleaning.data_validators import ImputationValidator
+from src.data_cleaning.data_cleaning_nilu import main_dc_nilu
+from src.data_access.data_loader import load_nilu_data
+
+class TestClimatology(unittest.TestCase):
+    """
+    Tester for den felles klimatologien per dag i året.
+    """
+
+    def setUp(self):
+        """
+        Lager fire år med en årssyklus, støy og noen imputerte verdier.
+        """
+        dates = pd.date_range('2016-01-01', '2019-12-31', freq='D')
+        rng = np.random.default_rng(4)
+        doy = dates.dayofyear.to_numpy()
+        self.df = pd.DataFrame({
+            'date': dates,
+            'temp': np.round(5 - 10 * np.cos(2 * np.pi * doy / 365) + rng.normal(size=len(dates)), 1),
+            'generated_temp': rng.random(len(dates)) < 0.05
+        })
+
+    def test_matches_pandas(self):
+        """
+        Tester gjennomsnitt per dag i året og kvantiler over vinduet mot pandas.
+        """
+        climatology = compute_climatology(self.df, 'date', ['temp'], window=15)
+        observed = self.df['temp'].where(~self.df['generated_temp'])
+        doy = self.df['date'].dt.dayofyear
+
+        expected = observed.groupby(doy).mean().reindex(range(1, 367))
+        np.testing.assert_allclose(climatology.arrays['doy_mean'][0], expected.to_numpy())
+        # Vinduet rundt 1. mars er dag 54-68 i året
+        window = observed[(doy >= 54) & (doy <= 68)]
+        self.assertAlmostEqual(climatology.quantile('temp', 0.9, [61])[0], window.quantile(0.9))
+        # Den glattede årssyklusen følger kurven dataene er laget fra
+        self.assertAlmostEqual(climatology.lookup('temp', [1])[0], 5 - 10 * np.cos(2 * np.pi / 365), delta=0.3)
+
+    def test_cached_until_data_changes(self):
+        """
+        Tester at den lagrede klimatologien gjenbrukes, og beregnes på nytt uten å lagres når målingene endres.
+        """
+        with tempfile.TemporaryDirectory() as clean_dir:
+            path = get_climatology_path('test', clean_dir)
+            compute_climatology(self.df, 'date', ['temp']).save(path)
+            written = os.stat(path).st_mtime_ns
+
+            # Endrede imputerte verdier påvirker ikke klimatologien
+            changed = self.df.copy()
+            changed.loc[changed['generated_temp'], 'temp'] = 100.0
+            get_climatology('test', changed, 'date', ['temp'], clean_dir=clean_dir)
+            self.assertEqual(os.stat(path).st_mtime_ns, written)
+
+            changed.loc[~changed['generated_temp'], 'temp'] += 1.0
+            updated = get_climatology('test', changed, 'date', ['temp'], clean_dir=clean_dir)
+            self.assertEqual(os.stat(path).st_mtime_ns, written)
+            self.assertAlmostEqual(updated.arrays['doy_mean'][0, 0],
+                                   get_climatology('test', clean_dir=clean_dir).arrays['doy_mean'][0, 0] + 1.0)
+
+    def test_imputation_uses_climatology(self):
+        """
+        Tester at imputasjonen fyller inn gjennomsnittet per dag i året og tar vare på klimatologien.
+        """
+        df = self.df[['date', 'temp']].rename(columns={'date': 'referenceTime'})
+        df.loc[self.df['generated_temp'], 'temp'] = np.nan
+        validator = ImputationValidator()
+        info, imputed = validator.validate(df)
+
+        missing = df['temp'].isna()
+        expected = df['temp'].groupby(df['referenceTime'].dt.dayofyear).transform('mean').round(1)
+        self.assertEqual(info['temp'], missing.sum())
+        np.testing.assert_allclose(imputed.loc[missing, 'temp'], expected[missing])
+        self.assertEqual(validator.climatology.columns, ['temp'])
+
+    def test_cleaning_saves_climatology_of_cleaned_values(self):
+        """
+        Tester at klimatologien fra rensingen har samme fingeravtrykk som de avrundede verdiene som lagres.
+        """
+        rng = np.random.default_rng(6)
+        dates = pd.date_range('2018-01-01', '2019-12-31', freq='D').strftime('%Y-%m-%dT00:00:00+01:00')
+        raw = [{'component': component,
+                'values': [{'dateTime': date, 'value': float(value)}
+                           for date, value in zip(dates, rng.gamma(4, 5, len(dates))) if rng.random() > 0.02]}
+               for component in ('NO2', 'PM10')]
+
+        with tempfile.TemporaryDirectory() as clean_dir:
+            raw_file = os.path.join(clean_dir, 'raw.json')
+            cleaned_file = os.path.join(clean_dir, 'cleaned_data_nilu.json')
+            with open(raw_file, 'w') as file:
+                json.dump(raw, file)
+            main_dc_nilu(raw_file, cleaned_file)
+
+            saved = Climatology.load(get_climatology_path('nilu', clean_dir))
+            fingerprints = climatology_fingerprints(load_nilu_data(cleaned_file), 'dateTime', ['NO2', 'PM10'])
+            self.assertTrue(saved.matches(fingerprints, climatology_params()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.correlation_engine import (
+    pairwise_correlation, lagged_cross_correlation, cross_correlation_table, strongest_lags
+)
+
+class TestCorrelationEngine(unittest.TestCase):
+    """
+    Tester for korrelasjonsmotoren som sammenligner vær og luftkvalitet.
+    """
+
+    def setUp(self):
+        """
+        Lager værdata og en komponent som følger temperaturen med fem dagers forsinkelse.
+        """
+        rng = np.random.default_rng(2)
+        n = 1000
+        self.x = rng.normal(size=(n, 2))
+        self.y = np.roll(self.x[:, :1], 5, axis=0) + 0.5 * rng.normal(size=(n, 1))
+        self.x[rng.random(self.x.shape) < 0.1] = np.nan
+        self.y[rng.random(self.y.shape) < 0.1] = np.nan
+        self.dates = pd.date_range('2016-01-01', periods=n, freq='D')
+
+    def test_pairwise_matches_pandas(self):
+        """
+        Tester at manglende verdier gir parvis komplette korrelasjoner, som DataFrame.corr.
+        """
+        values = np.column_stack([self.x, self.y])
+        corr, counts = pairwise_correlation(values)
+
+        np.testing.assert_allclose(corr, pd.DataFrame(values).corr().to_numpy())
+        self.assertEqual(counts[0, 2], int((~np.isnan(values[:, [0, 2]])).all(axis=1).sum()))
+
+    def test_lagged_matches_shifted_series(self):
+        """
+        Tester at korrelasjonen ved hvert lag er lik korrelasjonen med en forskjøvet serie.
+        """
+        corr, counts = lagged_cross_correlation(self.x, self.y, max_lag=10)
+
+        for lag in (-7, 0, 5, 10):
+            shifted = pd.Series(self.y[:, 0]).shift(-lag)
+            expected = pd.Series(self.x[:, 0]).corr(shifted)
+            self.assertAlmostEqual(corr[0, lag + 10, 0, 0], expected, places=10)
+            self.assertEqual(counts[0, lag + 10, 0, 0], (shifted.notna() & ~np.isnan(self.x[:, 0])).sum())
+
+    def test_seasonal_table_finds_lag(self):
+        """
+        Tester at tabellen har én rad per årstid, lag og par, og at forsinkelsen blir funnet.
+        """
+        df = pd.DataFrame({'date': self.dates, 'temp': self.x[:, 0], 'wind': self.x[:, 1], 'NO2': self.y[:, 0]})
+        table = cross_correlation_table(df, ['temp', 'wind'], ['NO2'], max_lag=30)
+
+        self.assertEqual(len(table), 5 * 61 * 2)
+        best = strongest_lags(table)
+        self.assertEqual(best.loc[('All', 'temp', 'NO2'), 'lag'], 5)
+        self.assertEqual(best.loc[('Summer', 'temp', 'NO2'), 'lag'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,343 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_access.data_loader import load_frost_data, load_nilu_data, clear_data_cache
+from src.data_access.series_cache import write_series_cache, load_series_cache
+from src.data_access.frost_query import query_frost
+from src.data_access.raw_frost_store import load_raw_frost_entries
+from src.predictive_analysis.data_deletion_frost import delete_frost_data_period, restore_frost_data_period
+
+def create_frost_db(path, temperatures):
+    """
+    Hjelpefunksjon som lager en liten Frost-database med daglige temperaturer.
+
+    Args:
+        path (str): Filsti til SQLite-databasen.
+        temperatures (list): Temperaturer, én per dag fra 2020-01-01.
+    """
+    df = pd.DataFrame({
+        'referenceTime': pd.date_range('2020-01-01', periods=len(temperatures), freq='D').strftime('%Y-%m-%d'),
+        'mean_air_temperature': temperatures,
+        'total_precipitation': [0.0] * len(temperatures)
+    })
+    with sqlite3.connect(path) as conn:
+        df.to_sql('weather_data', conn, if_exists='replace', index=False)
+
+class TestDataLoader(unittest.TestCase):
+    """
+    Tester for den cachede innlastingen av rensede Frost- og NILU-data.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en midlertidig mappe med testdata og tømmer cachen.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'frost.db')
+        self.json_path = os.path.join(self.tmp_dir.name, 'nilu.json')
+        create_frost_db(self.db_path, [-3.0, 1.5, 4.0])
+        with open(self.json_path, 'w') as file:
+            json.dump([
+                {'dateTime': '2020-06-01', 'NO2': 10.0, 'PM10': 5.0},
+                {'dateTime': '2020-12-01', 'NO2': 20.0, 'PM10': None}
+            ], file)
+        clear_data_cache()
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        clear_data_cache()
+        self.tmp_dir.cleanup()
+
+    def test_frost_prepared_columns(self):
+        """
+        Tester at Frost-data får datetime, år, måned og årstid.
+        """
+        # Kjører innlasting
+        df = load_frost_data(self.db_path)
+
+        # Sjekker kolonner og typer
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['referenceTime']))
+        self.assertEqual(df['season'].tolist(), ['Winter'] * 3)
+        self.assertEqual(df['year'].tolist(), [2020] * 3)
+
+    def test_column_projection(self):
+        """
+        Tester at kun forespurte kolonner leses inn.
+        """
+        # Kjører innlasting med utvalgte kolonner
+        frost = load_frost_data(self.db_path, columns=['mean_air_temperature'])
+        nilu = load_nilu_data(self.json_path, columns=['NO2'])
+
+        # Sjekker at de andre målekolonnene ikke er med
+        self.assertNotIn('total_precipitation', frost.columns)
+        self.assertNotIn('PM10', nilu.columns)
+        self.assertEqual(nilu['season'].tolist(), ['Summer', 'Winter'])
+
+    def test_cached_data_is_read_only(self):
+        """
+        Tester at kallere ikke kan endre de cachede verdiene.
+        """
+        # Setter opp data
+        df = load_frost_data(self.db_path)
+
+        # Sjekker at skriving feiler og at nye kolonner ikke påvirker cachen
+        with self.assertRaises(ValueError):
+            df.loc[0, 'mean_air_temperature'] = 100.0
+        df['extra'] = 1
+        self.assertNotIn('extra', load_frost_data(self.db_path).columns)
+        self.assertEqual(load_frost_data(self.db_path)['mean_air_temperature'].iloc[0], -3.0)
+
+    def test_changed_file_is_reloaded(self):
+        """
+        Tester at cachen oppdateres når filen endres.
+        """
+        # Setter opp data og endrer filen etter første innlasting
+        load_frost_data(self.db_path)
+        create_frost_db(self.db_path, [7.0, 8.0, 9.0, 10.0])
+        stat = os.stat(self.db_path)
+        os.utime(self.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        # Kjører innlasting på nytt
+        df = load_frost_data(self.db_path)
+
+        # Sjekker at de nye verdiene er lest inn
+        self.assertEqual(len(df), 4)
+        self.assertTrue(np.allclose(df['mean_air_temperature'], [7.0, 8.0, 9.0, 10.0]))
+
+    def test_missing_file(self):
+        """
+        Tester at en manglende fil gir FileNotFoundError.
+        """
+        with self.assertRaises(FileNotFoundError):
+            load_nilu_data(os.path.join(self.tmp_dir.name, 'finnes_ikke.json'))
+
+class TestFrostQuery(unittest.TestCase):
+    """
+    Tester for spørrings-API-et mot Frost-databasen.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en Frost-database med 60 dager fra 2020-01-01.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'frost.db')
+        create_frost_db(self.db_path, [float(i) for i in range(60)])
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_date_range_and_projection(self):
+        """
+        Tester at kun radene og kolonnene i perioden hentes.
+        """
+        # Kjører spørring for 2020-01-10 til og med 2020-01-12
+        df = query_frost(['mean_air_temperature'], start='2020-01-10', end='2020-01-12', db_path=self.db_path)
+
+        # Sjekker resultatet
+        self.assertEqual(df.columns.tolist(), ['referenceTime', 'mean_air_temperature'])
+        self.assertEqual(df['mean_air_temperature'].tolist(), [9.0, 10.0, 11.0])
+
+    def test_monthly_aggregation(self):
+        """
+        Tester at månedlige gjennomsnitt beregnes i SQLite.
+        """
+        # Kjører spørring med månedlig aggregering
+        df = query_frost(['mean_air_temperature'], agg='monthly', db_path=self.db_path)
+
+        # Sjekker januar (dag 0-30) og februar (dag 31-59)
+        self.assertEqual(df['month'].tolist(), [1, 2])
+        self.assertEqual(df['n_days'].tolist(), [31, 29])
+        self.assertAlmostEqual(df['mean_air_temperature'].iloc[0], 15.0)
+        self.assertAlmostEqual(df['mean_air_temperature'].iloc[1], 45.0)
+
+    def test_unknown_column(self):
+        """
+        Tester at ukjente kolonnenavn avvises i stedet for å settes inn i SQL.
+        """
+        with self.assertRaises(ValueError):
+            query_frost(['mean_air_temperature; DROP TABLE weather_data'], db_path=self.db_path)
+
+class TestSeriesCache(unittest.TestCase):
+    """
+    Tester for den minnemappede .npy-cachen av rensede tidsserier.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en midlertidig cache-mappe.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'frost')
+
+    def tearDown(self):
+        """
+        Fjerner den midlertidige mappen.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_with_gap(self):
+        """
+        Tester at verdier og flagg havner på riktig dag, og at hull blir NaN.
+        """
+        # Setter opp testdata med manglende dag 2020-01-03
+        df = pd.DataFrame({
+            'referenceTime': ['2020-01-01', '2020-01-02', '2020-01-04'],
+            'mean_air_temperature': [1.0, 2.0, 4.0],
+            'generated_mean_air_temperature': [False, True, False],
+            'quality_mean_air_temperature': np.array([0, 9, 0], dtype=np.uint8)
+        })
+
+        # Kjører skriving og lesing
+        write_series_cache(df, self.cache_dir, 'referenceTime')
+        cache = load_series_cache(self.cache_dir)
+
+        # Sjekker dag-aksen, verdiene og flaggene
+        self.assertEqual(cache.meta['start_date'], '2020-01-01')
+        self.assertEqual(cache.length, 4)
+        values = cache.column('mean_air_temperature')
+        self.assertIsInstance(values, np.memmap)
+        self.assertTrue(np.isnan(values[2]))
+        self.assertEqual(values[cache.index_of('2020-01-04')], 4.0)
+        self.assertEqual(cache.generated('mean_air_temperature').tolist(), [False, True, False, False])
+        self.assertEqual(cache.columns, ['mean_air_temperature'])
+        self.assertEqual(cache.quality('mean_air_temperature').tolist(), [0, 9, 0, 0])
+
+    def test_empty_dataframe(self):
+        """
+        Tester at en tom DataFrame gir ValueError.
+        """
+        with self.assertRaises(ValueError):
+            write_series_cache(pd.DataFrame({'referenceTime': []}), self.cache_dir, 'referenceTime')
+
+class TestFrostDeletion(unittest.TestCase):
+    """
+    Tester for indeksert sletting av perioder i Frost-rådataene.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en prosjektmappe med rådata for 10 dager og en renset database.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_root = self.tmp_dir.name
+        os.makedirs(os.path.join(self.project_root, 'data', 'raw'))
+        os.makedirs(os.path.join(self.project_root, 'data', 'clean'))
+        entries = [{'sourceId': 'SN68860:0', 'referenceTime': f'2012-04-{day:02d}T00:00:00.000Z',
+                    'observations': [{'elementId': 'mean(air_temperature P1D)', 'value': float(day)}]}
+                   for day in range(25, 31)]
+        entries += [{'sourceId': 'SN68860:0', 'referenceTime': f'2012-05-{day:02d}T00:00:00.000Z',
+                     'observations': [{'elementId': 'mean(air_temperature P1D)', 'value': float(day)}]}
+                    for day in range(1, 5)]
+        self.json_path = os.path.join(self.project_root, 'data', 'raw', 'api_frost_weather.json')
+        with open(self.json_path, 'w') as file:
+            json.dump(entries, file)
+        self.db_path = os.path.join(self.project_root, 'data', 'clean', 'cleaned_data_frost.db')
+        create_frost_db(self.db_path, [1.0, 2.0])
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_dry_run(self):
+        """
+        Tester at dry run teller oppføringene uten å slette eller fjerne rensede data.
+        """
+        # Kjører dry run for mai
+        result = delete_frost_data_period(self.project_root, '2012-05-01', '2012-05-31', dry_run=True)
+
+        # Sjekker tellingen og at ingenting er endret
+        self.assertEqual(result['deleted_entries'], 4)
+        self.assertEqual(result['remaining_entries'], 6)
+        self.assertTrue(os.path.exists(self.db_path))
+        self.assertEqual(delete_frost_data_period(self.project_root, '2012-05-01', '2012-05-31',
+                                                  dry_run=True)['deleted_entries'], 4)
+
+    def test_delete_period(self):
+        """
+        Tester at perioden slettes, at slettingen bevares og at rensede data fjernes.
+        """
+        # Kjører sletting av 2012-04-30 til og med 2012-05-02
+        result = delete_frost_data_period(self.project_root, '2012-04-30', '2012-05-02')
+
+        # Sjekker sammendraget og at rensede data er fjernet
+        self.assertEqual(result['original_entries'], 10)
+        self.assertEqual(result['deleted_entries'], 3)
+        self.assertEqual(result['remaining_entries'], 7)
+        self.assertFalse(os.path.exists(self.db_path))
+        self.assertIn(self.db_path, result['invalidated_outputs'])
+
+        # Sjekker at JSON-filen er urørt og at slettingen gjelder ved neste kall
+        with open(self.json_path) as file:
+            self.assertEqual(len(json.load(file)), 10)
+        again = delete_frost_data_period(self.project_root, '2012-04-30', '2012-05-02')
+        self.assertEqual(again['deleted_entries'], 0)
+        self.assertEqual(again['deleted_periods'], [('2012-04-30', '2012-05-02')])
+
+    def test_deletion_survives_new_raw_data(self):
+        """
+        Tester at en slettet periode forblir slettet når rådataene hentes på nytt, og at avledede data fjernes.
+        """
+        state_path = os.path.join(self.project_root, 'data', 'analyses_results', 'frost_streaming_state.json')
+        os.makedirs(os.path.dirname(state_path))
+        with open(state_path, 'w') as file:
+            json.dump({}, file)
+
+        result = delete_frost_data_period(self.project_root, '2012-05-01', '2012-05-31')
+        self.assertFalse(os.path.exists(state_path))
+        self.assertIn(state_path, result['invalidated_outputs'])
+
+        # Ny henting skriver hele JSON-filen på nytt, med en ny dag i mai
+        with open(self.json_path) as file:
+            entries = json.load(file)
+        entries.append({'sourceId': 'SN68860:0', 'referenceTime': '2012-05-05T00:00:00.000Z',
+                        'observations': [{'elementId': 'mean(air_temperature P1D)', 'value': 5.0}]})
+        with open(self.json_path, 'w') as file:
+            json.dump(entries, file)
+        mtime = os.stat(self.json_path).st_mtime_ns + 10**9
+        os.utime(self.json_path, ns=(mtime, mtime))
+
+        times = [entry['referenceTime'][:10] for entry in load_raw_frost_entries(self.json_path)]
+        self.assertEqual(len(times), 6)
+        self.assertFalse(any(time.startswith('2012-05') for time in times))
+
+    def test_restore_period(self):
+        """
+        Tester at en slettet periode kan gjenopprettes fra JSON-filen, og at andre perioder forblir slettet.
+        """
+        delete_frost_data_period(self.project_root, '2012-04-25', '2012-04-26')
+        delete_frost_data_period(self.project_root, '2012-05-01', '2012-05-31')
+        create_frost_db(self.db_path, [1.0, 2.0])
+
+        result = restore_frost_data_period(self.project_root, '2012-05-01', '2012-05-31')
+
+        # Sjekker at mai er tilbake, at april-perioden fortsatt er slettet og at rensede data er fjernet
+        self.assertEqual(result['restored_periods'], 1)
+        self.assertEqual(result['restored_entries'], 4)
+        self.assertEqual(result['total_entries'], 8)
+        self.assertEqual(result['deleted_periods'], [('2012-04-25', '2012-04-26')])
+        self.assertIn(self.db_path, result['invalidated_outputs'])
+        times = [entry['referenceTime'][:10] for entry in load_raw_frost_entries(self.json_path)]
+        self.assertEqual(sum(time.startswith('2012-05') for time in times), 4)
+
+        # Uten datoer gjenopprettes alle periodene
+        self.assertEqual(restore_frost_data_period(self.project_root)['total_entries'], 10)
+        self.assertEqual(restore_frost_data_period(self.project_root)['restored_periods'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
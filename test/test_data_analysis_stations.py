@@ -0,0 +1,95 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.data_analysis_stations import (
+    read_partitions, load_partitions, station_statistics, station_correlations
+)
+
+class TestDataAnalysisStations(unittest.TestCase):
+    """
+    Tester for den samlede analysen av flere stasjoner.
+    """
+
+    def setUp(self):
+        """
+        Lager én Frost-database og to NILU-filer med ulike nivåer, og en stasjonsliste.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        dates = pd.date_range('2020-01-01', '2021-12-31', freq='D')
+        rng = np.random.default_rng(6)
+
+        frost_path = os.path.join(self.tmp_dir.name, 'frost.db')
+        with sqlite3.connect(frost_path) as conn:
+            pd.DataFrame({
+                'referenceTime': dates.strftime('%Y-%m-%d'),
+                'mean_air_temperature': rng.normal(5, 8, len(dates)).round(1)
+            }).to_sql('weather_data', conn, index=False)
+
+        partitions = [{'station': 'voll', 'source': 'frost', 'path': frost_path,
+                       'columns': ['mean_air_temperature']}]
+        for station, level in (('elgeseter', 30.0), ('torvet', 15.0)):
+            path = os.path.join(self.tmp_dir.name, f'{station}.json')
+            with open(path, 'w') as file:
+                json.dump([{'dateTime': day, 'NO2': float(value), 'PM10': float(value) / 2}
+                           for day, value in zip(dates.strftime('%Y-%m-%d'),
+                                                 rng.normal(level, 3, len(dates)).round(1))], file)
+            partitions.append({'station': station, 'source': 'nilu', 'path': path, 'columns': ['NO2', 'PM10']})
+
+        self.config_file = os.path.join(self.tmp_dir.name, 'stations.json')
+        with open(self.config_file, 'w') as file:
+            json.dump(partitions, file)
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_consolidated_statistics(self):
+        """
+        Tester at den samlede tabellen har stasjon som nøkkel og gir samme tall som pandas per stasjon.
+        """
+        df = load_partitions(read_partitions(self.config_file))
+        year_season, year = station_statistics(df, ['mean_air_temperature', 'NO2', 'PM10'])
+
+        expected = df.groupby(['station', 'year'])['NO2'].mean().dropna()
+        np.testing.assert_allclose(year.xs('NO2', level='variable')['mean'], expected)
+        # Variabler en stasjon ikke har, gir ingen rader
+        self.assertEqual(sorted(year.loc['voll'].index.get_level_values('variable').unique()),
+                         ['mean_air_temperature'])
+        # Fem stasjon-variabel-par, to år og fire årstider
+        self.assertEqual(len(year_season), 5 * 2 * 4)
+
+    def test_parallel_loading_and_correlations(self):
+        """
+        Tester at lesing i flere prosesser gir det samme, og at korrelasjonene er per stasjon.
+        """
+        partitions = read_partitions(self.config_file)
+        serial = load_partitions(partitions)
+        parallel = load_partitions(partitions, max_workers=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+        correlations = station_correlations(serial, ['mean_air_temperature', 'NO2', 'PM10'])
+        self.assertAlmostEqual(correlations.loc[('torvet', 'NO2', 'PM10'), 'correlation'], 1.0)
+        self.assertNotIn(('voll', 'NO2', 'PM10'), correlations.index)
+
+    def test_invalid_partition(self):
+        """
+        Tester at ukjente kilder og dupliserte stasjonsnavn gir en forklarende feil.
+        """
+        with open(self.config_file, 'w') as file:
+            json.dump([{'station': 'a', 'source': 'yr', 'path': 'x'}], file)
+        with self.assertRaises(ValueError):
+            read_partitions(self.config_file)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,11 @@ import sys
 import os
 import json
 
-# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.data_cleaning.data_validators import MissingValueValidator, OutlierValidator, DateContinuityValidator, ImputationValidator
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_cleaning.data_validators import MissingValueValidator, OutlierValidator, DateContinuityValidator, ImputationValidator, QualityFlagValidator
+from src.data_access.quality_flags import QUALITY_MISSING, QUALITY_OUTLIER, QUALITY_GAP, QUALITY_IMPUTED, quality_mask
 
 # Laster inn mock-data fra en JSON-fil
 with open(os.path.join(os.path.dirname(__file__), 'mock_weather_data.json'), 'r') as f:
@@ -359,5 +361,63 @@ class TestImputationValidator(unittest.TestCase):
         self.assertTrue(not df_cleaned['sum(precipitation_amount P1D)'].isna().any())
         self.assertTrue(not df_cleaned['mean(wind_speed P1D)'].isna().any())
 
+    def test_imputation_uses_unrounded_mean(self):
+        """
+        Tester at gjennomsnittet per dag i året beregnes fra uavrundede verdier og først avrundes til slutt.
+        """
+        test_data = pd.DataFrame({
+            'referenceTime': pd.to_datetime(['2016-01-01', '2017-01-01', '2018-01-01', '2019-01-01', '2020-01-01']),
+            'mean_air_temperature': [0.14, 0.14, 0.14, 0.24, np.nan]
+        })
+        _, df_cleaned = self.validator.validate(test_data)
+
+        # Uavrundet gjennomsnitt er 0.165 (0.2); avrundet først ville gitt 0.125 (0.1)
+        self.assertAlmostEqual(df_cleaned['mean_air_temperature'].iloc[4], 0.2)
+        self.assertEqual(df_cleaned['mean_air_temperature'].iloc[:4].tolist(), [0.1, 0.1, 0.1, 0.2])
+
+class TestQualityFlagValidator(unittest.TestCase):
+    """
+    Tester for QualityFlagValidator-klassen, som samler valideringsresultatene i et kvalitetsfelt.
+    """
+
+    def test_bits_after_validation_chain(self):
+        """
+        Tester at manglende verdier, uteliggere og datohull får riktige bits, og at alle imputerte er merket.
+        """
+        dates = pd.date_range('2020-01-01', periods=10, freq='D').strftime('%Y-%m-%d')
+        test_data = pd.DataFrame({
+            'referenceTime': dates,
+            'mean_air_temperature': [1.0, np.nan, 3.0, 99.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+            'mean_wind_speed': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
+        }).drop(index=6)  # 2020-01-07 mangler helt
+
+        missing_results, df_cleaned = MissingValueValidator().validate(test_data)
+        outlier_results, df_cleaned = OutlierValidator({'mean_air_temperature': (-30, 40)}).validate(df_cleaned)
+        gap_results, df_cleaned = DateContinuityValidator().validate(df_cleaned)
+        _, df_cleaned = ImputationValidator(n_neighbors=3).validate(df_cleaned)
+        counts, df_cleaned = QualityFlagValidator().validate(df_cleaned, missing_results, outlier_results,
+                                                             gap_results)
+
+        flags = df_cleaned['quality_mean_air_temperature']
+        self.assertEqual(flags.dtype, np.uint8)
+        self.assertEqual(flags[1], QUALITY_MISSING | QUALITY_IMPUTED)
+        self.assertEqual(flags[3], QUALITY_OUTLIER | QUALITY_IMPUTED)
+        self.assertEqual(flags[6], QUALITY_GAP | QUALITY_IMPUTED)
+        self.assertEqual(int((flags == 0).sum()), 7)
+        self.assertEqual(df_cleaned['quality_mean_wind_speed'].tolist(),
+                         [0] * 6 + [QUALITY_GAP | QUALITY_IMPUTED] + [0] * 3)
+        self.assertEqual(counts['mean_air_temperature'], {'manglende': 1, 'uteligger': 1, 'datohull': 1,
+                                                          'imputert': 3})
+        self.assertEqual(quality_mask(df_cleaned, 'mean_air_temperature', QUALITY_OUTLIER | QUALITY_GAP).tolist(),
+                         [False] * 3 + [True] + [False] * 2 + [True] + [False] * 3)
+
+    def test_mask_without_quality_column(self):
+        """
+        Tester at data renset før kvalitetsfeltet fantes bruker 'generated_'-kolonnen.
+        """
+        df = pd.DataFrame({'NO2': [1.0, 2.0, 3.0], 'generated_NO2': [False, True, False]})
+        self.assertEqual(quality_mask(df, 'NO2').tolist(), [False, True, False])
+        self.assertFalse(quality_mask(df, 'NO2', QUALITY_MISSING).any())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
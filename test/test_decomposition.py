@@ -0,0 +1,108 @@
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from statsmodels.tsa.seasonal import STL
+from src.data_analysis.decomposition import decompose, get_decomposition, get_decomposition_path
+
+class TestDecomposition(unittest.TestCase):
+    """
+    Tester for dekomposisjonen i trend, sesong og rest.
+    """
+
+    def setUp(self):
+        """
+        Lager åtte år med lineær trend, årssyklus og støy for to stasjoner, med hull og imputerte verdier.
+        """
+        rng = np.random.default_rng(9)
+        dates = pd.date_range('2012-01-01', '2019-12-31', freq='D')
+        self.trend = 5 + 0.002 * np.arange(len(dates))
+        self.seasonal = 8 * np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 100) / 365.25)
+        frames = []
+        for station, scale in (('a', 1.0), ('b', 2.0)):
+            values = scale * (self.trend + self.seasonal) + rng.normal(0, 1.5, len(dates))
+            generated = rng.random(len(dates)) < 0.05
+            values[generated] = 100.0  # Imputerte verdier skal ikke påvirke komponentene
+            values[rng.random(len(dates)) < 0.05] = np.nan
+            frames.append(pd.DataFrame({'date': dates, 'station': station, 'NO2': values,
+                                        'generated_NO2': generated}))
+        self.df = pd.concat(frames, ignore_index=True)
+
+    def test_recovers_components(self):
+        """
+        Tester at trend og sesong følger kurvene dataene er laget fra, for alle stasjoner samtidig.
+        """
+        decomposition = decompose(self.df, 'date', ['NO2'], station_column='station')
+
+        for station, scale in (('a', 1.0), ('b', 2.0)):
+            trend = decomposition.component('trend', 'NO2', station).to_numpy()
+            seasonal = decomposition.component('seasonal', 'NO2', station).to_numpy()
+            # Kantene av trenden er mer usikre, som i LOESS
+            self.assertLess(np.abs(trend - scale * self.trend)[365:-365].max(), 0.3 * scale)
+            self.assertLess(np.abs(seasonal - scale * self.seasonal).mean(), 0.5 * scale)
+
+        # Imputerte dager er ikke målinger og har ingen rest
+        frame = decomposition.to_frame()
+        measured = frame['residual'].notna()
+        self.assertEqual(measured.sum(), (self.df['NO2'].notna() & ~self.df['generated_NO2']).sum())
+        np.testing.assert_allclose(frame.loc[measured, 'observed'],
+                                   (frame['trend'] + frame['seasonal'] + frame['residual'])[measured])
+
+    def test_long_gap_does_not_bias_components(self):
+        """
+        Tester at et langt hull (en slettet sommer) ikke trekker trenden mot en rett linje gjennom hullet.
+        """
+        df = self.df[self.df['station'] == 'a'].reset_index(drop=True)
+        gap = (df['date'] >= '2015-05-15') & (df['date'] <= '2015-09-15')
+        df.loc[gap, 'NO2'] = np.nan
+        decomposition = decompose(df, 'date', ['NO2'])
+
+        trend = decomposition.component('trend', 'NO2').to_numpy()
+        seasonal = decomposition.component('seasonal', 'NO2').to_numpy()
+        self.assertLess(np.abs(trend - self.trend)[gap].max(), 0.3)
+        self.assertLess(np.abs(seasonal - self.seasonal)[gap].mean(), 0.5)
+        self.assertTrue(np.isnan(decomposition.component('residual', 'NO2').to_numpy()[gap]).all())
+
+    def test_matches_statsmodels_without_gaps(self):
+        """
+        Tester at en serie uten hull og uten glatting mellom nabodager gir samme svar som STL fra statsmodels.
+        """
+        df = self.df[self.df['station'] == 'a'].drop(columns=['station', 'generated_NO2'])
+        df['NO2'] = df['NO2'].interpolate().bfill()
+        decomposition = decompose(df, 'date', ['NO2'], seasonal_days=1, fill_iterations=0)
+        expected = STL(df['NO2'].to_numpy(), period=365, robust=True, seasonal_jump=1, trend_jump=70,
+                       low_pass_jump=37).fit()
+
+        np.testing.assert_allclose(decomposition.component('trend', 'NO2').to_numpy(), expected.trend)
+        np.testing.assert_allclose(decomposition.component('seasonal', 'NO2').to_numpy(), expected.seasonal)
+
+    def test_parallel_and_cached(self):
+        """
+        Tester at fordeling på flere prosesser gir samme svar, og at den lagrede dekomposisjonen gjenbrukes.
+        """
+        serial = decompose(self.df, 'date', ['NO2'], station_column='station')
+        parallel = decompose(self.df, 'date', ['NO2'], station_column='station', max_workers=2)
+        np.testing.assert_allclose(serial.components['trend'], parallel.components['trend'])
+
+        with tempfile.TemporaryDirectory() as results_dir:
+            get_decomposition('test', self.df, 'date', ['NO2'], results_dir=results_dir, station_column='station')
+            path = get_decomposition_path('test', results_dir)
+            written = os.stat(path).st_mtime_ns
+            cached = get_decomposition('test', self.df, 'date', ['NO2'], results_dir=results_dir,
+                                       station_column='station')
+            self.assertEqual(os.stat(path).st_mtime_ns, written)
+            np.testing.assert_allclose(cached.components['seasonal'], serial.components['seasonal'])
+
+            # Andre parametre gir en ny beregning
+            get_decomposition('test', self.df, 'date', ['NO2'], results_dir=results_dir,
+                              station_column='station', seasonal_years=9)
+            self.assertNotEqual(os.stat(path).st_mtime_ns, written)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.exceedances import analyse_exceedances
+
+class TestExceedances(unittest.TestCase):
+    """
+    Tester for overskridelser og episoder.
+    """
+
+    def setUp(self):
+        """
+        Lager to stasjoner med kjente episoder over terskelen 50.
+        """
+        dates = pd.date_range('2020-01-01', '2020-12-31', freq='D')
+        station_a = np.full(len(dates), 10.0)
+        station_a[[3, 4, 5, 40, 200]] = 60.0      # Episoder på 3, 1 og 1 dager
+        station_b = np.full(len(dates), 10.0)
+        station_b[[0, 1, 364]] = 80.0             # Episoder på 2 og 1 dager, i starten og slutten
+        station_b[100] = np.nan
+        self.df = pd.DataFrame({
+            'date': np.concatenate([dates, dates]),
+            'station': ['A'] * len(dates) + ['B'] * len(dates),
+            'PM10': np.concatenate([station_a, station_b])
+        })
+        self.rules = [
+            {'name': 'PM10_24h', 'column': 'PM10', 'averaging': '24h', 'threshold': 50.0,
+             'direction': 'above', 'min_duration': 1},
+            {'name': 'PM10_long', 'column': 'PM10', 'averaging': '24h', 'threshold': 50.0,
+             'direction': 'above', 'min_duration': 2}
+        ]
+
+    def test_episodes_do_not_cross_stations(self):
+        """
+        Tester at episodene finnes per stasjon med riktig start, lengde og minste varighet.
+        """
+        _, _, episodes = analyse_exceedances(self.df, 'date', self.rules, station_column='station')
+        short = episodes[episodes['rule'] == 'PM10_24h']
+
+        self.assertEqual(short.groupby('station')['duration_days'].apply(list).to_dict(),
+                         {'A': [3, 1, 1], 'B': [2, 1]})
+        self.assertEqual(short['start'].iloc[0], pd.Timestamp('2020-01-04'))
+        self.assertEqual(short['peak'].max(), 80.0)
+        self.assertEqual(len(episodes[episodes['rule'] == 'PM10_long']), 2)
+
+    def test_counts_per_year_and_season(self):
+        """
+        Tester antall overskridelsesdager, gyldige dager og episoder per år og årstid.
+        """
+        year_season, year, _ = analyse_exceedances(self.df, 'date', self.rules[:1], station_column='station')
+
+        self.assertEqual(year.loc[('A', 'PM10_24h', 2020), 'exceedance_days'], 5)
+        self.assertEqual(year.loc[('B', 'PM10_24h', 2020), 'valid_days'], 365)
+        winter_b = year_season.loc[('B', 'PM10_24h', 2020, 'Winter')]
+        self.assertEqual(winter_b['exceedance_days'], 3)
+        self.assertEqual(winter_b['episodes'], 2)
+        self.assertEqual(winter_b['longest_episode'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import tempfile
+import json
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.predictive_analysis.feature_store import (build_features, get_features, get_features_dir, load_cleaned,
+                                                   FEATURES_FILENAME)
+from src.data_access.series_cache import write_series_cache, get_series_cache_dir
+
+class TestFeatureStore(unittest.TestCase):
+    """
+    Tester for egenskapene som lagres for prediksjonsmodellene.
+    """
+
+    def setUp(self):
+        """
+        Lager to år med daglige NILU-verdier med noen hull, og værdata som starter senere.
+        """
+        rng = np.random.default_rng(11)
+        dates = pd.date_range('2019-01-01', '2020-12-31', freq='D')
+        self.df = pd.DataFrame({'dateTime': dates, 'NO2': rng.normal(20, 5, len(dates)),
+                                'PM10': rng.normal(10, 3, len(dates)),
+                                'PM2.5': rng.normal(5, 1, len(dates)),
+                                'generated_NO2': rng.random(len(dates)) < 0.1})
+        self.df.loc[[10, 11, 200], 'NO2'] = np.nan
+        weather_dates = pd.date_range('2019-02-01', '2021-03-01', freq='D')
+        self.weather = pd.DataFrame({'referenceTime': weather_dates,
+                                     'mean_air_temperature': rng.normal(5, 8, len(weather_dates))})
+
+    def test_matches_pandas(self):
+        """
+        Tester forskjøvede verdier, glidende gjennomsnitt, kalenderen og værdataene mot pandas.
+        """
+        features = build_features(self.df, 'dateTime', ['NO2'],
+                                  exogenous={'frost': (self.weather, 'referenceTime', ['mean_air_temperature'])})
+        no2 = self.df['NO2']
+
+        np.testing.assert_allclose(features['NO2_lag7'], no2.shift(7))
+        np.testing.assert_allclose(features['NO2_mean30'], no2.rolling(30, min_periods=1).mean().shift(1))
+        np.testing.assert_array_equal(features['day_of_year'], self.df['dateTime'].dt.dayofyear)
+        np.testing.assert_array_equal(features['generated_NO2'], self.df['generated_NO2'])
+
+        weather = self.weather.set_index('referenceTime')['mean_air_temperature'].reindex(self.df['dateTime'])
+        np.testing.assert_allclose(features['frost_mean_air_temperature'], weather)
+        np.testing.assert_allclose(features['frost_mean_air_temperature_lag1'], weather.shift(1))
+
+    def test_materialized_once_per_data_version(self):
+        """
+        Tester at egenskapene lagres én gang, leses kolonnevis og lages på nytt når dataene endres.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            clean_dir = os.path.join(root, 'data', 'clean')
+            os.makedirs(clean_dir)
+            data_path = os.path.join(clean_dir, 'cleaned_data_nilu.json')
+            records = self.df.assign(dateTime=self.df['dateTime'].dt.strftime('%Y-%m-%d'))
+            records = records.astype(object).where(records.notna(), None).to_dict('records')
+            with open(data_path, 'w') as file:
+                json.dump(records, file)
+
+            features = get_features('nilu', ['days', 'NO2', 'PM10_lag1'], project_root=root)
+            meta_path = os.path.join(get_features_dir('nilu', root), FEATURES_FILENAME)
+            written = os.stat(meta_path).st_mtime_ns
+            self.assertEqual(list(features.columns), ['date', 'days', 'NO2', 'PM10_lag1', 'generated_NO2'])
+            np.testing.assert_allclose(features['PM10_lag1'], self.df['PM10'].shift(1))
+
+            get_features('nilu', ['NO2_mean7'], project_root=root)
+            self.assertEqual(os.stat(meta_path).st_mtime_ns, written)
+
+            # Nye rensede data gir nye egenskaper
+            os.utime(data_path, ns=(written + 10**9, written + 10**9))
+            get_features('nilu', ['NO2_mean7'], project_root=root)
+            self.assertNotEqual(os.stat(meta_path).st_mtime_ns, written)
+
+    def test_reads_cleaning_cache_while_it_matches_the_file(self):
+        """
+        Tester at de rensede dataene leses fra cachen fra rensingen, men bare så lenge filen er uendret.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            clean_dir = os.path.join(root, 'data', 'clean')
+            os.makedirs(clean_dir)
+            data_path = os.path.join(clean_dir, 'cleaned_data_nilu.json')
+            records = self.df.assign(dateTime=self.df['dateTime'].dt.strftime('%Y-%m-%d'))
+            records = records.astype(object).where(records.notna(), None).to_dict('records')
+            with open(data_path, 'w') as file:
+                json.dump(records, file)
+
+            # Cachen får andre verdier enn filen, slik at vi ser hvilken som leses
+            write_series_cache(self.df.assign(NO2=self.df['NO2'] + 100), get_series_cache_dir('nilu', clean_dir),
+                               'dateTime', source_path=data_path)
+            cached = load_cleaned('nilu', root, ['NO2'])
+            np.testing.assert_allclose(cached['NO2'], self.df['NO2'] + 100)
+            np.testing.assert_array_equal(cached['generated_NO2'], self.df['generated_NO2'])
+
+            # En endret fil gjør cachen utdatert
+            mtime = os.stat(data_path).st_mtime_ns + 10**9
+            os.utime(data_path, ns=(mtime, mtime))
+            np.testing.assert_allclose(load_cleaned('nilu', root, ['NO2'])['NO2'], self.df['NO2'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+import json
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from sklearn.linear_model import LinearRegression
+from src.predictive_analysis.model_registry import get_model, get_model_path, predict
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Tester for de lagrede prediksjonsmodellene.
+    """
+
+    def setUp(self):
+        """
+        Lagrer to år med daglige NILU-verdier med en trend og noen hull i en midlertidig rot-mappe.
+        """
+        rng = np.random.default_rng(5)
+        dates = pd.date_range('2019-01-01', '2020-12-31', freq='D')
+        self.df = pd.DataFrame({'dateTime': dates, 'NO2': 30 - 0.01 * np.arange(len(dates)) + rng.normal(0, 2, len(dates)),
+                                'PM10': rng.normal(10, 3, len(dates)), 'PM2.5': rng.normal(5, 1, len(dates))})
+        self.df.loc[[3, 4, 400], 'NO2'] = np.nan
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        clean_dir = os.path.join(self.root, 'data', 'clean')
+        os.makedirs(clean_dir)
+        self.data_path = os.path.join(clean_dir, 'cleaned_data_nilu.json')
+        records = self.df.assign(dateTime=self.df['dateTime'].dt.strftime('%Y-%m-%d'))
+        records = records.astype(object).where(records.notna(), None).to_dict('records')
+        with open(self.data_path, 'w') as file:
+            json.dump(records, file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_trained_once_per_data_version(self):
+        """
+        Tester at modellen lagres én gang, gjenbrukes og trenes på nytt når dataene endres.
+        """
+        record = get_model('nilu_NO2', project_root=self.root)
+        model_path = get_model_path('nilu_NO2', self.root)
+        written = os.stat(model_path).st_mtime_ns
+        self.assertEqual(record['features'], ['days'])
+        self.assertEqual(record['n_train'], len(self.df) - 3)
+
+        self.assertEqual(get_model('nilu_NO2', project_root=self.root)['trained_at'], record['trained_at'])
+        self.assertEqual(os.stat(model_path).st_mtime_ns, written)
+
+        # Nye rensede data gir en ny modell
+        os.utime(self.data_path, ns=(written + 10**9, written + 10**9))
+        retrained = get_model('nilu_NO2', project_root=self.root)
+        self.assertNotEqual(retrained['fingerprint'], record['fingerprint'])
+        self.assertNotEqual(os.stat(model_path).st_mtime_ns, written)
+
+    def test_predict_matches_direct_fit(self):
+        """
+        Tester at prediksjonen for fremtidige datoer er lik en regresjon tilpasset direkte på dagene.
+        """
+        known = self.df.dropna(subset=['NO2'])
+        days = ((known['dateTime'] - pd.Timestamp('1970-01-01')).dt.days).to_numpy(dtype=float)
+        expected_model = LinearRegression().fit(days.reshape(-1, 1), known['NO2'])
+
+        future = pd.date_range('2021-01-01', periods=30, freq='D')
+        future_days = ((future - pd.Timestamp('1970-01-01')).days).to_numpy(dtype=float)
+        prediction = predict('nilu_NO2', future, project_root=self.root)
+
+        self.assertEqual(prediction.name, 'NO2')
+        self.assertTrue(prediction.index.equals(future))
+        np.testing.assert_allclose(prediction, expected_model.predict(future_days.reshape(-1, 1)))
+
+        with self.assertRaises(KeyError):
+            predict('ukjent', future, project_root=self.root)
+
+if __name__ == '__main__':
+    unittest.main()
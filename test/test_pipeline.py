@@ -0,0 +1,218 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline.stage_cache import StageCache
+from src.pipeline.stages import Stage, run_stages, get_stages
+from src.pipeline.pipeline_runner import run_pipeline, resolve_dependencies, critical_path
+
+# Teller hvor mange ganger teststeget faktisk kjøres
+calls = []
+
+def copy_input(project_root):
+    """
+    Teststeg som kopierer 'input.txt' til 'output.txt'.
+    """
+    calls.append(project_root)
+    with open('input.txt') as source, open('output.txt', 'w') as target:
+        target.write(source.read())
+
+def append_to_store(project_root):
+    """
+    Teststeg som leser og oppdaterer 'store.txt', som et rådatalager, og skriver 'output.txt'.
+    """
+    calls.append(project_root)
+    with open('store.txt', 'a') as store:
+        store.write('x')
+    write_text('output.txt', 'ok')
+
+class TestStageCache(unittest.TestCase):
+    """
+    Tester for fingeravtrykk og overhopping av uendrede pipeline-steg.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en prosjektmappe med én inndatafil.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.input_path = os.path.join(self.root, 'input.txt')
+        with open(self.input_path, 'w') as file:
+            file.write('a')
+        calls.clear()
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def make_stage(self, params):
+        """
+        Lager teststeget med gitte parametre.
+        """
+        return [Stage('copy', copy_input, inputs=['input.txt'], outputs=['output.txt'], params=params)]
+
+    def test_unchanged_stage_is_skipped(self):
+        """
+        Tester at et steg hoppes over når inndata og parametre er uendret.
+        """
+        # Kjører steget to ganger
+        first = run_stages(self.root, stages=self.make_stage({'num_std': 4}))
+        second = run_stages(self.root, stages=self.make_stage({'num_std': 4}))
+
+        # Sjekker at steget kun kjørte første gang
+        self.assertEqual(first, {'copy': 'ran'})
+        self.assertEqual(second, {'copy': 'skipped'})
+        self.assertEqual(len(calls), 1)
+
+    def test_changes_trigger_rerun(self):
+        """
+        Tester at endrede parametre, endret innhold og manglende utdata gir ny kjøring.
+        """
+        run_stages(self.root, stages=self.make_stage({'num_std': 4}))
+
+        # Sjekker endret parameter
+        self.assertEqual(run_stages(self.root, stages=self.make_stage({'num_std': 3})), {'copy': 'ran'})
+
+        # Sjekker endret innhold
+        with open(self.input_path, 'w') as file:
+            file.write('b')
+        self.assertEqual(run_stages(self.root, stages=self.make_stage({'num_std': 3})), {'copy': 'ran'})
+
+        # Sjekker manglende utdata
+        os.remove(os.path.join(self.root, 'output.txt'))
+        self.assertEqual(run_stages(self.root, stages=self.make_stage({'num_std': 3})), {'copy': 'ran'})
+        self.assertEqual(len(calls), 4)
+
+    def test_self_updated_input_is_stable(self):
+        """
+        Tester at en inndatafil som steget selv oppdaterer ikke gir ny kjøring, men at endringer utenfra gjør det.
+        """
+        stages = [Stage('store', append_to_store, inputs=['store.txt'], outputs=['output.txt', 'store.txt'])]
+        self.assertEqual(run_stages(self.root, stages=stages), {'store': 'ran'})
+        self.assertEqual(run_stages(self.root, stages=stages), {'store': 'skipped'})
+
+        # Endringer fra andre, f.eks. en slettet periode, gir ny kjøring
+        with open(os.path.join(self.root, 'store.txt'), 'w') as file:
+            file.write('')
+        self.assertEqual(run_stages(self.root, stages=stages), {'store': 'ran'})
+        self.assertEqual(len(calls), 2)
+
+    def test_content_hash_ignores_touch(self):
+        """
+        Tester at en fil med nytt endringstidspunkt, men samme innhold, gir samme fingeravtrykk.
+        """
+        cache = StageCache(os.path.join(self.root, 'cache.json'))
+        before = cache.fingerprint([self.input_path])
+        stat = os.stat(self.input_path)
+        os.utime(self.input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(cache.fingerprint([self.input_path]), before)
+
+    def test_analysis_tunables_change_fingerprint(self):
+        """
+        Tester at en endret konstant i en analysemodul gir nytt fingeravtrykk for analysestegene.
+        """
+        import data_analysis.bootstrap as bootstrap
+        import data_analysis.trend_tests as trend_tests
+        cache = StageCache(os.path.join(self.root, 'cache.json'))
+
+        def fingerprints():
+            stages = {stage.name: stage for stage in get_stages()}
+            return [cache.fingerprint([], stages[name].params) for name in ('analyse_frost', 'analyse_nilu')]
+
+        before = fingerprints()
+        with mock.patch.object(bootstrap, 'BOOTSTRAP_SEED', 1):
+            self.assertNotEqual(fingerprints()[0], before[0])
+        with mock.patch.object(trend_tests, 'MAX_PAIRS', 1000):
+            self.assertNotEqual(fingerprints()[1], before[1])
+        self.assertEqual(fingerprints(), before)
+
+def write_text(name, text):
+    """
+    Hjelpefunksjon som lager et steg som skriver en tekstfil.
+    """
+    with open(name, 'w') as file:
+        file.write(text)
+
+def write_frost(project_root):
+    """
+    Teststeg for Frost-grenen.
+    """
+    write_text('frost.txt', 'frost')
+
+def write_nilu(project_root):
+    """
+    Teststeg for NILU-grenen.
+    """
+    write_text('nilu.txt', 'nilu')
+
+def write_joined(project_root):
+    """
+    Teststeg som slår sammen utdataene fra de to grenene.
+    """
+    with open('frost.txt') as frost, open('nilu.txt') as nilu:
+        write_text('joined.txt', frost.read() + nilu.read())
+
+class TestPipelineRunner(unittest.TestCase):
+    """
+    Tester for avhengighetsgrafen og den parallelle kjøringen av stegene.
+    """
+
+    def setUp(self):
+        """
+        Oppretter en tom prosjektmappe og tre steg der 'join' avhenger av de to andre.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.stages = [
+            Stage('frost', write_frost, inputs=[], outputs=['frost.txt']),
+            Stage('nilu', write_nilu, inputs=[], outputs=['nilu.txt']),
+            Stage('join', write_joined, inputs=['frost.txt', 'nilu.txt'], outputs=['joined.txt'],
+                  depends_on=['frost', 'nilu'])
+        ]
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_runs_in_dependency_order(self):
+        """
+        Tester at avhengige steg får utdataene fra stegene før, og at neste kjøring hopper over alt.
+        """
+        # Kjører pipelinen to ganger med to prosesser
+        first = run_pipeline(self.root, stages=self.stages, max_workers=2)
+        second = run_pipeline(self.root, stages=self.stages, max_workers=2)
+
+        # Sjekker status og resultat
+        self.assertEqual(first, {'frost': 'ran', 'nilu': 'ran', 'join': 'ran'})
+        self.assertEqual(set(second.values()), {'skipped'})
+        with open(os.path.join(self.root, 'joined.txt')) as file:
+            self.assertEqual(file.read(), 'frostnilu')
+
+    def test_cycle_is_rejected(self):
+        """
+        Tester at sykliske avhengigheter gir ValueError.
+        """
+        self.stages[0].depends_on = ['join']
+        with self.assertRaises(ValueError):
+            resolve_dependencies(self.stages)
+
+    def test_critical_path(self):
+        """
+        Tester at den kritiske stien følger den tregeste grenen.
+        """
+        dependencies = resolve_dependencies(self.stages)
+        path, length = critical_path(dependencies, {'frost': 3.0, 'nilu': 1.0, 'join': 0.5})
+        self.assertEqual(path, ['frost', 'join'])
+        self.assertAlmostEqual(length, 3.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_analysis.rolling_stats import rolling_window_statistics, rolling_statistics, running_means
+
+class TestRollingStats(unittest.TestCase):
+    """
+    Tester for de glidende statistikkene i rolling_stats.
+    """
+
+    def setUp(self):
+        """
+        Lager to år med tilfeldige daglige verdier, med manglende verdier og imputerte dager.
+        """
+        rng = np.random.default_rng(1)
+        self.values = rng.normal(10, 5, (730, 2))
+        self.values[rng.random(self.values.shape) < 0.1] = np.nan
+        self.df = pd.DataFrame({
+            'date': pd.date_range('2019-01-01', periods=730, freq='D'),
+            'a': self.values[:, 0],
+            'generated_a': rng.random(730) < 0.2
+        })
+
+    def test_matches_pandas_rolling(self):
+        """
+        Tester at alle statistikkene er like pandas' rolling for flere vindusstørrelser.
+        """
+        frame = pd.DataFrame(self.values)
+        for window in (1, 7, 30, 365):
+            min_periods = int(np.ceil(0.75 * window))
+            stats = rolling_window_statistics(self.values, window, min_periods)
+            expected = frame.rolling(window, min_periods=min_periods)
+            for name in ('mean', 'sum', 'std', 'min', 'max'):
+                np.testing.assert_allclose(stats[name], getattr(expected, name)().to_numpy(),
+                                           atol=1e-8, err_msg=f"{name}, vindu {window}")
+
+    def test_exclude_generated_and_gaps(self):
+        """
+        Tester at imputerte dager kan utelates og at manglende dager legges inn som NaN.
+        """
+        df = self.df.drop(index=range(100, 110))
+        result = rolling_statistics(df, 'date', ['a'], windows=(7,), exclude_generated=True, min_coverage=0)
+
+        self.assertEqual(len(result), 730)
+        kept = self.df['a'].where(~self.df['generated_a']).copy()
+        kept.iloc[100:110] = np.nan
+        expected = kept.rolling(7, min_periods=1).mean().to_numpy()
+        np.testing.assert_allclose(result['a_7d_mean'].to_numpy(), expected)
+        self.assertEqual(result['a_7d_count'].iloc[109], 0)
+
+    def test_running_means_hourly(self):
+        """
+        Tester at 24-timersmiddelet for timedata er et glidende middel over 24 verdier.
+        """
+        hours = pd.DataFrame({'time': pd.date_range('2020-01-01', periods=72, freq='h'),
+                              'NO2': np.arange(72, dtype=float)})
+        result = running_means(hours, 'time', ['NO2'], freq='h')
+
+        self.assertTrue(np.isnan(result['NO2_24h_mean'].iloc[16]))
+        self.assertAlmostEqual(result['NO2_24h_mean'].iloc[47], np.arange(24, 48).mean())
+        self.assertTrue(result['NO2_annual_mean'].isna().all())
+
+if __name__ == '__main__':
+    unittest.main()
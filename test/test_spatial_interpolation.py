@@ -0,0 +1,66 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.spatial_interpolation import (SpatialInterpolator, regular_grid, idw_weights,
+                                                     interpolate_stations)
+
+class TestSpatialInterpolation(unittest.TestCase):
+    """
+    Tester for interpolasjonen av stasjonsdata til et rutenett med inverse avstandsvekter.
+    """
+
+    def setUp(self):
+        """
+        Lager fire stasjoner rundt Trondheim og 30 dager med målinger, der noen mangler.
+        """
+        rng = np.random.default_rng(4)
+        self.lats = np.array([63.43, 63.42, 63.44, 63.41])
+        self.lons = np.array([10.39, 10.40, 10.43, 10.35])
+        self.values = rng.normal(20, 5, (30, 4))
+        self.values[rng.random((30, 4)) < 0.2] = np.nan
+        self.values[0] = [1.0, np.nan, 3.0, 4.0]
+
+    def test_exact_at_stations_and_renormalized(self):
+        """
+        Tester at feltet går gjennom målingene, og at en manglende stasjon gir samme svar som uten stasjonen.
+        """
+        exact = SpatialInterpolator(self.lats, self.lons, self.lats, self.lons).interpolate(self.values)
+        present = ~np.isnan(self.values)
+        np.testing.assert_allclose(exact[present], self.values[present])
+
+        grid_lats, grid_lons = regular_grid(self.lats, self.lons, resolution_km=2.0)
+        full = SpatialInterpolator.for_grid(self.lats, self.lons, grid_lats, grid_lons).interpolate(self.values[:1])
+        keep = [0, 2, 3]
+        without = SpatialInterpolator.for_grid(self.lats[keep], self.lons[keep], grid_lats, grid_lons)
+        np.testing.assert_allclose(full, without.interpolate(self.values[:1, keep]))
+        self.assertEqual(full.shape, (1, len(grid_lats), len(grid_lons)))
+
+    def test_matches_daily_loop(self):
+        """
+        Tester at matrisemultiplikasjonen for alle dager gir samme svar som en løkke over dagene.
+        """
+        grid_lats, grid_lons = regular_grid(self.lats, self.lons, resolution_km=1.0)
+        lons, lats = np.meshgrid(grid_lons, grid_lats)
+        fields = SpatialInterpolator.for_grid(self.lats, self.lons, grid_lats, grid_lons).interpolate(self.values)
+        for day in range(len(self.values)):
+            present = ~np.isnan(self.values[day])
+            weights = idw_weights(self.lats[present], self.lons[present], lats.ravel(), lons.ravel())
+            expected = weights @ self.values[day, present] / weights.sum(axis=1)
+            np.testing.assert_allclose(fields[day].ravel(), expected)
+
+        # Fra langt format med stasjonsnavn
+        dates = pd.date_range('2020-01-01', periods=len(self.values), freq='D')
+        df = pd.DataFrame({'date': np.repeat(dates, 4), 'station': np.tile(list('abcd'), len(dates)),
+                           'NO2': self.values.ravel()})
+        coordinates = {name: (lat, lon) for name, lat, lon in zip('abcd', self.lats, self.lons)}
+        grids = interpolate_stations(df, coordinates, ['NO2'], resolution_km=1.0)
+        np.testing.assert_allclose(grids['NO2'][3], fields)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_collection import station_catalogue
+from src.data_collection.station_catalogue import StationCatalogue, load_catalogue, EARTH_RADIUS_KM
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Storsirkelavstand i km mellom ett punkt og mange punkter.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+class TestStationCatalogue(unittest.TestCase):
+    """
+    Tester for stasjonskatalogen med BallTree-indeks.
+    """
+
+    def setUp(self):
+        """
+        Lager 500 tilfeldige stasjoner i Trøndelag, der annenhver er lagt ned i 2005.
+        """
+        rng = np.random.default_rng(5)
+        self.lats = rng.uniform(62.5, 64.5, 500)
+        self.lons = rng.uniform(9.0, 12.0, 500)
+        self.catalogue = StationCatalogue([
+            {'id': f'SN{i}', 'name': f'Stasjon {i}', 'source': 'frost' if i % 3 else 'nilu',
+             'latitude': lat, 'longitude': lon, 'elements': ['NO2'] if i % 3 == 0 else [],
+             'valid_from': '1990-01-01T00:00:00.000Z', 'valid_to': '2005-06-30T00:00:00.000Z' if i % 2 else None}
+            for i, (lat, lon) in enumerate(zip(self.lats, self.lons))])
+
+    def test_matches_brute_force(self):
+        """
+        Tester nærmeste stasjoner og radiussøk for mange koordinater mot avstand til alle stasjonene.
+        """
+        rng = np.random.default_rng(6)
+        query_lats, query_lons = rng.uniform(62.5, 64.5, 50), rng.uniform(9.0, 12.0, 50)
+        distances, indices = self.catalogue.nearest(query_lats, query_lons, k=3)
+        radius_distances, radius_indices = self.catalogue.within_radius(query_lats, query_lons, 10.0)
+
+        for q, (lat, lon) in enumerate(zip(query_lats, query_lons)):
+            all_distances = haversine(lat, lon, self.lats, self.lons)
+            np.testing.assert_array_equal(indices[q], np.argsort(all_distances)[:3])
+            np.testing.assert_allclose(distances[q], np.sort(all_distances)[:3])
+            np.testing.assert_array_equal(radius_indices[q], np.flatnonzero(all_distances <= 10.0)[
+                np.argsort(all_distances[all_distances <= 10.0])])
+            np.testing.assert_allclose(radius_distances[q], np.sort(all_distances[all_distances <= 10.0]))
+
+        # Filtrene tar bare med stasjoner fra kilden som var i drift i perioden
+        active = self.catalogue.subset(source='nilu', element='NO2', valid_from='2010-01-01')
+        self.assertTrue(all(s['source'] == 'nilu' and s['valid_to'] is None for s in active.stations))
+        self.assertEqual(len(active), sum(1 for i in range(500) if i % 3 == 0 and i % 2 == 0))
+
+    def test_cached_and_refreshed(self):
+        """
+        Tester at den lagrede katalogen brukes til den er for gammel, og at den gamle brukes hvis hentingen feiler.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'catalogue.json')
+            with mock.patch.object(station_catalogue, 'fetch_nilu_stations',
+                                   return_value=self.catalogue.stations[:10]) as fetch:
+                first = load_catalogue(path)
+                second = load_catalogue(path)
+                self.assertEqual(fetch.call_count, 1)
+                self.assertEqual(len(second), 10)
+                self.assertEqual(second.nearest_station(self.lats[3], self.lons[3])['id'], 'SN3')
+
+                # En gammel katalog hentes på nytt
+                StationCatalogue(first.stations, '2000-01-01T00:00:00+00:00').save(path)
+                load_catalogue(path)
+                self.assertEqual(fetch.call_count, 2)
+
+            StationCatalogue(first.stations, '2000-01-01T00:00:00+00:00').save(path)
+            with mock.patch.object(station_catalogue, 'fetch_nilu_stations', return_value=None):
+                stale = load_catalogue(path)
+            self.assertEqual(stale.fetched_at, '2000-01-01T00:00:00+00:00')
+
+if __name__ == '__main__':
+    unittest.main()
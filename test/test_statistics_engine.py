@@ -0,0 +1,68 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_analysis.statistics_engine import GroupMoments, multi_level_statistics
+
+class TestStatisticsEngine(unittest.TestCase):
+    """
+    Tester for statistikkmotoren som brukes av analysene og de løpende aggregatene.
+    """
+
+    def setUp(self):
+        """
+        Lager tre år med tilfeldige daglige verdier, med noen manglende verdier.
+        """
+        rng = np.random.default_rng(0)
+        dates = pd.date_range('2018-01-01', '2020-12-31', freq='D')
+        self.df = pd.DataFrame({
+            'year': dates.year,
+            'season': np.array(['Winter', 'Spring', 'Summer', 'Fall'])[(dates.month % 12) // 3],
+            'temperature': rng.normal(5, 8, len(dates)),
+            'precipitation': rng.gamma(1.0, 3.0, len(dates))
+        })
+        self.df.loc[10:40, 'precipitation'] = np.nan
+        self.columns = ['temperature', 'precipitation']
+
+    def test_matches_pandas_groupby(self):
+        """
+        Tester at begge nivåene gir samme resultat som pandas groupby.
+        """
+        # Kjører motoren
+        year_season, year = multi_level_statistics(self.df, self.columns)
+
+        # Sjekker mot pandas for begge nivåene
+        for result, keys in ((year_season, ['year', 'season']), (year, ['year'])):
+            expected = self.df.groupby(keys)[self.columns].agg(['mean', 'median', 'std', 'min', 'max', 'count'])
+            self.assertTrue(result.index.equals(expected.index))
+            self.assertTrue(np.allclose(result[expected.columns].to_numpy(dtype=float),
+                                        expected.to_numpy(dtype=float), equal_nan=True))
+
+    def test_rollup_is_exact(self):
+        """
+        Tester at sammenslåing av delgrupper gir samme gjennomsnitt og std som rådataene.
+        """
+        # Slår sammen (år, årstid) til ett nivå uten nøkler utenom år
+        moments = GroupMoments.from_frame(self.df, ['year', 'season'], self.columns).combine(['year'])
+        direct = GroupMoments.from_frame(self.df, ['year'], self.columns)
+
+        # Sjekker at verdiene er like
+        self.assertTrue(np.allclose(moments.mean, direct.mean))
+        self.assertTrue(np.allclose(moments.std(), direct.std()))
+        self.assertTrue(np.array_equal(moments.count, direct.count))
+
+    def test_single_value_group(self):
+        """
+        Tester at en gruppe med én verdi får NaN som standardavvik, slik som pandas.
+        """
+        df = pd.DataFrame({'year': [2020, 2021, 2021], 'season': ['Winter'] * 3, 'value': [1.0, 2.0, 4.0]})
+        _, year = multi_level_statistics(df, ['value'])
+        self.assertTrue(np.isnan(year.loc[2020, ('value', 'std')]))
+        self.assertEqual(year.loc[2021, ('value', 'median')], 3.0)
+
+if __name__ == '__main__':
+    unittest.main()
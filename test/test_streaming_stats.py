@@ -0,0 +1,142 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import tempfile
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.statistics_engine import multi_level_statistics
+from src.data_analysis.correlation_engine import pairwise_correlation
+from src.data_analysis.streaming_stats import QuantileSketch, StreamingAggregator, refresh_streaming_statistics
+from src.data_analysis.data_analysis_nilu import calculate_statistics
+
+def make_daily_data(start, periods, seed=0):
+    """
+    Hjelpefunksjon som lager daglige data med år og årstid.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=periods, freq='D')
+    return pd.DataFrame({
+        'date': dates,
+        'year': dates.year,
+        'season': np.array(['Winter', 'Spring', 'Summer', 'Fall'])[(dates.month % 12) // 3],
+        'no2': np.round(rng.normal(20, 8, periods), 1),
+        'pm10': np.round(rng.gamma(2.0, 6.0, periods), 1)
+    })
+
+class TestStreamingStats(unittest.TestCase):
+    """
+    Tester for de løpende, mergebare aggregatene.
+    """
+
+    def setUp(self):
+        """
+        Lager to års data og en midlertidig tilstandsfil.
+        """
+        self.df = make_daily_data('2019-01-01', 730)
+        self.columns = ['no2', 'pm10']
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, 'state.json')
+
+    def tearDown(self):
+        """
+        Fjerner de midlertidige filene.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_incremental_matches_batch(self):
+        """
+        Tester at oppdatering i to omganger gir samme tabeller som en full beregning.
+        """
+        # Kjører første år, og deretter hele perioden
+        refresh_streaming_statistics(self.df.iloc[:365], self.columns, 'date', self.state_path)
+        aggregator = refresh_streaming_statistics(self.df, self.columns, 'date', self.state_path)
+        year_season, year, correlations = aggregator.to_frames()
+
+        # Sjekker mot statistikkmotoren og np.corrcoef
+        expected_ys, expected_y = multi_level_statistics(self.df, self.columns)
+        self.assertEqual(aggregator.rows, 730)
+        self.assertTrue(np.allclose(year_season.to_numpy(float), expected_ys.to_numpy(float)))
+        self.assertTrue(np.allclose(year.to_numpy(float), expected_y.to_numpy(float)))
+        self.assertTrue(np.allclose(correlations.to_numpy(), np.corrcoef(self.df[self.columns].to_numpy().T)))
+
+    def test_calculate_statistics_matches_engine(self):
+        """
+        Tester at calculate_statistics gir eksakte medianer for verdier med én desimal, og parvis korrelasjon.
+        """
+        df = self.df.rename(columns={'date': 'dateTime'})
+        df.loc[df.index[::4], 'pm10'] = np.nan
+        year_season, year, correlations = calculate_statistics(df, self.columns)
+
+        expected_ys, expected_y = multi_level_statistics(df, self.columns)
+        expected_corr, _ = pairwise_correlation(df[self.columns].to_numpy(dtype=float))
+        self.assertTrue(np.allclose(year_season.to_numpy(float), expected_ys.to_numpy(float)))
+        self.assertTrue(np.allclose(year.to_numpy(float), expected_y.to_numpy(float)))
+        self.assertTrue(np.allclose(correlations.to_numpy(), expected_corr))
+
+    def test_correlation_is_pairwise(self):
+        """
+        Tester at korrelasjonen bruker parvis komplette rader, også når tilstanden oppdateres i to omganger.
+        """
+        df = self.df.assign(so2=np.round(np.random.default_rng(1).normal(3, 1, len(self.df)), 1))
+        df.loc[df.index[::3], 'no2'] = np.nan
+        df.loc[df.index[1::5], 'so2'] = np.nan
+        columns = self.columns + ['so2']
+
+        refresh_streaming_statistics(df.iloc[:400], columns, 'date', self.state_path)
+        _, _, correlations = refresh_streaming_statistics(df, columns, 'date', self.state_path).to_frames()
+
+        expected, _ = pairwise_correlation(df[columns].to_numpy(dtype=float))
+        self.assertFalse(correlations.isna().any().any())
+        self.assertTrue(np.allclose(correlations.to_numpy(), expected))
+
+    def test_merge_partitions(self):
+        """
+        Tester at to aggregatorer for hver sin partisjon kan slås sammen.
+        """
+        first, second = StreamingAggregator(self.columns), StreamingAggregator(self.columns)
+        first.update(self.df.iloc[::2], 'date')
+        second.update(self.df.iloc[1::2], 'date')
+        _, year, _ = first.merge(second).to_frames()
+        _, expected = multi_level_statistics(self.df, self.columns)
+        self.assertTrue(np.allclose(year.to_numpy(float), expected.to_numpy(float)))
+
+    def test_rewritten_history_rebuilds(self):
+        """
+        Tester at tilstanden bygges på nytt når eldre rader er fjernet.
+        """
+        refresh_streaming_statistics(self.df, self.columns, 'date', self.state_path)
+        aggregator = refresh_streaming_statistics(self.df.iloc[100:], self.columns, 'date', self.state_path)
+        self.assertEqual(aggregator.rows, 630)
+
+    def test_changed_values_rebuild(self):
+        """
+        Tester at tilstanden bygges på nytt når eldre verdier endres, men antall rader er det samme.
+        """
+        refresh_streaming_statistics(self.df, self.columns, 'date', self.state_path)
+
+        # Som ny rensing med andre grenser: én sommer får nye verdier på de samme dagene
+        changed = self.df.copy()
+        summer = (changed['year'] == 2019) & (changed['season'] == 'Summer')
+        changed.loc[summer, 'no2'] = changed.loc[summer, 'no2'] * 0.5
+        aggregator = refresh_streaming_statistics(changed, self.columns, 'date', self.state_path)
+
+        year_season, _, _ = aggregator.to_frames()
+        expected, _ = multi_level_statistics(changed, self.columns)
+        self.assertEqual(aggregator.rows, 730)
+        self.assertTrue(np.allclose(year_season.to_numpy(float), expected.to_numpy(float)))
+
+    def test_sketch_median(self):
+        """
+        Tester at skissen gir samme median som np.median, også etter sammenslåing.
+        """
+        a, b = QuantileSketch(), QuantileSketch()
+        a.add([1.0, 5.5, np.nan])
+        b.add([2.25, 9.0])
+        self.assertAlmostEqual(a.merge(b).quantile(0.5), np.median([1.0, 5.5, 2.25, 9.0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Legger til prosjektets rotmappe og src-mappen i Python-path for å kunne importere moduler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from src.data_analysis.trend_tests import mann_kendall_s, sen_slope, trend_test, trend_test_table
+
+class TestTrendTests(unittest.TestCase):
+    """
+    Tester for Mann-Kendall-testen og Sen-stigningen.
+    """
+
+    def test_s_matches_pairwise_sum(self):
+        """
+        Tester at den blokkvise tellingen gir samme S som summen over alle par, også med like verdier.
+        """
+        values = np.round(np.random.default_rng(0).normal(size=500), 1)
+        expected = sum(np.sign(values[j] - values[:j]).sum() for j in range(len(values)))
+
+        self.assertEqual(mann_kendall_s(values, chunk_size=64), expected)
+        self.assertEqual(mann_kendall_s(values), expected)
+
+    def test_slope_and_autocorrelation(self):
+        """
+        Tester stigningen for en lineær serie, og at autokorrelasjon gir større varians og høyere p-verdi.
+        """
+        times = np.arange(200.0)
+        self.assertAlmostEqual(sen_slope(times, 3.0 + 0.5 * times), 0.5)
+        # Et utvalg av par gir nesten samme stigning
+        noisy = 0.5 * times + np.random.default_rng(1).normal(size=200)
+        self.assertAlmostEqual(sen_slope(times, noisy, max_pairs=5000), sen_slope(times, noisy), places=2)
+
+        rng = np.random.default_rng(2)
+        series = np.zeros(400)
+        for i in range(1, 400):
+            series[i] = 0.9 * series[i - 1] + rng.normal()
+        series += 0.01 * np.arange(400)
+        corrected = trend_test(np.arange(400.0), series)
+        plain = trend_test(np.arange(400.0), series, autocorrelation=False)
+
+        self.assertGreater(corrected['variance_factor'], 1)
+        self.assertGreater(corrected['p_value'], plain['p_value'])
+        self.assertEqual(corrected['S'], plain['S'])
+
+    def test_table_per_station_variable_and_season(self):
+        """
+        Tester at tabellen har én rad per stasjon, variabel og årstid og finner en kjent trend.
+        """
+        dates = pd.date_range('2015-01-01', '2019-12-31', freq='D')
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame({
+            'date': np.concatenate([dates, dates]),
+            'station': ['A'] * len(dates) + ['B'] * len(dates),
+            'NO2': np.concatenate([2.0 * np.arange(len(dates)) / 365.25, np.zeros(len(dates))])
+                   + rng.normal(size=2 * len(dates))
+        })
+        table = trend_test_table(df, 'date', ['NO2'], station_column='station')
+
+        self.assertEqual(len(table), 2 * 5)
+        self.assertEqual(table.loc[('A', 'NO2', 'All'), 'trend'], 'increasing')
+        self.assertAlmostEqual(table.loc[('A', 'NO2', 'All'), 'sen_slope'], 2.0, places=1)
+        self.assertLess(abs(table.loc[('B', 'NO2', 'All'), 'sen_slope']), 0.1)
+
+    def test_seasonal_cycle_is_not_a_trend(self):
+        """
+        Tester at en årssyklus uten trend ikke gir trender innenfor årstidene, men at en ekte trend finnes.
+        """
+        dates = pd.date_range('2005-01-01', '2019-12-31', freq='D')
+        cycle = -10.0 * np.cos(2 * np.pi * (dates.dayofyear - 15) / 365.25)
+        rng = np.random.default_rng(4)
+        stations = [f'S{i}' for i in range(10)]
+        df = pd.DataFrame({
+            'date': np.tile(dates, len(stations)),
+            'station': np.repeat(stations, len(dates)),
+            'temperature': np.tile(cycle, len(stations)) + rng.normal(0, 2, len(stations) * len(dates))
+        })
+        table = trend_test_table(df, 'date', ['temperature'], station_column='station')
+
+        # Høsten går alltid fra varm til kald; på rådataene var nesten alle høstseriene signifikante
+        significant = table['trend'] != 'no trend'
+        self.assertLessEqual(int(significant.sum()), 5)
+        self.assertLessEqual(int(significant.xs('Fall', level='season').sum()), 2)
+
+        trending = df[df['station'] == 'S0'].assign(
+            temperature=lambda frame: frame['temperature'] + 0.2 * (frame['date'].dt.year - 2005))
+        fall = trend_test_table(trending, 'date', ['temperature']).loc[('station', 'temperature', 'Fall')]
+        self.assertEqual(fall['trend'], 'increasing')
+        self.assertAlmostEqual(fall['sen_slope'], 0.2, delta=0.05)
+
+if __name__ == '__main__':
+    unittest.main()